@@ -7,18 +7,21 @@ Export websites in multiple formats with advanced features
 
 import json
 import os
-import zipfile
+import re
 import base64
 import hashlib
 from datetime import datetime
-from typing import Dict, List, Optional, Any, BinaryIO
+from typing import Dict, List, Optional, Any, BinaryIO, Iterator, Tuple
 from dataclasses import dataclass
 from enum import Enum
 import logging
 import subprocess
-import tempfile
 from pathlib import Path
 
+from streaming_zip import StreamingZipWriter
+from css_purger import CSSPurger, SelectorIndex, purge_files
+from browser_pool import RenderJob, get_shared_browser_pool
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -61,6 +64,34 @@ class ExportOptions:
     watermark: bool = False
     custom_css: Optional[str] = None
     custom_js: Optional[str] = None
+    purge_css: bool = False
+    css_safelist: Optional[List[str]] = None
+
+class CompiledTemplate:
+    """Template pre-split into literal segments and {{placeholder}} slots"""
+    
+    PLACEHOLDER_PATTERN = re.compile(r"\{\{(\w+)\}\}")
+    
+    __slots__ = ("source", "segments", "slots")
+    
+    def __init__(self, source: str):
+        self.source = source
+        # split() alternates literal text and captured placeholder names
+        self.segments: List[str] = self.PLACEHOLDER_PATTERN.split(source)
+        self.slots: List[Tuple[int, str]] = []
+        for index in range(1, len(self.segments), 2):
+            name = self.segments[index]
+            self.slots.append((index, name))
+            # Unknown placeholders render unchanged, as with plain str.replace
+            self.segments[index] = f"{{{{{name}}}}}"
+    
+    def render(self, data: Dict) -> str:
+        """Fill every slot and join the segments once"""
+        parts = self.segments.copy()
+        for index, name in self.slots:
+            if name in data:
+                parts[index] = str(data[name])
+        return "".join(parts)
 
 class AdvancedExportSystem:
     """World-class export system for multiple formats"""
@@ -69,6 +100,9 @@ class AdvancedExportSystem:
         self.export_templates: Dict[str, str] = {}
         self.export_presets: Dict[str, ExportOptions] = {}
         self.optimization_settings: Dict[str, Any] = {}
+        self.compiled_templates: Dict[str, CompiledTemplate] = {}
+        self.selector_index: Optional[SelectorIndex] = None
+        self.last_purge_report: Dict[str, Dict] = {}
         
         # Initialize export system
         self._initialize_export_templates()
@@ -278,8 +312,8 @@ self.addEventListener('fetch', function(event) {
             "twitter_image": metadata.get("twitter_image", ""),
             "url": metadata.get("url", ""),
             "favicon": metadata.get("favicon", ""),
-            "css_file": "styles.css",
-            "js_file": "script.js",
+            "css_file": metadata.get("css_file", "styles.css"),
+            "js_file": metadata.get("js_file", "script.js"),
             "critical_css": "critical.css",
             "critical_font": "fonts.woff2",
             "analytics_code": self._generate_analytics_code(metadata.get("analytics", {})),
@@ -289,8 +323,7 @@ self.addEventListener('fetch', function(event) {
         }
         
         # Generate HTML
-        html_template = self.export_templates["responsive_html"]
-        html_content = self._replace_template_vars(html_template, template_data)
+        html_content = self.render_template("responsive_html", template_data)
         
         # Minify if requested
         if options.minify:
@@ -358,26 +391,43 @@ self.addEventListener('fetch', function(event) {
     # 4. ZIP Archive Export
     def export_zip(self, files: Dict[str, str], options: ExportOptions) -> bytes:
         """Export as ZIP archive"""
-        zip_buffer = tempfile.NamedTemporaryFile()
-        
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED, 
-                           compresslevel=self.optimization_settings["compression_level"][options.quality.value]) as zip_file:
+        return b"".join(self.stream_zip(files, options))
+    
+    def stream_zip(self, files: Dict[str, str], options: ExportOptions) -> Iterator[bytes]:
+        """Export as ZIP archive, yielding chunks (e.g. for a StreamingHttpResponse)"""
+        writer = self._create_zip_writer(options)
+        if options.purge_css:
+            files, _ = self.purge_unused_css(files, options.css_safelist)
+        return writer.iter_zip(self._iter_zip_entries(files, options))
+    
+    def export_zip_to_file(self, files: Dict[str, str], options: ExportOptions,
+                           fileobj: BinaryIO) -> int:
+        """Export as ZIP archive directly into a binary file object"""
+        writer = self._create_zip_writer(options)
+        if options.purge_css:
+            files, _ = self.purge_unused_css(files, options.css_safelist)
+        return writer.write_zip(self._iter_zip_entries(files, options), fileobj)
+    
+    def _create_zip_writer(self, options: ExportOptions) -> StreamingZipWriter:
+        """Create a streaming ZIP writer for the export quality"""
+        return StreamingZipWriter(
+            compresslevel=self.optimization_settings["compression_level"][options.quality.value]
+        )
+    
+    def _iter_zip_entries(self, files: Dict[str, Any],
+                          options: ExportOptions) -> Iterator[Tuple[str, Any]]:
+        """Yield archive entries, minifying text files lazily"""
+        for file_path, file_content in files.items():
+            # Optimize content based on file type
+            if options.minify and isinstance(file_content, str):
+                if file_path.endswith('.html'):
+                    file_content = self._minify_html(file_content)
+                elif file_path.endswith('.css'):
+                    file_content = self._minify_css(file_content)
+                elif file_path.endswith('.js'):
+                    file_content = self._minify_js(file_content)
             
-            for file_path, file_content in files.items():
-                # Optimize content based on file type
-                if file_path.endswith(('.html', '.css', '.js')):
-                    if options.minify:
-                        if file_path.endswith('.html'):
-                            file_content = self._minify_html(file_content)
-                        elif file_path.endswith('.css'):
-                            file_content = self._minify_css(file_content)
-                        elif file_path.endswith('.js'):
-                            file_content = self._minify_js(file_content)
-                
-                zip_file.writestr(file_path, file_content)
-        
-        zip_buffer.seek(0)
-        return zip_buffer.read()
+            yield file_path, file_content
     
     # 5. PDF Export
     def export_pdf(self, html_content: str, options: ExportOptions, metadata: Dict = None) -> bytes:
@@ -399,7 +449,13 @@ self.addEventListener('fetch', function(event) {
             return pdf_bytes
             
         except ImportError:
-            logger.warning("WeasyPrint not available, using fallback PDF generation")
+            pass
+        
+        try:
+            # Fall back to the shared headless browser
+            return get_shared_browser_pool().pdf(html_content)
+        except ImportError:
+            logger.warning("WeasyPrint and Playwright not available, using fallback PDF generation")
             return self._fallback_pdf_generation(html_content)
     
     # 6. Image Export
@@ -407,28 +463,30 @@ self.addEventListener('fetch', function(event) {
                     format: str = "png", width: int = 1920, height: int = 1080) -> bytes:
         """Export as image"""
         try:
-            # Use playwright for image generation
-            from playwright.sync_api import sync_playwright
-            
-            with sync_playwright() as p:
-                browser = p.chromium.launch()
-                page = browser.new_page(viewport={'width': width, 'height': height})
-                page.set_content(html_content)
-                
-                # Wait for content to load
-                page.wait_for_load_state('networkidle')
-                
-                # Take screenshot
-                image_bytes = page.screenshot(type=format, full_page=True)
-                
-                browser.close()
-                
-                return image_bytes
+            # Use the shared playwright browser pool for image generation
+            return get_shared_browser_pool().screenshot(html_content, width, height, format)
                 
         except ImportError:
             logger.warning("Playwright not available, using fallback image generation")
             return self._fallback_image_generation(html_content, format, width, height)
     
+    def export_images(self, html_contents: List[str], options: ExportOptions,
+                      format: str = "png", width: int = 1920, height: int = 1080) -> List[bytes]:
+        """Export many pages as images in one batch (e.g. template previews)"""
+        try:
+            pool = get_shared_browser_pool()
+        except ImportError:
+            logger.warning("Playwright not available, using fallback image generation")
+            return [self._fallback_image_generation(html, format, width, height) for html in html_contents]
+        
+        results = pool.render_batch(
+            RenderJob(html=html, width=width, height=height, format=format) for html in html_contents
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+        return results
+    
     # 7. PWA Export
     def export_pwa(self, content: str, options: ExportOptions, metadata: Dict = None) -> Dict[str, str]:
         """Export as Progressive Web App"""
@@ -453,15 +511,11 @@ self.addEventListener('fetch', function(event) {
             "manifest_file": "manifest.json"
         }
         
-        manifest_content = self._replace_template_vars(
-            self.export_templates["pwa_manifest"], manifest_data
-        )
+        manifest_content = self.render_template("pwa_manifest", manifest_data)
         pwa_files["manifest.json"] = manifest_content
         
         # Generate service worker
-        sw_content = self._replace_template_vars(
-            self.export_templates["service_worker"], manifest_data
-        )
+        sw_content = self.render_template("service_worker", manifest_data)
         pwa_files["sw.js"] = sw_content
         
         # Generate HTML with PWA features
@@ -501,8 +555,9 @@ self.addEventListener('fetch', function(event) {
         optimized_content = content
         
         if format == "html":
-            # Remove unused CSS
-            optimized_content = self._remove_unused_css(optimized_content)
+            # Remove unused CSS (opt-in: classes added at runtime are not seen)
+            if options.purge_css:
+                optimized_content = self._remove_unused_css(optimized_content, options.css_safelist)
             
             # Optimize images
             if options.optimize_images:
@@ -513,7 +568,8 @@ self.addEventListener('fetch', function(event) {
         
         elif format == "css":
             # Remove unused selectors
-            optimized_content = self._remove_unused_selectors(optimized_content)
+            if options.purge_css:
+                optimized_content = self._remove_unused_selectors(optimized_content, options.css_safelist)
             
             # Optimize colors
             optimized_content = self._optimize_colors(optimized_content)
@@ -527,6 +583,23 @@ self.addEventListener('fetch', function(event) {
         
         return optimized_content
     
+    def purge_unused_css(self, files: Dict[str, str],
+                         safelist: Optional[List[str]] = None) -> Tuple[Dict[str, str], Dict[str, Dict]]:
+        """Drop CSS rules that no exported page can match
+        
+        The class/id/tag set of all HTML (and JS string literals) in ``files`` is
+        indexed once and kept on ``selector_index`` for later ``optimize_export``
+        calls. Returns the purged files and a bytes-saved report per stylesheet.
+        """
+        self.selector_index = SelectorIndex().index_files(files)
+        purged_files, reports = purge_files(files, safelist, self.selector_index)
+        
+        self.last_purge_report = {path: report.to_dict() for path, report in reports.items()}
+        total_saved = sum(report.bytes_saved for report in reports.values())
+        logger.info(f"Purged unused CSS from {len(reports)} files, saved {total_saved} bytes")
+        
+        return purged_files, self.last_purge_report
+    
     # 10. Export Analytics
     def generate_export_report(self, export_data: Dict) -> Dict:
         """Generate export analytics report"""
@@ -544,11 +617,91 @@ self.addEventListener('fetch', function(event) {
         return report
     
     # Helper methods
+    def get_compiled_template(self, name: str) -> CompiledTemplate:
+        """Get a compiled export template, compiling it on first use"""
+        source = self.export_templates[name]
+        compiled = self.compiled_templates.get(name)
+        
+        # Recompile if the template source was replaced since it was cached
+        if compiled is None or compiled.source is not source:
+            compiled = CompiledTemplate(source)
+            self.compiled_templates[name] = compiled
+        
+        return compiled
+    
+    def render_template(self, name: str, data: Dict) -> str:
+        """Render a named export template"""
+        return self.get_compiled_template(name).render(data)
+    
     def _replace_template_vars(self, template: str, data: Dict) -> str:
         """Replace template variables"""
-        for key, value in data.items():
-            template = template.replace(f"{{{{{key}}}}}", str(value))
-        return template
+        return CompiledTemplate(template).render(data)
+    
+    def _remove_unused_css(self, html: str, safelist: Optional[List[str]] = None) -> str:
+        """Purge inline <style> blocks against the page's own DOM"""
+        index = SelectorIndex().index_html(html)
+        if self.selector_index is not None:
+            index.classes |= self.selector_index.classes
+            index.ids |= self.selector_index.ids
+            index.tags |= self.selector_index.tags
+            index.attributes |= self.selector_index.attributes
+        purger = CSSPurger(index, safelist)
+        
+        return re.sub(
+            r'(<style[^>]*>)(.*?)(</style>)',
+            lambda match: match.group(1) + purger.purge(match.group(2)) + match.group(3),
+            html,
+            flags=re.DOTALL | re.IGNORECASE
+        )
+    
+    def _remove_unused_selectors(self, css: str, safelist: Optional[List[str]] = None) -> str:
+        """Purge a stylesheet against the pages indexed by purge_unused_css"""
+        if self.selector_index is None:
+            # Without exported pages nothing is known to be unused
+            return css
+        return CSSPurger(self.selector_index, safelist).purge(css)
+    
+    def _optimize_images(self, html: str, quality: ExportQuality) -> str:
+        """Lazy-load and async-decode images that don't set loading themselves"""
+        return re.sub(
+            r'<img(?![^>]*\sloading=)([^>]*?)(/?)>',
+            r'<img loading="lazy" decoding="async"\1\2>',
+            html,
+            flags=re.IGNORECASE
+        )
+    
+    def _add_performance_hints(self, html: str) -> str:
+        """Enable DNS prefetching for third-party resources"""
+        if 'x-dns-prefetch-control' in html:
+            return html
+        return re.sub(
+            r'(<head[^>]*>)',
+            r'\1<meta http-equiv="x-dns-prefetch-control" content="on">',
+            html,
+            count=1,
+            flags=re.IGNORECASE
+        )
+    
+    def _optimize_colors(self, css: str) -> str:
+        """Shorten #aabbcc colors to #abc inside declaration blocks"""
+        short_hex = re.compile(r'#([0-9a-fA-F])\1([0-9a-fA-F])\2([0-9a-fA-F])\3(?![0-9a-fA-F])')
+        return re.sub(
+            r'\{[^{}]*\}',
+            lambda block: short_hex.sub(r'#\1\2\3', block.group(0)),
+            css
+        )
+    
+    def _tree_shake_js(self, js: str) -> str:
+        """Tree-shake JavaScript
+        
+        Exports are single concatenated scripts without a module graph, so
+        nothing can be proven unused; the script is returned unchanged.
+        """
+        return js
+    
+    def _eliminate_dead_code(self, js: str) -> str:
+        """Remove debugger statements"""
+        return re.sub(r'(^|[;{}\s])debugger\s*;', r'\1', js)
     
     def _minify_html(self, html: str) -> str:
         """Minify HTML"""
@@ -17,7 +17,6 @@ from cryptography.hazmat.primitives.asymmetric import rsa, padding
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 import base64
 import os
-import time
 import json
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple, Any
@@ -26,7 +25,12 @@ from enum import Enum
 import logging
 import ipaddress
 import re
-from collections import defaultdict, deque
+from collections import defaultdict
+
+from security_store import MemorySecurityStore, SecurityStore
+from input_sanitizer import InputSanitizer, get_input_sanitizer
+from security_event_log import SecurityEventLog
+from password_hashing import PasswordHashingService
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -81,7 +85,9 @@ class UserSession:
 class AdvancedSecurity:
     """Advanced Security System with comprehensive protection"""
     
-    def __init__(self, secret_key: str = None):
+    def __init__(self, secret_key: str = None, store: Optional[SecurityStore] = None,
+                 sanitizer: Optional[InputSanitizer] = None, event_log: Optional[SecurityEventLog] = None,
+                 password_hasher: Optional[PasswordHashingService] = None):
         self.secret_key = secret_key or self._generate_secret_key()
         self.encryption_key = self._generate_encryption_key()
         self.fernet = Fernet(self.encryption_key)
@@ -93,15 +99,23 @@ class AdvancedSecurity:
         self.password_min_length = 8
         self.require_2fa = False
         
-        # Security monitoring
-        self.security_events: List[SecurityEvent] = []
-        self.active_sessions: Dict[str, UserSession] = {}
-        self.failed_attempts: Dict[str, List[datetime]] = defaultdict(list)
-        self.blocked_ips: Dict[str, datetime] = {}
+        # Security monitoring: recent events in a fixed-size ring with
+        # per-minute rollups (optionally persisted to an EventSegmentLog)
+        if event_log is None:
+            event_log = SecurityEventLog(ThreatType, SecurityLevel, capacity=1000)
+        self.event_log = event_log
         self.suspicious_activities: Dict[str, List[datetime]] = defaultdict(list)
         
+        # Sessions, failed attempts, IP blocks and rate limits live in a store
+        # that can be shared by all worker processes (e.g. RedisSecurityStore)
+        self.store = store or MemorySecurityStore()
+        self.sanitizer = sanitizer or get_input_sanitizer()
+        
+        # bcrypt runs in a bounded process pool; the cost is calibrated once
+        # per process to the target latency
+        self.password_hasher = password_hasher or PasswordHashingService()
+        
         # Rate limiting
-        self.rate_limits: Dict[str, deque] = defaultdict(lambda: deque())
         self.rate_limit_config = {
             "login": {"max_attempts": 5, "window": 300},  # 5 attempts per 5 minutes
             "api": {"max_attempts": 100, "window": 3600},  # 100 requests per hour
@@ -113,6 +127,27 @@ class AdvancedSecurity:
         
         logger.info("Advanced Security System initialized")
     
+    @property
+    def active_sessions(self) -> Dict[str, UserSession]:
+        """Snapshot of live sessions"""
+        return self.store.list_sessions()
+    
+    @property
+    def failed_attempts(self) -> Dict[str, List[datetime]]:
+        """Snapshot of failed attempts inside the lockout window"""
+        return {identifier: [datetime.fromtimestamp(attempt) for attempt in attempts]
+                for identifier, attempts in self.store.list_failures().items()}
+    
+    @property
+    def blocked_ips(self) -> Dict[str, datetime]:
+        """Snapshot of blocked IPs and when their blocks end"""
+        return {ip: datetime.fromtimestamp(until) for ip, until in self.store.list_blocked_ips().items()}
+
+    @property
+    def security_events(self) -> List[SecurityEvent]:
+        """Snapshot of the events still held in memory, oldest first"""
+        return self.event_log.events()
+
     def _generate_secret_key(self) -> str:
         """Generate a secure secret key"""
         return secrets.token_urlsafe(32)
@@ -155,13 +190,36 @@ class AdvancedSecurity:
     # Password Security
     def hash_password(self, password: str) -> str:
         """Hash password using bcrypt"""
-        salt = bcrypt.gensalt()
-        hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-        return hashed.decode('utf-8')
+        return self.password_hasher.hash_password_sync(password)
     
     def verify_password(self, password: str, hashed: str) -> bool:
         """Verify password against hash"""
-        return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+        return self.password_hasher.verify_password_sync(password, hashed)
+    
+    async def hash_password_async(self, password: str) -> str:
+        """Hash password without blocking the event loop"""
+        return await self.password_hasher.hash_password(password)
+    
+    async def verify_password_async(self, password: str, hashed: str) -> bool:
+        """Verify password without blocking the event loop"""
+        return await self.password_hasher.verify_password(password, hashed)
+    
+    async def authenticate_password(self, identifier: str, ip: str, password: str,
+                                    hashed: str) -> Tuple[bool, Optional[str]]:
+        """Check a login password with lockout tracking
+        
+        Returns ``(valid, new_hash)``; ``new_hash`` is set when the stored
+        hash used an outdated bcrypt cost and should replace it.
+        """
+        if self.is_locked_out(identifier):
+            return False, None
+        
+        valid, new_hash = await self.password_hasher.verify_and_rehash(password, hashed)
+        if valid:
+            self.clear_failed_attempts(identifier)
+        else:
+            self.record_failed_attempt(identifier, ip)
+        return valid, new_hash
     
     def validate_password_strength(self, password: str) -> Tuple[bool, List[str]]:
         """Validate password strength"""
@@ -288,43 +346,28 @@ class AdvancedSecurity:
             last_activity=datetime.now()
         )
         
-        self.active_sessions[session_id] = session
+        self.store.save_session(session, self.session_timeout)
         logger.info(f"Created session for user {user_id}")
         return session_id
     
     def validate_session(self, session_id: str) -> Tuple[bool, Optional[UserSession]]:
         """Validate user session"""
-        if session_id not in self.active_sessions:
+        # Expired sessions are gone from the store; touching updates last activity
+        session = self.store.touch_session(session_id, self.session_timeout)
+        if session is None:
             return False, None
         
-        session = self.active_sessions[session_id]
-        
-        # Check if session is expired
-        if datetime.now() - session.last_activity > timedelta(seconds=self.session_timeout):
-            self.active_sessions.pop(session_id, None)
-            return False, None
-        
-        # Update last activity
-        session.last_activity = datetime.now()
         return True, session
     
     def terminate_session(self, session_id: str):
         """Terminate user session"""
-        if session_id in self.active_sessions:
-            del self.active_sessions[session_id]
+        if self.store.delete_session(session_id):
             logger.info(f"Terminated session {session_id}")
     
     def terminate_all_user_sessions(self, user_id: str):
         """Terminate all sessions for a user"""
-        sessions_to_remove = [
-            sid for sid, session in self.active_sessions.items()
-            if session.user_id == user_id
-        ]
-        
-        for session_id in sessions_to_remove:
-            self.terminate_session(session_id)
-        
-        logger.info(f"Terminated all sessions for user {user_id}")
+        terminated = self.store.delete_user_sessions(user_id)
+        logger.info(f"Terminated all {terminated} sessions for user {user_id}")
     
     # Rate Limiting
     def check_rate_limit(self, identifier: str, action: str) -> Tuple[bool, Dict]:
@@ -333,45 +376,36 @@ class AdvancedSecurity:
             return True, {}
         
         config = self.rate_limit_config[action]
-        now = time.time()
-        
-        # Clean old attempts
-        while (self.rate_limits[identifier] and 
-               self.rate_limits[identifier][0] < now - config["window"]):
-            self.rate_limits[identifier].popleft()
+        allowed, retry_after = self.store.hit_rate_limit(
+            identifier, action, config["max_attempts"], config["window"]
+        )
         
         # Check if limit exceeded
-        if len(self.rate_limits[identifier]) >= config["max_attempts"]:
+        if not allowed:
             return False, {
                 "limit_exceeded": True,
                 "max_attempts": config["max_attempts"],
                 "window": config["window"],
-                "retry_after": int(self.rate_limits[identifier][0] + config["window"] - now)
+                "retry_after": retry_after
             }
         
-        # Add current attempt
-        self.rate_limits[identifier].append(now)
         return True, {}
     
     # Input Validation and Sanitization
-    def sanitize_input(self, input_data: str) -> str:
-        """Sanitize user input to prevent XSS and injection attacks"""
-        # Remove HTML tags
-        import html
-        sanitized = html.escape(input_data)
-        
-        # Remove potential SQL injection patterns
-        sql_patterns = [
-            r"(\b(SELECT|INSERT|UPDATE|DELETE|DROP|CREATE|ALTER|EXEC|UNION)\b)",
-            r"(--|#|\/\*|\*\/)",
-            r"(\b(OR|AND)\s+\d+\s*=\s*\d+)",
-            r"(\b(OR|AND)\s+'.*'\s*=\s*'.*')"
-        ]
-        
-        for pattern in sql_patterns:
-            sanitized = re.sub(pattern, "", sanitized, flags=re.IGNORECASE)
-        
-        return sanitized.strip()
+    def sanitize_input(self, input_data: str, context: str = "html_attribute") -> str:
+        """Sanitize user input to prevent XSS and injection attacks
+
+        ``context`` selects the output policy: "html_body", "html_attribute"
+        (default, escapes quotes too) or "plain_text" (markup stripped).
+        """
+        return self.sanitizer.sanitize(input_data, context)
+    
+    def sanitize_payload(self, payload: Any, context: str = "html_attribute",
+                         field_contexts: Optional[Dict[str, str]] = None) -> Any:
+        """Sanitize every string in a dict/list payload (or JSON text) in one call"""
+        if isinstance(payload, (str, bytes)):
+            return self.sanitizer.sanitize_json(payload, context, field_contexts)
+        return self.sanitizer.sanitize_data(payload, context, field_contexts)
     
     def validate_email(self, email: str) -> bool:
         """Validate email format"""
@@ -402,11 +436,7 @@ class AdvancedSecurity:
             details=details or {}
         )
         
-        self.security_events.append(event)
-        
-        # Keep only last 1000 events
-        if len(self.security_events) > 1000:
-            self.security_events = self.security_events[-1000:]
+        self.event_log.append(event)
         
         logger.warning(f"Security event: {event_type.value} - {description}")
         
@@ -430,68 +460,41 @@ class AdvancedSecurity:
     
     def block_ip(self, ip: str, duration: int = 3600):
         """Block IP address for specified duration"""
-        self.blocked_ips[ip] = datetime.now() + timedelta(seconds=duration)
+        self.store.block_ip(ip, duration)
         logger.info(f"Blocked IP {ip} for {duration} seconds")
     
     def is_ip_blocked(self, ip: str) -> bool:
         """Check if IP is blocked"""
-        if ip not in self.blocked_ips:
-            return False
-        
-        if datetime.now() > self.blocked_ips[ip]:
-            del self.blocked_ips[ip]
-            return False
-        
-        return True
+        return self.store.is_ip_blocked(ip)
     
     def unblock_ip(self, ip: str):
         """Unblock IP address"""
-        if ip in self.blocked_ips:
-            del self.blocked_ips[ip]
+        if self.store.unblock_ip(ip):
             logger.info(f"Unblocked IP {ip}")
     
     # Brute Force Protection
     def record_failed_attempt(self, identifier: str, ip: str):
         """Record failed login attempt"""
-        now = datetime.now()
-        self.failed_attempts[identifier].append(now)
-        
-        # Clean old attempts
-        cutoff = now - timedelta(seconds=self.lockout_duration)
-        self.failed_attempts[identifier] = [
-            attempt for attempt in self.failed_attempts[identifier]
-            if attempt > cutoff
-        ]
+        attempts = self.store.record_failure(identifier, self.lockout_duration, self.max_login_attempts)
         
         # Check if should be locked out
-        if len(self.failed_attempts[identifier]) >= self.max_login_attempts:
+        if attempts >= self.max_login_attempts:
             self.log_security_event(
                 ThreatType.BRUTE_FORCE,
                 SecurityLevel.HIGH,
                 ip,
                 f"Brute force attack detected for {identifier}",
-                {"attempts": len(self.failed_attempts[identifier])},
+                {"attempts": attempts},
                 identifier
             )
     
     def is_locked_out(self, identifier: str) -> bool:
         """Check if identifier is locked out"""
-        if identifier not in self.failed_attempts:
-            return False
-        
-        now = datetime.now()
-        cutoff = now - timedelta(seconds=self.lockout_duration)
-        recent_attempts = [
-            attempt for attempt in self.failed_attempts[identifier]
-            if attempt > cutoff
-        ]
-        
-        return len(recent_attempts) >= self.max_login_attempts
+        return self.store.is_locked_out(identifier)
     
     def clear_failed_attempts(self, identifier: str):
         """Clear failed attempts for identifier"""
-        if identifier in self.failed_attempts:
-            del self.failed_attempts[identifier]
+        self.store.clear_failures(identifier)
     
     # Two-Factor Authentication
     def generate_2fa_secret(self) -> str:
@@ -517,28 +520,19 @@ class AdvancedSecurity:
     # Security Reports
     def get_security_report(self, hours: int = 24) -> Dict:
         """Generate security report"""
-        cutoff = datetime.now() - timedelta(hours=hours)
-        recent_events = [
-            event for event in self.security_events
-            if event.timestamp > cutoff
-        ]
-        
-        # Group events by type
-        events_by_type = defaultdict(int)
-        events_by_level = defaultdict(int)
-        
-        for event in recent_events:
-            events_by_type[event.type.value] += 1
-            events_by_level[event.level.value] += 1
+        summary = self.event_log.window_summary(hours * 3600)
+        cutoff = (datetime.now() - timedelta(hours=hours)).timestamp()
+        recent_events = self.event_log.recent(10, since=cutoff)
         
         return {
             "period_hours": hours,
-            "total_events": len(recent_events),
-            "events_by_type": dict(events_by_type),
-            "events_by_level": dict(events_by_level),
-            "blocked_ips": len(self.blocked_ips),
-            "active_sessions": len(self.active_sessions),
-            "failed_attempts": sum(len(attempts) for attempts in self.failed_attempts.values()),
+            "total_events": summary["total_events"],
+            "events_by_type": summary["events_by_type"],
+            "events_by_level": summary["events_by_level"],
+            "top_source_ips": summary["top_source_ips"],
+            "blocked_ips": len(self.store.list_blocked_ips()),
+            "active_sessions": self.store.count_sessions(),
+            "failed_attempts": sum(len(attempts) for attempts in self.store.list_failures().values()),
             "recent_events": [
                 {
                     "type": event.type.value,
@@ -547,19 +541,19 @@ class AdvancedSecurity:
                     "description": event.description,
                     "timestamp": event.timestamp.isoformat()
                 }
-                for event in recent_events[-10:]  # Last 10 events
+                for event in recent_events  # Last 10 events
             ]
         }
     
     def get_security_status(self) -> Dict:
         """Get current security status"""
         return {
-            "active_sessions": len(self.active_sessions),
-            "blocked_ips": len(self.blocked_ips),
-            "failed_attempts": len(self.failed_attempts),
+            "active_sessions": self.store.count_sessions(),
+            "blocked_ips": len(self.store.list_blocked_ips()),
+            "failed_attempts": len(self.store.list_failures()),
             "suspicious_activities": len(self.suspicious_activities),
-            "total_security_events": len(self.security_events),
-            "security_level": "HIGH" if len(self.security_events) > 10 else "MEDIUM"
+            "total_security_events": len(self.event_log),
+            "security_level": "HIGH" if len(self.event_log) > 10 else "MEDIUM"
         }
 
 # Example usage and testing
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark Script for the CDN Cache Store
+Compares the linear scans GlobalCDN used for cache lookups and invalidation
+with the indexed CDNCacheStore at a million cache entries
+"""
+
+import sys
+import os
+import time
+import random
+import hashlib
+import resource
+from collections import namedtuple
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from cdn_cache_store import POLICY_LFU, POLICY_LRU, CDNCacheStore
+
+Entry = namedtuple("Entry", ["id", "node_id", "cache_key", "content_url", "tags"])
+
+NODES = [f"node-{index}" for index in range(8)]
+
+
+def make_entries(count: int, seed: int = 1) -> list:
+    """Cache entries for pages of 1000 sites spread over the nodes"""
+    rng = random.Random(seed)
+    entries = []
+    for index in range(count):
+        site = rng.randrange(1000)
+        url = f"https://site-{site}.example.com/assets/{index % 50}/page-{index}.html"
+        entries.append(Entry(str(index), NODES[index % len(NODES)], hashlib.md5(url.encode()).hexdigest(), url,
+                             (f"site-{site}", f"section-{index % 50}")))
+    return entries
+
+
+def legacy_lookup(caches: dict, cache_key: str):
+    """Previous ``_check_cache``: scan every entry comparing the key"""
+    for cache_id, entry in caches.items():
+        if entry.cache_key == cache_key:
+            return cache_id
+    return None
+
+
+def legacy_invalidate(caches: dict, predicate) -> int:
+    """Previous ``invalidate_cache``: scan and delete matches"""
+    removed = [cache_id for cache_id, entry in caches.items() if predicate(entry)]
+    for cache_id in removed:
+        del caches[cache_id]
+    return len(removed)
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def run_benchmark(count: int = 1_000_000, lookups: int = 200_000):
+    """Run the cache store benchmark"""
+    print("⏱️ CDN Cache Store Benchmark")
+    print("=" * 50)
+
+    entries = make_entries(count)
+    rng = random.Random(2)
+    probes = [rng.choice(entries) for _ in range(lookups)]
+
+    legacy = {entry.id: entry for entry in entries}
+    scan_probes = probes[:10]
+    scan_time, _ = timed(lambda: [legacy_lookup(legacy, entry.cache_key) for entry in scan_probes])
+    print(f"\n🐢 Linear scan over {count:,} entries")
+    print(f"   lookup:            {scan_time / len(scan_probes) * 1000:.1f} ms/lookup")
+    tag_scan, tagged = timed(lambda: legacy_invalidate(legacy, lambda entry: "site-7" in entry.tags))
+    prefix = "https://site-9.example.com/assets/1"
+    prefix_scan, prefixed = timed(lambda: legacy_invalidate(legacy, lambda entry: entry.content_url.startswith(prefix)))
+    print(f"   tag invalidation:  {tag_scan * 1000:.1f} ms ({tagged} entries)")
+    print(f"   prefix invalidation: {prefix_scan * 1000:.1f} ms ({prefixed} entries)")
+    del legacy
+
+    for policy in (POLICY_LRU, POLICY_LFU):
+        # Capacity for 90% of the entries so the last tenth evicts
+        store = CDNCacheStore(node_capacity=int(count * 0.9 / len(NODES)) * 1000, policy=policy)
+
+        def fill():
+            for entry in entries:
+                store.put(entry.node_id, entry.cache_key, entry, 1000, url=entry.content_url, tags=entry.tags)
+
+        fill_time, _ = timed(fill)
+
+        def probe():
+            hits = 0
+            for entry in probes:
+                if store.get(entry.node_id, entry.cache_key) is not None:
+                    hits += 1
+            return hits
+
+        lookup_time, hits = timed(probe)
+        tag_time, tag_removed = timed(lambda: store.invalidate_tag("site-7"))
+        prefix_time, prefix_removed = timed(lambda: store.invalidate_prefix(prefix))
+        metrics = store.get_metrics()
+
+        print(f"\n🗂️ CDNCacheStore ({policy}), {count:,} inserts")
+        print(f"   insert:            {fill_time / count * 1e6:.2f} µs/entry ({metrics['evictions']:,} evictions)")
+        print(f"   lookup:            {lookup_time / lookups * 1e6:.2f} µs/lookup ({hits / lookups:.0%} hits), "
+              f"{scan_time / len(scan_probes) / (lookup_time / lookups):,.0f}x faster")
+        print(f"   tag invalidation:  {tag_time * 1000:.2f} ms ({len(tag_removed)} entries)")
+        print(f"   prefix invalidation: {prefix_time * 1000:.2f} ms ({len(prefix_removed)} entries)")
+        print(f"   entries kept:      {metrics['entries']:,}")
+        del store
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"\n📦 Peak memory: {peak:.0f} MB")
+
+
+if __name__ == "__main__":
+    run_benchmark()
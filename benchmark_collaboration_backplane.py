@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark Script for the Collaboration Backplane
+Load test of N collaboration nodes x M clients editing one project over the
+in-process backplane; reports commit throughput, ack latency and whether
+every node and client converged on the same document
+"""
+
+import sys
+import os
+import json
+import time
+import random
+import asyncio
+import logging
+
+import jwt
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from collaboration_backplane import InMemoryBackplane, InMemoryBus
+from collaboration_merge import ROOT, ElementDocument, MergeClient, operation_to_change
+from real_time_collaboration import RealTimeCollaboration
+
+
+class BenchmarkSocket:
+    """WebSocket stand-in fed through asyncio queues"""
+
+    def __init__(self):
+        self.id = object()
+        self.incoming = asyncio.Queue()
+        self.outgoing = asyncio.Queue()
+
+    async def send(self, payload):
+        self.outgoing.put_nowait(json.loads(payload))
+
+    async def close(self, code=1000, reason=""):
+        self.incoming.put_nowait(None)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        message = await self.incoming.get()
+        if message is None:
+            raise StopAsyncIteration
+        return json.dumps(message)
+
+
+class BenchmarkEditor:
+    """Client keeping one operation in flight and timing its ack"""
+
+    def __init__(self, name: str, node: RealTimeCollaboration, token: str):
+        self.name = name
+        self.socket = BenchmarkSocket()
+        self.client = None
+        self.sent_at = 0.0
+        self.latencies = []
+        self.counter = 0
+        self.server = asyncio.create_task(node.handle_connection(self.socket, f"/project1/{token}"))
+        self.reader = asyncio.create_task(self.read())
+
+    async def read(self):
+        while True:
+            message = await self.socket.outgoing.get()
+            if message["type"] == "project_state":
+                snapshot = message["data"]["snapshot"]
+                self.client = MergeClient(ElementDocument.from_dict(snapshot["document"]), snapshot["version"])
+                for record in message["data"]["operations"]:
+                    self.client.document.apply(record["data"])
+                    self.client.version = record["version"]
+            elif message["type"] == "operation":
+                self.client.receive(message["data"]["data"])
+            elif message["type"] == "operation_ack":
+                self.client.acknowledge()
+                self.latencies.append(time.perf_counter() - self.sent_at)
+
+    def edit(self, rng: random.Random):
+        self.counter += 1
+        document = self.client.document
+        live = [element_id for element_id, element in document.elements.items() if not element["removed"]]
+        if not live or rng.random() < 0.2:
+            slot = f"{self.name}-{self.counter}"
+            operation_type, element_id = "add_element", f"el-{slot}"
+            data = {"type": "text", "slot": slot, "after": rng.choice([None] + document.sequences.get(ROOT, []))}
+        else:
+            operation_type, element_id = "content_change", rng.choice(live)
+            data = {"delta": [rng.randint(0, len(document.elements[element_id]["content"])), "x"]}
+        self.client.apply_local(operation_to_change(operation_type, element_id, data))
+        self.sent_at = time.perf_counter()
+        self.socket.incoming.put_nowait({
+            "type": "operation", "operation_type": operation_type, "element_id": element_id,
+            "data": data, "base_version": self.client.version
+        })
+
+
+async def run_cluster(node_count: int, client_count: int, operations: int, seed: int = 1) -> dict:
+    """Drive ``operations`` edits from ``client_count`` clients spread over ``node_count`` nodes"""
+    rng = random.Random(seed)
+    bus = InMemoryBus()
+    names = [f"node-{index}" for index in range(node_count)]
+    nodes = [RealTimeCollaboration(backplane=InMemoryBackplane(bus), node_id=name, nodes=names) for name in names]
+    for node in nodes:
+        await node.join_backplane()
+    token = jwt.encode({"user_id": "user1"}, nodes[0].jwt_secret, algorithm="HS256")
+
+    editors = []
+    for index in range(client_count):
+        editor = BenchmarkEditor(f"c{index}", nodes[index % node_count], token)
+        while editor.client is None:
+            await asyncio.sleep(0.001)
+        editors.append(editor)
+
+    start = time.perf_counter()
+    issued = 0
+    while issued < operations:
+        for editor in editors:
+            if editor.client.inflight is None and issued < operations:
+                editor.edit(rng)
+                issued += 1
+        await asyncio.sleep(0)
+    while any(editor.client.inflight is not None for editor in editors):
+        await asyncio.sleep(0.001)
+    elapsed = time.perf_counter() - start
+
+    # Let the last broadcasts reach every client
+    while any(not node.backplane.inbox.empty() or node.broadcaster.get_metrics()["queued"] for node in nodes) or \
+            any(not editor.socket.outgoing.empty() for editor in editors):
+        await asyncio.sleep(0.001)
+    owner = next(node for node in nodes if node.owner_of("project1") == node.node_id)
+    expected = owner.get_document("project1")
+    converged = all(node.get_document("project1") == expected for node in nodes) and \
+        all(editor.client.document.to_dict() == expected for editor in editors)
+
+    latencies = sorted(latency for editor in editors for latency in editor.latencies)
+    for editor in editors:
+        await editor.socket.close()
+        await editor.server
+        editor.reader.cancel()
+    for node in nodes:
+        await node.backplane.close()
+        await node.broadcaster.close()
+    return {
+        "throughput": operations / elapsed,
+        "p50": latencies[len(latencies) // 2],
+        "p99": latencies[int(len(latencies) * 0.99)],
+        "messages": bus.published,
+        "converged": converged
+    }
+
+
+def run_benchmark(operations: int = 2000):
+    """Run the backplane load test"""
+    print("⏱️ Collaboration Backplane Benchmark")
+    print("=" * 50)
+
+    logging.disable(logging.INFO)
+    for node_count, client_count in ((1, 8), (2, 16), (4, 32), (8, 64)):
+        result = asyncio.run(run_cluster(node_count, client_count, operations))
+        print(f"\n🛰️ {node_count} nodes x {client_count} clients, {operations} operations")
+        print(f"   throughput:  {result['throughput']:.0f} ops/s")
+        print(f"   ack latency: p50 {result['p50'] * 1000:.2f} ms, p99 {result['p99'] * 1000:.2f} ms")
+        print(f"   backplane:   {result['messages']} messages")
+        print(f"   converged:   {'✅' if result['converged'] else '❌'}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark Script for Code-Based Matrix Arithmetic
+Compares the list-of-lists GF(2) triple loop with the bit-packed GF2Matrix backend
+"""
+
+import sys
+import os
+import time
+import random
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from gf2_matrix import GF2Matrix
+from quantum_resistant_security import QuantumResistantSecurity, SecurityLevel
+
+
+def legacy_matrix_multiply(matrix1, matrix2):
+    """Previous triple-loop implementation"""
+    rows1, cols1 = len(matrix1), len(matrix1[0])
+    cols2 = len(matrix2[0])
+    result = [[0] * cols2 for _ in range(rows1)]
+    for i in range(rows1):
+        for j in range(cols2):
+            for k in range(cols1):
+                result[i][j] ^= matrix1[i][k] & matrix2[k][j]
+    return result
+
+
+def best_time(function, rounds: int) -> float:
+    """Best wall-clock time of several calls"""
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmark(rounds: int = 3):
+    """Run the code-based arithmetic benchmark"""
+    print("⏱️ Code-Based Matrix Benchmark")
+    print("=" * 50)
+
+    for size in (64, 128, 192):
+        a = [[random.randint(0, 1) for _ in range(size)] for _ in range(size)]
+        b = [[random.randint(0, 1) for _ in range(size)] for _ in range(size)]
+        legacy_time = best_time(lambda: legacy_matrix_multiply(a, b), 1)
+        packed_a, packed_b = GF2Matrix.from_rows(a), GF2Matrix.from_rows(b)
+        packed_time = best_time(lambda: packed_a.multiply(packed_b), rounds)
+        identical = legacy_matrix_multiply(a, b) == packed_a.multiply(packed_b).to_rows()
+        print(f"\n🧮 {size}x{size} product")
+        print(f"   pure Python: {legacy_time * 1000:.1f} ms")
+        print(f"   bit-packed:  {packed_time * 1000:.3f} ms "
+              f"({legacy_time / packed_time:.0f}x, identical: {identical})")
+
+    security = QuantumResistantSecurity()
+    for level in SecurityLevel:
+        params = security._get_mceliece_parameters(level)
+        keygen_time = best_time(lambda: security._generate_mceliece_keys(params), rounds)
+        public_key_bytes, _ = security._generate_mceliece_keys(params)
+        public_key = security._deserialize_matrix(public_key_bytes)
+        message = [random.randint(0, 1) for _ in range(params["k"])]
+        encrypt_time = best_time(lambda: security._vector_matrix_multiply(message, public_key), rounds * 10)
+        print(f"\n🔐 {level.value} (n={params['n']}, k={params['k']})")
+        print(f"   key generation: {keygen_time * 1000:.1f} ms")
+        print(f"   m * G':         {encrypt_time * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Bounded Cache - Byte-size bounded LRU + TTL caches
+Pluggable in-memory and memory-mapped on-disk stores with hit-rate and
+memory footprint metrics
+"""
+
+import hashlib
+import heapq
+import mmap
+import os
+import sys
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate memory footprint of a cached value in bytes"""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, memoryview):
+        return value.nbytes
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+    if isinstance(value, (tuple, list)):
+        return sum(estimate_size(item) for item in value)
+    return sys.getsizeof(value)
+
+
+class CacheBackend(ABC):
+    """Interface shared by the pluggable caches"""
+
+    @abstractmethod
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        ...
+
+    @abstractmethod
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> bool:
+        """Store a value; returns False if it was rejected"""
+
+    @abstractmethod
+    def delete(self, key: Hashable) -> bool:
+        ...
+
+    @abstractmethod
+    def clear(self):
+        ...
+
+    @abstractmethod
+    def get_metrics(self) -> Dict:
+        ...
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+    @abstractmethod
+    def __contains__(self, key: Hashable) -> bool:
+        ...
+
+
+class _CounterMixin:
+    """Hit/miss/eviction counters"""
+
+    def _reset_counters(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.rejections = 0
+
+    def _counter_metrics(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "rejections": self.rejections,
+        }
+
+
+class BoundedCache(_CounterMixin, CacheBackend):
+    """In-memory LRU cache bounded by total bytes, with per-entry TTL
+
+    Entries live in an OrderedDict in recency order, so lookups, inserts
+    and LRU evictions are O(1). Expiry deadlines are tracked in a min-heap
+    and expired entries are dropped on access or when new entries arrive.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, default_ttl: Optional[float] = 3600.0,
+                 max_entries: Optional[int] = None, sizeof: Callable[[Any], int] = estimate_size,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.sizeof = sizeof
+        self.clock = clock
+        self.current_bytes = 0
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int, Optional[float]]]" = OrderedDict()
+        self._deadlines: List[Tuple[float, int, Hashable]] = []
+        self._sequence = 0
+        self._lock = threading.RLock()
+        self._reset_counters()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, _, expires_at = entry
+            if expires_at is not None and expires_at <= self.clock():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> bool:
+        size = self.sizeof(value)
+        ttl = self.default_ttl if ttl is None else ttl
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                self.rejections += 1
+                return False
+
+            now = self.clock()
+            self._expire(now)
+            expires_at = now + ttl if ttl is not None else None
+            self._entries[key] = (value, size, expires_at)
+            self.current_bytes += size
+            if expires_at is not None:
+                self._sequence += 1
+                heapq.heappush(self._deadlines, (expires_at, self._sequence, key))
+
+            while self.current_bytes > self.max_bytes or (
+                    self.max_entries is not None and len(self._entries) > self.max_entries):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+            return True
+
+    def delete(self, key: Hashable) -> bool:
+        with self._lock:
+            if key not in self._entries:
+                return False
+            self._remove(key)
+            return True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._deadlines.clear()
+            self.current_bytes = 0
+
+    def purge_expired(self) -> int:
+        """Drop every expired entry; returns how many were removed"""
+        with self._lock:
+            before = self.expirations
+            self._expire(self.clock())
+            return self.expirations - before
+
+    def get_metrics(self) -> Dict:
+        with self._lock:
+            metrics = self._counter_metrics()
+            metrics.update({
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "utilization": self.current_bytes / self.max_bytes if self.max_bytes else 0.0,
+            })
+            return metrics
+
+    def _remove(self, key: Hashable):
+        _, size, _ = self._entries.pop(key)
+        self.current_bytes -= size
+
+    def _expire(self, now: float):
+        deadlines = self._deadlines
+        while deadlines and deadlines[0][0] <= now:
+            expires_at, _, key = heapq.heappop(deadlines)
+            entry = self._entries.get(key)
+            # Skip heap records left behind by overwritten or evicted entries
+            if entry is not None and entry[2] == expires_at:
+                self._remove(key)
+                self.expirations += 1
+        if len(deadlines) > 2 * len(self._entries) + 64:
+            self._deadlines = [record for record in deadlines
+                               if record[2] in self._entries and self._entries[record[2]][2] == record[0]]
+            heapq.heapify(self._deadlines)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and (entry[2] is None or entry[2] > self.clock())
+
+
+class MappedBlobStore(_CounterMixin, CacheBackend):
+    """Byte values kept in files and served as read-only memory maps
+
+    Values stay out of the Python heap; ``get`` returns an ``mmap`` object
+    that supports the buffer protocol (``numpy.frombuffer``,
+    ``struct.unpack_from``, slicing). Eviction unlinks the file but leaves
+    maps already handed out valid until they are garbage collected.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: Optional[int] = None,
+                 default_ttl: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self._owns_directory = directory is None
+        self.directory = directory or tempfile.mkdtemp(prefix="blobstore-")
+        os.makedirs(self.directory, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.clock = clock
+        self.current_bytes = 0
+        self._index: "OrderedDict[Hashable, Tuple[str, int, Optional[float]]]" = OrderedDict()
+        self._maps: Dict[Hashable, mmap.mmap] = {}
+        self._lock = threading.RLock()
+        self._reset_counters()
+
+    def _path_for(self, key: Hashable) -> str:
+        digest = hashlib.sha256(repr(key).encode("utf-8")).hexdigest()[:32]
+        return os.path.join(self.directory, f"{digest}.bin")
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            record = self._index.get(key)
+            if record is None:
+                self.misses += 1
+                return default
+            path, size, expires_at = record
+            if expires_at is not None and expires_at <= self.clock():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._index.move_to_end(key)
+            self.hits += 1
+            if size == 0:
+                return b""
+            mapped = self._maps.get(key)
+            if mapped is None:
+                with open(path, "rb") as handle:
+                    mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+                self._maps[key] = mapped
+            return mapped
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> bool:
+        data = memoryview(value).cast("B")
+        size = data.nbytes
+        ttl = self.default_ttl if ttl is None else ttl
+        with self._lock:
+            if key in self._index:
+                self._remove(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                self.rejections += 1
+                return False
+
+            path = self._path_for(key)
+            temporary = f"{path}.{os.getpid()}.tmp"
+            with open(temporary, "wb") as handle:
+                handle.write(data)
+            os.replace(temporary, path)
+
+            expires_at = self.clock() + ttl if ttl is not None else None
+            self._index[key] = (path, size, expires_at)
+            self.current_bytes += size
+
+            while self.max_bytes is not None and self.current_bytes > self.max_bytes:
+                self._remove(next(iter(self._index)))
+                self.evictions += 1
+            return True
+
+    def delete(self, key: Hashable) -> bool:
+        with self._lock:
+            if key not in self._index:
+                return False
+            self._remove(key)
+            return True
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._index):
+                self._remove(key)
+
+    def close(self):
+        """Remove all files (and the directory if this store created it)"""
+        self.clear()
+        if self._owns_directory:
+            try:
+                os.rmdir(self.directory)
+            except OSError:
+                pass
+
+    def get_metrics(self) -> Dict:
+        with self._lock:
+            metrics = self._counter_metrics()
+            metrics.update({
+                "entries": len(self._index),
+                "bytes_on_disk": self.current_bytes,
+                "mapped_entries": len(self._maps),
+                "max_bytes": self.max_bytes,
+            })
+            return metrics
+
+    def _remove(self, key: Hashable):
+        path, size, _ = self._index.pop(key)
+        self.current_bytes -= size
+        # Outstanding maps keep the unlinked file's pages alive
+        self._maps.pop(key, None)
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            record = self._index.get(key)
+            return record is not None and (record[2] is None or record[2] > self.clock())
+
+
+# Example usage and testing
+if __name__ == "__main__":
+    print("🗄️ Bounded Cache Demo")
+    print("=" * 50)
+
+    cache = BoundedCache(max_bytes=1024, default_ttl=60)
+    for index in range(20):
+        cache.set(f"item-{index}", os.urandom(100))
+    for index in range(20):
+        cache.get(f"item-{index}")
+    print(f"✅ Memory cache: {cache.get_metrics()}")
+
+    store = MappedBlobStore()
+    store.set("public-key", os.urandom(1 << 20))
+    mapped = store.get("public-key")
+    print(f"✅ Mapped store: {len(mapped)} bytes mapped, {store.get_metrics()}")
+    store.close()
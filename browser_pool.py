@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Browser Pool - Long-lived headless browser for screenshot and PDF export
+Keeps a Playwright browser running between renders, bounds concurrent contexts,
+recycles the browser after N renders and enforces a timeout per job
+"""
+
+import asyncio
+import atexit
+import importlib.util
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class RenderTimeoutError(Exception):
+    """Raised when a render job exceeds its timeout"""
+    pass
+
+
+@dataclass
+class RenderJob:
+    """Screenshot or PDF render request"""
+    html: str
+    kind: str = "screenshot"
+    width: int = 1920
+    height: int = 1080
+    format: str = "png"
+    full_page: bool = True
+    page_format: str = "A4"
+    timeout: Optional[float] = None
+
+
+class _BrowserWorker:
+    """One launched browser and its usage counters"""
+
+    def __init__(self, browser: Any, generation: int):
+        self.browser = browser
+        self.generation = generation
+        self.renders = 0
+        self.active = 0
+        self.retired = False
+
+
+def _default_playwright_factory():
+    from playwright.async_api import async_playwright
+    return async_playwright()
+
+
+class BrowserPool:
+    """Async pool of browser contexts on a long-lived browser
+
+    At most ``max_contexts`` pages render concurrently. After
+    ``recycle_after`` renders a fresh browser is launched for new jobs and the
+    old one is closed once its in-flight jobs finish, which caps the memory a
+    long-running Chromium accumulates.
+    """
+
+    def __init__(self, max_contexts: int = 4, recycle_after: int = 200, job_timeout: float = 30.0,
+                 browser_type: str = "chromium", launch_options: Optional[Dict] = None,
+                 playwright_factory: Optional[Callable[[], Any]] = None):
+        self.max_contexts = max_contexts
+        self.recycle_after = recycle_after
+        self.job_timeout = job_timeout
+        self.browser_type = browser_type
+        self.launch_options = launch_options or {}
+        self.playwright_factory = playwright_factory or _default_playwright_factory
+
+        self._playwright = None
+        self._worker: Optional[_BrowserWorker] = None
+        self._generation = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self.stats: Dict[str, int] = {
+            "renders": 0,
+            "failures": 0,
+            "timeouts": 0,
+            "browsers_launched": 0,
+            "browsers_recycled": 0,
+        }
+
+    # Lifecycle
+    async def start(self):
+        """Start Playwright (browsers are launched on first use)"""
+        if self._playwright is None:
+            self._playwright = await self.playwright_factory().start()
+            self._semaphore = asyncio.Semaphore(self.max_contexts)
+            self._lock = asyncio.Lock()
+
+    async def close(self):
+        """Close the browser and stop Playwright"""
+        if self._worker is not None:
+            await self._close_browser(self._worker)
+            self._worker = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def __aenter__(self) -> "BrowserPool":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    # Rendering
+    async def screenshot(self, html: str, width: int = 1920, height: int = 1080,
+                         format: str = "png", full_page: bool = True,
+                         timeout: Optional[float] = None) -> bytes:
+        """Render HTML to an image"""
+        return await self.render(RenderJob(html=html, kind="screenshot", width=width, height=height,
+                                           format=format, full_page=full_page, timeout=timeout))
+
+    async def pdf(self, html: str, page_format: str = "A4", timeout: Optional[float] = None) -> bytes:
+        """Render HTML to PDF (Chromium only)"""
+        return await self.render(RenderJob(html=html, kind="pdf", page_format=page_format, timeout=timeout))
+
+    async def render_batch(self, jobs: Iterable[RenderJob]) -> List[Union[bytes, Exception]]:
+        """Render many jobs concurrently; failed jobs return their exception"""
+        return await asyncio.gather(*(self.render(job) for job in jobs), return_exceptions=True)
+
+    async def render(self, job: RenderJob) -> bytes:
+        """Render one job on a pooled browser context"""
+        if job.kind == "pdf" and self.browser_type != "chromium":
+            raise ValueError("PDF rendering is only available with Chromium")
+        await self.start()
+
+        timeout = job.timeout if job.timeout is not None else self.job_timeout
+        async with self._semaphore:
+            worker = await self._acquire_worker()
+            context = None
+            try:
+                context = await worker.browser.new_context(
+                    viewport={"width": job.width, "height": job.height}
+                )
+                page = await context.new_page()
+                result = await asyncio.wait_for(self._render_page(page, job), timeout)
+                self.stats["renders"] += 1
+                return result
+            except asyncio.TimeoutError:
+                self.stats["timeouts"] += 1
+                raise RenderTimeoutError(f"Render exceeded {timeout}s")
+            except Exception:
+                self.stats["failures"] += 1
+                raise
+            finally:
+                if context is not None:
+                    try:
+                        await context.close()
+                    except Exception as e:
+                        logger.warning(f"Error closing browser context: {e}")
+                await self._release_worker(worker)
+
+    async def _render_page(self, page: Any, job: RenderJob) -> bytes:
+        await page.set_content(job.html, wait_until="networkidle")
+        if job.kind == "pdf":
+            return await page.pdf(format=job.page_format, print_background=True)
+        image_type = "jpeg" if job.format in ("jpg", "jpeg") else job.format
+        return await page.screenshot(type=image_type, full_page=job.full_page)
+
+    # Browser recycling
+    async def _acquire_worker(self) -> _BrowserWorker:
+        async with self._lock:
+            worker = self._worker
+            connected = worker is not None and getattr(worker.browser, "is_connected", lambda: True)()
+            if worker is None or not connected or worker.renders >= self.recycle_after:
+                if worker is not None:
+                    worker.retired = True
+                    self.stats["browsers_recycled"] += 1
+                    if worker.active == 0:
+                        await self._close_browser(worker)
+                worker = await self._launch_worker()
+                self._worker = worker
+            worker.renders += 1
+            worker.active += 1
+            return worker
+
+    async def _release_worker(self, worker: _BrowserWorker):
+        worker.active -= 1
+        if worker.retired and worker.active == 0:
+            await self._close_browser(worker)
+
+    async def _launch_worker(self) -> _BrowserWorker:
+        launcher = getattr(self._playwright, self.browser_type)
+        browser = await launcher.launch(**self.launch_options)
+        self._generation += 1
+        self.stats["browsers_launched"] += 1
+        return _BrowserWorker(browser, self._generation)
+
+    async def _close_browser(self, worker: _BrowserWorker):
+        try:
+            await worker.browser.close()
+        except Exception as e:
+            logger.warning(f"Error closing browser: {e}")
+
+
+class SyncBrowserPool:
+    """Blocking facade over BrowserPool for synchronous callers
+
+    The async pool runs on a private event loop thread, so Django views and
+    the export system can share one warm browser.
+    """
+
+    def __init__(self, **pool_options):
+        self.pool = BrowserPool(**pool_options)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="browser-pool", daemon=True)
+        self._thread.start()
+        try:
+            self._call(self.pool.start())
+        except Exception:
+            self._stop_loop()
+            raise
+
+    def screenshot(self, html: str, width: int = 1920, height: int = 1080,
+                   format: str = "png", full_page: bool = True) -> bytes:
+        return self._call(self.pool.screenshot(html, width, height, format, full_page))
+
+    def pdf(self, html: str, page_format: str = "A4") -> bytes:
+        return self._call(self.pool.pdf(html, page_format))
+
+    def render_batch(self, jobs: Iterable[RenderJob]) -> List[Union[bytes, Exception]]:
+        return self._call(self.pool.render_batch(list(jobs)))
+
+    def close(self):
+        if self._loop.is_running():
+            self._call(self.pool.close())
+            self._stop_loop()
+
+    def _call(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def _stop_loop(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+
+_shared_pool: Optional[SyncBrowserPool] = None
+_shared_pool_lock = threading.Lock()
+# Set once Playwright turns out to be missing, so later calls fail fast
+_playwright_missing: Optional[str] = None
+
+
+def get_shared_browser_pool(**pool_options) -> SyncBrowserPool:
+    """Get the process-wide browser pool, starting it on first use
+
+    Raises ImportError when Playwright is not installed, without starting
+    a pool thread once that is known.
+    """
+    global _shared_pool, _playwright_missing
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            if _playwright_missing is None and "playwright_factory" not in pool_options and \
+                    importlib.util.find_spec("playwright") is None:
+                _playwright_missing = "Playwright is not installed"
+            if _playwright_missing is not None:
+                raise ImportError(_playwright_missing)
+            try:
+                _shared_pool = SyncBrowserPool(**pool_options)
+            except ImportError as e:
+                _playwright_missing = str(e)
+                raise
+            atexit.register(_shared_pool.close)
+        return _shared_pool
+
+
+# Example usage and testing
+if __name__ == "__main__":
+    print("🖼️ Browser Pool Demo")
+    print("=" * 50)
+
+    async def demo():
+        async with BrowserPool(max_contexts=2, recycle_after=10) as pool:
+            jobs = [RenderJob(html=f"<h1>Preview {i}</h1>", width=800, height=600) for i in range(5)]
+            results = await pool.render_batch(jobs)
+            for i, result in enumerate(results):
+                status = "✅" if isinstance(result, bytes) else "❌"
+                print(f"{status} Job {i}: {len(result) if isinstance(result, bytes) else result}")
+            print(f"✅ Stats: {pool.stats}")
+
+    try:
+        asyncio.run(demo())
+    except ImportError:
+        print("⚠️ Playwright not available")
@@ -10,9 +10,9 @@
 """
 
 import os
+import sys
 import json
 import shutil
-import zipfile
 import requests
 from pathlib import Path
 from datetime import datetime
@@ -20,6 +20,10 @@ import subprocess
 import re
 from typing import Dict, List, Optional
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from streaming_zip import StreamingZipWriter
+from css_purger import SelectorIndex, CSSPurger
+
 class SiteBuilder:
     """موتور اصلی ساخت سایت"""
 
@@ -279,15 +283,36 @@ Sitemap: {site_config.get('domain', 'https://example.com')}/sitemap.xml
             with open(css_file, 'w', encoding='utf-8') as f:
                 f.write(css_content)
 
+        # حذف CSS استفاده نشده (اختیاری؛ کلاس‌هایی که در زمان اجرا ساخته می‌شوند دیده نمی‌شوند)
+        if self.config.get('purge_css', False):
+            self._purge_unused_css(site_path)
+
+    def _purge_unused_css(self, site_path: Path):
+        """حذف قواعد CSS که با هیچ صفحه‌ای تطبیق ندارند"""
+        index = SelectorIndex()
+        for page in site_path.rglob('*'):
+            if page.suffix in ('.html', '.htm'):
+                index.index_html(page.read_text(encoding='utf-8', errors='ignore'))
+            elif page.suffix == '.js':
+                index.index_script(page.read_text(encoding='utf-8', errors='ignore'))
+
+        purger = CSSPurger(index, self.config.get('css_safelist', []))
+        for css_file in site_path.rglob('*.css'):
+            css_content = css_file.read_text(encoding='utf-8', errors='ignore')
+            purged, report = purger.purge_with_report(css_file.name, css_content)
+            css_file.write_text(purged, encoding='utf-8')
+            print(f"🧹 {css_file.relative_to(site_path)}: {report.bytes_saved} بایت کاهش "
+                  f"({report.rules_removed}/{report.rules_total} قاعده حذف شد)")
+
     def compress_site(self, site_path: str) -> str:
         """فشرده کردن سایت"""
         site_path = Path(site_path)
         zip_path = site_path.with_suffix('.zip')
 
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            for file in site_path.rglob('*'):
-                if file.is_file():
-                    zipf.write(file, file.relative_to(site_path))
+        # تصاویر و فونت‌های فشرده بدون فشرده‌سازی مجدد ذخیره می‌شوند
+        writer = StreamingZipWriter()
+        with open(zip_path, 'wb') as zip_file:
+            writer.write_zip(writer.iter_directory(site_path), zip_file)
 
         print(f"📦 سایت فشرده شد: {zip_path}")
         return str(zip_path)
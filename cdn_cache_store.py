@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CDN Cache Store - Indexed per-node cache for edge content
+Constant-time lookups by (node, cache key), per-node byte capacity with
+LRU or LFU eviction, TTL expiry with an optional stale window, and tag-
+and URL-prefix invalidation
+"""
+
+import heapq
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+POLICY_LRU = "lru"
+POLICY_LFU = "lfu"
+DEFAULT_NODE_CAPACITY = 1024 ** 3
+
+# Lookup results
+CACHE_HIT = "hit"
+CACHE_STALE = "stale"
+CACHE_EXPIRED = "expired"
+CACHE_MISS = "miss"
+
+
+class _Slot:
+    """One cached entry and its bookkeeping"""
+
+    __slots__ = ("node_id", "cache_key", "value", "size", "expires_at", "stale_until", "frequency", "url", "tags")
+
+    def __init__(self, node_id: str, cache_key: str, value: Any, size: int, expires_at: Optional[float],
+                 stale_until: Optional[float], url: Optional[str], tags: Tuple[str, ...]):
+        self.node_id = node_id
+        self.cache_key = cache_key
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+        self.stale_until = stale_until
+        self.frequency = 1
+        self.url = url
+        self.tags = tags
+
+
+class _Partition:
+    """Entries of one node in eviction order"""
+
+    __slots__ = ("entries", "capacity", "used", "buckets", "min_frequency")
+
+    def __init__(self, capacity: int):
+        self.entries: "OrderedDict[str, _Slot]" = OrderedDict()
+        self.capacity = capacity
+        self.used = 0
+        # LFU only: frequency -> entries with that frequency, oldest first
+        self.buckets: Dict[int, "OrderedDict[str, _Slot]"] = {}
+        self.min_frequency = 1
+
+
+def url_directory(url: str) -> str:
+    """Directory part of a URL, up to and including the last ``/``"""
+    return url[:url.rfind("/") + 1]
+
+
+def _parent_directory(directory: str) -> str:
+    """Enclosing directory, or "" at the top (``scheme://host/`` or ``/``)"""
+    parent = directory[:directory.rfind("/", 0, len(directory) - 1) + 1]
+    return "" if not parent or parent.endswith("//") else parent
+
+
+class CDNCacheStore:
+    """Cache entries of every CDN node, indexed by node and cache key
+
+    Each node has its own partition with a byte capacity; a lookup is two
+    dict probes and inserting past capacity evicts that node's least
+    recently (LRU) or least frequently (LFU, ties by age) used entries.
+    An entry is fresh for its TTL and then, during its ``stale_ttl``
+    window, returned as CACHE_STALE so callers can serve it while they
+    revalidate. Removal deadlines sit in a min-heap and entries past them
+    are dropped on access or when new entries arrive. Tags map to their
+    entries, and URLs are grouped by directory so a prefix invalidation
+    only walks the directories under the prefix.
+    """
+
+    def __init__(self, node_capacity: int = DEFAULT_NODE_CAPACITY, policy: str = POLICY_LRU,
+                 default_ttl: Optional[float] = 3600.0, stale_ttl: float = 0.0,
+                 clock: Callable[[], float] = time.monotonic):
+        if policy not in (POLICY_LRU, POLICY_LFU):
+            raise ValueError(f"Unknown eviction policy: {policy}")
+        self.node_capacity = node_capacity
+        self.policy = policy
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+        self.clock = clock
+        self.partitions: Dict[str, _Partition] = {}
+        self.tags: Dict[str, Set[_Slot]] = {}
+        self.directories: Dict[str, Set[_Slot]] = {}
+        self.subdirectories: Dict[str, Set[str]] = {}
+        self._deadlines: List[Tuple[float, int, _Slot]] = []
+        self._sequence = 0
+        self._size = 0
+        self.stats = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "expirations": 0,
+            "evictions": 0,
+            "invalidations": 0,
+            "rejections": 0
+        }
+
+    # 1. Capacity
+    def set_capacity(self, node_id: str, capacity: int):
+        """Set a node's capacity in bytes, evicting if it is now over"""
+        partition = self._partition(node_id)
+        partition.capacity = capacity
+        self._evict(partition)
+
+    def _partition(self, node_id: str) -> _Partition:
+        partition = self.partitions.get(node_id)
+        if partition is None:
+            partition = self.partitions[node_id] = _Partition(self.node_capacity)
+        return partition
+
+    # 2. Lookups
+    def lookup(self, node_id: str, cache_key: str) -> Tuple[Optional[Any], str]:
+        """Look up an entry; returns ``(value, status)``
+
+        The status is CACHE_HIT or CACHE_STALE with the value, or
+        CACHE_EXPIRED or CACHE_MISS with None.
+        """
+        partition = self.partitions.get(node_id)
+        slot = partition.entries.get(cache_key) if partition is not None else None
+        if slot is None:
+            self.stats["misses"] += 1
+            return None, CACHE_MISS
+        status = CACHE_HIT
+        if slot.expires_at is not None:
+            now = self.clock()
+            if slot.stale_until <= now:
+                self._remove(slot)
+                self.stats["expirations"] += 1
+                self.stats["misses"] += 1
+                return None, CACHE_EXPIRED
+            if slot.expires_at <= now:
+                status = CACHE_STALE
+        self._touch(partition, slot)
+        self.stats["hits" if status == CACHE_HIT else "stale_hits"] += 1
+        return slot.value, status
+
+    def get(self, node_id: str, cache_key: str, default: Any = None) -> Any:
+        value, status = self.lookup(node_id, cache_key)
+        return value if status == CACHE_HIT else default
+
+    def ttl_remaining(self, node_id: str, cache_key: str) -> Optional[float]:
+        """Seconds until the entry expires, None if it never does or is not cached"""
+        partition = self.partitions.get(node_id)
+        slot = partition.entries.get(cache_key) if partition is not None else None
+        if slot is None or slot.expires_at is None:
+            return None
+        return max(0.0, slot.expires_at - self.clock())
+
+    def _touch(self, partition: _Partition, slot: _Slot):
+        if self.policy == POLICY_LRU:
+            partition.entries.move_to_end(slot.cache_key)
+            return
+        bucket = partition.buckets[slot.frequency]
+        del bucket[slot.cache_key]
+        if not bucket:
+            del partition.buckets[slot.frequency]
+            if partition.min_frequency == slot.frequency:
+                partition.min_frequency += 1
+        slot.frequency += 1
+        partition.buckets.setdefault(slot.frequency, OrderedDict())[slot.cache_key] = slot
+
+    # 3. Updates
+    def put(self, node_id: str, cache_key: str, value: Any, size: int, ttl: Optional[float] = None,
+            url: Optional[str] = None, tags: Iterable[str] = (), stale_ttl: Optional[float] = None) -> bool:
+        """Cache ``value`` on a node; returns False if it is larger than the node's capacity"""
+        partition = self._partition(node_id)
+        existing = partition.entries.get(cache_key)
+        if existing is not None:
+            self._remove(existing)
+        if size > partition.capacity:
+            self.stats["rejections"] += 1
+            return False
+
+        now = self.clock()
+        self._expire(now)
+        ttl = self.default_ttl if ttl is None else ttl
+        stale_ttl = self.stale_ttl if stale_ttl is None else stale_ttl
+        expires_at = now + ttl if ttl is not None else None
+        slot = _Slot(node_id, cache_key, value, size, expires_at,
+                     expires_at + stale_ttl if expires_at is not None else None, url, tuple(tags))
+        partition.entries[cache_key] = slot
+        partition.used += size
+        self._size += 1
+        if self.policy == POLICY_LFU:
+            partition.buckets.setdefault(1, OrderedDict())[cache_key] = slot
+            partition.min_frequency = 1
+        if slot.stale_until is not None:
+            self._sequence += 1
+            heapq.heappush(self._deadlines, (slot.stale_until, self._sequence, slot))
+        for tag in slot.tags:
+            self.tags.setdefault(tag, set()).add(slot)
+        if url is not None:
+            self._index_url(slot)
+
+        self._evict(partition)
+        return True
+
+    def delete(self, node_id: str, cache_key: str) -> bool:
+        partition = self.partitions.get(node_id)
+        slot = partition.entries.get(cache_key) if partition is not None else None
+        if slot is None:
+            return False
+        self._remove(slot)
+        return True
+
+    def clear(self):
+        self.partitions.clear()
+        self.tags.clear()
+        self.directories.clear()
+        self.subdirectories.clear()
+        self._deadlines.clear()
+        self._size = 0
+
+    def purge_expired(self) -> int:
+        """Drop every expired entry; returns how many were removed"""
+        before = self.stats["expirations"]
+        self._expire(self.clock())
+        return self.stats["expirations"] - before
+
+    def _evict(self, partition: _Partition):
+        while partition.used > partition.capacity and partition.entries:
+            if self.policy == POLICY_LRU:
+                victim = next(iter(partition.entries.values()))
+            else:
+                if partition.min_frequency not in partition.buckets:
+                    partition.min_frequency = min(partition.buckets)
+                victim = next(iter(partition.buckets[partition.min_frequency].values()))
+            self._remove(victim)
+            self.stats["evictions"] += 1
+
+    def _expire(self, now: float):
+        deadlines = self._deadlines
+        while deadlines and deadlines[0][0] <= now:
+            stale_until, _, slot = heapq.heappop(deadlines)
+            # Skip heap records left behind by replaced or removed entries
+            if stale_until == slot.stale_until and self._is_live(slot):
+                self._remove(slot)
+                self.stats["expirations"] += 1
+        if len(deadlines) > 2 * self._size + 64:
+            self._deadlines = [record for record in deadlines
+                               if record[0] == record[2].stale_until and self._is_live(record[2])]
+            heapq.heapify(self._deadlines)
+
+    def _is_live(self, slot: _Slot) -> bool:
+        partition = self.partitions.get(slot.node_id)
+        return partition is not None and partition.entries.get(slot.cache_key) is slot
+
+    def _remove(self, slot: _Slot):
+        partition = self.partitions[slot.node_id]
+        del partition.entries[slot.cache_key]
+        partition.used -= slot.size
+        self._size -= 1
+        if self.policy == POLICY_LFU:
+            bucket = partition.buckets[slot.frequency]
+            del bucket[slot.cache_key]
+            if not bucket:
+                del partition.buckets[slot.frequency]
+        for tag in slot.tags:
+            tagged = self.tags[tag]
+            tagged.discard(slot)
+            if not tagged:
+                del self.tags[tag]
+        if slot.url is not None:
+            self._unindex_url(slot)
+
+    # 4. URL directory index
+    def _index_url(self, slot: _Slot):
+        directory = url_directory(slot.url)
+        entries = self.directories.get(directory)
+        if entries is None:
+            entries = self.directories[directory] = set()
+            # Register the directory with each ancestor that is not yet known
+            child = directory
+            while child:
+                parent = _parent_directory(child)
+                siblings = self.subdirectories.setdefault(parent, set())
+                known = bool(siblings) or parent in self.directories or parent == ""
+                siblings.add(child)
+                if known:
+                    break
+                child = parent
+        entries.add(slot)
+
+    def _unindex_url(self, slot: _Slot):
+        directory = url_directory(slot.url)
+        entries = self.directories[directory]
+        entries.discard(slot)
+        if not entries and not directory:
+            del self.directories[directory]
+        # Prune directories left without entries or subdirectories
+        while directory and not self.directories.get(directory) and not self.subdirectories.get(directory):
+            self.directories.pop(directory, None)
+            self.subdirectories.pop(directory, None)
+            parent = _parent_directory(directory)
+            siblings = self.subdirectories.get(parent)
+            if siblings is not None:
+                siblings.discard(directory)
+                if not siblings and parent:
+                    del self.subdirectories[parent]
+            directory = parent
+
+    def _slots_with_prefix(self, prefix: str) -> Iterator[_Slot]:
+        stack = [""]
+        while stack:
+            directory = stack.pop()
+            if directory.startswith(prefix):
+                # Everything below matches
+                for slot in self.directories.get(directory, ()):
+                    yield slot
+                stack.extend(self.subdirectories.get(directory, ()))
+            elif prefix.startswith(directory):
+                for slot in self.directories.get(directory, ()):
+                    if slot.url.startswith(prefix):
+                        yield slot
+                stack.extend(self.subdirectories.get(directory, ()))
+
+    # 5. Invalidation
+    def invalidate_key(self, cache_key: str, node_ids: Optional[Iterable[str]] = None) -> List[Tuple[str, Any]]:
+        """Remove a key from the given nodes (default: all); returns ``(node_id, value)`` pairs"""
+        removed = []
+        for node_id in list(node_ids if node_ids is not None else self.partitions):
+            partition = self.partitions.get(node_id)
+            slot = partition.entries.get(cache_key) if partition is not None else None
+            if slot is not None:
+                removed.append(slot)
+        return self._invalidate(removed)
+
+    def invalidate_tag(self, tag: str) -> List[Tuple[str, Any]]:
+        """Remove every entry carrying ``tag``"""
+        return self._invalidate(list(self.tags.get(tag, ())))
+
+    def invalidate_prefix(self, prefix: str) -> List[Tuple[str, Any]]:
+        """Remove every entry whose URL starts with ``prefix``"""
+        return self._invalidate(list(self._slots_with_prefix(prefix)))
+
+    def _invalidate(self, slots: List[_Slot]) -> List[Tuple[str, Any]]:
+        for slot in slots:
+            self._remove(slot)
+        self.stats["invalidations"] += len(slots)
+        return [(slot.node_id, slot.value) for slot in slots]
+
+    # 6. Introspection
+    def values(self) -> Iterator[Any]:
+        for partition in self.partitions.values():
+            for slot in partition.entries.values():
+                yield slot.value
+
+    def node_usage(self, node_id: str) -> Dict[str, int]:
+        partition = self._partition(node_id)
+        return {"entries": len(partition.entries), "bytes": partition.used, "capacity": partition.capacity}
+
+    def get_metrics(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["stale_hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": self.stats["hits"] / lookups if lookups else 0.0,
+            "entries": self._size,
+            "bytes": sum(partition.used for partition in self.partitions.values()),
+            "nodes": len(self.partitions),
+            "tags": len(self.tags),
+            "policy": self.policy
+        }
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        node_id, cache_key = key
+        partition = self.partitions.get(node_id)
+        slot = partition.entries.get(cache_key) if partition is not None else None
+        return slot is not None and (slot.expires_at is None or slot.expires_at > self.clock())
+
+
+# Example usage and testing
+if __name__ == "__main__":
+    print("🗂️ CDN Cache Store Demo")
+    print("=" * 50)
+
+    store = CDNCacheStore(node_capacity=3000, policy=POLICY_LFU)
+    for index in range(5):
+        url = f"https://example.com/products/{index}.html"
+        store.put("london", f"key-{index}", url, 1000, url=url, tags=["products", f"product-{index}"])
+    print(f"✅ Capacity kept: {store.node_usage('london')}")
+    store.put("tokyo", "key-9", "logo", 500, url="https://example.com/static/logo.png", tags=["static"])
+    print(f"✅ Lookup: {store.lookup('tokyo', 'key-9')}")
+    print(f"✅ Tag invalidation: {store.invalidate_tag('products')}")
+    print(f"✅ Prefix invalidation: {store.invalidate_prefix('https://example.com/static/')}")
+    print(f"✅ Metrics: {store.get_metrics()}")
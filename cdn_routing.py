@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CDN Routing - Geo-aware nearest-node selection
+Haversine distances from client locations to CDN nodes, per-location node
+rankings kept sorted as measured latencies change, and a load penalty
+applied at query time
+"""
+
+import bisect
+import heapq
+import math
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0
+# Light in fiber covers ~200 km/ms, so ~100 km of distance per ms of round trip
+KM_PER_RTT_MS = 100.0
+LOAD_PENALTY_MS = 50.0
+LATENCY_SMOOTHING = 0.3
+DEFAULT_LOCATION = "US"
+GLOBAL_RANKING = "*"
+
+# Approximate country centroids (latitude, longitude)
+COUNTRY_COORDINATES = {
+    "US": (39.8, -98.6), "CA": (56.1, -106.3), "MX": (23.6, -102.6), "BR": (-14.2, -51.9),
+    "AR": (-38.4, -63.6), "CL": (-35.7, -71.5), "CO": (4.6, -74.3), "UK": (54.0, -2.0),
+    "GB": (54.0, -2.0), "IE": (53.4, -8.2), "FR": (46.2, 2.2), "DE": (51.2, 10.5),
+    "NL": (52.1, 5.3), "ES": (40.5, -3.7), "IT": (41.9, 12.6), "SE": (60.1, 18.6),
+    "PL": (51.9, 19.1), "RU": (55.8, 37.6), "TR": (39.0, 35.2), "IR": (32.4, 53.7),
+    "IQ": (33.2, 43.7), "AE": (23.4, 53.8), "SA": (23.9, 45.1), "EG": (26.8, 30.8),
+    "ZA": (-30.6, 22.9), "NG": (9.1, 8.7), "KE": (0.0, 37.9), "IN": (20.6, 79.0),
+    "PK": (30.4, 69.3), "AF": (33.9, 67.7), "CN": (35.9, 104.2), "JP": (36.2, 138.3),
+    "KR": (35.9, 127.8), "SG": (1.35, 103.8), "ID": (-0.8, 113.9), "TH": (15.9, 101.0),
+    "VN": (14.1, 108.3), "PH": (12.9, 121.8), "AU": (-25.3, 133.8), "NZ": (-40.9, 174.9)
+}
+
+
+def haversine_km(origin: Tuple[float, float], target: Tuple[float, float]) -> float:
+    """Great-circle distance between two (latitude, longitude) points"""
+    lat1, lon1 = map(math.radians, origin)
+    lat2, lon2 = map(math.radians, target)
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class GeoRoutingTable:
+    """Nodes ranked by expected latency for each client location
+
+    A location is a country code or a ``"lat,lon"`` string (rounded to a
+    one-degree cell). Its ranking orders nodes by round-trip time over
+    the distance plus the node's smoothed measured latency, and is built
+    once per location. A new latency measurement moves only that node
+    within each ranking. Status and load are read from the node objects
+    at query time: a node costs ``load_penalty`` ms more per unit of
+    ``current_load``. Since load only adds cost, the scan stops at the
+    first node whose base cost exceeds the best found.
+    """
+
+    def __init__(self, nodes: Dict[str, Any], load_penalty: float = LOAD_PENALTY_MS,
+                 latency_smoothing: float = LATENCY_SMOOTHING, default_location: str = DEFAULT_LOCATION):
+        self.nodes = nodes
+        self.load_penalty = load_penalty
+        self.latency_smoothing = latency_smoothing
+        self.default_location = default_location
+        self.latencies: Dict[str, float] = {node_id: node.latency for node_id, node in nodes.items()}
+        self.locations: Dict[str, Optional[Tuple[float, float]]] = {}
+        self.distances: Dict[str, Dict[str, float]] = {}
+        self.rankings: Dict[str, List[Tuple[float, str]]] = {}
+        self.stats = {"lookups": 0, "nodes_scanned": 0, "rankings_built": 0, "reranks": 0}
+
+    # 1. Locations
+    def resolve(self, location: Optional[str]) -> Tuple[str, Optional[Tuple[float, float]]]:
+        """Ranking key and coordinates for a client location"""
+        if location is None:
+            return GLOBAL_RANKING, None
+        location = location.strip()
+        if "," in location:
+            try:
+                latitude, longitude = (float(part) for part in location.split(",", 1))
+                latitude, longitude = round(latitude), round(longitude)
+                return f"{latitude},{longitude}", (latitude, longitude)
+            except ValueError:
+                pass
+        code = location.upper()
+        if code not in COUNTRY_COORDINATES:
+            code = self.default_location
+        return code, COUNTRY_COORDINATES[code]
+
+    def _ranking(self, key: str, coordinates: Optional[Tuple[float, float]]) -> List[Tuple[float, str]]:
+        ranking = self.rankings.get(key)
+        if ranking is None:
+            self.locations[key] = coordinates
+            self.distances[key] = {node_id: self._distance_ms(coordinates, node)
+                                   for node_id, node in self.nodes.items()}
+            ranking = self.rankings[key] = sorted(
+                (distance + self.latencies[node_id], node_id) for node_id, distance in self.distances[key].items())
+            self.stats["rankings_built"] += 1
+        return ranking
+
+    @staticmethod
+    def _distance_ms(coordinates: Optional[Tuple[float, float]], node: Any) -> float:
+        if coordinates is None:
+            return 0.0
+        return haversine_km(coordinates, (node.latitude, node.longitude)) / KM_PER_RTT_MS
+
+    # 2. Queries
+    def nearest(self, location: Optional[str] = None) -> Optional[Any]:
+        """Active node with the lowest expected latency for a location"""
+        ranked = self.rank(location, 1)
+        return ranked[0] if ranked else None
+
+    def rank(self, location: Optional[str] = None, count: int = 1) -> List[Any]:
+        """Up to ``count`` active nodes by expected latency including load"""
+        self.stats["lookups"] += 1
+        best: List[Tuple[float, int, str]] = []
+        for position, (base, node_id) in enumerate(self._ranking(*self.resolve(location))):
+            # Load only adds cost, so nothing further down can beat the current picks
+            if len(best) == count and base >= -best[0][0]:
+                break
+            self.stats["nodes_scanned"] += 1
+            node = self.nodes[node_id]
+            if node.status != "active":
+                continue
+            cost = base + self.load_penalty * node.current_load
+            if len(best) < count:
+                heapq.heappush(best, (-cost, -position, node_id))
+            elif cost < -best[0][0]:
+                heapq.heapreplace(best, (-cost, -position, node_id))
+        return [self.nodes[node_id] for _, _, node_id in sorted(best, reverse=True)]
+
+    def estimated_latency(self, node: Any, location: Optional[str] = None) -> float:
+        """Expected round trip from a location to a node, without load"""
+        key, coordinates = self.resolve(location)
+        self._ranking(key, coordinates)
+        return self.distances[key][node.id] + self.latencies[node.id]
+
+    # 3. Updates
+    def update_latency(self, node_id: str, latency: float):
+        """Fold a latency measurement into a node's estimate and move it in each ranking"""
+        previous = self.latencies[node_id]
+        current = previous + self.latency_smoothing * (latency - previous)
+        self.latencies[node_id] = current
+        for key, ranking in self.rankings.items():
+            distance = self.distances[key][node_id]
+            self._reposition(ranking, (distance + previous, node_id), (distance + current, node_id))
+        self.stats["reranks"] += 1
+
+    def add_node(self, node: Any):
+        """Insert a node into every ranking"""
+        self.latencies[node.id] = node.latency
+        for key, ranking in self.rankings.items():
+            distance = self.distances[key][node.id] = self._distance_ms(self.locations[key], node)
+            bisect.insort(ranking, (distance + node.latency, node.id))
+
+    def remove_node(self, node_id: str):
+        """Drop a node from every ranking"""
+        latency = self.latencies.pop(node_id)
+        for key, ranking in self.rankings.items():
+            self._reposition(ranking, (self.distances[key].pop(node_id) + latency, node_id), None)
+
+    @staticmethod
+    def _reposition(ranking: List[Tuple[float, str]], old: Tuple[float, str], new: Optional[Tuple[float, str]]):
+        index = bisect.bisect_left(ranking, old)
+        if index < len(ranking) and ranking[index] == old:
+            del ranking[index]
+        else:
+            ranking.remove(next(entry for entry in ranking if entry[1] == old[1]))
+        if new is not None:
+            bisect.insort(ranking, new)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "locations": len(self.rankings),
+            "average_scan": self.stats["nodes_scanned"] / self.stats["lookups"] if self.stats["lookups"] else 0.0
+        }
+
+
+# Example usage and testing
+if __name__ == "__main__":
+    from types import SimpleNamespace
+
+    print("🧭 CDN Routing Demo")
+    print("=" * 50)
+
+    sites = {"frankfurt": (50.1, 8.7, 6), "dubai": (25.2, 55.3, 9), "singapore": (1.35, 103.8, 7)}
+    nodes = {name: SimpleNamespace(id=name, latitude=lat, longitude=lon, latency=latency, current_load=0.2,
+                                   status="active") for name, (lat, lon, latency) in sites.items()}
+    table = GeoRoutingTable(nodes)
+    for location in ("IR", "DE", "AU", "35.7,51.4"):
+        print(f"✅ {location}: {table.nearest(location).id}")
+    nodes["dubai"].current_load = 1.0
+    print(f"✅ IR with Dubai saturated: {table.nearest('IR').id}")
+    table.update_latency("frankfurt", 80)
+    print(f"✅ DE after Frankfurt slowed down: {[node.id for node in table.rank('DE', 3)]}")
+    print(f"✅ Metrics: {table.get_metrics()}")
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Collaboration Backplane - Pub/sub relay between collaboration nodes
+Redis pub/sub transport plus an in-process bus for tests, and rendezvous
+hashing to pick the node that orders each project's operations
+"""
+
+import asyncio
+import hashlib
+import json
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+def owner_node(key: str, nodes: Iterable[str]) -> str:
+    """Node responsible for ``key`` by rendezvous (highest random weight) hashing
+
+    Every node computes the same owner from the same member list, and
+    adding or removing a node only moves the keys that node owned.
+    """
+    return max(nodes, key=lambda node: hashlib.sha1(f"{node}:{key}".encode("utf-8")).digest())
+
+
+class Backplane(ABC):
+    """Interface for node-to-node messaging
+
+    Messages are JSON-serializable dicts. Handlers for one backplane run
+    one at a time in delivery order, and messages from one publisher on
+    one channel arrive in publish order.
+    """
+
+    @abstractmethod
+    async def publish(self, channel: str, message: Dict[str, Any]):
+        ...
+
+    @abstractmethod
+    async def subscribe(self, channel: str, handler: Handler):
+        ...
+
+    @abstractmethod
+    async def unsubscribe(self, channel: str):
+        ...
+
+    @abstractmethod
+    async def close(self):
+        ...
+
+
+class InMemoryBus:
+    """Shared in-process message bus connecting ``InMemoryBackplane`` nodes"""
+
+    def __init__(self):
+        self.subscribers: Dict[str, Set["InMemoryBackplane"]] = defaultdict(set)
+        self.published = 0
+
+    def deliver(self, channel: str, payload: str):
+        self.published += 1
+        for backplane in list(self.subscribers.get(channel, ())):
+            backplane.inbox.put_nowait((channel, payload))
+
+
+class InMemoryBackplane(Backplane):
+    """Backplane over an ``InMemoryBus``; messages are JSON round-tripped like on the wire"""
+
+    def __init__(self, bus: InMemoryBus):
+        self.bus = bus
+        self.handlers: Dict[str, Handler] = {}
+        self.inbox: asyncio.Queue = asyncio.Queue()
+        self.reader: Optional[asyncio.Task] = None
+
+    async def publish(self, channel: str, message: Dict[str, Any]):
+        self.bus.deliver(channel, json.dumps(message, default=str))
+
+    async def subscribe(self, channel: str, handler: Handler):
+        self.handlers[channel] = handler
+        self.bus.subscribers[channel].add(self)
+        if self.reader is None:
+            self.reader = asyncio.get_running_loop().create_task(self._read())
+
+    async def unsubscribe(self, channel: str):
+        self.handlers.pop(channel, None)
+        self.bus.subscribers[channel].discard(self)
+
+    async def _read(self):
+        while True:
+            channel, payload = await self.inbox.get()
+            handler = self.handlers.get(channel)
+            if handler is None:
+                continue
+            try:
+                await handler(json.loads(payload))
+            except Exception as e:
+                logger.error(f"Error handling backplane message on {channel}: {e}")
+
+    async def close(self):
+        for channel in list(self.handlers):
+            await self.unsubscribe(channel)
+        if self.reader is not None:
+            self.reader.cancel()
+            await asyncio.gather(self.reader, return_exceptions=True)
+            self.reader = None
+
+
+class RedisBackplane(Backplane):
+    """Backplane over Redis pub/sub
+
+    ``client`` is a ``redis.asyncio`` client. One pub/sub connection
+    carries every subscription and a single reader task dispatches
+    messages, preserving per-channel order.
+    """
+
+    def __init__(self, client: Any):
+        self.client = client
+        self.pubsub = client.pubsub(ignore_subscribe_messages=True)
+        self.handlers: Dict[str, Handler] = {}
+        self.reader: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_url(cls, url: str = "redis://localhost:6379") -> "RedisBackplane":
+        import redis.asyncio
+        return cls(redis.asyncio.from_url(url))
+
+    async def publish(self, channel: str, message: Dict[str, Any]):
+        try:
+            await self.client.publish(channel, json.dumps(message, default=str))
+        except Exception as e:
+            logger.error(f"Error publishing to {channel}: {e}")
+            raise
+
+    async def subscribe(self, channel: str, handler: Handler):
+        self.handlers[channel] = handler
+        await self.pubsub.subscribe(channel)
+        if self.reader is None:
+            self.reader = asyncio.get_running_loop().create_task(self._read())
+
+    async def unsubscribe(self, channel: str):
+        self.handlers.pop(channel, None)
+        await self.pubsub.unsubscribe(channel)
+
+    async def _read(self):
+        async for item in self.pubsub.listen():
+            if item.get("type") != "message":
+                continue
+            channel = item["channel"].decode("utf-8") if isinstance(item["channel"], bytes) else item["channel"]
+            handler = self.handlers.get(channel)
+            if handler is None:
+                continue
+            try:
+                await handler(json.loads(item["data"]))
+            except Exception as e:
+                logger.error(f"Error handling backplane message on {channel}: {e}")
+
+    async def close(self):
+        if self.reader is not None:
+            self.reader.cancel()
+            await asyncio.gather(self.reader, return_exceptions=True)
+            self.reader = None
+        await self.pubsub.aclose()
+
+
+# Example usage and testing
+if __name__ == "__main__":
+    async def main():
+        print("🛰️ Collaboration Backplane Demo")
+        print("=" * 50)
+
+        nodes = ["node-a", "node-b", "node-c"]
+        owners = [owner_node(f"project-{index}", nodes) for index in range(300)]
+        print(f"✅ Project ownership: { {node: owners.count(node) for node in nodes} }")
+
+        bus = InMemoryBus()
+        first, second = InMemoryBackplane(bus), InMemoryBackplane(bus)
+        received = []
+
+        async def handler(message):
+            received.append(message)
+
+        await second.subscribe("collab:project:demo", handler)
+        for index in range(3):
+            await first.publish("collab:project:demo", {"kind": "relay", "sequence": index})
+        await asyncio.sleep(0.01)
+        print(f"✅ Relayed in order: {[message['sequence'] for message in received]}")
+        await first.close()
+        await second.close()
+
+    asyncio.run(main())
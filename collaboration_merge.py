@@ -0,0 +1,471 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Collaboration Merge - Operational transform engine for collaborative edits
+Server-side transformation of concurrent element operations with compact
+deltas: anchored element ordering, last-writer-wins attribute and style
+maps, and retain/insert/delete text deltas
+"""
+
+import copy
+from collections import deque
+from itertools import islice
+from typing import Any, Deque, Dict, List, Optional, Tuple, Union
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ROOT = "root"
+
+# OperationType values that edit the document; everything else (cursors,
+# chat, presence) is committed as an empty change
+DOCUMENT_OPERATION_TYPES = {
+    "add_element",
+    "remove_element",
+    "modify_element",
+    "move_element",
+    "style_change",
+    "content_change"
+}
+
+# A text delta is a list of components: a positive int retains that many
+# characters, a negative int deletes them, a string is inserted. Characters
+# past the last component are retained implicitly.
+TextDelta = List[Union[int, str]]
+Change = Dict[str, Any]
+
+
+class ResyncRequired(Exception):
+    """Raised when a change is based on a version no longer in the history"""
+
+
+# 1. Text Deltas
+def normalize_text_delta(delta: TextDelta) -> TextDelta:
+    """Merge adjacent components and drop no-ops and the trailing retain"""
+    result: TextDelta = []
+    for component in delta:
+        if component == 0 or component == "":
+            continue
+        if result and type(result[-1]) is type(component) and (
+                isinstance(component, str) or (result[-1] > 0) == (component > 0)):
+            result[-1] += component
+        else:
+            result.append(component)
+    while result and isinstance(result[-1], int) and result[-1] > 0:
+        result.pop()
+    return result
+
+
+def _base_length(delta: TextDelta) -> int:
+    return sum(abs(component) for component in delta if isinstance(component, int))
+
+
+def apply_text_delta(text: str, delta: TextDelta) -> str:
+    """Apply a text delta, validating it against the text length"""
+    if _base_length(delta) > len(text):
+        raise ValueError(f"Text delta spans {_base_length(delta)} characters, text has {len(text)}")
+    parts = []
+    position = 0
+    for component in delta:
+        if isinstance(component, str):
+            parts.append(component)
+        elif component > 0:
+            parts.append(text[position:position + component])
+            position += component
+        else:
+            position -= component
+    parts.append(text[position:])
+    return "".join(parts)
+
+
+def _transform_text(first: TextDelta, second: TextDelta) -> Tuple[TextDelta, TextDelta]:
+    """Transform two deltas on the same text; ``first`` inserts win ties"""
+    length = max(_base_length(first), _base_length(second))
+    first = [component for component in first if component] + [length - _base_length(first)]
+    second = [component for component in second if component] + [length - _base_length(second)]
+    first_prime: TextDelta = []
+    second_prime: TextDelta = []
+    i = j = 0
+    a = first[0] if first else None
+    b = second[0] if second else None
+
+    while a is not None or b is not None:
+        if isinstance(a, str):
+            first_prime.append(a)
+            second_prime.append(len(a))
+            i += 1
+            a = first[i] if i < len(first) else None
+            continue
+        if isinstance(b, str):
+            first_prime.append(len(b))
+            second_prime.append(b)
+            j += 1
+            b = second[j] if j < len(second) else None
+            continue
+        if a == 0:
+            i += 1
+            a = first[i] if i < len(first) else None
+            continue
+        if b == 0:
+            j += 1
+            b = second[j] if j < len(second) else None
+            continue
+        if a is None or b is None:
+            raise ValueError("Text deltas do not cover the same text")
+
+        span = min(abs(a), abs(b))
+        if a > 0 and b > 0:
+            first_prime.append(span)
+            second_prime.append(span)
+        elif a > 0:
+            second_prime.append(-span)
+        elif b > 0:
+            first_prime.append(-span)
+        a = a - span if a > 0 else a + span
+        b = b - span if b > 0 else b + span
+
+    return normalize_text_delta(first_prime), normalize_text_delta(second_prime)
+
+
+def transform_text_delta(delta: TextDelta, applied: TextDelta) -> Tuple[TextDelta, TextDelta]:
+    """Rebase ``delta`` over ``applied`` (and vice versa)
+
+    ``applied`` was committed first, so its inserts go first when both
+    insert at the same position. Returns ``(delta', applied')``.
+    """
+    applied_prime, delta_prime = _transform_text(applied, delta)
+    return delta_prime, applied_prime
+
+
+# 2. Changes
+def operation_to_change(operation_type: str, element_id: Optional[str], data: Dict[str, Any],
+                        slot: Optional[str] = None) -> Change:
+    """Convert an operation payload into a normalized change
+
+    ``add_element`` and ``move_element`` place the element right after the
+    ``after`` slot of ``parent`` (or first when ``after`` is None); the new
+    position gets the id ``data["slot"]``, falling back to ``slot``.
+    """
+    data = dict(data or {})
+    if operation_type not in DOCUMENT_OPERATION_TYPES or element_id is None:
+        return {}
+
+    change: Change = {"element_id": element_id}
+    if operation_type in ("add_element", "move_element") and (
+            operation_type == "add_element" or "parent" in data or "after" in data):
+        change["insert"] = {
+            "parent": data.pop("parent", ROOT),
+            "after": data.pop("after", None),
+            "slot": data.pop("slot", None) or slot or element_id
+        }
+    else:
+        data.pop("slot", None)
+
+    if operation_type == "add_element":
+        change["element_type"] = data.pop("element_type", data.pop("type", "element"))
+        change["attributes"] = data.pop("attributes", {})
+        change["styles"] = data.pop("styles", {})
+        change["content"] = data.pop("content", "")
+        change["attributes"].update(data)
+    elif operation_type == "remove_element":
+        change["remove"] = True
+    elif operation_type == "style_change":
+        change["styles"] = data
+    elif operation_type == "content_change":
+        if "delta" in data:
+            change["text"] = normalize_text_delta(data["delta"])
+        else:
+            change["content"] = data.get("content", data.get("text", ""))
+    else:
+        if "content" in data:
+            change["content"] = data.pop("content")
+        if data:
+            change["attributes"] = data
+    return change
+
+
+def transform_change(change: Change, applied: Change) -> Tuple[Change, Change]:
+    """Rebase ``change`` over a concurrent, already-applied change
+
+    Returns ``(change', applied')`` so that applying ``applied`` then
+    ``change'`` gives the same document as ``change`` then ``applied'``.
+    ``change`` is the later one in commit order and wins conflicts.
+    """
+    change = dict(change)
+    applied = dict(applied)
+
+    if "insert" in change and "insert" in applied:
+        ours, theirs = change["insert"], applied["insert"]
+        if ours["parent"] == theirs["parent"] and ours["after"] == theirs["after"]:
+            change["insert"] = {**ours, "after": theirs["slot"]}
+
+    if not change or change.get("element_id") != applied.get("element_id"):
+        return change, applied
+
+    if "insert" in change and "insert" in applied:
+        applied["insert"] = {**applied["insert"], "dead": True}
+    for field in ("attributes", "styles"):
+        if change.get(field) and applied.get(field):
+            applied[field] = {key: value for key, value in applied[field].items() if key not in change[field]}
+    if "content" in change:
+        applied.pop("content", None)
+        applied.pop("text", None)
+    elif "content" in applied:
+        change.pop("text", None)
+    elif "text" in change and "text" in applied:
+        change["text"], applied["text"] = transform_text_delta(change["text"], applied["text"])
+    return change, applied
+
+
+# 3. Document
+class ElementDocument:
+    """Element tree with anchored child ordering
+
+    Every placement of an element gets its own slot in the parent's
+    sequence; moving or removing an element leaves a tombstone so that
+    concurrent changes anchored to the old slot still resolve.
+    """
+
+    def __init__(self):
+        self.elements: Dict[str, Dict[str, Any]] = {}
+        self.sequences: Dict[str, List[str]] = {}
+        self.slots: Dict[str, Tuple[str, str]] = {}
+
+    def apply(self, change: Change) -> List[str]:
+        """Apply a normalized change and return the slots it turned into tombstones
+
+        Raises ValueError and leaves the document untouched if the change
+        is invalid.
+        """
+        if not change:
+            return []
+        element_id = change["element_id"]
+        element = self.elements.get(element_id)
+        insert = change.get("insert")
+        index = None
+        if insert is not None:
+            sequence = self.sequences.get(insert["parent"], [])
+            if insert["slot"] in self.slots:
+                raise ValueError(f"Slot {insert['slot']} already exists")
+            if insert["after"] is None:
+                index = 0
+            elif self.slots.get(insert["after"], (None,))[0] == insert["parent"]:
+                index = sequence.index(insert["after"]) + 1
+            else:
+                raise ValueError(f"Unknown anchor slot {insert['after']} in {insert['parent']}")
+
+        if element is None and "element_type" in change:
+            if insert is None:
+                raise ValueError(f"New element {element_id} needs a position")
+            element = {
+                "type": change["element_type"],
+                "parent": insert["parent"],
+                "slot": insert["slot"],
+                "attributes": {},
+                "styles": {},
+                "content": "",
+                "removed": False
+            }
+            self.elements[element_id] = element
+        live = element is not None and not element["removed"]
+        content = None
+        if live and "text" in change:
+            content = apply_text_delta(change.get("content", element["content"]), change["text"])
+
+        tombstones = []
+        if insert is not None:
+            self.sequences.setdefault(insert["parent"], []).insert(index, insert["slot"])
+            self.slots[insert["slot"]] = (insert["parent"], element_id)
+            if live and not insert.get("dead"):
+                if element["slot"] != insert["slot"]:
+                    tombstones.append(element["slot"])
+                element["parent"] = insert["parent"]
+                element["slot"] = insert["slot"]
+            else:
+                tombstones.append(insert["slot"])
+        if not live:
+            return tombstones
+        if change.get("remove"):
+            # Tombstones keep no state, so the order of concurrent edits
+            # and the removal cannot leave a trace
+            tombstones.append(element["slot"])
+            element.update(parent=None, slot=None, attributes={}, styles={}, content="", removed=True)
+            return tombstones
+        for field in ("attributes", "styles"):
+            for key, value in change.get(field, {}).items():
+                if value is None:
+                    element[field].pop(key, None)
+                else:
+                    element[field][key] = value
+        if content is not None:
+            element["content"] = content
+        elif "content" in change:
+            element["content"] = change["content"]
+        return tombstones
+
+    def tombstones(self) -> List[str]:
+        """Slots that no longer hold a live element"""
+        return [slot for slot, (_, element_id) in self.slots.items() if self.slot_of(element_id) != slot]
+
+    def purge(self, slots: List[str]):
+        """Drop tombstones, and the records of removed elements they belonged to"""
+        for slot in slots:
+            location = self.slots.pop(slot, None)
+            if location is None:
+                continue
+            parent, element_id = location
+            self.sequences[parent].remove(slot)
+            if not self.sequences[parent]:
+                del self.sequences[parent]
+            element = self.elements.get(element_id)
+            if element is not None and element["removed"]:
+                del self.elements[element_id]
+
+    def slot_of(self, element_id: str) -> Optional[str]:
+        """Current slot of a live element"""
+        element = self.elements.get(element_id)
+        return element["slot"] if element is not None and not element["removed"] else None
+
+    def children(self, parent: str = ROOT) -> List[str]:
+        """Live element ids under ``parent`` in document order"""
+        result = []
+        for slot in self.sequences.get(parent, []):
+            element_id = self.slots[slot][1]
+            element = self.elements.get(element_id)
+            if element is not None and not element["removed"] and element["slot"] == slot:
+                result.append(element_id)
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Full state, including tombstones, as plain JSON-able data"""
+        return {
+            "elements": copy.deepcopy(self.elements),
+            "sequences": {parent: list(slots) for parent, slots in self.sequences.items()},
+            "slots": {slot: list(location) for slot, location in self.slots.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ElementDocument":
+        """Rebuild a document from ``to_dict`` output"""
+        document = cls()
+        document.elements = copy.deepcopy(data.get("elements", {}))
+        document.sequences = {parent: list(slots) for parent, slots in data.get("sequences", {}).items()}
+        document.slots = {slot: tuple(location) for slot, location in data.get("slots", {}).items()}
+        return document
+
+
+# 4. Server Engine
+class MergeEngine:
+    """Authoritative per-project document with a bounded transform history
+
+    Clients submit changes together with the version they were made
+    against; the engine rebases them over everything committed since,
+    applies them and assigns the next version. Clients anchor new
+    positions to live slots only, which lets ``compact`` drop tombstones
+    older than the history window.
+    """
+
+    def __init__(self, document: Optional[ElementDocument] = None, version: int = 0, max_history: int = 1000):
+        self.document = document if document is not None else ElementDocument()
+        self.version = version
+        self.history: Deque[Change] = deque(maxlen=max_history)
+        self.graveyard: Deque[Tuple[int, str]] = deque((version, slot) for slot in self.document.tombstones())
+
+    @property
+    def oldest_version(self) -> int:
+        """Oldest base version a change can still be rebased from"""
+        return self.version - len(self.history)
+
+    def submit(self, change: Change, base_version: Optional[int] = None) -> Tuple[int, Change]:
+        """Rebase, apply and commit a change; returns ``(version, change')``"""
+        if base_version is None:
+            base_version = self.version
+        if base_version > self.version:
+            raise ValueError(f"Base version {base_version} is ahead of {self.version}")
+        for applied in self.changes_since(base_version):
+            change, _ = transform_change(change, applied)
+        tombstones = self.document.apply(change)
+        self.version += 1
+        self.history.append(change)
+        self.graveyard.extend((self.version, slot) for slot in tombstones)
+        return self.version, change
+
+    def compact(self) -> int:
+        """Purge tombstones no acceptable change can still anchor to
+
+        A slot that died at or before ``oldest_version`` was already dead
+        for every client whose base version is still accepted.
+        """
+        expired = []
+        while self.graveyard and self.graveyard[0][0] <= self.oldest_version:
+            expired.append(self.graveyard.popleft()[1])
+        self.document.purge(expired)
+        return len(expired)
+
+    def changes_since(self, version: int) -> List[Change]:
+        """Committed changes after ``version``, oldest first"""
+        if version < self.oldest_version:
+            raise ResyncRequired(f"Version {version} is older than {self.oldest_version}")
+        return list(islice(self.history, version - self.oldest_version, None))
+
+
+# 5. Reference Client
+class MergeClient:
+    """Client side of the protocol: one change in flight, the rest buffered
+
+    Local changes apply immediately. Remote changes are rebased over the
+    unacknowledged local ones before being applied, so the local document
+    converges with the server without refetching state.
+    """
+
+    def __init__(self, document: Optional[ElementDocument] = None, version: int = 0):
+        self.document = document if document is not None else ElementDocument()
+        self.version = version
+        self.inflight: Optional[Change] = None
+        self.buffer: List[Change] = []
+
+    def apply_local(self, change: Change) -> Optional[Change]:
+        """Apply a local change; returns it if it should be sent now"""
+        self.document.apply(change)
+        if self.inflight is None:
+            self.inflight = change
+            return change
+        self.buffer.append(change)
+        return None
+
+    def receive(self, change: Change):
+        """Apply a change committed by the server for another client"""
+        pending = [self.inflight] + self.buffer if self.inflight is not None else []
+        for index, local in enumerate(pending):
+            pending[index], change = transform_change(local, change)
+        if pending:
+            self.inflight, self.buffer = pending[0], pending[1:]
+        self.document.apply(change)
+        self.version += 1
+
+    def acknowledge(self) -> Optional[Change]:
+        """Handle the server ack of the in-flight change; returns the next change to send"""
+        self.version += 1
+        self.inflight = self.buffer.pop(0) if self.buffer else None
+        return self.inflight
+
+
+# Example usage and testing
+if __name__ == "__main__":
+    print("🔀 Collaboration Merge Demo")
+    print("=" * 50)
+
+    engine = MergeEngine()
+    engine.submit(operation_to_change("add_element", "title", {"type": "heading", "content": "Hello"}, "s1"))
+
+    # Two editors change the same heading against version 1
+    version, first = engine.submit(operation_to_change("content_change", "title", {"delta": [5, " world"]}), 1)
+    version, second = engine.submit(operation_to_change("content_change", "title", {"delta": ["Say: "]}), 1)
+    print(f"✅ Rebased delta: {second['text']}")
+    print(f"✅ Content after v{version}: {engine.document.elements['title']['content']}")
+
+    engine.submit(operation_to_change("style_change", "title", {"color": "red"}), 1)
+    engine.submit(operation_to_change("style_change", "title", {"color": "blue", "font-size": "18px"}), 1)
+    print(f"✅ Styles (last writer wins): {engine.document.elements['title']['styles']}")
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Collaboration Store - Persistent operation log with snapshots
+Append-only per-project operation log in SQLite with periodic document
+snapshots; taking a snapshot compacts the operations it covers
+"""
+
+import json
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS operations (
+    project_id TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    operation TEXT NOT NULL,
+    PRIMARY KEY (project_id, version)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS snapshots (
+    project_id TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    document TEXT NOT NULL
+);
+"""
+
+
+class OperationLog:
+    """Append-only operation log and latest snapshot per project
+
+    A joining client needs the latest snapshot plus the operations after
+    it; ``save_snapshot`` deletes the operations the snapshot already
+    covers, so storage per project is one document plus at most
+    ``snapshot_interval`` operations.
+    """
+
+    def __init__(self, path: str = ":memory:", snapshot_interval: int = 100):
+        self.path = path
+        self.snapshot_interval = snapshot_interval
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(_SCHEMA)
+
+    # 1. Writes
+    def append(self, project_id: str, operation: Dict[str, Any]):
+        """Append a committed operation; ``operation["version"]`` orders the log"""
+        try:
+            with self._lock, self.connection:
+                self.connection.execute(
+                    "INSERT INTO operations (project_id, version, operation) VALUES (?, ?, ?)",
+                    (project_id, operation["version"], json.dumps(operation, default=str))
+                )
+        except Exception as e:
+            logger.error(f"Error appending operation to log: {e}")
+            raise
+
+    def needs_snapshot(self, version: int) -> bool:
+        """True when ``version`` falls on a snapshot boundary"""
+        return version > 0 and version % self.snapshot_interval == 0
+
+    def save_snapshot(self, project_id: str, version: int, document: Dict[str, Any]):
+        """Store the document at ``version`` and compact the operations before it"""
+        try:
+            with self._lock, self.connection:
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO snapshots (project_id, version, document) VALUES (?, ?, ?)",
+                    (project_id, version, json.dumps(document, default=str))
+                )
+                deleted = self.connection.execute(
+                    "DELETE FROM operations WHERE project_id = ? AND version <= ?", (project_id, version)
+                ).rowcount
+            logger.info(f"Snapshot of {project_id} at version {version}, compacted {deleted} operations")
+        except Exception as e:
+            logger.error(f"Error saving snapshot: {e}")
+            raise
+
+    def delete_project(self, project_id: str):
+        """Drop a project's snapshot and operations"""
+        with self._lock, self.connection:
+            self.connection.execute("DELETE FROM operations WHERE project_id = ?", (project_id,))
+            self.connection.execute("DELETE FROM snapshots WHERE project_id = ?", (project_id,))
+
+    # 2. Reads
+    def latest_snapshot(self, project_id: str) -> Tuple[int, Optional[Dict[str, Any]]]:
+        """``(version, document)`` of the latest snapshot, ``(0, None)`` if there is none"""
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT version, document FROM snapshots WHERE project_id = ?", (project_id,)
+            ).fetchone()
+        return (row[0], json.loads(row[1])) if row else (0, None)
+
+    def operations_since(self, project_id: str, version: int, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Operations after ``version``, oldest first"""
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT operation FROM operations WHERE project_id = ? AND version > ? ORDER BY version LIMIT ?",
+                (project_id, version, -1 if limit is None else limit)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def latest_version(self, project_id: str) -> int:
+        """Version of the newest logged operation or snapshot"""
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT MAX(version) FROM (SELECT version FROM operations WHERE project_id = ? "
+                "UNION ALL SELECT version FROM snapshots WHERE project_id = ?)",
+                (project_id, project_id)
+            ).fetchone()
+        return row[0] or 0
+
+    def get_stats(self, project_id: str) -> Dict[str, int]:
+        """Snapshot version and the number of operations after it"""
+        snapshot_version, _ = self.latest_snapshot(project_id)
+        with self._lock:
+            pending = self.connection.execute(
+                "SELECT COUNT(*) FROM operations WHERE project_id = ?", (project_id,)
+            ).fetchone()[0]
+        return {"snapshot_version": snapshot_version, "logged_operations": pending}
+
+    def close(self):
+        with self._lock:
+            self.connection.close()
+
+
+# Example usage and testing
+if __name__ == "__main__":
+    print("🗄️ Collaboration Store Demo")
+    print("=" * 50)
+
+    log = OperationLog(snapshot_interval=3)
+    for version in range(1, 8):
+        log.append("demo", {"version": version, "type": "modify_element", "data": {"title": str(version)}})
+        if log.needs_snapshot(version):
+            log.save_snapshot("demo", version, {"elements": {}, "version": version})
+
+    snapshot_version, document = log.latest_snapshot("demo")
+    print(f"✅ Latest snapshot: version {snapshot_version}")
+    print(f"✅ Operations since snapshot: {[op['version'] for op in log.operations_since('demo', snapshot_version)]}")
+    print(f"✅ Stats: {log.get_stats('demo')}")
+    log.close()
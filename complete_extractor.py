@@ -19,7 +19,8 @@ from pathlib import Path
 import time
 from datetime import datetime
 import shutil
-import zipfile
+
+from streaming_zip import StreamingZipWriter
 
 class CompleteSiteExtractor:
     def __init__(self, options=None):
@@ -309,11 +310,10 @@ class CompleteSiteExtractor:
         
         zip_path = folder_path.parent / zip_name
         
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            for file_path in folder_path.rglob('*'):
-                if file_path.is_file():
-                    arcname = file_path.relative_to(folder_path)
-                    zipf.write(file_path, arcname)
+        # تصاویر و فونت‌های فشرده بدون فشرده‌سازی مجدد ذخیره می‌شوند
+        writer = StreamingZipWriter()
+        with open(zip_path, 'wb') as zip_file:
+            writer.write_zip(writer.iter_directory(folder_path), zip_file)
         
         print(f"📦 فایل ZIP ایجاد شد: {zip_path}")
         return str(zip_path)
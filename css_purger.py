@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CSS Purger - Unused CSS elimination against exported pages
+Indexes the classes, ids, tags and attributes used by a site once and drops
+CSS rules whose selectors cannot match any of them
+"""
+
+import re
+from dataclasses import dataclass, asdict
+from html.parser import HTMLParser
+from typing import Dict, Iterable, List, Optional, Pattern, Set, Tuple, Union
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SafelistEntry = Union[str, Pattern]
+
+# At-rules whose bodies contain ordinary style rules that can be purged
+GROUPING_AT_RULES = frozenset({"media", "supports", "layer", "container", "document", "-moz-document"})
+
+# Elements that exist in every rendered document, even for HTML fragments
+IMPLICIT_TAGS = frozenset({"html", "head", "body"})
+
+_SCRIPT_TOKEN_PATTERN = re.compile(r"""["'`]([^"'`]*)["'`]""")
+_TOKEN_SPLIT_PATTERN = re.compile(r"[\s,]+")
+
+
+@dataclass
+class PurgeReport:
+    """Per-file result of a purge run"""
+    file: str
+    original_bytes: int
+    purged_bytes: int
+    bytes_saved: int
+    rules_total: int
+    rules_removed: int
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+class SelectorIndex:
+    """Set of classes, ids, tags and attributes used by a group of pages"""
+
+    def __init__(self):
+        self.classes: Set[str] = set()
+        self.ids: Set[str] = set()
+        self.tags: Set[str] = set(IMPLICIT_TAGS)
+        self.attributes: Set[str] = set()
+
+    def index_html(self, html: str) -> "SelectorIndex":
+        """Index one HTML document or fragment"""
+        parser = _IndexingParser(self)
+        parser.feed(html)
+        parser.close()
+        return self
+
+    def index_script(self, script: str) -> "SelectorIndex":
+        """Index class/id names that scripts may add at runtime
+
+        Every whitespace-separated token inside a string literal is treated as
+        a possible class or id, which keeps classList.add("open") style toggles.
+        """
+        for literal in _SCRIPT_TOKEN_PATTERN.findall(script):
+            tokens = [token.lstrip(".#") for token in _TOKEN_SPLIT_PATTERN.split(literal) if token]
+            self.classes.update(tokens)
+            self.ids.update(tokens)
+        return self
+
+    def index_files(self, files: Dict[str, str]) -> "SelectorIndex":
+        """Index every HTML and JavaScript file of an export"""
+        for file_path, content in files.items():
+            if not isinstance(content, str):
+                continue
+            if file_path.endswith(('.html', '.htm')):
+                self.index_html(content)
+            elif file_path.endswith(('.js', '.mjs')):
+                self.index_script(content)
+        return self
+
+
+class _IndexingParser(HTMLParser):
+    """HTML parser feeding a SelectorIndex"""
+
+    def __init__(self, index: SelectorIndex):
+        super().__init__(convert_charrefs=True)
+        self.index = index
+        self._in_script = False
+
+    def handle_starttag(self, tag, attrs):
+        index = self.index
+        index.tags.add(tag.lower())
+        for name, value in attrs:
+            index.attributes.add(name.lower())
+            if value is None:
+                continue
+            if name == "class":
+                index.classes.update(value.split())
+            elif name == "id":
+                index.ids.add(value.strip())
+            elif "class" in name:
+                # Framework bindings such as :class, x-bind:class or data-toggle-class
+                index.index_script(f'"{value}"')
+        if tag.lower() == "script":
+            self._in_script = True
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag.lower() == "script":
+            self._in_script = False
+
+    def handle_endtag(self, tag):
+        if tag.lower() == "script":
+            self._in_script = False
+
+    def handle_data(self, data):
+        if self._in_script:
+            self.index.index_script(data)
+
+
+class _CSSNode:
+    """One top-level item of a stylesheet"""
+
+    __slots__ = ("prelude", "body", "children")
+
+    def __init__(self, prelude: str, body: Optional[str] = None,
+                 children: Optional[List["_CSSNode"]] = None):
+        self.prelude = prelude
+        self.body = body
+        self.children = children
+
+
+class CSSPurger:
+    """Removes CSS rules that cannot match an indexed set of pages"""
+
+    def __init__(self, index: SelectorIndex, safelist: Optional[Iterable[SafelistEntry]] = None):
+        self.index = index
+        self.safelist_names: Set[str] = set()
+        self.safelist_patterns: List[Pattern] = []
+        for entry in safelist or ():
+            if isinstance(entry, str):
+                self.safelist_names.add(entry.lstrip(".#"))
+            else:
+                self.safelist_patterns.append(entry)
+        self._rules_total = 0
+        self._rules_removed = 0
+
+    # Public API
+    def purge(self, css: str) -> str:
+        """Return ``css`` without the rules that cannot match"""
+        self._rules_total = 0
+        self._rules_removed = 0
+        nodes, _ = self._parse(css, 0, nested=False)
+        return self._serialize(nodes)
+
+    def purge_with_report(self, file_path: str, css: str) -> Tuple[str, PurgeReport]:
+        """Purge one stylesheet and report the bytes saved"""
+        purged = self.purge(css)
+        original_bytes = len(css.encode("utf-8"))
+        purged_bytes = len(purged.encode("utf-8"))
+        report = PurgeReport(
+            file=file_path,
+            original_bytes=original_bytes,
+            purged_bytes=purged_bytes,
+            bytes_saved=original_bytes - purged_bytes,
+            rules_total=self._rules_total,
+            rules_removed=self._rules_removed
+        )
+        return purged, report
+
+    def selector_can_match(self, selector: str) -> bool:
+        """Whether a single complex selector could match an indexed element"""
+        selector = selector.strip()
+        if not selector:
+            return False
+        if any(pattern.search(selector) for pattern in self.safelist_patterns):
+            return True
+
+        index = self.index
+        i = 0
+        length = len(selector)
+        while i < length:
+            char = selector[i]
+            if char in ".#":
+                name, i = self._read_ident(selector, i + 1)
+                known = index.classes if char == "." else index.ids
+                if name not in known and not self._is_safelisted(name):
+                    return False
+            elif char == "[":
+                end = self._skip_balanced(selector, i, "[", "]")
+                attribute = re.split(r"[~|^$*]?=", selector[i + 1:end - 1], maxsplit=1)[0]
+                attribute = attribute.strip().split("|")[-1].lower()
+                if attribute not in index.attributes and attribute not in ("class", "id"):
+                    return False
+                i = end
+            elif char == ":":
+                # Pseudo-classes and pseudo-elements depend on runtime state; keep them
+                i += 2 if selector.startswith("::", i) else 1
+                _, i = self._read_ident(selector, i)
+                if i < length and selector[i] == "(":
+                    i = self._skip_balanced(selector, i, "(", ")")
+            elif char == "&":
+                return True
+            elif char.isalpha() or char == "\\" or char == "-" or char == "_":
+                name, i = self._read_ident(selector, i)
+                if name.lower() not in index.tags:
+                    return False
+            else:
+                # Combinators, whitespace and the universal selector
+                i += 1
+        return True
+
+    # Parsing
+    def _parse(self, css: str, pos: int, nested: bool) -> Tuple[List[_CSSNode], int]:
+        nodes: List[_CSSNode] = []
+        prelude_start = pos
+        prelude: List[str] = []
+        length = len(css)
+        while pos < length:
+            char = css[pos]
+            if css.startswith("/*", pos):
+                end = css.find("*/", pos + 2)
+                end = length if end == -1 else end + 2
+                if css.startswith("/*!", pos):
+                    # Preserve license comments
+                    nodes.append(_CSSNode(css[pos:end]))
+                pos = end
+            elif char in "\"'":
+                end = self._skip_string(css, pos)
+                prelude.append(css[pos:end])
+                pos = end
+            elif char == ";":
+                statement = "".join(prelude).strip()
+                if statement:
+                    nodes.append(_CSSNode(statement + ";"))
+                prelude = []
+                pos += 1
+            elif char == "{":
+                header = "".join(prelude).strip()
+                prelude = []
+                at_rule = header[1:].split(None, 1)[0].lower() if header.startswith("@") else None
+                if at_rule in GROUPING_AT_RULES:
+                    children, pos = self._parse(css, pos + 1, nested=True)
+                    nodes.append(_CSSNode(header, children=children))
+                else:
+                    end = self._skip_balanced(css, pos, "{", "}")
+                    nodes.append(_CSSNode(header, body=css[pos + 1:end - 1]))
+                    pos = end
+            elif char == "}":
+                if nested:
+                    return nodes, pos + 1
+                pos += 1
+            else:
+                prelude.append(char)
+                pos += 1
+        trailing = "".join(prelude).strip()
+        if trailing:
+            nodes.append(_CSSNode(trailing))
+        return nodes, pos
+
+    def _serialize(self, nodes: List[_CSSNode]) -> str:
+        output: List[str] = []
+        for node in nodes:
+            if node.children is not None:
+                inner = self._serialize(node.children)
+                if inner:
+                    output.append(f"{node.prelude}{{{inner}}}")
+            elif node.body is None:
+                output.append(node.prelude)
+            elif node.prelude.startswith("@"):
+                # @font-face, @keyframes, @page, ... are kept as-is
+                output.append(f"{node.prelude}{{{node.body}}}")
+            else:
+                self._rules_total += 1
+                selectors = [
+                    selector.strip() for selector in self._split_selector_list(node.prelude)
+                    if self.selector_can_match(selector)
+                ]
+                if selectors:
+                    output.append(f"{','.join(selectors)}{{{node.body}}}")
+                else:
+                    self._rules_removed += 1
+        return "\n".join(output)
+
+    # Helpers
+    def _is_safelisted(self, name: str) -> bool:
+        if name in self.safelist_names:
+            return True
+        return any(pattern.search(name) for pattern in self.safelist_patterns)
+
+    @staticmethod
+    def _read_ident(text: str, pos: int) -> Tuple[str, int]:
+        """Read a CSS identifier, resolving backslash escapes (e.g. Tailwind's md\\:flex)"""
+        name: List[str] = []
+        length = len(text)
+        while pos < length:
+            char = text[pos]
+            if char == "\\" and pos + 1 < length:
+                hex_match = re.match(r"[0-9a-fA-F]{1,6}\s?", text[pos + 1:pos + 8])
+                if hex_match:
+                    name.append(chr(int(hex_match.group().strip(), 16)))
+                    pos += 1 + len(hex_match.group())
+                else:
+                    name.append(text[pos + 1])
+                    pos += 2
+            elif char.isalnum() or char in "-_" or ord(char) > 127:
+                name.append(char)
+                pos += 1
+            else:
+                break
+        return "".join(name), pos
+
+    @staticmethod
+    def _skip_string(text: str, pos: int) -> int:
+        quote = text[pos]
+        pos += 1
+        while pos < len(text):
+            if text[pos] == "\\":
+                pos += 2
+                continue
+            if text[pos] == quote:
+                return pos + 1
+            pos += 1
+        return pos
+
+    def _skip_balanced(self, text: str, pos: int, opening: str, closing: str) -> int:
+        """Return the position after the bracket matching ``text[pos]``"""
+        depth = 0
+        length = len(text)
+        while pos < length:
+            char = text[pos]
+            if char in "\"'":
+                pos = self._skip_string(text, pos)
+                continue
+            if text.startswith("/*", pos):
+                end = text.find("*/", pos + 2)
+                pos = length if end == -1 else end + 2
+                continue
+            if char == opening:
+                depth += 1
+            elif char == closing:
+                depth -= 1
+                if depth == 0:
+                    return pos + 1
+            pos += 1
+        return pos
+
+    def _split_selector_list(self, prelude: str) -> List[str]:
+        """Split ``a, b:is(c, d)`` at top-level commas"""
+        selectors: List[str] = []
+        start = 0
+        pos = 0
+        length = len(prelude)
+        while pos < length:
+            char = prelude[pos]
+            if char == "\\":
+                pos += 2
+                continue
+            if char in "\"'":
+                pos = self._skip_string(prelude, pos)
+                continue
+            if char in "([":
+                pos = self._skip_balanced(prelude, pos, char, ")" if char == "(" else "]")
+                continue
+            if char == ",":
+                selectors.append(prelude[start:pos])
+                start = pos + 1
+            pos += 1
+        selectors.append(prelude[start:])
+        return selectors
+
+
+def purge_files(files: Dict[str, str], safelist: Optional[Iterable[SafelistEntry]] = None,
+                index: Optional[SelectorIndex] = None) -> Tuple[Dict[str, str], Dict[str, PurgeReport]]:
+    """Purge every ``.css`` file of an export against its HTML/JS files
+
+    Returns the updated file mapping and a report per stylesheet.
+    """
+    if index is None:
+        index = SelectorIndex().index_files(files)
+    purger = CSSPurger(index, safelist)
+
+    purged_files = dict(files)
+    reports: Dict[str, PurgeReport] = {}
+    for file_path, content in files.items():
+        if file_path.endswith('.css') and isinstance(content, str):
+            purged_files[file_path], reports[file_path] = purger.purge_with_report(file_path, content)
+    return purged_files, reports
+
+
+# Example usage and testing
+if __name__ == "__main__":
+    print("🧹 CSS Purger Demo")
+    print("=" * 50)
+
+    pages = {
+        "index.html": '<div class="container"><button class="btn btn-primary">Go</button></div>',
+        "app.js": 'document.body.classList.add("menu-open");',
+        "styles.css": """
+            .container { max-width: 1200px; }
+            .btn, .btn-link { padding: 4px; }
+            .btn-primary:hover { color: white; }
+            .card .card-body { padding: 1rem; }
+            .menu-open nav { display: block; }
+            @media (min-width: 768px) { .col-md-6 { width: 50%; } .container { padding: 0 } }
+        """,
+    }
+    purged, reports = purge_files(pages)
+    print(purged["styles.css"])
+    for report in reports.values():
+        print(f"✅ {report.file}: saved {report.bytes_saved} bytes, "
+              f"removed {report.rules_removed}/{report.rules_total} rules")
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+GF(2) Matrix - Bit-packed binary linear algebra
+Rows are stored as little-endian uint64 words so products, elimination and
+permutations run as vectorized XOR/popcount operations for the code-based
+(McEliece-style) operations of the quantum-resistant security system
+"""
+
+import os
+import struct
+from typing import Optional, Sequence, Tuple, Union
+import logging
+
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BitsLike = Union[Sequence[int], np.ndarray]
+
+# Header of the original one-byte-per-entry matrix serialization
+_LEGACY_HEADER = struct.Struct("II")
+# Header of the packed serialization: magic, rows, cols
+_PACKED_HEADER = struct.Struct("<4sII")
+_PACKED_MAGIC = b"GF2P"
+
+# Four Russians table width: columns of the left operand handled per step
+_TABLE_BITS = 8
+
+_POPCOUNT_TABLE = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+
+def bytes_to_bits(data: bytes) -> np.ndarray:
+    """Unpack bytes to bits, least significant bit of each byte first"""
+    return np.unpackbits(np.frombuffer(data, dtype=np.uint8), bitorder="little")
+
+
+def bits_to_bytes(bits: BitsLike) -> bytes:
+    """Pack bits (least significant bit first) into bytes"""
+    return np.packbits(np.asarray(bits, dtype=np.uint8) & 1, bitorder="little").tobytes()
+
+
+def _popcount(words: np.ndarray) -> np.ndarray:
+    """Population count per uint64 word"""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words)
+    return _POPCOUNT_TABLE[words.view(np.uint8)].reshape(words.shape + (8,)).sum(axis=-1)
+
+
+class GF2Matrix:
+    """Binary matrix with bit-packed rows"""
+
+    __slots__ = ("rows", "cols", "words")
+
+    def __init__(self, rows: int, cols: int, words: Optional[np.ndarray] = None):
+        self.rows = rows
+        self.cols = cols
+        word_count = (cols + 63) // 64
+        if words is None:
+            words = np.zeros((rows, word_count), dtype=np.uint64)
+        self.words = words
+
+    # Construction
+    @classmethod
+    def from_bits(cls, bits: np.ndarray) -> "GF2Matrix":
+        """Build from a (rows, cols) array of 0/1 values"""
+        bits = np.asarray(bits, dtype=np.uint8) & 1
+        rows, cols = bits.shape
+        word_count = (cols + 63) // 64
+        padded = np.zeros((rows, word_count * 64), dtype=np.uint8)
+        padded[:, :cols] = bits
+        packed = np.packbits(padded, axis=1, bitorder="little")
+        return cls(rows, cols, packed.view("<u8").astype(np.uint64))
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Sequence[int]]) -> "GF2Matrix":
+        """Build from the list-of-int-lists representation"""
+        return cls.from_bits(np.array(rows, dtype=np.uint8).reshape(len(rows), -1))
+
+    @classmethod
+    def identity(cls, n: int) -> "GF2Matrix":
+        matrix = cls(n, n)
+        index = np.arange(n)
+        matrix.words[index, index // 64] = np.uint64(1) << (index % 64).astype(np.uint64)
+        return matrix
+
+    @classmethod
+    def random(cls, rows: int, cols: int, random_bytes=os.urandom) -> "GF2Matrix":
+        """Uniformly random matrix from a byte source (system entropy by default)"""
+        word_count = (cols + 63) // 64
+        data = np.frombuffer(random_bytes(rows * word_count * 8), dtype="<u8").astype(np.uint64)
+        matrix = cls(rows, cols, data.reshape(rows, word_count))
+        matrix._clear_padding()
+        return matrix
+
+    @classmethod
+    def from_permutation(cls, permutation: Sequence[int]) -> "GF2Matrix":
+        """Permutation matrix with entry (i, permutation[i]) set"""
+        n = len(permutation)
+        matrix = cls(n, n)
+        columns = np.asarray(permutation, dtype=np.int64)
+        matrix.words[np.arange(n), columns // 64] = np.uint64(1) << (columns % 64).astype(np.uint64)
+        return matrix
+
+    # Conversion
+    def to_bits(self) -> np.ndarray:
+        """Unpack to a (rows, cols) uint8 array"""
+        packed = self.words.astype("<u8").view(np.uint8)
+        return np.unpackbits(packed, axis=1, bitorder="little")[:, :self.cols]
+
+    def to_rows(self) -> list:
+        """Convert to the list-of-int-lists representation"""
+        return self.to_bits().tolist()
+
+    def to_legacy_bytes(self) -> bytes:
+        """Serialize in the original format: rows, cols, then one byte per entry"""
+        return _LEGACY_HEADER.pack(self.rows, self.cols) + self.to_bits().tobytes()
+
+    @classmethod
+    def from_legacy_bytes(cls, data: bytes, offset: int = 0) -> Tuple["GF2Matrix", int]:
+        """Parse the original format; returns the matrix and the offset after it"""
+        rows, cols = _LEGACY_HEADER.unpack_from(data, offset)
+        start = offset + _LEGACY_HEADER.size
+        end = start + rows * cols
+        bits = np.frombuffer(data, dtype=np.uint8, count=rows * cols, offset=start)
+        return cls.from_bits(bits.reshape(rows, cols)), end
+
+    def to_packed_bytes(self) -> bytes:
+        """Serialize compactly: header plus packed uint64 rows (1/8 of the legacy size)"""
+        return _PACKED_HEADER.pack(_PACKED_MAGIC, self.rows, self.cols) + self.words.astype("<u8").tobytes()
+
+    @classmethod
+    def from_packed_bytes(cls, data: bytes, offset: int = 0) -> Tuple["GF2Matrix", int]:
+        """Parse the packed format; returns the matrix and the offset after it"""
+        magic, rows, cols = _PACKED_HEADER.unpack_from(data, offset)
+        if magic != _PACKED_MAGIC:
+            raise ValueError("Not a packed GF(2) matrix")
+        word_count = (cols + 63) // 64
+        start = offset + _PACKED_HEADER.size
+        words = np.frombuffer(data, dtype="<u8", count=rows * word_count, offset=start)
+        return cls(rows, cols, words.astype(np.uint64).reshape(rows, word_count)), start + words.nbytes
+
+    @classmethod
+    def from_any_bytes(cls, data: bytes, offset: int = 0) -> Tuple["GF2Matrix", int]:
+        """Parse either serialization format"""
+        if data[offset:offset + 4] == _PACKED_MAGIC:
+            return cls.from_packed_bytes(data, offset)
+        return cls.from_legacy_bytes(data, offset)
+
+    def is_permutation(self) -> bool:
+        """True if every row and every column holds exactly one set bit"""
+        if self.rows != self.cols:
+            return False
+        if not (_popcount(self.words).sum(axis=1) == 1).all():
+            return False
+        covered = np.bitwise_or.reduce(self.words, axis=0) if self.rows else self.words.sum(axis=0)
+        return int(_popcount(covered).sum()) == self.cols
+
+    def permutation(self) -> np.ndarray:
+        """For a permutation matrix, the column index set in each row"""
+        if not self.is_permutation():
+            raise ValueError("Matrix is not a permutation matrix")
+        return self.to_bits().argmax(axis=1)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the packed rows"""
+        return self.words.nbytes
+
+    # Element access
+    def get(self, row: int, col: int) -> int:
+        return int((self.words[row, col // 64] >> np.uint64(col % 64)) & np.uint64(1))
+
+    def copy(self) -> "GF2Matrix":
+        return GF2Matrix(self.rows, self.cols, self.words.copy())
+
+    def __eq__(self, other) -> bool:
+        return (isinstance(other, GF2Matrix) and self.rows == other.rows
+                and self.cols == other.cols and np.array_equal(self.words, other.words))
+
+    def __repr__(self) -> str:
+        return f"GF2Matrix({self.rows}x{self.cols})"
+
+    # Arithmetic
+    def multiply(self, other: "GF2Matrix") -> "GF2Matrix":
+        """Matrix product (Method of Four Russians)
+
+        For every group of 8 columns of ``self`` the 256 XOR combinations of
+        the matching rows of ``other`` are tabulated once, then each result
+        row picks its combination with one gather.
+        """
+        if self.cols != other.rows:
+            raise ValueError(f"Cannot multiply {self!r} by {other!r}")
+        result = np.zeros((self.rows, other.words.shape[1]), dtype=np.uint64)
+        left_bytes = self.words.astype("<u8").view(np.uint8)
+        table = np.zeros((1 << _TABLE_BITS, other.words.shape[1]), dtype=np.uint64)
+
+        for group in range((self.cols + _TABLE_BITS - 1) // _TABLE_BITS):
+            base = group * _TABLE_BITS
+            width = min(_TABLE_BITS, self.cols - base)
+            table[0] = 0
+            for bit in range(width):
+                size = 1 << bit
+                table[size:2 * size] = table[:size] ^ other.words[base + bit]
+            selectors = left_bytes[:, group]
+            if width < _TABLE_BITS:
+                selectors = selectors & ((1 << width) - 1)
+            result ^= table[selectors]
+
+        return GF2Matrix(self.rows, other.cols, result)
+
+    def vector_multiply(self, vector: BitsLike) -> np.ndarray:
+        """Row vector times matrix: XOR of the rows selected by ``vector``"""
+        selected = np.asarray(vector, dtype=np.uint8)[:self.rows].astype(bool)
+        if not selected.any():
+            return np.zeros(self.cols, dtype=np.uint8)
+        words = np.bitwise_xor.reduce(self.words[np.nonzero(selected)[0]], axis=0)
+        return GF2Matrix(1, self.cols, words.reshape(1, -1)).to_bits()[0]
+
+    def inner_products(self, other: "GF2Matrix") -> "GF2Matrix":
+        """``self @ other.T``: entry (i, j) is the parity of popcount(row_i & other_row_j)"""
+        if self.cols != other.cols:
+            raise ValueError(f"Row lengths differ: {self!r} vs {other!r}")
+        parities = np.zeros((self.rows, other.rows), dtype=np.uint8)
+        for index in range(other.rows):
+            parities[:, index] = _popcount(self.words & other.words[index]).sum(axis=1) & 1
+        return GF2Matrix.from_bits(parities)
+
+    def transpose(self) -> "GF2Matrix":
+        return GF2Matrix.from_bits(self.to_bits().T)
+
+    def apply_permutation(self, permutation: Sequence[int]) -> "GF2Matrix":
+        """``self`` times the permutation matrix of ``permutation``
+
+        Column i of ``self`` moves to column ``permutation[i]``.
+        """
+        inverse = np.empty(len(permutation), dtype=np.int64)
+        inverse[np.asarray(permutation, dtype=np.int64)] = np.arange(len(permutation))
+        return GF2Matrix.from_bits(self.to_bits()[:, inverse])
+
+    # Gaussian elimination
+    def row_reduce(self) -> Tuple["GF2Matrix", list]:
+        """Reduced row echelon form and the pivot columns"""
+        words = self.words.copy()
+        pivots = []
+        pivot_row = 0
+        for col in range(self.cols):
+            if pivot_row == self.rows:
+                break
+            word, bit = col // 64, np.uint64(col % 64)
+            column = (words[pivot_row:, word] >> bit) & np.uint64(1)
+            candidates = np.nonzero(column)[0]
+            if candidates.size == 0:
+                continue
+            swap = pivot_row + candidates[0]
+            if swap != pivot_row:
+                words[[pivot_row, swap]] = words[[swap, pivot_row]]
+            mask = ((words[:, word] >> bit) & np.uint64(1)).astype(bool)
+            mask[pivot_row] = False
+            words[mask] ^= words[pivot_row]
+            pivots.append(col)
+            pivot_row += 1
+        return GF2Matrix(self.rows, self.cols, words), pivots
+
+    def rank(self) -> int:
+        return len(self.row_reduce()[1])
+
+    def inverse(self) -> "GF2Matrix":
+        """Inverse via Gauss-Jordan elimination on [self | I]"""
+        if self.rows != self.cols:
+            raise ValueError("Only square matrices can be inverted")
+        n = self.rows
+        augmented = GF2Matrix.from_bits(np.hstack([self.to_bits(), GF2Matrix.identity(n).to_bits()]))
+        reduced, pivots = augmented.row_reduce()
+        if pivots[:n] != list(range(n)):
+            raise ValueError("Matrix is singular")
+        return GF2Matrix.from_bits(reduced.to_bits()[:, n:])
+
+    def _clear_padding(self):
+        spare = self.words.shape[1] * 64 - self.cols
+        if spare and self.rows:
+            self.words[:, -1] &= np.uint64((1 << (64 - spare)) - 1)
+
+
+# Example usage and testing
+if __name__ == "__main__":
+    import time
+
+    print("🧮 GF(2) Matrix Demo")
+    print("=" * 50)
+
+    for k, n in ((524, 1024), (1751, 2048), (3600, 4096)):
+        start = time.perf_counter()
+        s = GF2Matrix.random(k, k)
+        g = GF2Matrix.random(k, n)
+        permutation = np.random.permutation(n)
+        public = s.multiply(g).apply_permutation(permutation)
+        print(f"✅ k={k}, n={n}: S*G*P in {time.perf_counter() - start:.2f}s, rank(G)={g.rank()}")
@@ -8,9 +8,9 @@ Features that provide worldwide content distribution and optimization
 import json
 import asyncio
 import time
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Dict, List, Optional, Any, Tuple, Union
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from enum import Enum
 import logging
 import uuid
@@ -21,10 +21,21 @@ from PIL import Image
 import cv2
 import numpy as np
 
+from cdn_cache_store import CACHE_EXPIRED, CACHE_MISS, CACHE_STALE, POLICY_LRU, CDNCacheStore
+from cdn_routing import GeoRoutingTable
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Seconds an expired entry may still be served while it is refetched
+STALE_WHILE_REVALIDATE = 300
+# Origin failures are remembered per node and key for this many seconds
+NEGATIVE_CACHE_TTL = 30
+NEGATIVE_CACHE_ENTRIES = 10000
+# Cache-Control directives that keep a response out of the shared cache
+UNCACHEABLE_DIRECTIVES = {"no-store", "no-cache", "private"}
+
 class CDNProvider(Enum):
     """CDN providers"""
     CLOUDFLARE = "cloudflare"
@@ -69,6 +80,8 @@ class CDNNode:
     bandwidth: float
     created_at: datetime
     last_updated: datetime
+    latitude: float = 0.0
+    longitude: float = 0.0
 
 @dataclass
 class ContentCache:
@@ -83,13 +96,42 @@ class ContentCache:
     miss_count: int
     last_accessed: datetime
     created_at: datetime
+    node_id: str = ""
+    tags: List[str] = field(default_factory=list)
 
 class GlobalCDN:
-    """Revolutionary global content delivery network system"""
-    
-    def __init__(self):
+    """Revolutionary global content delivery network system
+    
+    Cache entries live in a CDNCacheStore indexed by (node, cache key);
+    each node's share is bounded by its capacity (or ``node_cache_capacity``
+    bytes) and evicted by ``cache_policy``. Requests are routed by a
+    GeoRoutingTable fed with the latencies from collect_performance_metrics.
+    
+    Concurrent misses for the same node and key share one origin fetch,
+    expired entries are served stale while they are refetched in the
+    background, and origin failures are cached briefly so a failing URL
+    does not hit the origin on every request. A purge fences the fetches
+    in flight for what it removes: they still answer their waiters but are
+    not cached, and later requests start a fresh fetch.
+    """
+    
+    def __init__(self, cache_policy: str = POLICY_LRU, node_cache_capacity: Optional[int] = None):
         self.cdn_nodes: Dict[str, CDNNode] = {}
-        self.content_caches: Dict[str, ContentCache] = {}
+        self.content_caches = CDNCacheStore(policy=cache_policy, stale_ttl=STALE_WHILE_REVALIDATE)
+        self.negative_caches = CDNCacheStore(node_capacity=NEGATIVE_CACHE_ENTRIES, default_ttl=NEGATIVE_CACHE_TTL)
+        self.node_cache_capacity = node_cache_capacity
+        self.origin_fetches: Dict[Tuple[str, str], asyncio.Task] = {}
+        self.origin_fences: Dict[Tuple[str, str], Tuple[str, asyncio.Event]] = {}
+        self.origin_stats = {
+            "origin_fetches": 0,
+            "coalesced_requests": 0,
+            "stale_served": 0,
+            "revalidations": 0,
+            "negative_hits": 0,
+            "origin_errors": 0,
+            "fenced_fetches": 0,
+            "uncacheable": 0
+        }
         self.cdn_providers: Dict[CDNProvider, Dict] = {}
         self.optimization_rules: Dict[str, Dict] = {}
         self.performance_metrics: Dict[str, List] = {}
@@ -97,6 +139,7 @@ class GlobalCDN:
         # Initialize global CDN
         self._initialize_cdn_providers()
         self._initialize_global_nodes()
+        self.routing = GeoRoutingTable(self.cdn_nodes)
         self._initialize_optimization_engine()
         self._initialize_caching_system()
         self._initialize_monitoring_system()
@@ -135,14 +178,16 @@ class GlobalCDN:
     def _initialize_global_nodes(self):
         """Initialize global CDN nodes"""
         global_locations = [
-            {"name": "New York", "country": "US", "region": "North America", "latency": 5},
-            {"name": "London", "country": "UK", "region": "Europe", "latency": 8},
-            {"name": "Tokyo", "country": "JP", "region": "Asia", "latency": 12},
-            {"name": "Sydney", "country": "AU", "region": "Oceania", "latency": 15},
-            {"name": "São Paulo", "country": "BR", "region": "South America", "latency": 18},
-            {"name": "Mumbai", "country": "IN", "region": "Asia", "latency": 20},
-            {"name": "Dubai", "country": "AE", "region": "Middle East", "latency": 22},
-            {"name": "Cape Town", "country": "ZA", "region": "Africa", "latency": 25}
+            {"name": "New York", "country": "US", "region": "North America", "latency": 5,
+             "coordinates": (40.71, -74.01)},
+            {"name": "London", "country": "UK", "region": "Europe", "latency": 8, "coordinates": (51.51, -0.13)},
+            {"name": "Tokyo", "country": "JP", "region": "Asia", "latency": 12, "coordinates": (35.68, 139.69)},
+            {"name": "Sydney", "country": "AU", "region": "Oceania", "latency": 15, "coordinates": (-33.87, 151.21)},
+            {"name": "São Paulo", "country": "BR", "region": "South America", "latency": 18,
+             "coordinates": (-23.55, -46.63)},
+            {"name": "Mumbai", "country": "IN", "region": "Asia", "latency": 20, "coordinates": (19.08, 72.88)},
+            {"name": "Dubai", "country": "AE", "region": "Middle East", "latency": 22, "coordinates": (25.20, 55.27)},
+            {"name": "Cape Town", "country": "ZA", "region": "Africa", "latency": 25, "coordinates": (-33.92, 18.42)}
         ]
         
         for i, location in enumerate(global_locations):
@@ -160,7 +205,9 @@ class GlobalCDN:
                 latency=location["latency"],
                 bandwidth=10000,  # Mbps
                 created_at=datetime.now(),
-                last_updated=datetime.now()
+                last_updated=datetime.now(),
+                latitude=location["coordinates"][0],
+                longitude=location["coordinates"][1]
             )
             self.cdn_nodes[node_id] = node
     
@@ -209,6 +256,11 @@ class GlobalCDN:
                 "time_based": True
             }
         }
+        
+        # Per-node cache capacity (node capacity is in GB)
+        for node in self.cdn_nodes.values():
+            capacity = self.node_cache_capacity if self.node_cache_capacity is not None else node.capacity * 1024 ** 3
+            self.content_caches.set_capacity(node.id, capacity)
     
     def _initialize_monitoring_system(self):
         """Initialize monitoring system"""
@@ -222,7 +274,7 @@ class GlobalCDN:
     
     # 1. Content Distribution
     async def distribute_content(self, content_url: str, content_type: ContentType, 
-                               optimization_level: OptimizationLevel) -> Dict:
+                               optimization_level: OptimizationLevel, tags: Optional[List[str]] = None) -> Dict:
         """Distribute content across global CDN"""
         try:
             distribution_id = str(uuid.uuid4())
@@ -237,7 +289,7 @@ class GlobalCDN:
             distribution_result = await self._distribute_to_nodes(optimized_content, optimal_nodes)
             
             # Create cache entries
-            cache_entries = await self._create_cache_entries(optimized_content, optimal_nodes)
+            cache_entries = await self._create_cache_entries(optimized_content, optimal_nodes, tags or [])
             
             return {
                 "success": True,
@@ -364,13 +416,8 @@ class GlobalCDN:
         # Simulate node selection
         await asyncio.sleep(0.1)
         
-        # Filter active nodes
-        active_nodes = [node for node in self.cdn_nodes.values() if node.status == "active"]
-        
-        # Sort by latency and load
-        optimal_nodes = sorted(active_nodes, key=lambda x: (x.latency, x.current_load))[:5]
-        
-        return optimal_nodes
+        # Active nodes with the lowest latency plus load penalty
+        return self.routing.rank(None, 5)
     
     async def _distribute_to_nodes(self, optimized_content: Dict, nodes: List[CDNNode]) -> Dict:
         """Distribute content to selected nodes"""
@@ -397,9 +444,13 @@ class GlobalCDN:
             "distribution_results": distribution_results
         }
     
-    async def _create_cache_entries(self, optimized_content: Dict, nodes: List[CDNNode]) -> List[str]:
+    async def _create_cache_entries(self, optimized_content: Dict, nodes: List[CDNNode],
+                                    tags: Optional[List[str]] = None) -> List[str]:
         """Create cache entries for distributed content"""
         cache_entries = []
+        # Keyed by the URL clients request so lookups find the distributed copy
+        content_url = optimized_content["original_url"]
+        cache_key = hashlib.md5(content_url.encode()).hexdigest()
         
         for node in nodes:
             cache_id = str(uuid.uuid4())
@@ -408,16 +459,19 @@ class GlobalCDN:
                 content_url=optimized_content["optimized_url"],
                 content_type=ContentType(optimized_content["content_type"]),
                 size=1000,  # Mock size
-                cache_key=hashlib.md5(optimized_content["optimized_url"].encode()).hexdigest(),
+                cache_key=cache_key,
                 ttl=86400,  # 1 day
                 hit_count=0,
                 miss_count=0,
                 last_accessed=datetime.now(),
-                created_at=datetime.now()
+                created_at=datetime.now(),
+                node_id=node.id,
+                tags=list(tags or [])
             )
             
-            self.content_caches[cache_id] = cache_entry
-            cache_entries.append(cache_id)
+            if self.content_caches.put(node.id, cache_key, cache_entry, cache_entry.size, ttl=cache_entry.ttl,
+                                       url=content_url, tags=cache_entry.tags):
+                cache_entries.append(cache_id)
         
         return cache_entries
     
@@ -430,13 +484,23 @@ class GlobalCDN:
             
             # Check cache
             cache_hit = await self._check_cache(content_url, nearest_node)
+            cache_key = cache_hit["cache_key"]
+            flight_key = (nearest_node.id, cache_key)
             
             if cache_hit["found"]:
                 # Update cache statistics
-                cache_entry = self.content_caches[cache_hit["cache_id"]]
+                cache_entry = cache_hit["entry"]
                 cache_entry.hit_count += 1
                 cache_entry.last_accessed = datetime.now()
                 
+                if cache_hit["stale"]:
+                    # Serve the stale copy and refresh it in the background
+                    self.origin_stats["stale_served"] += 1
+                    if flight_key not in self.origin_fetches and \
+                            self.negative_caches.get(nearest_node.id, cache_key) is None:
+                        self.origin_stats["revalidations"] += 1
+                        self._origin_flight(content_url, nearest_node, cache_key)
+                
                 return {
                     "success": True,
                     "cache_hit": True,
@@ -444,24 +508,32 @@ class GlobalCDN:
                     "served_from": nearest_node.location,
                     "latency": nearest_node.latency,
                     "cache_key": cache_entry.cache_key,
-                    "ttl_remaining": cache_entry.ttl
-                }
-            else:
-                # Cache miss - fetch from origin
-                origin_content = await self._fetch_from_origin(content_url)
-                
-                # Cache the content
-                await self._cache_content(content_url, origin_content, nearest_node)
-                
-                return {
-                    "success": True,
-                    "cache_hit": False,
-                    "content_url": content_url,
-                    "served_from": "origin",
-                    "latency": nearest_node.latency + 50,  # Higher latency for origin
-                    "cached": True
+                    "ttl_remaining": self.content_caches.ttl_remaining(nearest_node.id, cache_entry.cache_key),
+                    "stale": cache_hit["stale"]
                 }
             
+            # Recent origin failures are answered without another fetch
+            origin_error = self.negative_caches.get(nearest_node.id, cache_key)
+            if origin_error is not None:
+                self.origin_stats["negative_hits"] += 1
+                return {"success": False, "error": origin_error, "negative_cached": True}
+            
+            # Cache miss - one origin fetch per node and key, concurrent misses wait for it
+            coalesced = flight_key in self.origin_fetches
+            if coalesced:
+                self.origin_stats["coalesced_requests"] += 1
+            fetched = await asyncio.shield(self._origin_flight(content_url, nearest_node, cache_key))
+            
+            return {
+                "success": True,
+                "cache_hit": False,
+                "content_url": content_url,
+                "served_from": "origin",
+                "latency": nearest_node.latency + 50,  # Higher latency for origin
+                "cached": fetched["cache_id"] is not None,
+                "coalesced": coalesced
+            }
+            
         except Exception as e:
             logger.error(f"Error getting cached content: {e}")
             return {"success": False, "error": str(e)}
@@ -471,24 +543,10 @@ class GlobalCDN:
         # Simulate nearest node finding
         await asyncio.sleep(0.05)
         
-        # Mock location-based selection
-        location_mapping = {
-            "US": "New York",
-            "UK": "London",
-            "JP": "Tokyo",
-            "AU": "Sydney",
-            "BR": "São Paulo",
-            "IN": "Mumbai",
-            "AE": "Dubai",
-            "ZA": "Cape Town"
-        }
-        
-        target_location = location_mapping.get(user_location, "New York")
-        
-        # Find node with matching location
-        for node in self.cdn_nodes.values():
-            if target_location in node.location:
-                return node
+        # Lowest distance, latency and load for the user's country or coordinates
+        node = self.routing.nearest(user_location)
+        if node is not None:
+            return node
         
         # Fallback to first available node
         return list(self.cdn_nodes.values())[0]
@@ -500,18 +558,60 @@ class GlobalCDN:
         
         cache_key = hashlib.md5(content_url.encode()).hexdigest()
         
-        # Find matching cache entry
-        for cache_id, cache_entry in self.content_caches.items():
-            if cache_entry.cache_key == cache_key:
-                # Check if cache is still valid
-                if datetime.now() - cache_entry.created_at < timedelta(seconds=cache_entry.ttl):
-                    return {"found": True, "cache_id": cache_id}
-                else:
-                    # Cache expired
-                    cache_entry.miss_count += 1
-                    return {"found": False, "reason": "expired"}
+        # Look up the entry on this node
+        cache_entry, status = self.content_caches.lookup(node.id, cache_key)
+        if status == CACHE_EXPIRED:
+            return {"found": False, "reason": "expired", "cache_key": cache_key}
+        if status == CACHE_MISS:
+            return {"found": False, "reason": "not_found", "cache_key": cache_key}
+        return {"found": True, "cache_id": cache_entry.id, "entry": cache_entry, "cache_key": cache_key,
+                "stale": status == CACHE_STALE}
+    
+    def _origin_flight(self, content_url: str, node: CDNNode, cache_key: str) -> asyncio.Task:
+        """The in-flight origin fetch for a node and key, started if there is none"""
+        flight_key = (node.id, cache_key)
+        flight = self.origin_fetches.get(flight_key)
+        if flight is None:
+            fence = asyncio.Event()
+            flight = asyncio.get_running_loop().create_task(
+                self._fetch_and_cache(content_url, node, cache_key, fence))
+            self.origin_fetches[flight_key] = flight
+            self.origin_fences[flight_key] = (content_url, fence)
+            flight.add_done_callback(lambda task: self._finish_origin_flight(flight_key, task))
+        return flight
+    
+    def _finish_origin_flight(self, flight_key: Tuple[str, str], task: asyncio.Task):
+        # A fenced flight was already replaced or detached
+        if self.origin_fetches.get(flight_key) is task:
+            del self.origin_fetches[flight_key]
+            del self.origin_fences[flight_key]
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Origin fetch failed for {flight_key[1]} on {flight_key[0]}: {task.exception()}")
+    
+    def _fence_origin_fetches(self, matches) -> int:
+        """Keep in-flight fetches selected by ``matches(cache_key, url)`` out of the cache"""
+        fenced = [flight_key for flight_key, (content_url, _) in self.origin_fences.items()
+                  if matches(flight_key[1], content_url)]
+        for flight_key in fenced:
+            self.origin_fetches.pop(flight_key)
+            self.origin_fences.pop(flight_key)[1].set()
+        self.origin_stats["fenced_fetches"] += len(fenced)
+        return len(fenced)
+    
+    async def _fetch_and_cache(self, content_url: str, node: CDNNode, cache_key: str,
+                               fence: Optional[asyncio.Event] = None) -> Dict:
+        """Fetch from origin and cache on the node, remembering failures"""
+        self.origin_stats["origin_fetches"] += 1
+        try:
+            origin_content = await self._fetch_from_origin(content_url)
+        except Exception as e:
+            self.origin_stats["origin_errors"] += 1
+            if fence is None or not fence.is_set():
+                self.negative_caches.put(node.id, cache_key, str(e), 1, url=content_url)
+            raise
         
-        return {"found": False, "reason": "not_found"}
+        cache_id = await self._cache_content(content_url, origin_content, node, fence)
+        return {**origin_content, "cache_id": cache_id}
     
     async def _fetch_from_origin(self, content_url: str) -> Dict:
         """Fetch content from origin server"""
@@ -526,26 +626,56 @@ class GlobalCDN:
             "headers": {"cache-control": "max-age=3600"}
         }
     
-    async def _cache_content(self, content_url: str, content: Dict, node: CDNNode) -> str:
-        """Cache content on node"""
+    async def _cache_content(self, content_url: str, content: Dict, node: CDNNode,
+                             fence: Optional[asyncio.Event] = None) -> Optional[str]:
+        """Cache content on node; returns None when it may not be cached"""
         # Simulate content caching
         await asyncio.sleep(0.1)
         
+        # A purge since the fetch started makes this response outdated
+        if fence is not None and fence.is_set():
+            return None
+        
+        # Freshness and stale window from the origin's Cache-Control header
+        cache_control = {}
+        for directive in content.get("headers", {}).get("cache-control", "").split(","):
+            name, _, value = directive.strip().partition("=")
+            if name:
+                cache_control[name.lower()] = value.strip('"')
+        max_age = int(cache_control["max-age"]) if cache_control.get("max-age", "").isdigit() else 3600
+        if cache_control.get("stale-while-revalidate", "").isdigit():
+            stale_ttl = int(cache_control["stale-while-revalidate"])
+        elif max_age > 0 and "must-revalidate" not in cache_control:
+            stale_ttl = STALE_WHILE_REVALIDATE
+        else:
+            stale_ttl = 0
+        
+        cache_key = hashlib.md5(content_url.encode()).hexdigest()
+        if UNCACHEABLE_DIRECTIVES & cache_control.keys() or max_age + stale_ttl <= 0:
+            # Drop any earlier copy this response replaces
+            self.content_caches.delete(node.id, cache_key)
+            self.origin_stats["uncacheable"] += 1
+            return None
+        
         cache_id = str(uuid.uuid4())
         cache_entry = ContentCache(
             id=cache_id,
             content_url=content_url,
             content_type=ContentType.STATIC,
             size=content["size"],
-            cache_key=hashlib.md5(content_url.encode()).hexdigest(),
-            ttl=3600,  # 1 hour
+            cache_key=cache_key,
+            ttl=max_age,  # 1 hour by default
             hit_count=0,
             miss_count=0,
             last_accessed=datetime.now(),
-            created_at=datetime.now()
+            created_at=datetime.now(),
+            node_id=node.id,
+            # Origin cache tags, as sent in the Surrogate-Key header
+            tags=content.get("headers", {}).get("surrogate-key", "").split()
         )
         
-        self.content_caches[cache_id] = cache_entry
+        self.content_caches.put(node.id, cache_entry.cache_key, cache_entry, cache_entry.size, ttl=cache_entry.ttl,
+                                url=content_url, tags=cache_entry.tags, stale_ttl=stale_ttl)
         return cache_id
     
     # 3. Cache Invalidation
@@ -553,14 +683,11 @@ class GlobalCDN:
         """Invalidate cached content"""
         try:
             cache_key = hashlib.md5(content_url.encode()).hexdigest()
-            invalidated_entries = []
             
-            # Find and invalidate cache entries
-            for cache_id, cache_entry in list(self.content_caches.items()):
-                if cache_entry.cache_key == cache_key:
-                    # Remove from cache
-                    del self.content_caches[cache_id]
-                    invalidated_entries.append(cache_id)
+            # Remove the key from every node
+            invalidated_entries = [entry.id for _, entry in self.content_caches.invalidate_key(cache_key)]
+            self.negative_caches.invalidate_key(cache_key)
+            self._fence_origin_fetches(lambda key, _: key == cache_key)
             
             return {
                 "success": True,
@@ -574,6 +701,47 @@ class GlobalCDN:
             logger.error(f"Error invalidating cache: {e}")
             return {"success": False, "error": str(e)}
     
+    async def invalidate_by_tag(self, tag: str) -> Dict:
+        """Invalidate every cached entry carrying a tag"""
+        try:
+            invalidated = [entry for _, entry in self.content_caches.invalidate_tag(tag)]
+            invalidated_entries = [entry.id for entry in invalidated]
+            for cache_key in {entry.cache_key for entry in invalidated}:
+                self.negative_caches.invalidate_key(cache_key)
+            # Tags of a response are unknown until it arrives, so every fetch in flight is fenced
+            self._fence_origin_fetches(lambda key, _: True)
+            
+            return {
+                "success": True,
+                "tag": tag,
+                "invalidation_type": "tag",
+                "invalidated_entries": len(invalidated_entries),
+                "cache_entries": invalidated_entries
+            }
+            
+        except Exception as e:
+            logger.error(f"Error invalidating cache tag: {e}")
+            return {"success": False, "error": str(e)}
+    
+    async def invalidate_by_prefix(self, url_prefix: str) -> Dict:
+        """Invalidate every cached entry whose URL starts with a prefix"""
+        try:
+            invalidated_entries = [entry.id for _, entry in self.content_caches.invalidate_prefix(url_prefix)]
+            self.negative_caches.invalidate_prefix(url_prefix)
+            self._fence_origin_fetches(lambda _, content_url: content_url.startswith(url_prefix))
+            
+            return {
+                "success": True,
+                "url_prefix": url_prefix,
+                "invalidation_type": "prefix",
+                "invalidated_entries": len(invalidated_entries),
+                "cache_entries": invalidated_entries
+            }
+            
+        except Exception as e:
+            logger.error(f"Error invalidating cache prefix: {e}")
+            return {"success": False, "error": str(e)}
+    
     # 4. Performance Monitoring
     async def collect_performance_metrics(self, node_id: str) -> Dict:
         """Collect performance metrics from CDN node"""
@@ -602,6 +770,7 @@ class GlobalCDN:
             # Update node metrics
             node.current_load = metrics["bandwidth_usage"]
             node.last_updated = datetime.now()
+            self.routing.update_latency(node_id, metrics["latency"])
             
             # Store metrics
             if node_id not in self.performance_metrics:
@@ -682,11 +851,9 @@ class GlobalCDN:
     
     def _get_cache_statistics(self) -> Dict:
         """Get cache statistics"""
-        if not self.content_caches:
-            return {"total_entries": 0, "total_hits": 0, "total_misses": 0}
-        
-        total_hits = sum(cache.hit_count for cache in self.content_caches.values())
-        total_misses = sum(cache.miss_count for cache in self.content_caches.values())
+        store_metrics = self.content_caches.get_metrics()
+        total_hits = store_metrics["hits"]
+        total_misses = store_metrics["misses"]
         total_requests = total_hits + total_misses
         
         return {
@@ -694,7 +861,13 @@ class GlobalCDN:
             "total_hits": total_hits,
             "total_misses": total_misses,
             "hit_ratio": total_hits / total_requests if total_requests > 0 else 0,
-            "average_ttl": np.mean([cache.ttl for cache in self.content_caches.values()])
+            "average_ttl": np.mean([cache.ttl for cache in self.content_caches.values()]) if self.content_caches else 0,
+            "evictions": store_metrics["evictions"],
+            "expirations": store_metrics["expirations"],
+            "invalidations": store_metrics["invalidations"],
+            "cached_bytes": store_metrics["bytes"],
+            "stale_hits": store_metrics["stale_hits"],
+            "origin": {**self.origin_stats, "in_flight": len(self.origin_fetches)}
         }
     
     def _get_bandwidth_usage(self) -> Dict:
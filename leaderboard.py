@@ -0,0 +1,516 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Leaderboard - Order-statistics leaderboards with time windows
+Indexable skip list with O(log n) updates, rank and top-k queries, daily and
+weekly boards, and a Redis sorted-set backend
+"""
+
+import json
+import random
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_MAX_LEVEL = 32
+_LEVEL_PROBABILITY = 0.25
+
+WINDOWS = ("all_time", "daily", "weekly")
+WINDOW_TTL = {"daily": 2 * 86400, "weekly": 14 * 86400}
+
+
+class _Node:
+    __slots__ = ("key", "forward", "span")
+
+    def __init__(self, key: Optional[Tuple[float, str]], level: int):
+        self.key = key
+        self.forward: List[Optional["_Node"]] = [None] * level
+        self.span = [0] * level
+
+
+class RankedSkipList:
+    """Indexable skip list of unique members ordered by (score, member)
+
+    Same layout as the Redis sorted-set skip list: every forward link
+    records how many nodes it jumps, so inserts, deletes, rank lookups and
+    index lookups are all O(log n) expected. Order matches Redis exactly
+    (ascending score, ties by member), so descending queries agree with
+    ZREVRANK/ZREVRANGE.
+    """
+
+    def __init__(self, random_source: Optional[random.Random] = None):
+        self._random = random_source or random.Random()
+        self._head = _Node(None, _MAX_LEVEL)
+        self._level = 1
+        self._length = 0
+        self._scores: Dict[str, float] = {}
+
+    def _random_level(self) -> int:
+        level = 1
+        random_value = self._random.random
+        while level < _MAX_LEVEL and random_value() < _LEVEL_PROBABILITY:
+            level += 1
+        return level
+
+    def _insert(self, key: Tuple[float, str]):
+        level = self._random_level()
+        top = max(level, self._level)
+        update: List[_Node] = [self._head] * top
+        rank = [0] * top
+        node = self._head
+        traversed = 0
+        # Keys are (score, member) tuples, compared in C
+        for i in range(self._level - 1, -1, -1):
+            forward = node.forward[i]
+            while forward is not None and forward.key < key:
+                traversed += node.span[i]
+                node = forward
+                forward = node.forward[i]
+            update[i] = node
+            rank[i] = traversed
+
+        if level > self._level:
+            for i in range(self._level, level):
+                self._head.span[i] = self._length
+            self._level = level
+
+        new = _Node(key, level)
+        for i in range(level):
+            previous = update[i]
+            new.forward[i] = previous.forward[i]
+            previous.forward[i] = new
+            new.span[i] = previous.span[i] - (traversed - rank[i])
+            previous.span[i] = traversed - rank[i] + 1
+        for i in range(level, self._level):
+            update[i].span[i] += 1
+        self._length += 1
+
+    def _delete(self, key: Tuple[float, str]):
+        update: List[_Node] = [self._head] * self._level
+        node = self._head
+        for i in range(self._level - 1, -1, -1):
+            forward = node.forward[i]
+            while forward is not None and forward.key < key:
+                node = forward
+                forward = node.forward[i]
+            update[i] = node
+        target = node.forward[0]
+
+        for i in range(self._level):
+            previous = update[i]
+            if previous.forward[i] is target:
+                previous.span[i] += target.span[i] - 1
+                previous.forward[i] = target.forward[i]
+            else:
+                previous.span[i] -= 1
+        while self._level > 1 and self._head.forward[self._level - 1] is None:
+            self._level -= 1
+        self._length -= 1
+
+    def _node_at(self, index: int) -> _Node:
+        """Node at 0-based ascending ``index``"""
+        traversed = 0
+        target = index + 1
+        node = self._head
+        for i in range(self._level - 1, -1, -1):
+            while node.forward[i] is not None and traversed + node.span[i] <= target:
+                traversed += node.span[i]
+                node = node.forward[i]
+            if traversed == target:
+                return node
+        raise IndexError(index)
+
+    # Public API
+    def set(self, member: str, score: float):
+        """Insert ``member`` or move it to ``score``"""
+        score = float(score)
+        current = self._scores.get(member)
+        if current == score:
+            return
+        if current is not None:
+            self._delete((current, member))
+        self._insert((score, member))
+        self._scores[member] = score
+
+    def increment(self, member: str, amount: float) -> float:
+        score = self._scores.get(member, 0.0) + amount
+        self.set(member, score)
+        return score
+
+    def remove(self, member: str) -> bool:
+        score = self._scores.pop(member, None)
+        if score is None:
+            return False
+        self._delete((score, member))
+        return True
+
+    def score(self, member: str) -> Optional[float]:
+        return self._scores.get(member)
+
+    def rank(self, member: str) -> Optional[int]:
+        """0-based ascending rank"""
+        score = self._scores.get(member)
+        if score is None:
+            return None
+        key = (score, member)
+        rank = 0
+        node = self._head
+        for i in range(self._level - 1, -1, -1):
+            forward = node.forward[i]
+            while forward is not None and forward.key <= key:
+                rank += node.span[i]
+                node = forward
+                forward = node.forward[i]
+            if node.key == key:
+                return rank - 1
+        raise KeyError(member)
+
+    def rev_rank(self, member: str) -> Optional[int]:
+        """0-based descending rank (0 is the highest score)"""
+        rank = self.rank(member)
+        return None if rank is None else self._length - 1 - rank
+
+    def rev_range(self, start: int, stop: int) -> List[Tuple[str, float]]:
+        """Descending entries ``start`` (inclusive) to ``stop`` (exclusive)"""
+        stop = min(stop, self._length)
+        if start >= stop:
+            return []
+        # Descending index j is ascending index n - 1 - j: walk up from the
+        # lowest requested entry, then reverse
+        first = self._length - stop
+        node = self._node_at(first)
+        items = []
+        for _ in range(stop - start):
+            score, member = node.key
+            items.append((member, score))
+            node = node.forward[0]
+        items.reverse()
+        return items
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __contains__(self, member: str) -> bool:
+        return member in self._scores
+
+    def __iter__(self):
+        """Members in descending order"""
+        return (member for member, _ in self.rev_range(0, self._length))
+
+
+class LeaderboardBackend(ABC):
+    """Sorted-set operations used by LeaderboardService (descending ranks)"""
+
+    @abstractmethod
+    def update(self, keys: Sequence[Tuple[str, Optional[float]]], member: str, value: float,
+               increment: bool = False) -> List[float]:
+        """Set (or add to) ``member``'s score on each ``(key, ttl)``; returns new scores"""
+
+    @abstractmethod
+    def remove(self, keys: Sequence[str], member: str) -> int:
+        ...
+
+    @abstractmethod
+    def score(self, key: str, member: str) -> Optional[float]:
+        ...
+
+    @abstractmethod
+    def rank(self, key: str, member: str) -> Optional[int]:
+        ...
+
+    @abstractmethod
+    def range(self, key: str, start: int, stop: int) -> List[Tuple[str, float]]:
+        ...
+
+    @abstractmethod
+    def count(self, key: str) -> int:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str):
+        ...
+
+    @abstractmethod
+    def set_metadata(self, key: str, member: str, metadata: Dict):
+        ...
+
+    @abstractmethod
+    def get_metadata(self, key: str, members: Sequence[str]) -> List[Optional[Dict]]:
+        ...
+
+
+class MemoryLeaderboardBackend(LeaderboardBackend):
+    """Single-process backend: one RankedSkipList per board"""
+
+    def __init__(self, clock: Callable[[], float] = time.time, seed: Optional[int] = None):
+        self.clock = clock
+        self._random = random.Random(seed)
+        self._boards: Dict[str, RankedSkipList] = {}
+        self._deadlines: Dict[str, float] = {}
+        self._metadata: Dict[str, Dict[str, Dict]] = {}
+
+    def _board(self, key: str, create: bool = False) -> Optional[RankedSkipList]:
+        deadline = self._deadlines.get(key)
+        if deadline is not None and deadline <= self.clock():
+            self.delete(key)
+        board = self._boards.get(key)
+        if board is None and create:
+            board = self._boards[key] = RankedSkipList(self._random)
+        return board
+
+    def update(self, keys: Sequence[Tuple[str, Optional[float]]], member: str, value: float,
+               increment: bool = False) -> List[float]:
+        scores = []
+        for key, ttl in keys:
+            board = self._board(key, create=True)
+            if increment:
+                scores.append(board.increment(member, value))
+            else:
+                board.set(member, value)
+                scores.append(float(value))
+            if ttl is not None:
+                self._deadlines[key] = self.clock() + ttl
+        return scores
+
+    def remove(self, keys: Sequence[str], member: str) -> int:
+        removed = 0
+        for key in keys:
+            board = self._board(key)
+            if board is not None and board.remove(member):
+                removed += 1
+        return removed
+
+    def score(self, key: str, member: str) -> Optional[float]:
+        board = self._board(key)
+        return board.score(member) if board is not None else None
+
+    def rank(self, key: str, member: str) -> Optional[int]:
+        board = self._board(key)
+        return board.rev_rank(member) if board is not None else None
+
+    def range(self, key: str, start: int, stop: int) -> List[Tuple[str, float]]:
+        board = self._board(key)
+        return board.rev_range(start, stop) if board is not None else []
+
+    def count(self, key: str) -> int:
+        board = self._board(key)
+        return len(board) if board is not None else 0
+
+    def delete(self, key: str):
+        self._boards.pop(key, None)
+        self._deadlines.pop(key, None)
+
+    def set_metadata(self, key: str, member: str, metadata: Dict):
+        self._metadata.setdefault(key, {})[member] = metadata
+
+    def get_metadata(self, key: str, members: Sequence[str]) -> List[Optional[Dict]]:
+        records = self._metadata.get(key, {})
+        return [records.get(member) for member in members]
+
+
+class RedisLeaderboardBackend(LeaderboardBackend):
+    """Boards stored as Redis sorted sets shared by every worker
+
+    ``client`` is a redis-py style client. Writes to all windows of a board
+    go through one pipeline; period boards carry a TTL so old days and weeks
+    are dropped by the server. Metadata lives in one hash per board.
+    """
+
+    def __init__(self, client, prefix: str = "leaderboard:"):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, redis_url: str = "redis://localhost:6379", **kwargs) -> "RedisLeaderboardBackend":
+        import redis
+        return cls(redis.from_url(redis_url), **kwargs)
+
+    @staticmethod
+    def _text(value) -> str:
+        return value.decode("utf-8") if isinstance(value, bytes) else value
+
+    def update(self, keys: Sequence[Tuple[str, Optional[float]]], member: str, value: float,
+               increment: bool = False) -> List[float]:
+        pipe = self.client.pipeline(transaction=True)
+        for key, ttl in keys:
+            if increment:
+                pipe.zincrby(self.prefix + key, value, member)
+            else:
+                pipe.zadd(self.prefix + key, {member: value})
+            if ttl is not None:
+                pipe.expire(self.prefix + key, int(ttl))
+        results = pipe.execute()
+        if not increment:
+            return [float(value)] * len(keys)
+        # Each key queued ZINCRBY, plus EXPIRE when it has a TTL
+        scores, index = [], 0
+        for _, ttl in keys:
+            scores.append(float(results[index]))
+            index += 1 if ttl is None else 2
+        return scores
+
+    def remove(self, keys: Sequence[str], member: str) -> int:
+        pipe = self.client.pipeline(transaction=True)
+        for key in keys:
+            pipe.zrem(self.prefix + key, member)
+        return sum(int(result) for result in pipe.execute())
+
+    def score(self, key: str, member: str) -> Optional[float]:
+        score = self.client.zscore(self.prefix + key, member)
+        return float(score) if score is not None else None
+
+    def rank(self, key: str, member: str) -> Optional[int]:
+        return self.client.zrevrank(self.prefix + key, member)
+
+    def range(self, key: str, start: int, stop: int) -> List[Tuple[str, float]]:
+        if start >= stop:
+            return []
+        return [(self._text(member), float(score))
+                for member, score in self.client.zrevrange(self.prefix + key, start, stop - 1, withscores=True)]
+
+    def count(self, key: str) -> int:
+        return self.client.zcard(self.prefix + key)
+
+    def delete(self, key: str):
+        self.client.delete(self.prefix + key)
+
+    def set_metadata(self, key: str, member: str, metadata: Dict):
+        self.client.hset(self.prefix + "meta:" + key, member, json.dumps(metadata, default=str))
+
+    def get_metadata(self, key: str, members: Sequence[str]) -> List[Optional[Dict]]:
+        if not members:
+            return []
+        values = self.client.hmget(self.prefix + "meta:" + key, list(members))
+        return [json.loads(self._text(value)) if value is not None else None for value in values]
+
+
+class LeaderboardService:
+    """Named leaderboards, each kept for all time and per day / ISO week
+
+    Every write updates the all-time board and the board of the current
+    period. Period boards only contain members active in that period and
+    expire on their own after ``WINDOW_TTL``.
+    """
+
+    def __init__(self, backend: Optional[LeaderboardBackend] = None, clock: Callable[[], float] = time.time,
+                 windows: Iterable[str] = WINDOWS):
+        self.clock = clock
+        self.backend = backend if backend is not None else MemoryLeaderboardBackend(clock)
+        self.windows = tuple(windows)
+        self.names: List[str] = []
+
+    def register(self, name: str):
+        if name not in self.names:
+            self.names.append(name)
+
+    def board_key(self, name: str, window: str = "all_time", timestamp: Optional[float] = None) -> str:
+        """Backend key of ``name``'s board for the period containing ``timestamp``"""
+        if window == "all_time":
+            return f"{name}:all_time"
+        moment = datetime.fromtimestamp(self.clock() if timestamp is None else timestamp, timezone.utc)
+        if window == "daily":
+            return f"{name}:daily:{moment:%Y-%m-%d}"
+        if window == "weekly":
+            year, week, _ = moment.isocalendar()
+            return f"{name}:weekly:{year}-W{week:02d}"
+        raise ValueError(f"Unknown leaderboard window: {window}")
+
+    def _write(self, name: str, member: str, value: float, increment: bool, metadata: Optional[Dict]) -> Dict:
+        self.register(name)
+        now = self.clock()
+        keys = [(self.board_key(name, window, now), WINDOW_TTL.get(window)) for window in self.windows]
+        scores = self.backend.update(keys, member, value, increment)
+        self.backend.set_metadata(name, member, {
+            "metadata": metadata or {},
+            "updated_at": datetime.fromtimestamp(now).isoformat(),
+        })
+        return {"user_id": member, "score": _plain(scores[0]), "rank": self.rank(name, member, self.windows[0])}
+
+    def submit_score(self, name: str, member: str, score: float, metadata: Optional[Dict] = None) -> Dict:
+        """Replace ``member``'s score on every window"""
+        return self._write(name, member, score, False, metadata)
+
+    def add_points(self, name: str, member: str, points: float, metadata: Optional[Dict] = None) -> Dict:
+        """Add ``points`` to ``member`` on every window (period boards count points earned in the period)"""
+        return self._write(name, member, points, True, metadata)
+
+    def remove(self, name: str, member: str) -> bool:
+        keys = [self.board_key(name, window) for window in self.windows]
+        return self.backend.remove(keys, member) > 0
+
+    def rank(self, name: str, member: str, window: str = "all_time") -> Optional[int]:
+        """1-based rank, or None if ``member`` is not on the board"""
+        rank = self.backend.rank(self.board_key(name, window), member)
+        return None if rank is None else rank + 1
+
+    def score(self, name: str, member: str, window: str = "all_time") -> Optional[float]:
+        score = self.backend.score(self.board_key(name, window), member)
+        return None if score is None else _plain(score)
+
+    def count(self, name: str, window: str = "all_time") -> int:
+        return self.backend.count(self.board_key(name, window))
+
+    def top(self, name: str, limit: Optional[int] = 10, window: str = "all_time", offset: int = 0) -> List[Dict]:
+        """Entries ranked ``offset + 1`` onwards; ``limit=None`` returns the whole board"""
+        if offset < 0:
+            raise ValueError(f"offset must be non-negative: {offset}")
+        if limit is not None and limit < 0:
+            raise ValueError(f"limit must be non-negative: {limit}")
+        key = self.board_key(name, window)
+        stop = self.backend.count(key) if limit is None else offset + limit
+        return self._entries(name, self.backend.range(key, offset, stop), offset)
+
+    def around(self, name: str, member: str, radius: int = 2, window: str = "all_time") -> List[Dict]:
+        """``member`` with up to ``radius`` neighbours on each side"""
+        rank = self.backend.rank(self.board_key(name, window), member)
+        if rank is None:
+            return []
+        start = max(0, rank - radius)
+        return self._entries(name, self.backend.range(self.board_key(name, window), start, rank + radius + 1), start)
+
+    def _entries(self, name: str, items: List[Tuple[str, float]], offset: int) -> List[Dict]:
+        records = self.backend.get_metadata(name, [member for member, _ in items])
+        entries = []
+        for position, ((member, score), record) in enumerate(zip(items, records)):
+            record = record or {}
+            updated_at = record.get("updated_at")
+            entries.append({
+                "user_id": member,
+                "score": _plain(score),
+                "rank": offset + position + 1,
+                "updated_at": datetime.fromisoformat(updated_at) if updated_at else None,
+                "metadata": record.get("metadata", {}),
+            })
+        return entries
+
+
+def _plain(score: float):
+    """Whole scores as int, like the scores callers submit"""
+    return int(score) if float(score).is_integer() else score
+
+
+# Example usage and testing
+if __name__ == "__main__":
+    print("🏅 Leaderboard Demo")
+    print("=" * 50)
+
+    service = LeaderboardService()
+    users = 50_000
+    start = time.perf_counter()
+    for index in range(users):
+        service.submit_score("weekly_builders", f"user-{index}", random.randint(0, 1_000_000))
+    elapsed = time.perf_counter() - start
+    print(f"✅ {users} score updates in {elapsed:.2f}s ({elapsed / users * 1e6:.1f} µs each)")
+
+    start = time.perf_counter()
+    for index in range(1000):
+        service.rank("weekly_builders", f"user-{index}")
+    print(f"✅ Rank lookup: {(time.perf_counter() - start) * 1000:.3f} µs each")
+    print(f"✅ Top 3: {[(entry['user_id'], entry['score']) for entry in service.top('weekly_builders', 3)]}")
+    print(f"✅ Daily board size: {service.count('weekly_builders', 'daily')}")
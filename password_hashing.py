@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Password Hashing - Offloaded bcrypt hashing service
+Bounded process pool with an async API, queue-depth backpressure, startup
+cost calibration and rehash-on-login support
+"""
+
+import asyncio
+import math
+import os
+import re
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+import logging
+
+import bcrypt
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MIN_COST = 12
+MAX_COST = 16
+DEFAULT_TARGET_LATENCY = 0.25
+
+_BCRYPT_HASH = re.compile(r"^\$2[abxy]?\$(\d{2})\$")
+
+
+class HashingOverloadedError(RuntimeError):
+    """Raised when too many hashing jobs are already queued"""
+
+
+def _hash(password: bytes, cost: int) -> bytes:
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds=cost))
+
+
+def _check(password: bytes, hashed: bytes) -> bool:
+    return bcrypt.checkpw(password, hashed)
+
+
+def bcrypt_cost(hashed: str) -> int:
+    """Cost (log2 rounds) encoded in a bcrypt hash"""
+    match = _BCRYPT_HASH.match(hashed)
+    if match is None:
+        raise ValueError("Not a bcrypt hash")
+    return int(match.group(1))
+
+
+@lru_cache(maxsize=None)
+def calibrate_cost(target_latency: float = DEFAULT_TARGET_LATENCY,
+                   min_cost: int = MIN_COST, max_cost: int = MAX_COST) -> int:
+    """Highest bcrypt cost whose hash time stays within ``target_latency``
+
+    Times a hash at ``min_cost`` on this machine and extrapolates: each
+    cost step doubles the work. Cached, so it runs once per process.
+    """
+    sample = b"calibration-password"
+    elapsed = float("inf")
+    for _ in range(2):
+        start = time.perf_counter()
+        _hash(sample, min_cost)
+        elapsed = min(elapsed, time.perf_counter() - start)
+    steps = math.floor(math.log2(target_latency / elapsed)) if elapsed > 0 else max_cost - min_cost
+    cost = max(min_cost, min(max_cost, min_cost + steps))
+    logger.info(f"Calibrated bcrypt cost {cost} (cost {min_cost} took {elapsed * 1000:.1f} ms)")
+    return cost
+
+
+class PasswordHashingService:
+    """bcrypt hashing offloaded to a bounded process pool
+
+    At most ``max_workers`` hashes run at once, so a login burst cannot pin
+    every core of the web worker. Jobs beyond ``max_pending`` (queued plus
+    running) are rejected with ``HashingOverloadedError`` instead of
+    piling up, letting callers answer with a retryable error.
+    """
+
+    def __init__(self, cost: Optional[int] = None, target_latency: float = DEFAULT_TARGET_LATENCY,
+                 min_cost: int = MIN_COST, max_cost: int = MAX_COST, max_workers: Optional[int] = None,
+                 max_pending: Optional[int] = None, executor: Optional[Executor] = None):
+        self.cost = cost if cost is not None else calibrate_cost(target_latency, min_cost, max_cost)
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 2) // 2)
+        self.max_pending = max_pending if max_pending is not None else self.max_workers * 16
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._pending = 0
+        self._lock = threading.Lock()
+        self.hashed = 0
+        self.verified = 0
+        self.rehashed = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._executor
+
+    def _acquire(self):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise HashingOverloadedError(f"{self._pending} password hashing jobs pending")
+            self._pending += 1
+
+    def _release(self, _future=None):
+        with self._lock:
+            self._pending -= 1
+
+    def _submit(self, function, *args):
+        executor = self._get_executor()
+        self._acquire()
+        try:
+            future = executor.submit(function, *args)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    # Async API
+    async def hash_password(self, password: str) -> str:
+        """Hash a password at the current cost"""
+        hashed = await asyncio.wrap_future(self._submit(_hash, password.encode("utf-8"), self.cost))
+        self.hashed += 1
+        return hashed.decode("utf-8")
+
+    async def verify_password(self, password: str, hashed: str) -> bool:
+        """Check a password against a bcrypt hash"""
+        result = await asyncio.wrap_future(self._submit(_check, password.encode("utf-8"), hashed.encode("utf-8")))
+        self.verified += 1
+        return result
+
+    async def verify_and_rehash(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """Verify; on success return a fresh hash if the stored cost is outdated"""
+        if not await self.verify_password(password, hashed):
+            return False, None
+        if not self.needs_rehash(hashed):
+            return True, None
+        new_hash = await self.hash_password(password)
+        self.rehashed += 1
+        return True, new_hash
+
+    # Blocking API (same pool and limits)
+    def hash_password_sync(self, password: str) -> str:
+        hashed = self._submit(_hash, password.encode("utf-8"), self.cost).result()
+        self.hashed += 1
+        return hashed.decode("utf-8")
+
+    def verify_password_sync(self, password: str, hashed: str) -> bool:
+        result = self._submit(_check, password.encode("utf-8"), hashed.encode("utf-8")).result()
+        self.verified += 1
+        return result
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """True if ``hashed`` was made with a lower cost than the current one
+
+        Hashes are only ever upgraded, so a machine that calibrates to a
+        lower cost does not weaken hashes made elsewhere.
+        """
+        return bcrypt_cost(hashed) < self.cost
+
+    def get_metrics(self) -> Dict:
+        with self._lock:
+            pending = self._pending
+        return {
+            "cost": self.cost,
+            "max_workers": self.max_workers,
+            "pending": pending,
+            "max_pending": self.max_pending,
+            "hashed": self.hashed,
+            "verified": self.verified,
+            "rehashed": self.rehashed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None and self._owns_executor:
+            executor.shutdown(wait=wait)
+
+
+# Example usage and testing
+if __name__ == "__main__":
+    print("🔑 Password Hashing Demo")
+    print("=" * 50)
+
+    async def demo():
+        service = PasswordHashingService()
+        print(f"✅ Calibrated cost: {service.cost}")
+
+        start = time.perf_counter()
+        hashes = await asyncio.gather(*(service.hash_password(f"password-{index}") for index in range(8)))
+        print(f"✅ Hashed 8 passwords in {time.perf_counter() - start:.2f}s on {service.max_workers} workers")
+
+        old_hash = bcrypt.hashpw(b"password-0", bcrypt.gensalt(rounds=MIN_COST)).decode("utf-8")
+        valid, new_hash = await service.verify_and_rehash("password-0", old_hash)
+        print(f"✅ Verified: {valid}, rehashed: {new_hash is not None and service.cost != MIN_COST}")
+        print(f"✅ Metrics: {service.get_metrics()}")
+        service.shutdown()
+        return hashes
+
+    asyncio.run(demo())
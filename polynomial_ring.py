@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Polynomial Ring - Vectorized arithmetic in Z_q[X]/(X^n - 1)
+NumPy number-theoretic transforms for the lattice operations of the
+quantum-resistant security system
+"""
+
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+import logging
+
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PolynomialLike = Union[Sequence[int], np.ndarray]
+
+# NTT-friendly primes (p = c * 2^k + 1) with a primitive root of 3; their
+# product bounds the exact integer convolution recovered through CRT
+NTT_PRIMES = (998244353, 167772161)
+NTT_PRIME_PRODUCT = NTT_PRIMES[0] * NTT_PRIMES[1]
+
+# Serialized coefficient format (matches the struct "i" format on little-endian hosts)
+COEFFICIENT_DTYPE = np.dtype("<i4")
+
+
+def _is_prime(value: int) -> bool:
+    if value < 2:
+        return False
+    if value % 2 == 0:
+        return value == 2
+    divisor = 3
+    while divisor * divisor <= value:
+        if value % divisor == 0:
+            return False
+        divisor += 2
+    return True
+
+
+def _prime_factors(value: int) -> List[int]:
+    factors = []
+    divisor = 2
+    while divisor * divisor <= value:
+        if value % divisor == 0:
+            factors.append(divisor)
+            while value % divisor == 0:
+                value //= divisor
+        divisor += 1
+    if value > 1:
+        factors.append(value)
+    return factors
+
+
+def _primitive_root(prime: int) -> int:
+    factors = _prime_factors(prime - 1)
+    for candidate in range(2, prime):
+        if all(pow(candidate, (prime - 1) // factor, prime) != 1 for factor in factors):
+            return candidate
+    raise ValueError(f"No primitive root for {prime}")
+
+
+class NTTPlan:
+    """Precomputed twiddles for a length-n cyclic NTT modulo a prime"""
+
+    def __init__(self, n: int, prime: int):
+        if n & (n - 1) or (prime - 1) % n:
+            raise ValueError(f"NTT of length {n} is not possible modulo {prime}")
+        self.n = n
+        self.prime = prime
+        root = pow(_primitive_root(prime), (prime - 1) // n, prime)
+        self.bit_reverse = self._bit_reverse_permutation(n)
+        self.forward_roots = self._stage_roots(root)
+        self.inverse_roots = self._stage_roots(pow(root, prime - 2, prime))
+        self.n_inverse = pow(n, prime - 2, prime)
+
+    @staticmethod
+    def _bit_reverse_permutation(n: int) -> np.ndarray:
+        bits = n.bit_length() - 1
+        indices = np.arange(n)
+        reversed_indices = np.zeros(n, dtype=np.int64)
+        for bit in range(bits):
+            reversed_indices |= ((indices >> bit) & 1) << (bits - 1 - bit)
+        return reversed_indices
+
+    def _stage_roots(self, root: int) -> List[np.ndarray]:
+        stages = []
+        half = 1
+        while half < self.n:
+            step = pow(root, self.n // (2 * half), self.prime)
+            powers = np.empty(half, dtype=np.int64)
+            value = 1
+            for index in range(half):
+                powers[index] = value
+                value = value * step % self.prime
+            stages.append(powers)
+            half *= 2
+        return stages
+
+    def transform(self, values: np.ndarray, inverse: bool = False) -> np.ndarray:
+        """Iterative radix-2 NTT, one vectorized butterfly pass per stage"""
+        prime = self.prime
+        data = values[self.bit_reverse] % prime
+        for roots in (self.inverse_roots if inverse else self.forward_roots):
+            half = len(roots)
+            blocks = data.reshape(-1, 2, half)
+            even = blocks[:, 0, :]
+            odd = blocks[:, 1, :] * roots % prime
+            result = np.empty_like(blocks)
+            result[:, 0, :] = even + odd
+            result[:, 1, :] = even - odd
+            data = result.reshape(-1) % prime
+        if inverse:
+            data = data * self.n_inverse % prime
+        return data
+
+
+@lru_cache(maxsize=None)
+def get_ntt_plan(n: int, prime: int) -> NTTPlan:
+    """Get a cached NTT plan"""
+    return NTTPlan(n, prime)
+
+
+class PolynomialRing:
+    """Arithmetic in Z_q[X]/(X^n - 1) on int64 coefficient arrays
+
+    Multiplication is a cyclic convolution computed with number-theoretic
+    transforms: directly modulo q when q is an NTT-friendly prime, otherwise
+    modulo two NTT primes whose CRT combination is the exact integer product
+    (reduced mod q afterwards). Power-of-two moduli, as used by the NTRU-style
+    parameters, take the second path.
+    """
+
+    def __init__(self, n: int, modulus: int):
+        self.n = n
+        self.modulus = modulus
+        self.is_power_of_two_n = n > 0 and not n & (n - 1)
+        self.modulus_is_prime = _is_prime(modulus)
+        self.direct_plan: Optional[NTTPlan] = None
+        self.crt_plans: Optional[Tuple[NTTPlan, NTTPlan]] = None
+
+        if self.is_power_of_two_n:
+            if self.modulus_is_prime and modulus < (1 << 31) and (modulus - 1) % n == 0:
+                self.direct_plan = get_ntt_plan(n, modulus)
+            elif n * (modulus - 1) ** 2 < NTT_PRIME_PRODUCT and all((p - 1) % n == 0 for p in NTT_PRIMES):
+                self.crt_plans = (get_ntt_plan(n, NTT_PRIMES[0]), get_ntt_plan(n, NTT_PRIMES[1]))
+
+        p0, p1 = NTT_PRIMES
+        self._crt_inverse = pow(p0, -1, p1)
+
+    @property
+    def backend(self) -> str:
+        if self.direct_plan is not None:
+            return "ntt"
+        if self.crt_plans is not None:
+            return "ntt_crt"
+        return "convolution"
+
+    # Conversions
+    def coerce(self, poly: PolynomialLike) -> np.ndarray:
+        """Return ``poly`` as a reduced int64 coefficient array"""
+        array = np.asarray(poly, dtype=np.int64)
+        if array.shape != (self.n,):
+            raise ValueError(f"Expected {self.n} coefficients, got {array.shape}")
+        return array % self.modulus
+
+    @staticmethod
+    def to_bytes(poly: PolynomialLike) -> bytes:
+        """Serialize coefficients as little-endian int32"""
+        return np.asarray(poly, dtype=COEFFICIENT_DTYPE).tobytes()
+
+    @staticmethod
+    def from_bytes(data: bytes) -> np.ndarray:
+        """Deserialize little-endian int32 coefficients"""
+        return np.frombuffer(data, dtype=COEFFICIENT_DTYPE).astype(np.int64)
+
+    # Arithmetic
+    def add(self, poly1: PolynomialLike, poly2: PolynomialLike) -> np.ndarray:
+        return (self.coerce(poly1) + self.coerce(poly2)) % self.modulus
+
+    def subtract(self, poly1: PolynomialLike, poly2: PolynomialLike) -> np.ndarray:
+        return (self.coerce(poly1) - self.coerce(poly2)) % self.modulus
+
+    def multiply(self, poly1: PolynomialLike, poly2: PolynomialLike) -> np.ndarray:
+        """Cyclic product modulo (X^n - 1, q)"""
+        a = self.coerce(poly1)
+        b = self.coerce(poly2)
+
+        if self.direct_plan is not None:
+            plan = self.direct_plan
+            product = plan.transform(a) * plan.transform(b) % plan.prime
+            return plan.transform(product, inverse=True)
+
+        if self.crt_plans is not None:
+            residues = []
+            for plan in self.crt_plans:
+                product = plan.transform(a) * plan.transform(b) % plan.prime
+                residues.append(plan.transform(product, inverse=True))
+            p0, p1 = NTT_PRIMES
+            lift = (residues[1] - residues[0]) % p1 * self._crt_inverse % p1
+            return (residues[0] + p0 * lift) % self.modulus
+
+        return self._convolve(a, b)
+
+    def _convolve(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """Row-wise vectorized cyclic convolution for sizes without an NTT plan"""
+        exact = self.n * (self.modulus - 1) ** 2 < (1 << 62)
+        dtype = np.int64 if exact else object
+        result = np.zeros(self.n, dtype=dtype)
+        b = b.astype(dtype)
+        for shift in np.nonzero(a)[0]:
+            result = (result + int(a[shift]) * np.roll(b, shift)) % self.modulus
+        return result.astype(np.int64)
+
+    def inverse(self, poly: PolynomialLike) -> np.ndarray:
+        """Multiplicative inverse in the ring
+
+        Power-of-two moduli invert modulo 2 with the extended Euclidean
+        algorithm and Newton-lift to q; prime moduli with an NTT plan invert
+        pointwise in the transform domain. Raises ValueError if ``poly`` is
+        not invertible or the modulus is unsupported.
+        """
+        a = self.coerce(poly)
+
+        if self.modulus & (self.modulus - 1) == 0:
+            inverse = self._inverse_mod_two(a)
+            precision = 2
+            while precision < self.modulus:
+                correction = -self.multiply(a, inverse)
+                correction[0] += 2
+                inverse = self.multiply(inverse, correction)
+                precision *= precision
+            return inverse
+
+        if self.direct_plan is not None:
+            plan = self.direct_plan
+            spectrum = plan.transform(a)
+            if np.any(spectrum == 0):
+                raise ValueError("Polynomial is not invertible")
+            inverted = np.array([pow(int(value), plan.prime - 2, plan.prime) for value in spectrum],
+                                dtype=np.int64)
+            return plan.transform(inverted, inverse=True)
+
+        raise ValueError(f"Inverse not supported for modulus {self.modulus}")
+
+    def _inverse_mod_two(self, a: np.ndarray) -> np.ndarray:
+        """Inverse in GF(2)[X]/(X^n - 1) using Python ints as bit vectors"""
+        bits = a & 1
+        value = int("".join("1" if bit else "0" for bit in bits[::-1]), 2) if bits.any() else 0
+        r0, r1 = (1 << self.n) | 1, value
+        s0, s1 = 0, 1
+        while r1:
+            quotient, remainder = 0, r0
+            divisor_degree = r1.bit_length()
+            while remainder.bit_length() >= divisor_degree:
+                shift = remainder.bit_length() - divisor_degree
+                quotient |= 1 << shift
+                remainder ^= r1 << shift
+            product = 0
+            while quotient:
+                low_bit = quotient & -quotient
+                product ^= s1 << (low_bit.bit_length() - 1)
+                quotient ^= low_bit
+            r0, r1 = r1, remainder
+            s0, s1 = s1, s0 ^ product
+        if r0 != 1:
+            raise ValueError("Polynomial is not invertible modulo 2")
+
+        inverse = np.zeros(self.n, dtype=np.int64)
+        for index in range(min(s0.bit_length(), self.n)):
+            inverse[index] = (s0 >> index) & 1
+        return inverse
+
+
+_rings: Dict[Tuple[int, int], PolynomialRing] = {}
+
+
+def get_polynomial_ring(n: int, modulus: int) -> PolynomialRing:
+    """Get a cached ring for (n, q)"""
+    ring = _rings.get((n, modulus))
+    if ring is None:
+        ring = PolynomialRing(n, modulus)
+        _rings[(n, modulus)] = ring
+    return ring
+
+
+# Example usage and testing
+if __name__ == "__main__":
+    print("🧮 Polynomial Ring Demo")
+    print("=" * 50)
+
+    rng = np.random.default_rng()
+    for n, q in ((512, 2048), (2048, 8192), (1024, 12289)):
+        ring = get_polynomial_ring(n, q)
+        a = rng.integers(0, q, n)
+        b = rng.integers(0, q, n)
+        product = ring.multiply(a, b)
+        expected = ring._convolve(ring.coerce(a), ring.coerce(b))
+        print(f"✅ n={n}, q={q}, backend={ring.backend}, exact={np.array_equal(product, expected)}")
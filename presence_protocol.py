@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Presence Protocol - Compact, tick-batched cursor and selection traffic
+Struct-packed binary frames for presence updates, per-connection encoding
+and compression negotiation with JSON as the fallback, and a batcher that
+sends the latest presence of every user once per tick
+"""
+
+import asyncio
+import json
+import struct
+import time
+import zlib
+from collections import defaultdict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+import logging
+
+from websocket_broadcaster import FanoutBroadcaster
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ENCODING_JSON = "json"
+ENCODING_BINARY = "binary"
+COMPRESSION_ZLIB = "zlib"
+PRESENCE_TICK_HZ = 30
+COMPRESSION_THRESHOLD = 256
+# Largest frame body accepted from a client, before or after decompression
+MAX_FRAME_BYTES = 64 * 1024
+
+# Presence record kinds; JSON_BODY marks records whose data did not fit the packed layout
+KIND_CURSOR = 1
+KIND_SELECTION = 2
+JSON_BODY = 0x80
+
+# Frame: magic, flags, record count, tick timestamp (ms)
+FRAME_MAGIC = 0xC5
+FLAG_COMPRESSED = 0x01
+_HEADER = struct.Struct("!BBHQ")
+_POINT = struct.Struct("!ff")
+_SHORT = struct.Struct("!B")
+_LENGTH = struct.Struct("!H")
+
+
+def _packed_string(value: str) -> bytes:
+    encoded = value.encode("utf-8")
+    if len(encoded) > 255:
+        raise ValueError("string too long for packed record")
+    return _SHORT.pack(len(encoded)) + encoded
+
+
+def encode_record(kind: int, user_id: str, data: Dict[str, Any]) -> bytes:
+    """Pack one presence record
+
+    Cursors with numeric ``position["x"]``/``position["y"]`` take 8 bytes
+    plus the element id; anything else carries its data as JSON.
+    """
+    position = data.get("position")
+    if kind == KIND_CURSOR and isinstance(position, dict) and set(position) == {"x", "y"} and \
+            all(isinstance(position[axis], (int, float)) for axis in ("x", "y")) and set(data) <= {"position", "element"}:
+        try:
+            return (_SHORT.pack(kind) + _packed_string(user_id) +
+                    _POINT.pack(position["x"], position["y"]) + _packed_string(data.get("element") or ""))
+        except ValueError:
+            pass
+    body = json.dumps(data, separators=(",", ":"), default=str).encode("utf-8")
+    return _SHORT.pack(kind | JSON_BODY) + _packed_string(user_id) + _LENGTH.pack(len(body)) + body
+
+
+def encode_frame(records: Iterable[bytes], timestamp_ms: int, compress: bool = False) -> bytes:
+    """Concatenate packed records behind a frame header, optionally zlib-compressed"""
+    records = list(records)
+    body = b"".join(records)
+    flags = 0
+    if compress:
+        body = zlib.compress(body)
+        flags |= FLAG_COMPRESSED
+    return _HEADER.pack(FRAME_MAGIC, flags, len(records), timestamp_ms) + body
+
+
+def decode_frame(frame: bytes, allow_compressed: bool = True,
+                 max_bytes: int = MAX_FRAME_BYTES) -> Tuple[int, List[Tuple[int, str, Dict[str, Any]]]]:
+    """Unpack a frame into ``(timestamp_ms, [(kind, user_id, data), ...])``
+
+    The body may not exceed ``max_bytes`` either on the wire or once
+    inflated, so a small compressed frame cannot expand without bound.
+    """
+    magic, flags, count, timestamp_ms = _HEADER.unpack_from(frame)
+    if magic != FRAME_MAGIC:
+        raise ValueError("not a presence frame")
+    body = frame[_HEADER.size:]
+    if len(body) > max_bytes:
+        raise ValueError("presence frame too large")
+    if flags & FLAG_COMPRESSED:
+        if not allow_compressed:
+            raise ValueError("compressed presence frame was not negotiated")
+        decompressor = zlib.decompressobj()
+        body = decompressor.decompress(body, max_bytes)
+        if decompressor.unconsumed_tail or not decompressor.eof:
+            raise ValueError("presence frame too large")
+
+    records = []
+    offset = 0
+    for _ in range(count):
+        kind = body[offset]
+        length = body[offset + 1]
+        user_id = body[offset + 2:offset + 2 + length].decode("utf-8")
+        offset += 2 + length
+        if kind & JSON_BODY:
+            (size,) = _LENGTH.unpack_from(body, offset)
+            data = json.loads(body[offset + 2:offset + 2 + size])
+            offset += 2 + size
+        else:
+            x, y = _POINT.unpack_from(body, offset)
+            length = body[offset + _POINT.size]
+            offset += _POINT.size + 1
+            data = {"position": {"x": x, "y": y}}
+            element = body[offset:offset + length].decode("utf-8")
+            offset += length
+            if element:
+                data["element"] = element
+        records.append((kind & ~JSON_BODY, user_id, data))
+    return timestamp_ms, records
+
+
+class PresenceBatcher:
+    """Latest-wins presence updates flushed to each room once per tick
+
+    ``update`` only records the newest state per key, so a user moving the
+    mouse at 200 Hz costs at most ``tick_hz`` sends. On each tick binary
+    clients get one frame holding every changed record, packed once and
+    compressed when they negotiated it and the frame is large enough;
+    JSON clients get the same legacy messages as before, just rate-limited.
+    A record is never echoed to the connection it came from.
+    """
+
+    def __init__(self, broadcaster: FanoutBroadcaster, recipients: Callable[[Hashable], Iterable[Any]],
+                 tick_hz: float = PRESENCE_TICK_HZ, compression_threshold: int = COMPRESSION_THRESHOLD):
+        self.broadcaster = broadcaster
+        self.recipients = recipients
+        self.tick_hz = tick_hz
+        self.compression_threshold = compression_threshold
+        self.sessions: Dict[Any, Dict[str, Optional[str]]] = {}
+        self.pending: Dict[Hashable, Dict[Hashable, Tuple[Dict[str, Any], bytes, Any]]] = defaultdict(dict)
+        self.ticker: Optional[asyncio.Task] = None
+        self.frame_sequence = 0
+        self.stats = {
+            "updates": 0,
+            "coalesced": 0,
+            "ticks": 0,
+            "binary_frames": 0,
+            "compressed_frames": 0,
+            "json_messages": 0,
+            "binary_bytes": 0,
+            "json_bytes": 0
+        }
+
+    # 1. Negotiation
+    def negotiate(self, connection: Any, hello: Dict[str, Any]) -> Dict[str, Any]:
+        """Pick encoding and compression from a client's ``hello``; returns the reply"""
+        encodings = hello.get("encodings") or [ENCODING_JSON]
+        compression = hello.get("compression") or []
+        session = {
+            "encoding": ENCODING_BINARY if ENCODING_BINARY in encodings else ENCODING_JSON,
+            "compression": COMPRESSION_ZLIB if COMPRESSION_ZLIB in compression else None
+        }
+        self.sessions[connection] = session
+        return {"type": "hello", "data": {**session, "tick_hz": self.tick_hz}}
+
+    def forget(self, connection: Any):
+        """Drop the negotiated settings of a closed connection"""
+        self.sessions.pop(connection, None)
+
+    def decode(self, connection: Any, frame: bytes) -> Tuple[int, List[Tuple[int, str, Dict[str, Any]]]]:
+        """Decode a client's frame; compressed frames need negotiated compression"""
+        session = self.sessions.get(connection)
+        allow_compressed = session is not None and session["compression"] == COMPRESSION_ZLIB
+        return decode_frame(frame, allow_compressed=allow_compressed)
+
+    def encoding(self, connection: Any) -> str:
+        session = self.sessions.get(connection)
+        return session["encoding"] if session else ENCODING_JSON
+
+    # 2. Updates
+    def update(self, room: Hashable, key: Hashable, message: Dict[str, Any], kind: int,
+               user_id: str, data: Dict[str, Any], source: Any = None):
+        """Record the latest presence for ``key`` in ``room``
+
+        ``message`` is the JSON form sent to JSON clients; ``kind``,
+        ``user_id`` and ``data`` make the packed binary record.
+        """
+        room_pending = self.pending[room]
+        if key in room_pending:
+            self.stats["coalesced"] += 1
+        room_pending[key] = (message, encode_record(kind, user_id, data), source)
+        self.stats["updates"] += 1
+        if self.ticker is None or self.ticker.done():
+            self.ticker = asyncio.get_running_loop().create_task(self._tick())
+
+    async def _tick(self):
+        interval = 1.0 / self.tick_hz
+        try:
+            while self.pending:
+                await asyncio.sleep(interval)
+                self.flush()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error flushing presence updates: {e}")
+
+    def flush(self):
+        """Send every pending update; called once per tick"""
+        pending, self.pending = self.pending, defaultdict(dict)
+        if not pending:
+            return
+        self.stats["ticks"] += 1
+        timestamp_ms = int(time.time() * 1000)
+        for room, updates in pending.items():
+            self._flush_room(room, list(updates.items()), timestamp_ms)
+
+    def _flush_room(self, room: Hashable, updates: List[Tuple[Hashable, Tuple]], timestamp_ms: int):
+        recipients = list(self.recipients(room))
+        if not recipients:
+            return
+        sources = {source for _, (_, _, source) in updates if source is not None}
+        frames: Dict[Tuple[Any, bool], bytes] = {}
+        payloads: Optional[List[Tuple[Hashable, str, int, Any]]] = None
+
+        for connection in recipients:
+            session = self.sessions.get(connection)
+            if session is None or session["encoding"] == ENCODING_JSON:
+                if payloads is None:
+                    payloads = []
+                    for key, (message, _, source) in updates:
+                        payload = json.dumps(message, default=str)
+                        payloads.append((key, payload, len(payload.encode("utf-8")), source))
+                for key, payload, size, source in payloads:
+                    if source is not connection and self.broadcaster.send(connection, payload, coalesce_key=key):
+                        self.stats["json_messages"] += 1
+                        self.stats["json_bytes"] += size
+                continue
+
+            # One frame per distinct (excluded source, compression) pair
+            excluded = connection if connection in sources else None
+            compress = session["compression"] == COMPRESSION_ZLIB
+            frame_key = (excluded, compress)
+            frame = frames.get(frame_key)
+            if frame is None:
+                records = [record for _, (_, record, source) in updates if excluded is None or source is not excluded]
+                if not records:
+                    continue
+                size = sum(len(record) for record in records)
+                frame = encode_frame(records, timestamp_ms, compress and size >= self.compression_threshold)
+                frames[frame_key] = frame
+                if frame[1] & FLAG_COMPRESSED:
+                    self.stats["compressed_frames"] += 1
+            # Frames may be shed by a full queue but never replace one another
+            self.frame_sequence += 1
+            if self.broadcaster.send(connection, frame, coalesce_key=("presence_frame", self.frame_sequence)):
+                self.stats["binary_frames"] += 1
+                self.stats["binary_bytes"] += len(frame)
+
+    async def close(self):
+        """Stop the ticker without sending what is pending"""
+        if self.ticker is not None:
+            self.ticker.cancel()
+            await asyncio.gather(self.ticker, return_exceptions=True)
+            self.ticker = None
+        self.pending.clear()
+
+    # 3. Metrics
+    def get_metrics(self) -> Dict[str, Any]:
+        """Update, coalescing and bandwidth counters"""
+        return {
+            **self.stats,
+            "binary_sessions": sum(1 for session in self.sessions.values() if session["encoding"] == ENCODING_BINARY),
+            "pending": sum(len(updates) for updates in self.pending.values())
+        }
+
+
+# Example usage and testing
+if __name__ == "__main__":
+    print("🖱️ Presence Protocol Demo")
+    print("=" * 50)
+
+    cursor = {"position": {"x": 412.5, "y": 96.0}, "element": "hero-title"}
+    legacy = json.dumps({
+        "type": "cursor_move",
+        "data": {"user_id": "user-42", "user_name": "Ali", "user_color": "#3b82f6",
+                 "position": cursor["position"], "timestamp": "2024-01-01T12:00:00.000000"}
+    })
+    record = encode_record(KIND_CURSOR, "user-42", cursor)
+    print(f"✅ Cursor as JSON: {len(legacy)} bytes, packed record: {len(record)} bytes")
+
+    records = [encode_record(KIND_CURSOR, f"user-{index}", {"position": {"x": index, "y": index * 2}})
+               for index in range(50)]
+    plain, packed = encode_frame(records, 0), encode_frame(records, 0, compress=True)
+    print(f"✅ 50-user frame: {len(plain)} bytes, compressed: {len(packed)} bytes")
+    print(f"✅ Round trip: {decode_frame(packed)[1][3]}")
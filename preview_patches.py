@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Preview Patches - Debounced, incremental preview updates
+Minimal content splices and style/layout property patches between two
+preview states, and a per-element debouncer that folds bursts of edits
+into a single patch
+"""
+
+import asyncio
+from typing import Any, Callable, Dict, Hashable, Optional
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PATCH_DEBOUNCE = 0.05
+PATCH_MAX_DELAY = 0.25
+
+
+# 1. Diffs
+def diff_text(old: str, new: str) -> Optional[Dict[str, Any]]:
+    """Single splice turning ``old`` into ``new``, or None if they are equal
+
+    Keystroke bursts touch one region of the markup, so trimming the
+    common prefix and suffix gives the minimal patch in practice.
+    """
+    if old == new:
+        return None
+    limit = min(len(old), len(new))
+    start = 0
+    while start < limit and old[start] == new[start]:
+        start += 1
+    end = 0
+    while end < limit - start and old[len(old) - 1 - end] == new[len(new) - 1 - end]:
+        end += 1
+    return {"at": start, "delete": len(old) - start - end, "insert": new[start:len(new) - end]}
+
+
+def apply_text_patch(text: str, patch: Dict[str, Any]) -> str:
+    """Apply a splice from ``diff_text``"""
+    at = patch["at"]
+    if at + patch["delete"] > len(text):
+        raise ValueError("patch does not fit the text")
+    return text[:at] + patch["insert"] + text[at + patch["delete"]:]
+
+
+def diff_properties(old: Dict[str, Any], new: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Changed and removed keys between two property maps, or None if equal"""
+    changed = {key: value for key, value in new.items() if key not in old or old[key] != value}
+    removed = [key for key in old if key not in new]
+    if not changed and not removed:
+        return None
+    return {"set": changed, "unset": removed}
+
+
+def apply_property_patch(values: Dict[str, Any], patch: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply a patch from ``diff_properties``"""
+    result = {key: value for key, value in values.items() if key not in patch["unset"]}
+    result.update(patch["set"])
+    return result
+
+
+def merge_properties(values: Dict[str, Any], updates: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply editor updates to a property map; a None value removes the property"""
+    result = dict(values)
+    for key, value in updates.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = value
+    return result
+
+
+# 2. Debouncing
+class EditDebouncer:
+    """Folds bursts of edits per key into one flush
+
+    An edit is flushed once no further edit for the same key arrived for
+    ``delay`` seconds, and at most ``max_delay`` seconds after the first
+    edit of the burst so continuous typing still shows up. Content edits
+    keep the latest value; style and layout updates are merged.
+    """
+
+    def __init__(self, on_flush: Callable[[Hashable, Dict[str, Any]], None],
+                 delay: float = PATCH_DEBOUNCE, max_delay: float = PATCH_MAX_DELAY):
+        self.on_flush = on_flush
+        self.delay = delay
+        self.max_delay = max_delay
+        self.pending: Dict[Hashable, Dict[str, Any]] = {}
+        self.timers: Dict[Hashable, asyncio.TimerHandle] = {}
+        self.stats = {"edits": 0, "flushes": 0}
+
+    def submit(self, key: Hashable, content: Optional[str] = None, styles: Optional[Dict[str, Any]] = None,
+               layout: Optional[Dict[str, Any]] = None, user_id: Optional[str] = None):
+        """Record an edit and (re)arm the key's timer"""
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        edit = self.pending.get(key)
+        if edit is None:
+            edit = self.pending[key] = {"started": now, "styles": {}, "layout": {}, "edits": 0}
+        if content is not None:
+            edit["content"] = content
+        edit["styles"].update(styles or {})
+        edit["layout"].update(layout or {})
+        edit["user_id"] = user_id
+        edit["edits"] += 1
+        self.stats["edits"] += 1
+
+        timer = self.timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        due = min(now + self.delay, edit["started"] + self.max_delay)
+        self.timers[key] = loop.call_at(due, self.flush, key)
+
+    def flush(self, key: Hashable):
+        """Flush one key now"""
+        timer = self.timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        edit = self.pending.pop(key, None)
+        if edit is None:
+            return
+        self.stats["flushes"] += 1
+        try:
+            self.on_flush(key, edit)
+        except Exception as e:
+            logger.error(f"Error flushing edits for {key}: {e}")
+
+    def flush_where(self, predicate: Callable[[Hashable], bool]):
+        """Flush every pending key matching ``predicate``"""
+        for key in [key for key in self.pending if predicate(key)]:
+            self.flush(key)
+
+    def cancel(self):
+        """Drop every pending edit"""
+        for timer in self.timers.values():
+            timer.cancel()
+        self.timers.clear()
+        self.pending.clear()
+
+
+# Example usage and testing
+if __name__ == "__main__":
+    print("🧩 Preview Patches Demo")
+    print("=" * 50)
+
+    before = "<h1>Hello world</h1><p>Welcome to our store</p>"
+    after = "<h1>Hello brave new world</h1><p>Welcome to our store</p>"
+    patch = diff_text(before, after)
+    print(f"✅ Content patch: {patch} ({len(str(patch))} vs {len(after)} chars)")
+    print(f"✅ Round trip: {apply_text_patch(before, patch) == after}")
+    print(f"✅ Style patch: {diff_properties({'color': 'red', 'margin': '0'}, {'color': 'blue'})}")
+
+    async def main():
+        flushed = []
+        debouncer = EditDebouncer(lambda key, edit: flushed.append((key, edit["content"], edit["edits"])),
+                                  delay=0.01)
+        for length in range(1, 6):
+            debouncer.submit("title", content="Hello"[:length])
+        await asyncio.sleep(0.05)
+        print(f"✅ Five keystrokes flushed as: {flushed}")
+
+    asyncio.run(main())
@@ -10,7 +10,7 @@ import hashlib
 import secrets
 import time
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Tuple, Union
+from typing import Dict, List, Optional, Any, Tuple, Union, BinaryIO, Sequence
 from dataclasses import dataclass, asdict
 from enum import Enum
 import logging
@@ -23,7 +23,16 @@ from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from cryptography.hazmat.backends import default_backend
 import base64
 import os
-import struct
+import asyncio
+import threading
+from collections.abc import MutableMapping
+from concurrent.futures import ProcessPoolExecutor
+
+from bounded_cache import BoundedCache, CacheBackend, MappedBlobStore
+from polynomial_ring import PolynomialRing, get_polynomial_ring
+from gf2_matrix import GF2Matrix, bits_to_bytes, bytes_to_bits
+from hybrid_encryption import (DEFAULT_CHUNK_SIZE, EncryptedBatch, HybridHeader, StreamIntegrityError,
+                               decrypt_stream, derive_session_key, encrypt_stream, open_batch, seal_batch)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -74,15 +83,79 @@ class SecurityPolicy:
     authentication_enabled: bool
     key_exchange_enabled: bool
 
+class QuantumKeyStore(MutableMapping):
+    """Key registry that can keep large public keys in memory-mapped files
+
+    Behaves like the plain ``Dict[str, QuantumResistantKey]`` it replaces.
+    With a ``MappedBlobStore`` configured, public keys of at least
+    ``map_threshold`` bytes (code-based keys run to megabytes) are written
+    to disk and the key object holds a read-only map instead of the bytes.
+    """
+    
+    def __init__(self, mapped_store: Optional[MappedBlobStore] = None, map_threshold: int = 1024 * 1024):
+        self.mapped_store = mapped_store
+        self.map_threshold = map_threshold
+        self._keys: Dict[str, QuantumResistantKey] = {}
+    
+    def __setitem__(self, key_id: str, key: QuantumResistantKey):
+        if key_id in self._keys:
+            del self[key_id]
+        if (self.mapped_store is not None and isinstance(key.public_key, (bytes, bytearray))
+                and len(key.public_key) >= self.map_threshold):
+            if self.mapped_store.set(key_id, key.public_key):
+                key.public_key = self.mapped_store.get(key_id)
+        self._keys[key_id] = key
+    
+    def __getitem__(self, key_id: str) -> QuantumResistantKey:
+        return self._keys[key_id]
+    
+    def __delitem__(self, key_id: str):
+        del self._keys[key_id]
+        if self.mapped_store is not None:
+            self.mapped_store.delete(key_id)
+    
+    def __iter__(self):
+        return iter(self._keys)
+    
+    def __len__(self) -> int:
+        return len(self._keys)
+    
+    def get_metrics(self) -> Dict:
+        """Key counts and where public key bytes live"""
+        mapped_ids = set()
+        if self.mapped_store is not None:
+            mapped_ids = {key_id for key_id in self._keys if key_id in self.mapped_store}
+        resident = sum((0 if key_id in mapped_ids else len(key.public_key)) + len(key.private_key or b"")
+                       for key_id, key in self._keys.items())
+        return {
+            "keys": len(self._keys),
+            "mapped_keys": len(mapped_ids),
+            "mapped_bytes": self.mapped_store.current_bytes if self.mapped_store is not None else 0,
+            "resident_key_bytes": resident
+        }
+
 class QuantumResistantSecurity:
     """Revolutionary quantum-resistant security system"""
     
-    def __init__(self):
-        self.keys: Dict[str, QuantumResistantKey] = {}
+    def __init__(self, encryption_cache: Optional[CacheBackend] = None,
+                 signature_cache: Optional[CacheBackend] = None,
+                 key_storage_directory: Optional[str] = None):
+        mapped_store = MappedBlobStore(key_storage_directory) if key_storage_directory else None
+        self.keys = QuantumKeyStore(mapped_store)
         self.security_policies: Dict[str, SecurityPolicy] = {}
-        self.encryption_cache: Dict[str, bytes] = {}
-        self.signature_cache: Dict[str, bytes] = {}
+        # Decoded public key material, reused across encrypt/decrypt calls
+        self.encryption_cache = encryption_cache if encryption_cache is not None else \
+            BoundedCache(max_bytes=256 * 1024 * 1024, default_ttl=3600)
+        # Decoded private keys stay in this process, never in a pluggable or shared cache
+        self.private_key_cache = BoundedCache(max_bytes=64 * 1024 * 1024, default_ttl=3600)
+        # Signatures are deterministic per (key, message)
+        self.signature_cache = signature_cache if signature_cache is not None else \
+            BoundedCache(max_bytes=16 * 1024 * 1024, default_ttl=3600)
         self.quantum_random_generator = None
+        # Worker processes for batch encryption, started on first use and kept until shutdown()
+        self._batch_executor: Optional[ProcessPoolExecutor] = None
+        self._batch_workers: Optional[int] = None
+        self._batch_lock = threading.Lock()
         
         # Initialize quantum-resistant security
         self._initialize_quantum_random_generator()
@@ -218,16 +291,16 @@ class QuantumResistantSecurity:
         df = params["df"]
         dg = params["dg"]
         
-        # Generate random polynomials
-        f = self._generate_random_polynomial(n, df)
+        # Generate random polynomials; f = 1 + p*F so that f is 1 mod p and
+        # decryption needs no inverse mod p. F gets an even number of +-1s,
+        # which makes f invertible mod 2 and hence mod the power-of-two q.
+        f = np.asarray(self._generate_random_polynomial(n, df - df % 2), dtype=np.int64) * p
+        f[0] += 1
         g = self._generate_random_polynomial(n, dg)
         
         # Compute public key h = p * g * f^(-1) mod q
         f_inv = self._polynomial_inverse(f, q)
-        h = self._polynomial_multiply(
-            self._polynomial_multiply([p] * n, g, q),
-            f_inv, q
-        )
+        h = self._polynomial_multiply(np.asarray(g, dtype=np.int64) * p, f_inv, q)
         
         # Serialize keys
         public_key = self._serialize_polynomial(h)
@@ -248,38 +321,25 @@ class QuantumResistantSecurity:
         
         return poly
     
-    def _polynomial_inverse(self, poly: List[int], modulus: int) -> List[int]:
-        """Compute polynomial inverse modulo modulus"""
-        # Simplified polynomial inverse (in practice, use extended Euclidean algorithm)
-        n = len(poly)
-        result = [0] * n
-        
-        # For demonstration, use a simple approach
-        for i in range(n):
-            if poly[i] != 0:
-                result[i] = pow(poly[i], -1, modulus)
-        
-        return result
+    def _get_polynomial_ring(self, n: int, modulus: int) -> PolynomialRing:
+        """Get the NTT-backed ring Z_q[X]/(X^n - 1)"""
+        return get_polynomial_ring(n, modulus)
+    
+    def _polynomial_inverse(self, poly: List[int], modulus: int) -> np.ndarray:
+        """Compute polynomial inverse in Z_q[X]/(X^n - 1)"""
+        return self._get_polynomial_ring(len(poly), modulus).inverse(poly)
     
-    def _polynomial_multiply(self, poly1: List[int], poly2: List[int], modulus: int) -> List[int]:
+    def _polynomial_multiply(self, poly1: List[int], poly2: List[int], modulus: int) -> np.ndarray:
         """Multiply two polynomials modulo modulus"""
-        n = len(poly1)
-        result = [0] * n
-        
-        for i in range(n):
-            for j in range(n):
-                k = (i + j) % n
-                result[k] = (result[k] + poly1[i] * poly2[j]) % modulus
-        
-        return result
+        return self._get_polynomial_ring(len(poly1), modulus).multiply(poly1, poly2)
     
     def _serialize_polynomial(self, poly: List[int]) -> bytes:
         """Serialize polynomial to bytes"""
-        return struct.pack(f"{len(poly)}i", *poly)
+        return PolynomialRing.to_bytes(poly)
     
-    def _deserialize_polynomial(self, data: bytes) -> List[int]:
+    def _deserialize_polynomial(self, data: bytes) -> np.ndarray:
         """Deserialize bytes to polynomial"""
-        return list(struct.unpack(f"{len(data)//4}i", data))
+        return PolynomialRing.from_bytes(data)
     
     # 2. Hash-Based Signatures
     async def generate_hash_based_key(self, security_level: SecurityLevel = SecurityLevel.LEVEL_5) -> QuantumResistantKey:
@@ -450,62 +510,48 @@ class QuantumResistantSecurity:
         
         return public_key_bytes, private_key_bytes
     
-    def _generate_random_matrix(self, rows: int, cols: int) -> List[List[int]]:
+    def _generate_random_matrix(self, rows: int, cols: int) -> GF2Matrix:
         """Generate random binary matrix"""
-        matrix = []
-        for _ in range(rows):
-            row = [self.quantum_random_generator.randint(0, 1) for _ in range(cols)]
-            matrix.append(row)
-        return matrix
+        return GF2Matrix.random(rows, cols, secrets.token_bytes)
     
-    def _generate_random_permutation(self, n: int) -> List[List[int]]:
+    def _generate_random_permutation(self, n: int) -> GF2Matrix:
         """Generate random permutation matrix"""
         permutation = list(range(n))
         self.quantum_random_generator.shuffle(permutation)
-        
-        matrix = [[0] * n for _ in range(n)]
-        for i, j in enumerate(permutation):
-            matrix[i][j] = 1
-        
-        return matrix
+        return GF2Matrix.from_permutation(permutation)
     
-    def _generate_random_invertible_matrix(self, n: int) -> List[List[int]]:
+    def _generate_random_invertible_matrix(self, n: int) -> GF2Matrix:
         """Generate random invertible matrix"""
         # Generate random matrix
         matrix = self._generate_random_matrix(n, n)
         
         # Ensure invertibility (simplified)
-        for i in range(n):
-            matrix[i][i] = 1
+        matrix.words |= GF2Matrix.identity(n).words
         
         return matrix
     
-    def _matrix_multiply(self, matrix1: List[List[int]], matrix2: List[List[int]]) -> List[List[int]]:
-        """Multiply two matrices"""
-        rows1, cols1 = len(matrix1), len(matrix1[0])
-        rows2, cols2 = len(matrix2), len(matrix2[0])
-        
-        result = [[0] * cols2 for _ in range(rows1)]
-        
-        for i in range(rows1):
-            for j in range(cols2):
-                for k in range(cols1):
-                    result[i][j] ^= matrix1[i][k] & matrix2[k][j]
-        
-        return result
+    def _to_gf2_matrix(self, matrix: Union[GF2Matrix, List[List[int]]]) -> GF2Matrix:
+        """Accept both packed matrices and the list-of-rows representation"""
+        return matrix if isinstance(matrix, GF2Matrix) else GF2Matrix.from_rows(matrix)
     
-    def _serialize_matrix(self, matrix: List[List[int]]) -> bytes:
-        """Serialize matrix to bytes"""
-        rows, cols = len(matrix), len(matrix[0])
-        data = struct.pack("II", rows, cols)
+    def _matrix_multiply(self, matrix1: Union[GF2Matrix, List[List[int]]],
+                         matrix2: Union[GF2Matrix, List[List[int]]]) -> GF2Matrix:
+        """Multiply two matrices over GF(2)"""
+        matrix1 = self._to_gf2_matrix(matrix1)
+        matrix2 = self._to_gf2_matrix(matrix2)
         
-        for row in matrix:
-            for val in row:
-                data += struct.pack("B", val)
+        # Permutation matrices only move columns
+        if matrix2.is_permutation():
+            return matrix1.apply_permutation(matrix2.permutation())
         
-        return data
+        return matrix1.multiply(matrix2)
+    
+    def _serialize_matrix(self, matrix: Union[GF2Matrix, List[List[int]]]) -> bytes:
+        """Serialize matrix to bytes (rows, cols, one byte per entry)"""
+        return self._to_gf2_matrix(matrix).to_legacy_bytes()
     
-    def _serialize_private_key(self, invertible_matrix: List[List[int]], permutation: List[List[int]]) -> bytes:
+    def _serialize_private_key(self, invertible_matrix: Union[GF2Matrix, List[List[int]]],
+                               permutation: Union[GF2Matrix, List[List[int]]]) -> bytes:
         """Serialize private key components"""
         data = b""
         data += self._serialize_matrix(invertible_matrix)
@@ -535,12 +581,12 @@ class QuantumResistantSecurity:
     async def _encrypt_lattice(self, data: bytes, key: QuantumResistantKey) -> bytes:
         """Encrypt using lattice-based cryptography"""
         # Simulate NTRU encryption
-        public_key = self._deserialize_polynomial(key.public_key)
+        public_key = self._get_public_key_material(key)
         n = len(public_key)
         
         # Pad data to polynomial length
         padded_data = data + b'\x00' * (n * 4 - len(data))
-        message = list(struct.unpack(f"{n}i", padded_data))
+        message = PolynomialRing.from_bytes(padded_data)
         
         # Generate random polynomial r
         params = key.metadata["lattice_params"]
@@ -558,35 +604,26 @@ class QuantumResistantSecurity:
         # Serialize encrypted data
         encrypted_bytes = self._serialize_polynomial(encrypted)
         
-        # Cache for performance
-        cache_key = hashlib.sha256(data).hexdigest()
-        self.encryption_cache[cache_key] = encrypted_bytes
-        
         return encrypted_bytes
     
     async def _encrypt_code_based(self, data: bytes, key: QuantumResistantKey) -> bytes:
         """Encrypt using code-based cryptography"""
         # Simulate McEliece encryption
-        public_key = self._deserialize_matrix(key.public_key)
+        public_key = self._get_public_key_material(key)
         params = key.metadata["mceliece_params"]
         
-        # Convert data to binary vector
-        data_bits = self._bytes_to_bits(data)
+        # Convert data to binary vector, padded or truncated to k bits
         k = params["k"]
-        
-        # Pad or truncate to k bits
-        if len(data_bits) < k:
-            data_bits.extend([0] * (k - len(data_bits)))
-        else:
-            data_bits = data_bits[:k]
+        data_bits = np.zeros(k, dtype=np.uint8)
+        bits = self._bytes_to_bits(data)[:k]
+        data_bits[:len(bits)] = bits
         
         # Generate random error vector
         n = params["n"]
         t = params["t"]
         error_positions = self.quantum_random_generator.sample(range(n), t)
-        error_vector = [0] * n
-        for pos in error_positions:
-            error_vector[pos] = 1
+        error_vector = np.zeros(n, dtype=np.uint8)
+        error_vector[error_positions] = 1
         
         # Encrypt: c = m * G + e
         encrypted = self._vector_matrix_multiply(data_bits, public_key)
@@ -597,60 +634,67 @@ class QuantumResistantSecurity:
         
         return encrypted_bytes
     
-    def _polynomial_add(self, poly1: List[int], poly2: List[int], modulus: int) -> List[int]:
+    def _polynomial_add(self, poly1: List[int], poly2: List[int], modulus: int) -> np.ndarray:
         """Add two polynomials modulo modulus"""
-        result = []
-        for a, b in zip(poly1, poly2):
-            result.append((a + b) % modulus)
-        return result
+        return self._get_polynomial_ring(len(poly1), modulus).add(poly1, poly2)
     
-    def _deserialize_matrix(self, data: bytes) -> List[List[int]]:
+    def _deserialize_matrix(self, data: bytes) -> GF2Matrix:
         """Deserialize bytes to matrix"""
-        rows, cols = struct.unpack("II", data[:8])
-        matrix = []
-        
-        offset = 8
-        for _ in range(rows):
-            row = []
-            for _ in range(cols):
-                row.append(struct.unpack("B", data[offset:offset+1])[0])
-                offset += 1
-            matrix.append(row)
-        
-        return matrix
+        return GF2Matrix.from_legacy_bytes(data)[0]
     
-    def _bytes_to_bits(self, data: bytes) -> List[int]:
-        """Convert bytes to list of bits"""
-        bits = []
-        for byte in data:
-            for i in range(8):
-                bits.append((byte >> i) & 1)
-        return bits
-    
-    def _bits_to_bytes(self, bits: List[int]) -> bytes:
-        """Convert list of bits to bytes"""
-        data = bytearray()
-        for i in range(0, len(bits), 8):
-            byte = 0
-            for j in range(8):
-                if i + j < len(bits):
-                    byte |= bits[i + j] << j
-            data.append(byte)
-        return bytes(data)
-    
-    def _vector_matrix_multiply(self, vector: List[int], matrix: List[List[int]]) -> List[int]:
+    def _bytes_to_bits(self, data: bytes) -> np.ndarray:
+        """Convert bytes to bits (least significant bit first)"""
+        return bytes_to_bits(data)
+    
+    def _bits_to_bytes(self, bits: Union[List[int], np.ndarray]) -> bytes:
+        """Convert bits (least significant bit first) to bytes"""
+        return bits_to_bytes(bits)
+    
+    def _vector_matrix_multiply(self, vector: Union[List[int], np.ndarray],
+                                matrix: Union[GF2Matrix, List[List[int]]]) -> np.ndarray:
         """Multiply vector by matrix"""
-        result = []
-        for col in range(len(matrix[0])):
-            val = 0
-            for row in range(len(vector)):
-                val ^= vector[row] & matrix[row][col]
-            result.append(val)
-        return result
-    
-    def _vector_xor(self, vec1: List[int], vec2: List[int]) -> List[int]:
+        return self._to_gf2_matrix(matrix).vector_multiply(vector)
+    
+    def _vector_xor(self, vec1: Union[List[int], np.ndarray], vec2: Union[List[int], np.ndarray]) -> np.ndarray:
         """XOR two vectors"""
-        return [a ^ b for a, b in zip(vec1, vec2)]
+        length = min(len(vec1), len(vec2))
+        return np.bitwise_xor(np.asarray(vec1[:length], dtype=np.uint8), np.asarray(vec2[:length], dtype=np.uint8))
+    
+    def _get_public_key_material(self, key: QuantumResistantKey) -> Union[np.ndarray, GF2Matrix]:
+        """Decoded public key, cached by key id"""
+        cache_key = ("public", key.id)
+        material = self.encryption_cache.get(cache_key)
+        if material is None:
+            if key.algorithm == QuantumResistantAlgorithm.CODE_BASED:
+                material = self._deserialize_matrix(key.public_key)
+            else:
+                material = self._deserialize_polynomial(key.public_key)
+            self._freeze_material(material)
+            self.encryption_cache.set(cache_key, material)
+        return material
+    
+    def _get_private_key_material(self, key: QuantumResistantKey) -> Union[np.ndarray, Tuple[GF2Matrix, GF2Matrix]]:
+        """Decoded private key, cached in process memory by key id"""
+        material = self.private_key_cache.get(key.id)
+        if material is None:
+            if key.algorithm == QuantumResistantAlgorithm.CODE_BASED:
+                material = self._deserialize_private_key(key.private_key)
+            else:
+                material = self._deserialize_polynomial(key.private_key)
+            self._freeze_material(material)
+            self.private_key_cache.set(key.id, material)
+        return material
+    
+    def _evict_key_material(self, key_id: str):
+        """Drop a key's decoded material from the caches"""
+        self.encryption_cache.delete(("public", key_id))
+        self.private_key_cache.delete(key_id)
+    
+    def _freeze_material(self, material: Any):
+        """Make cached arrays read-only so callers cannot corrupt shared entries"""
+        for item in (material if isinstance(material, tuple) else (material,)):
+            array = item.words if isinstance(item, GF2Matrix) else item
+            array.flags.writeable = False
     
     # 5. Quantum-Resistant Decryption
     async def decrypt_quantum_resistant(self, encrypted_data: bytes, key_id: str) -> bytes:
@@ -675,7 +719,7 @@ class QuantumResistantSecurity:
     async def _decrypt_lattice(self, encrypted_data: bytes, key: QuantumResistantKey) -> bytes:
         """Decrypt using lattice-based cryptography"""
         # Simulate NTRU decryption
-        private_key = self._deserialize_polynomial(key.private_key)
+        private_key = self._get_private_key_material(key)
         encrypted = self._deserialize_polynomial(encrypted_data)
         params = key.metadata["lattice_params"]
         
@@ -687,40 +731,30 @@ class QuantumResistantSecurity:
         temp = self._polynomial_multiply(encrypted, private_key, q)
         
         # Then reduce mod p
-        decrypted = [val % p for val in temp]
+        decrypted = temp % p
         
         # Convert back to bytes
-        decrypted_bytes = struct.pack(f"{len(decrypted)}i", *decrypted)
+        decrypted_bytes = PolynomialRing.to_bytes(decrypted)
         
         return decrypted_bytes.rstrip(b'\x00')
     
     async def _decrypt_code_based(self, encrypted_data: bytes, key: QuantumResistantKey) -> bytes:
         """Decrypt using code-based cryptography"""
         # Simulate McEliece decryption
-        private_key_data = key.private_key
         params = key.metadata["mceliece_params"]
         
         # Deserialize private key components
-        invertible_matrix, permutation = self._deserialize_private_key(private_key_data)
+        invertible_matrix, permutation = self._get_private_key_material(key)
         
-        # Convert encrypted data to bits
-        encrypted_bits = self._bytes_to_bits(encrypted_data)
+        # Convert encrypted data to bits, truncated or padded to n bits
         n = params["n"]
+        encrypted_bits = np.zeros(n, dtype=np.uint8)
+        bits = self._bytes_to_bits(encrypted_data)[:n]
+        encrypted_bits[:len(bits)] = bits
         
-        # Truncate or pad to n bits
-        if len(encrypted_bits) < n:
-            encrypted_bits.extend([0] * (n - len(encrypted_bits)))
-        else:
-            encrypted_bits = encrypted_bits[:n]
-        
-        # Apply inverse permutation
-        permuted_bits = [0] * n
-        for i, bit in enumerate(encrypted_bits):
-            # Find where i maps to in permutation
-            for j, val in enumerate(permutation[i]):
-                if val == 1:
-                    permuted_bits[j] = bit
-                    break
+        # Apply inverse permutation: bit i moves to where row i of P points
+        permuted_bits = np.zeros(n, dtype=np.uint8)
+        permuted_bits[permutation.permutation()] = encrypted_bits
         
         # Decode using error correction (simplified)
         k = params["k"]
@@ -731,32 +765,10 @@ class QuantumResistantSecurity:
         
         return decrypted_bytes
     
-    def _deserialize_private_key(self, data: bytes) -> Tuple[List[List[int]], List[List[int]]]:
+    def _deserialize_private_key(self, data: bytes) -> Tuple[GF2Matrix, GF2Matrix]:
         """Deserialize private key components"""
-        # Read invertible matrix
-        rows, cols = struct.unpack("II", data[:8])
-        invertible_matrix = []
-        
-        offset = 8
-        for _ in range(rows):
-            row = []
-            for _ in range(cols):
-                row.append(struct.unpack("B", data[offset:offset+1])[0])
-                offset += 1
-            invertible_matrix.append(row)
-        
-        # Read permutation matrix
-        rows, cols = struct.unpack("II", data[offset:offset+8])
-        permutation = []
-        
-        offset += 8
-        for _ in range(rows):
-            row = []
-            for _ in range(cols):
-                row.append(struct.unpack("B", data[offset:offset+1])[0])
-                offset += 1
-            permutation.append(row)
-        
+        invertible_matrix, offset = GF2Matrix.from_legacy_bytes(data)
+        permutation, _ = GF2Matrix.from_legacy_bytes(data, offset)
         return invertible_matrix, permutation
     
     # 6. Quantum-Resistant Signatures
@@ -786,12 +798,17 @@ class QuantumResistantSecurity:
         # Hash the message
         message_hash = hashlib.sha256(data).digest()
         
+        # Reuse the signature of a message already signed with this key
+        cache_key = (key.id, message_hash)
+        signature = self.signature_cache.get(cache_key)
+        if signature is not None:
+            return signature
+        
         # Generate signature (simplified)
         signature = message_hash + private_key[:params["n"]]
         
         # Cache signature
-        cache_key = hashlib.sha256(data).hexdigest()
-        self.signature_cache[cache_key] = signature
+        self.signature_cache.set(cache_key, signature)
         
         return signature
     
@@ -851,6 +868,7 @@ class QuantumResistantSecurity:
             
             # Mark old key as expired
             old_key.expires_at = datetime.now()
+            self._evict_key_material(key_id)
             
             logger.info(f"Key {key_id} rotated to {new_key.id}")
             
@@ -890,6 +908,10 @@ class QuantumResistantSecurity:
                 "expired_keys": self._count_expired_keys(),
                 "encryption_cache_size": len(self.encryption_cache),
                 "signature_cache_size": len(self.signature_cache),
+                "private_key_cache_size": len(self.private_key_cache),
+                "encryption_cache": self.encryption_cache.get_metrics(),
+                "signature_cache": self.signature_cache.get_metrics(),
+                "key_store": self.keys.get_metrics(),
                 "security_policies": len(self.security_policies),
                 "quantum_random_available": self.quantum_random_generator is not None
             }
@@ -927,6 +949,144 @@ class QuantumResistantSecurity:
         
         return expired_count
 
+    # 9. Hybrid Streaming and Batch Encryption
+    def _get_hybrid_key(self, key_id: str) -> QuantumResistantKey:
+        """Look up a key usable as KEM for hybrid encryption"""
+        if key_id not in self.keys:
+            raise ValueError(f"Key {key_id} not found")
+        key = self.keys[key_id]
+        if key.algorithm != QuantumResistantAlgorithm.LATTICE_BASED:
+            raise ValueError(f"Hybrid encryption not supported for algorithm {key.algorithm}")
+        return key
+    
+    def _encapsulate_key(self, key: QuantumResistantKey) -> Tuple[bytes, bytes]:
+        """NTRU encapsulation: encrypt a random ternary m, shared secret = H(m mod p)"""
+        params = key.metadata["lattice_params"]
+        n, q, p = params["n"], params["q"], params["p"]
+        
+        h = self._get_public_key_material(key)
+        m = np.asarray(self._generate_random_polynomial(n, 2 * n // 3), dtype=np.int64)
+        r = self._generate_random_polynomial(n, params["dr"])
+        
+        # c = r * h + m mod q
+        c = self._polynomial_add(self._polynomial_multiply(r, h, q), m, q)
+        
+        return self._serialize_polynomial(c), self._kem_shared_secret(m, p)
+    
+    def _decapsulate_key(self, key: QuantumResistantKey, encapsulated_key: bytes) -> bytes:
+        """Recover the shared secret: m = center(c * f mod q) mod p"""
+        params = key.metadata["lattice_params"]
+        n, q, p = params["n"], params["q"], params["p"]
+        
+        c = self._deserialize_polynomial(encapsulated_key)
+        if len(c) != n:
+            raise StreamIntegrityError("Encapsulated key has the wrong length")
+        
+        a = self._polynomial_multiply(c, self._get_private_key_material(key), q)
+        a = np.where(a > q // 2, a - q, a)
+        m = (a + p // 2) % p - p // 2
+        
+        return self._kem_shared_secret(m, p)
+    
+    def _kem_shared_secret(self, message: np.ndarray, p: int) -> bytes:
+        """Hash the KEM message polynomial to a 32-byte secret"""
+        return hashlib.sha256(b"ntru-kem" + (message % p).astype(np.uint8).tobytes()).digest()
+    
+    def _new_hybrid_session(self, key_id: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Tuple[HybridHeader, bytes]:
+        """Encapsulate a fresh session key under ``key_id``"""
+        key = self._get_hybrid_key(key_id)
+        encapsulated_key, shared_secret = self._encapsulate_key(key)
+        header = HybridHeader(key_id=key_id, encapsulated_key=encapsulated_key, chunk_size=chunk_size)
+        return header, derive_session_key(shared_secret, header)
+    
+    def _open_hybrid_session(self, header: HybridHeader) -> bytes:
+        """Session key for a received header"""
+        key = self._get_hybrid_key(header.key_id)
+        return derive_session_key(self._decapsulate_key(key, header.encapsulated_key), header)
+    
+    async def encrypt_stream(self, source: BinaryIO, destination: BinaryIO, key_id: str,
+                             chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+        """Encrypt a file-like object of any size; returns bytes written"""
+        try:
+            header, session_key = self._new_hybrid_session(key_id, chunk_size)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, encrypt_stream, source, destination, header, session_key)
+        
+        except Exception as e:
+            logger.error(f"Error in hybrid stream encryption: {e}")
+            raise
+    
+    async def decrypt_stream(self, source: BinaryIO, destination: BinaryIO) -> int:
+        """Decrypt a stream written by ``encrypt_stream``; returns plaintext bytes"""
+        try:
+            header = HybridHeader.read(source)
+            session_key = self._open_hybrid_session(header)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, decrypt_stream, source, destination, header, session_key)
+        
+        except Exception as e:
+            logger.error(f"Error in hybrid stream decryption: {e}")
+            raise
+    
+    async def encrypt_batch(self, payloads: Sequence[bytes], key_id: str,
+                            max_workers: Optional[int] = None, slice_size: int = 256) -> EncryptedBatch:
+        """Encrypt many small payloads under one encapsulated session key
+        
+        Payloads are sealed in slices of ``slice_size``; batches spanning
+        several slices are spread over a process pool.
+        """
+        try:
+            header, session_key = self._new_hybrid_session(key_id)
+            ciphertexts = await self._run_batch(seal_batch, payloads, header, session_key, max_workers, slice_size)
+            return EncryptedBatch(header=header, ciphertexts=ciphertexts)
+        
+        except Exception as e:
+            logger.error(f"Error in hybrid batch encryption: {e}")
+            raise
+    
+    async def decrypt_batch(self, batch: Union[EncryptedBatch, bytes], max_workers: Optional[int] = None,
+                            slice_size: int = 256) -> List[bytes]:
+        """Decrypt a batch produced by ``encrypt_batch``"""
+        try:
+            if not isinstance(batch, EncryptedBatch):
+                batch = EncryptedBatch.from_bytes(batch)
+            session_key = self._open_hybrid_session(batch.header)
+            return await self._run_batch(open_batch, batch.ciphertexts, batch.header, session_key,
+                                         max_workers, slice_size)
+        
+        except Exception as e:
+            logger.error(f"Error in hybrid batch decryption: {e}")
+            raise
+    
+    async def _run_batch(self, function, items: Sequence[bytes], header: HybridHeader, session_key: bytes,
+                         max_workers: Optional[int], slice_size: int) -> List[bytes]:
+        loop = asyncio.get_running_loop()
+        if len(items) <= slice_size or max_workers == 1:
+            return await loop.run_in_executor(None, function, items, header, session_key)
+        
+        executor = self._get_batch_executor(max_workers)
+        return await loop.run_in_executor(None, function, items, header, session_key, executor, slice_size)
+
+    def _get_batch_executor(self, max_workers: Optional[int]) -> ProcessPoolExecutor:
+        stale = None
+        with self._batch_lock:
+            if self._batch_executor is None or (max_workers is not None and max_workers != self._batch_workers):
+                stale = self._batch_executor
+                self._batch_executor = ProcessPoolExecutor(max_workers=max_workers)
+                self._batch_workers = max_workers
+            executor = self._batch_executor
+        if stale is not None:
+            stale.shutdown(wait=False)
+        return executor
+
+    def shutdown(self, wait: bool = True):
+        """Stop the batch worker processes"""
+        with self._batch_lock:
+            executor, self._batch_executor = self._batch_executor, None
+            self._batch_workers = None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
 # Example usage and testing
 if __name__ == "__main__":
     # Initialize quantum-resistant security
@@ -13,17 +13,27 @@ from typing import Dict, List, Optional, Set, Any
 from dataclasses import dataclass, asdict
 from enum import Enum
 import logging
-from collections import defaultdict
+from collections import defaultdict, deque
 import redis
 import websockets
 from websockets.server import WebSocketServerProtocol
 import jwt
 from functools import wraps
+from websocket_broadcaster import FanoutBroadcaster
+from collaboration_merge import (DOCUMENT_OPERATION_TYPES, ElementDocument, MergeEngine, ResyncRequired,
+                                 operation_to_change)
+from collaboration_store import OperationLog
+from collaboration_backplane import Backplane, owner_node
+from presence_protocol import FRAME_MAGIC, KIND_CURSOR, KIND_SELECTION, PresenceBatcher
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Operations kept in memory per project; the full history lives in the operation log
+RECENT_OPERATIONS = 200
+REPLICA_SYNC_TIMEOUT = 5.0
+
 class UserRole(Enum):
     """User roles in collaboration"""
     OWNER = "owner"
@@ -84,14 +94,41 @@ class Project:
     is_active: bool = True
 
 class RealTimeCollaboration:
-    """Real-time collaboration system with WebSocket support"""
+    """Real-time collaboration system with WebSocket support
+
+    Committed operations and snapshots go to ``operation_log``, or to an
+    ``OperationLog`` opened at ``operation_log_path``. The default path is
+    ``:memory:``, which keeps nothing across a restart; deployments must
+    pass a file path (one per node) for documents to be recovered.
+    """
     
-    def __init__(self, redis_url: str = "redis://localhost:6379"):
+    def __init__(self, redis_url: str = "redis://localhost:6379", broadcaster: Optional[FanoutBroadcaster] = None,
+                 operation_log: Optional[OperationLog] = None, backplane: Optional[Backplane] = None,
+                 node_id: Optional[str] = None, nodes: Optional[List[str]] = None,
+                 presence: Optional[PresenceBatcher] = None, operation_log_path: str = ":memory:"):
         self.redis_client = redis.from_url(redis_url)
         self.active_connections: Dict[str, Set[WebSocketServerProtocol]] = defaultdict(set)
+        self.broadcaster = broadcaster if broadcaster is not None else FanoutBroadcaster()
+        if self.broadcaster.on_disconnect is None:
+            self.broadcaster.on_disconnect = self._discard_connection
+        self.presence = presence if presence is not None else PresenceBatcher(
+            self.broadcaster, lambda project_id: self.active_connections.get(project_id, ()))
         self.user_sessions: Dict[str, Dict] = {}
         self.projects: Dict[str, Project] = {}
-        self.operation_history: Dict[str, List[Operation]] = defaultdict(list)
+        self.operation_history: Dict[str, deque] = defaultdict(lambda: deque(maxlen=RECENT_OPERATIONS))
+        self.merge_engines: Dict[str, MergeEngine] = {}
+        self.operation_log = operation_log if operation_log is not None else OperationLog(operation_log_path)
+        
+        # Scale-out: each project is ordered by one owner node; the others
+        # keep replicas fed by the backplane
+        self.backplane = backplane
+        self.node_id = node_id or str(uuid.uuid4())
+        self.nodes = sorted(set(nodes or []) | {self.node_id})
+        self.project_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self.pending_submits: Dict[str, WebSocketServerProtocol] = {}
+        self.replica_syncs: Dict[str, asyncio.Future] = {}
+        self.replica_backlog: Dict[str, List[Dict]] = {}
+        self.subscriptions: Set[str] = set()
         self.cursors: Dict[str, Dict] = defaultdict(dict)
         self.selections: Dict[str, Dict] = defaultdict(dict)
         
@@ -136,10 +173,11 @@ class RealTimeCollaboration:
             created_at=datetime.now(),
             last_modified=datetime.now(),
             users={user.id: user for user in sample_users},
-            operations=[]
+            operations=deque(maxlen=RECENT_OPERATIONS)
         )
         
         self.projects["project1"] = sample_project
+        self.operation_history["project1"] = sample_project.operations
         
         logger.info("Sample data initialized")
     
@@ -188,8 +226,12 @@ class RealTimeCollaboration:
                 await websocket.close(code=1008, reason="Access denied")
                 return
             
+            # Make sure this node's replica of the project is current
+            await self._ensure_replica(project_id)
+            
             # Add connection to active connections
             self.active_connections[project_id].add(websocket)
+            self.broadcaster.register(websocket)
             self.user_sessions[websocket.id] = {
                 "user": user,
                 "project_id": project_id,
@@ -218,6 +260,10 @@ class RealTimeCollaboration:
     async def _handle_message(self, websocket: WebSocketServerProtocol, message: str):
         """Handle incoming WebSocket message"""
         try:
+            if isinstance(message, bytes) and message[:1] == bytes([FRAME_MAGIC]):
+                await self._handle_presence_frame(websocket, message)
+                return
+            
             data = json.loads(message)
             message_type = data.get("type")
             
@@ -238,6 +284,8 @@ class RealTimeCollaboration:
                 await self._handle_chat_message(websocket, data, user, project_id)
             elif message_type == "ping":
                 await self._send_pong(websocket)
+            elif message_type == "hello":
+                self.broadcaster.send(websocket, self.presence.negotiate(websocket, data.get("data", {})))
             else:
                 logger.warning(f"Unknown message type: {message_type}")
                 
@@ -247,39 +295,120 @@ class RealTimeCollaboration:
             logger.error(f"Error handling message: {e}")
     
     async def _handle_operation(self, websocket: WebSocketServerProtocol, data: Dict, user: User, project_id: str):
-        """Handle operation from user"""
+        """Handle operation from user
+        
+        Document operations are rebased by the project's merge engine over
+        everything committed since the client's ``base_version``; the other
+        users receive the rebased change and the sender an ``operation_ack``.
+        On a node that does not own the project the operation is forwarded
+        to the owner and acknowledged when its commit comes back.
+        """
         try:
+            owner = self.owner_of(project_id)
+            if owner != self.node_id:
+                request_id = str(uuid.uuid4())
+                self.pending_submits[request_id] = websocket
+                await self.backplane.publish(self._node_channel(owner), {
+                    "kind": "submit",
+                    "node": self.node_id,
+                    "request_id": request_id,
+                    "project_id": project_id,
+                    "user_id": user.id,
+                    "operation": data
+                })
+                return
+            
+            await self._commit_operation(project_id, user.id, data, websocket)
+            logger.info(f"Operation {data.get('operation_type')} from {user.name} in project {project_id}")
+            
+        except Exception as e:
+            logger.error(f"Error handling operation: {e}")
+    
+    async def _commit_operation(self, project_id: str, user_id: str, data: Dict,
+                                websocket: WebSocketServerProtocol = None, origin_node: Optional[str] = None,
+                                request_id: Optional[str] = None):
+        """Rebase, apply, persist and publish an operation on the owner node"""
+        async with self.project_locks[project_id]:
             operation_data = data.get("data", {})
             operation_type = OperationType(data.get("operation_type"))
             element_id = data.get("element_id")
+            operation_id = str(uuid.uuid4())
+            
+            # Rebase and apply
+            engine = self._get_engine(project_id)
+            change = operation_to_change(operation_type.value, element_id, operation_data, operation_id)
+            try:
+                version, change = engine.submit(change, data.get("base_version"))
+            except ResyncRequired:
+                await self._reply_to_sender({"type": "resync_required", "data": {"version": engine.version}},
+                                            websocket, origin_node, request_id)
+                return
+            except ValueError as e:
+                # The sender already applied the change locally, so it has to resync
+                await self._reply_to_sender({
+                    "type": "operation_rejected",
+                    "data": {"client_id": data.get("client_id"), "error": str(e), "version": engine.version}
+                }, websocket, origin_node, request_id)
+                return
             
             # Create operation
             operation = Operation(
-                id=str(uuid.uuid4()),
+                id=operation_id,
                 type=operation_type,
-                user_id=user.id,
+                user_id=user_id,
                 timestamp=datetime.now(),
-                data=operation_data,
+                data=change if operation_type.value in DOCUMENT_OPERATION_TYPES else operation_data,
                 element_id=element_id,
-                version=self.projects[project_id].version + 1
+                version=version
             )
+            self._record_operation(project_id, operation, engine)
             
-            # Add to project
-            project = self.projects[project_id]
-            project.operations.append(operation)
-            project.version += 1
-            project.last_modified = datetime.now()
-            
-            # Add to operation history
-            self.operation_history[project_id].append(operation)
-            
-            # Broadcast to other users
+            # Broadcast to other users and acknowledge to the sender
             await self._broadcast_operation(project_id, operation, websocket)
-            
-            logger.info(f"Operation {operation.type.value} from {user.name} in project {project_id}")
-            
-        except Exception as e:
-            logger.error(f"Error handling operation: {e}")
+            if websocket is not None:
+                self._send_ack(websocket, operation, data.get("client_id"))
+            
+            # Relay the commit; replicas apply it in version order
+            if self.backplane is not None:
+                await self.backplane.publish(self._project_channel(project_id), {
+                    "kind": "commit",
+                    "node": self.node_id,
+                    "project_id": project_id,
+                    "request_id": request_id,
+                    "client_id": data.get("client_id"),
+                    "operation": self._operation_record(operation)
+                })
+    
+    async def _reply_to_sender(self, message: Dict, websocket: WebSocketServerProtocol = None,
+                               origin_node: Optional[str] = None, request_id: Optional[str] = None):
+        """Send a reply to the submitter, through its node if it was forwarded"""
+        if websocket is not None:
+            self.broadcaster.send(websocket, message)
+        elif origin_node is not None:
+            await self.backplane.publish(self._node_channel(origin_node), {
+                "kind": "reply", "request_id": request_id, "message": message
+            })
+    
+    def _record_operation(self, project_id: str, operation: Operation, engine: MergeEngine):
+        """Add a committed operation to the project, persisting and snapshotting it"""
+        # Add to project (shares its bounded deque with operation_history)
+        project = self.projects[project_id]
+        project.operations.append(operation)
+        project.version = operation.version
+        project.last_modified = datetime.now()
+        
+        # Persist, snapshotting and compacting on interval boundaries
+        self.operation_log.append(project_id, self._operation_record(operation))
+        if self.operation_log.needs_snapshot(operation.version):
+            engine.compact()
+            self.operation_log.save_snapshot(project_id, operation.version, engine.document.to_dict())
+    
+    def _send_ack(self, websocket: WebSocketServerProtocol, operation: Operation, client_id: Optional[str]):
+        """Acknowledge a committed operation to the user who sent it"""
+        self.broadcaster.send(websocket, {
+            "type": "operation_ack",
+            "data": {"id": operation.id, "client_id": client_id, "version": operation.version}
+        })
     
     async def _handle_cursor_move(self, websocket: WebSocketServerProtocol, data: Dict, user: User, project_id: str):
         """Handle cursor movement"""
@@ -313,6 +442,19 @@ class RealTimeCollaboration:
         except Exception as e:
             logger.error(f"Error handling selection: {e}")
     
+    async def _handle_presence_frame(self, websocket: WebSocketServerProtocol, frame: bytes):
+        """Handle cursor and selection records sent by a binary client"""
+        session = self.user_sessions.get(websocket.id)
+        if not session:
+            return
+        
+        _, records = self.presence.decode(websocket, frame)
+        for kind, _, record_data in records:
+            if kind == KIND_CURSOR:
+                await self._handle_cursor_move(websocket, {"data": record_data}, session["user"], session["project_id"])
+            elif kind == KIND_SELECTION:
+                await self._handle_selection(websocket, {"data": record_data}, session["user"], session["project_id"])
+    
     async def _handle_chat_message(self, websocket: WebSocketServerProtocol, data: Dict, user: User, project_id: str):
         """Handle chat message"""
         try:
@@ -337,10 +479,11 @@ class RealTimeCollaboration:
         """Broadcast operation to all connected users"""
         message = {
             "type": "operation",
-            "data": asdict(operation)
+            "data": self._operation_record(operation)
         }
         
-        await self._broadcast_to_project(project_id, message, exclude_websocket)
+        # Commits reach other nodes through the owner's commit message
+        await self._broadcast_to_project(project_id, message, exclude_websocket, relay=False)
     
     async def _broadcast_cursor_move(self, project_id: str, user: User, cursor_data: Dict, exclude_websocket: WebSocketServerProtocol = None):
         """Broadcast cursor movement to other users"""
@@ -355,7 +498,8 @@ class RealTimeCollaboration:
             }
         }
         
-        await self._broadcast_to_project(project_id, message, exclude_websocket)
+        await self._broadcast_presence(project_id, ("cursor_move", user.id), message, KIND_CURSOR, user.id,
+                                       {"position": cursor_data.get("position")}, exclude_websocket)
     
     async def _broadcast_selection(self, project_id: str, user: User, selection_data: Dict, exclude_websocket: WebSocketServerProtocol = None):
         """Broadcast selection to other users"""
@@ -370,7 +514,8 @@ class RealTimeCollaboration:
             }
         }
         
-        await self._broadcast_to_project(project_id, message, exclude_websocket)
+        await self._broadcast_presence(project_id, ("selection", user.id), message, KIND_SELECTION, user.id,
+                                       selection_data, exclude_websocket)
     
     async def _broadcast_chat_message(self, project_id: str, chat_message: Dict):
         """Broadcast chat message to all users"""
@@ -408,33 +553,203 @@ class RealTimeCollaboration:
         
         await self._broadcast_to_project(project_id, message)
     
-    async def _broadcast_to_project(self, project_id: str, message: Dict, exclude_websocket: WebSocketServerProtocol = None):
-        """Broadcast message to all users in a project"""
-        if project_id not in self.active_connections:
+    async def _broadcast_to_project(self, project_id: str, message: Dict, exclude_websocket: WebSocketServerProtocol = None,
+                                    coalesce_key: Optional[tuple] = None, relay: bool = True):
+        """Broadcast message to all users in a project
+        
+        The message is serialized once and queued per connection; writer
+        tasks in the broadcaster do the actual sends, so a slow client
+        never delays the others. ``coalesce_key`` marks presence updates
+        that may be merged or dropped for clients that fall behind. With
+        ``relay`` the message is also published for users on other nodes.
+        """
+        if project_id in self.active_connections:
+            self.broadcaster.broadcast(self.active_connections[project_id], message, exclude_websocket, coalesce_key)
+        
+        if relay and self.backplane is not None:
+            await self.backplane.publish(self._project_channel(project_id), {
+                "kind": "relay",
+                "node": self.node_id,
+                "project_id": project_id,
+                "message": message,
+                "coalesce_key": list(coalesce_key) if coalesce_key else None
+            })
+    
+    async def _broadcast_presence(self, project_id: str, key: tuple, message: Dict, kind: int, user_id: str,
+                                  record_data: Dict, exclude_websocket: WebSocketServerProtocol = None,
+                                  relay: bool = True):
+        """Queue a cursor or selection update for the next presence tick
+        
+        JSON clients receive ``message``; binary clients receive the packed
+        ``record_data`` in the tick's frame.
+        """
+        self.presence.update(project_id, key, message, kind, user_id, record_data, exclude_websocket)
+        
+        if relay and self.backplane is not None:
+            await self.backplane.publish(self._project_channel(project_id), {
+                "kind": "presence",
+                "node": self.node_id,
+                "project_id": project_id,
+                "key": list(key),
+                "message": message,
+                "record": {"kind": kind, "user_id": user_id, "data": record_data}
+            })
+    
+    # Backplane
+    def owner_of(self, project_id: str) -> str:
+        """Node that orders the operations of a project"""
+        if self.backplane is None:
+            return self.node_id
+        return owner_node(project_id, self.nodes)
+    
+    async def join_backplane(self):
+        """Start receiving submits and state requests for the projects this node owns"""
+        if self.backplane is not None:
+            await self._subscribe(self._node_channel(self.node_id), self._handle_node_message)
+    
+    @staticmethod
+    def _project_channel(project_id: str) -> str:
+        return f"collab:project:{project_id}"
+    
+    @staticmethod
+    def _node_channel(node_id: str) -> str:
+        return f"collab:node:{node_id}"
+    
+    async def _subscribe(self, channel: str, handler):
+        if channel not in self.subscriptions:
+            self.subscriptions.add(channel)
+            await self.backplane.subscribe(channel, handler)
+    
+    async def _ensure_replica(self, project_id: str):
+        """Subscribe to a project's commits and, off the owner, sync the replica
+        
+        Commits that arrive while the owner's state is on its way are held
+        back and replayed on top of it, so a client can connect to any node.
+        """
+        if self.backplane is None:
+            return
+        await self.join_backplane()
+        channel = self._project_channel(project_id)
+        if channel not in self.subscriptions:
+            syncing = self.owner_of(project_id) != self.node_id
+            if syncing:
+                self._begin_replica_sync(project_id)
+            await self._subscribe(channel, self._handle_project_message)
+            if syncing:
+                await self._request_replica(project_id)
+        
+        sync = self.replica_syncs.get(project_id)
+        if sync is not None:
+            await asyncio.wait_for(asyncio.shield(sync), REPLICA_SYNC_TIMEOUT)
+    
+    def _begin_replica_sync(self, project_id: str):
+        """Hold back commits for a project until the owner's state arrives"""
+        if project_id not in self.replica_syncs:
+            self.replica_syncs[project_id] = asyncio.get_running_loop().create_future()
+            self.replica_backlog[project_id] = []
+    
+    async def _request_replica(self, project_id: str):
+        """Ask the owner for the current document of a project"""
+        self._begin_replica_sync(project_id)
+        await self.backplane.publish(self._node_channel(self.owner_of(project_id)), {
+            "kind": "state_request", "node": self.node_id, "project_id": project_id
+        })
+    
+    async def _handle_node_message(self, message: Dict):
+        """Handle a message addressed to this node"""
+        kind = message.get("kind")
+        project_id = message.get("project_id")
+        if kind == "submit":
+            await self._commit_operation(project_id, message["user_id"], message["operation"],
+                                         origin_node=message["node"], request_id=message["request_id"])
+        elif kind == "state_request":
+            async with self.project_locks[project_id]:
+                engine = self._get_engine(project_id)
+                await self.backplane.publish(self._node_channel(message["node"]), {
+                    "kind": "state",
+                    "project_id": project_id,
+                    "version": engine.version,
+                    "document": engine.document.to_dict()
+                })
+        elif kind == "state":
+            self._install_replica(project_id, message["version"], message["document"])
+            for commit in self.replica_backlog.pop(project_id, []):
+                await self._apply_commit(commit)
+            sync = self.replica_syncs.pop(project_id, None)
+            if sync is not None and not sync.done():
+                sync.set_result(message["version"])
+        elif kind == "reply":
+            websocket = self.pending_submits.pop(message["request_id"], None)
+            if websocket is not None:
+                self.broadcaster.send(websocket, message["message"])
+    
+    async def _handle_project_message(self, message: Dict):
+        """Handle a commit or relayed broadcast for a project"""
+        if message.get("node") == self.node_id:
+            return
+        if message["kind"] == "relay":
+            coalesce_key = tuple(message["coalesce_key"]) if message.get("coalesce_key") else None
+            await self._broadcast_to_project(message["project_id"], message["message"], coalesce_key=coalesce_key, relay=False)
+        elif message["kind"] == "presence":
+            record = message["record"]
+            await self._broadcast_presence(message["project_id"], tuple(message["key"]), message["message"],
+                                           record["kind"], record["user_id"], record["data"], relay=False)
+        elif message["kind"] == "commit":
+            await self._apply_commit(message)
+    
+    async def _apply_commit(self, message: Dict):
+        """Apply a commit from the owner to this node's replica"""
+        record = message["operation"]
+        project_id = message["project_id"]
+        if project_id in self.replica_backlog:
+            self.replica_backlog[project_id].append(message)
             return
         
-        disconnected = set()
+        engine = self._get_engine(project_id)
+        if record["version"] <= engine.version:
+            return
+        if record["version"] != engine.version + 1:
+            logger.warning(f"Replica of {project_id} missed commits before {record['version']}, resyncing")
+            await self._request_replica(project_id)
+            self.replica_backlog[project_id].append(message)
+            return
         
-        for websocket in self.active_connections[project_id]:
-            if websocket == exclude_websocket:
-                continue
-            
-            try:
-                await websocket.send(json.dumps(message, default=str))
-            except websockets.exceptions.ConnectionClosed:
-                disconnected.add(websocket)
-            except Exception as e:
-                logger.error(f"Error broadcasting message: {e}")
-                disconnected.add(websocket)
+        engine.submit(record["data"] if record["type"] in DOCUMENT_OPERATION_TYPES else {})
+        operation = Operation(
+            id=record["id"],
+            type=OperationType(record["type"]),
+            user_id=record["user_id"],
+            timestamp=datetime.fromisoformat(record["timestamp"]),
+            data=record["data"],
+            element_id=record["element_id"],
+            version=record["version"]
+        )
+        self._record_operation(project_id, operation, engine)
         
-        # Remove disconnected websockets
-        self.active_connections[project_id] -= disconnected
+        websocket = self.pending_submits.pop(message.get("request_id"), None)
+        await self._broadcast_operation(project_id, operation, websocket)
+        if websocket is not None:
+            self._send_ack(websocket, operation, message.get("client_id"))
+    
+    def _install_replica(self, project_id: str, version: int, document: Dict):
+        """Replace this node's replica with the owner's state"""
+        self.merge_engines[project_id] = MergeEngine(ElementDocument.from_dict(document), version)
+        self.operation_log.save_snapshot(project_id, version, document)
+        if project_id in self.projects:
+            self.projects[project_id].version = version
+    
+    def _discard_connection(self, websocket: WebSocketServerProtocol):
+        """Forget a connection the broadcaster gave up on"""
+        session = self.user_sessions.get(websocket.id)
+        if session and session["project_id"] in self.active_connections:
+            self.active_connections[session["project_id"]].discard(websocket)
     
     async def _send_project_state(self, websocket: WebSocketServerProtocol, project: Project):
         """Send current project state to user"""
         try:
-            # Get recent operations
-            recent_operations = self.operation_history[project.id][-50:]  # Last 50 operations
+            # Latest snapshot plus everything committed after it
+            snapshot_version, snapshot = self.operation_log.latest_snapshot(project.id)
+            operations = self.operation_log.operations_since(project.id, snapshot_version)
             
             # Get current cursors and selections
             current_cursors = self.cursors[project.id]
@@ -456,15 +771,19 @@ class RealTimeCollaboration:
                         "version": project.version,
                         "last_modified": project.last_modified.isoformat()
                     },
+                    "snapshot": {
+                        "version": snapshot_version,
+                        "document": snapshot if snapshot is not None else ElementDocument().to_dict()
+                    },
+                    "operations": operations,
                     "users": [asdict(user) for user in project.users.values()],
                     "online_users": [asdict(user) for user in online_users],
-                    "recent_operations": [asdict(op) for op in recent_operations],
                     "cursors": {user_id: cursor for user_id, cursor in current_cursors.items()},
                     "selections": {user_id: selection for user_id, selection in current_selections.items()}
                 }
             }
             
-            await websocket.send(json.dumps(state_message, default=str))
+            self.broadcaster.send(websocket, state_message)
             
         except Exception as e:
             logger.error(f"Error sending project state: {e}")
@@ -476,7 +795,7 @@ class RealTimeCollaboration:
                 "type": "pong",
                 "timestamp": datetime.now().isoformat()
             }
-            await websocket.send(json.dumps(pong_message))
+            self.broadcaster.send(websocket, pong_message)
         except Exception as e:
             logger.error(f"Error sending pong: {e}")
     
@@ -491,6 +810,10 @@ class RealTimeCollaboration:
                 # Remove from active connections
                 if project_id in self.active_connections:
                     self.active_connections[project_id].discard(websocket)
+                self.broadcaster.unregister(websocket)
+                self.presence.forget(websocket)
+                for request_id in [key for key, pending in self.pending_submits.items() if pending is websocket]:
+                    del self.pending_submits[request_id]
                 
                 # Remove from user sessions
                 del self.user_sessions[websocket.id]
@@ -547,9 +870,43 @@ class RealTimeCollaboration:
         if project_id not in self.operation_history:
             return []
         
-        operations = self.operation_history[project_id][-limit:]
+        operations = list(self.operation_history[project_id])[-limit:]
         return [asdict(op) for op in operations]
     
+    def get_document(self, project_id: str) -> Optional[Dict]:
+        """Get the merged document state of a project"""
+        if project_id not in self.projects:
+            return None
+        return self._get_engine(project_id).document.to_dict()
+    
+    def _get_engine(self, project_id: str) -> MergeEngine:
+        """Merge engine of a project, restored from its snapshot and log on first use"""
+        engine = self.merge_engines.get(project_id)
+        if engine is None:
+            version, snapshot = self.operation_log.latest_snapshot(project_id)
+            document = ElementDocument.from_dict(snapshot) if snapshot is not None else None
+            engine = MergeEngine(document, version)
+            for record in self.operation_log.operations_since(project_id, version):
+                engine.submit(record["data"] if record["type"] in DOCUMENT_OPERATION_TYPES else {})
+            self.merge_engines[project_id] = engine
+        return engine
+    
+    @staticmethod
+    def _operation_record(operation: Operation) -> Dict:
+        """JSON-ready form of an operation, as logged and broadcast"""
+        record = asdict(operation)
+        record["type"] = operation.type.value
+        record["timestamp"] = operation.timestamp.isoformat()
+        return record
+    
+    def get_broadcast_metrics(self) -> Dict:
+        """Get send-queue depth and fan-out latency metrics"""
+        return self.broadcaster.get_metrics()
+    
+    def get_presence_metrics(self) -> Dict:
+        """Get presence batching and bandwidth metrics"""
+        return self.presence.get_metrics()
+    
     def create_project(self, name: str, owner_id: str) -> str:
         """Create a new project"""
         project_id = str(uuid.uuid4())
@@ -569,11 +926,11 @@ class RealTimeCollaboration:
             created_at=datetime.now(),
             last_modified=datetime.now(),
             users={owner_id: owner},
-            operations=[]
+            operations=deque(maxlen=RECENT_OPERATIONS)
         )
         
         self.projects[project_id] = project
-        self.operation_history[project_id] = []
+        self.operation_history[project_id] = project.operations
         
         logger.info(f"Created project {name} with ID {project_id}")
         return project_id
@@ -612,7 +969,7 @@ class RealTimeCollaboration:
 # Example usage and testing
 if __name__ == "__main__":
     # Initialize collaboration system
-    collaboration = RealTimeCollaboration()
+    collaboration = RealTimeCollaboration(operation_log_path="collaboration_operations.db")
     
     # Create a sample project
     project_id = collaboration.create_project("Test Project", "user1")
@@ -626,6 +983,7 @@ if __name__ == "__main__":
     async def main():
         print("🚀 Starting Real-Time Collaboration Server...")
         print("📡 WebSocket server will be available at ws://localhost:8765")
+        await collaboration.join_backplane()
         
         server = await websockets.serve(
             collaboration.handle_connection,
@@ -17,12 +17,19 @@ from enum import Enum
 import logging
 import hashlib
 import uuid
-from collections import defaultdict
+from collections import defaultdict, deque
+from websocket_broadcaster import FanoutBroadcaster
+from presence_protocol import FRAME_MAGIC, KIND_CURSOR, KIND_SELECTION, PresenceBatcher
+from preview_patches import (PATCH_DEBOUNCE, PATCH_MAX_DELAY, EditDebouncer, diff_properties, diff_text,
+                             merge_properties)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+DEFAULT_ROOM = "default"
+EVENT_HISTORY_LIMIT = 100
+
 class PreviewMode(Enum):
     """Preview modes"""
     DESKTOP = "desktop"
@@ -30,8 +37,8 @@ class PreviewMode(Enum):
     MOBILE = "mobile"
     CUSTOM = "custom"
 
-class PreviewEvent(Enum):
-    """Preview events"""
+class PreviewEventType(Enum):
+    """Preview event types"""
     CONTENT_CHANGE = "content_change"
     STYLE_CHANGE = "style_change"
     LAYOUT_CHANGE = "layout_change"
@@ -43,6 +50,15 @@ class PreviewEvent(Enum):
     COMMENT_UPDATE = "comment_update"
     COMMENT_DELETE = "comment_delete"
 
+# Events sent as presence ticks or preview patches rather than echoed as-is
+DEFERRED_EVENT_TYPES = {
+    PreviewEventType.CONTENT_CHANGE,
+    PreviewEventType.STYLE_CHANGE,
+    PreviewEventType.LAYOUT_CHANGE,
+    PreviewEventType.CURSOR_MOVE,
+    PreviewEventType.SELECTION_CHANGE
+}
+
 @dataclass
 class PreviewState:
     """Preview state"""
@@ -58,24 +74,66 @@ class PreviewState:
 class PreviewEvent:
     """Preview event"""
     id: str
-    type: PreviewEvent
+    type: PreviewEventType
     data: Dict[str, Any]
     user_id: str
     timestamp: datetime
     version: int
+    room: str = DEFAULT_ROOM
 
-class RealTimePreviewSystem:
-    """Real-time preview system for collaborative editing"""
+class PreviewRoom:
+    """Clients and shared preview state of one site/page"""
     
-    def __init__(self, port: int = 8765):
-        self.port = port
-        self.connected_clients: Dict[str, websockets.WebSocketServerProtocol] = {}
+    def __init__(self, key: str):
+        self.key = key
+        self.clients: Dict[str, websockets.WebSocketServerProtocol] = {}
         self.preview_states: Dict[str, PreviewState] = {}
-        self.event_history: Dict[str, List[PreviewEvent]] = defaultdict(list)
         self.collaborators: Dict[str, Dict[str, Any]] = {}
         self.comments: Dict[str, List[Dict]] = defaultdict(list)
         self.cursors: Dict[str, Dict[str, Any]] = {}
         self.selections: Dict[str, Dict[str, Any]] = {}
+    
+    def is_idle(self) -> bool:
+        """True when nothing in the room is worth keeping"""
+        return not self.clients and not self.preview_states and not any(self.comments.values())
+
+class RealTimePreviewSystem:
+    """Real-time preview system for collaborative editing
+    
+    Clients join the room of the site/page they preview (from the
+    connection path ``/<site>/<page>``); events, presence and state are
+    only shared within a room. Per-client event histories are ring
+    buffers and the metrics are kept as running counters.
+    
+    Content, style and layout edits are debounced per element and sent
+    as ``preview_patch`` messages holding only what changed since the
+    element's previous version; a client that sees a patch whose
+    ``base`` is not the version it holds sends ``resync_request``.
+    """
+    
+    def __init__(self, port: int = 8765, broadcaster: Optional[FanoutBroadcaster] = None,
+                 presence: Optional[PresenceBatcher] = None, event_history_limit: int = EVENT_HISTORY_LIMIT,
+                 patch_delay: float = PATCH_DEBOUNCE, patch_max_delay: float = PATCH_MAX_DELAY):
+        self.port = port
+        self.connected_clients: Dict[str, websockets.WebSocketServerProtocol] = {}
+        self.rooms: Dict[str, PreviewRoom] = {}
+        self.client_rooms: Dict[str, str] = {}
+        self.broadcaster = broadcaster if broadcaster is not None else FanoutBroadcaster()
+        if self.broadcaster.on_disconnect is None:
+            self.broadcaster.on_disconnect = self._on_broadcast_failure
+        self.presence = presence if presence is not None else PresenceBatcher(
+            self.broadcaster, lambda room: self.rooms[room].clients.values() if room in self.rooms else ())
+        self.event_history: Dict[str, deque] = defaultdict(lambda: deque(maxlen=event_history_limit))
+        self.patcher = EditDebouncer(self._flush_element_edit, patch_delay, patch_max_delay)
+        self.counters = {
+            "events_processed": 0,
+            "stored_events": 0,
+            "comments": 0,
+            "collaborators": 0,
+            "patches": 0,
+            "patch_bytes": 0,
+            "resyncs": 0
+        }
         
         # Initialize preview system
         self._initialize_preview_modes()
@@ -109,39 +167,65 @@ class RealTimePreviewSystem:
     def _initialize_event_handlers(self):
         """Initialize event handlers"""
         self.event_handlers = {
-            PreviewEvent.CONTENT_CHANGE: self._handle_content_change,
-            PreviewEvent.STYLE_CHANGE: self._handle_style_change,
-            PreviewEvent.LAYOUT_CHANGE: self._handle_layout_change,
-            PreviewEvent.USER_JOIN: self._handle_user_join,
-            PreviewEvent.USER_LEAVE: self._handle_user_leave,
-            PreviewEvent.CURSOR_MOVE: self._handle_cursor_move,
-            PreviewEvent.SELECTION_CHANGE: self._handle_selection_change,
-            PreviewEvent.COMMENT_ADD: self._handle_comment_add,
-            PreviewEvent.COMMENT_UPDATE: self._handle_comment_update,
-            PreviewEvent.COMMENT_DELETE: self._handle_comment_delete
+            PreviewEventType.CONTENT_CHANGE: self._handle_content_change,
+            PreviewEventType.STYLE_CHANGE: self._handle_style_change,
+            PreviewEventType.LAYOUT_CHANGE: self._handle_layout_change,
+            PreviewEventType.USER_JOIN: self._handle_user_join,
+            PreviewEventType.USER_LEAVE: self._handle_user_leave,
+            PreviewEventType.CURSOR_MOVE: self._handle_cursor_move,
+            PreviewEventType.SELECTION_CHANGE: self._handle_selection_change,
+            PreviewEventType.COMMENT_ADD: self._handle_comment_add,
+            PreviewEventType.COMMENT_UPDATE: self._handle_comment_update,
+            PreviewEventType.COMMENT_DELETE: self._handle_comment_delete
         }
     
     # 1. WebSocket Server
     async def start_server(self):
         """Start WebSocket server"""
-        async def handle_client(websocket, path):
-            client_id = str(uuid.uuid4())
-            self.connected_clients[client_id] = websocket
-            
-            try:
-                await self._handle_client_connection(client_id, websocket)
-            except websockets.exceptions.ConnectionClosed:
-                await self._handle_client_disconnection(client_id)
-            except Exception as e:
-                logger.error(f"Error handling client {client_id}: {e}")
-                await self._handle_client_disconnection(client_id)
-        
-        server = await websockets.serve(handle_client, "localhost", self.port)
+        server = await websockets.serve(self.handle_client, "localhost", self.port)
         logger.info(f"WebSocket server started on ws://localhost:{self.port}")
         
         # Keep server running
         await server.wait_closed()
     
+    async def handle_client(self, websocket, path: str):
+        """Serve one preview connection until it closes"""
+        client_id = str(uuid.uuid4())
+        self.join_room(client_id, websocket, self.room_key(path))
+        
+        try:
+            await self._handle_client_connection(client_id, websocket)
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        except Exception as e:
+            logger.error(f"Error handling client {client_id}: {e}")
+        finally:
+            await self._handle_client_disconnection(client_id)
+    
+    @staticmethod
+    def room_key(path: str) -> str:
+        """Room of a connection path: ``/<site>/<page>``, or the site alone"""
+        parts = [part for part in (path or "").strip("/").split("/") if part]
+        return "/".join(parts[:2]) if parts else DEFAULT_ROOM
+    
+    def join_room(self, client_id: str, websocket, room_key: str = DEFAULT_ROOM) -> PreviewRoom:
+        """Register a connection with the room it previews"""
+        room = self._room(room_key)
+        room.clients[client_id] = websocket
+        self.connected_clients[client_id] = websocket
+        self.client_rooms[client_id] = room.key
+        self.broadcaster.register(websocket)
+        return room
+    
+    def _room(self, room_key: str) -> PreviewRoom:
+        room = self.rooms.get(room_key)
+        if room is None:
+            room = self.rooms[room_key] = PreviewRoom(room_key)
+        return room
+    
+    def _client_room(self, client_id: str) -> PreviewRoom:
+        return self._room(self.client_rooms.get(client_id, DEFAULT_ROOM))
+    
     async def _handle_client_connection(self, client_id: str, websocket):
         """Handle new client connection"""
         logger.info(f"Client {client_id} connected")
@@ -154,34 +238,56 @@ class RealTimePreviewSystem:
             await self._process_message(client_id, message)
     
     async def _handle_client_disconnection(self, client_id: str):
-        """Handle client disconnection"""
-        logger.info(f"Client {client_id} disconnected")
-        
+        """Handle client disconnection; safe to call more than once"""
         # Remove from connected clients
-        if client_id in self.connected_clients:
-            del self.connected_clients[client_id]
+        websocket = self.connected_clients.pop(client_id, None)
+        if websocket is not None:
+            self.broadcaster.unregister(websocket)
+            self.presence.forget(websocket)
+        room_key = self.client_rooms.pop(client_id, None)
+        if room_key is None:
+            # Already cleaned up, e.g. after a failed broadcast
+            return
+        logger.info(f"Client {client_id} disconnected")
+        room = self._room(room_key)
+        room.clients.pop(client_id, None)
         
         # Remove from collaborators
-        if client_id in self.collaborators:
-            del self.collaborators[client_id]
+        self._drop_collaborator(room, client_id)
         
-        # Remove cursor
-        if client_id in self.cursors:
-            del self.cursors[client_id]
+        # Remove cursor and selection
+        room.cursors.pop(client_id, None)
+        room.selections.pop(client_id, None)
         
-        # Remove selection
-        if client_id in self.selections:
-            del self.selections[client_id]
+        # Forget the client's event history
+        history = self.event_history.pop(client_id, None)
+        if history is not None:
+            self.counters["stored_events"] -= len(history)
         
         # Notify other clients
-        await self._broadcast_user_leave(client_id)
+        await self._broadcast_user_leave(client_id, room.key)
+        if room.is_idle():
+            del self.rooms[room.key]
     
     # 2. Message Processing
     async def _process_message(self, client_id: str, message: str):
         """Process incoming message"""
         try:
+            if isinstance(message, bytes) and message[:1] == bytes([FRAME_MAGIC]):
+                await self._process_presence_frame(client_id, message)
+                return
+            
             data = json.loads(message)
-            event_type = PreviewEvent(data.get("type"))
+            if data.get("type") == "hello":
+                websocket = self.connected_clients.get(client_id)
+                if websocket is not None:
+                    self.broadcaster.send(websocket, self.presence.negotiate(websocket, data.get("data", {})))
+                return
+            if data.get("type") == "resync_request":
+                self._send_resync(client_id, data.get("data", {}).get("element_ids"))
+                return
+            
+            event_type = PreviewEventType(data.get("type"))
             event_data = data.get("data", {})
             
             # Create event
@@ -191,7 +297,8 @@ class RealTimePreviewSystem:
                 data=event_data,
                 user_id=client_id,
                 timestamp=datetime.now(),
-                version=self._get_next_version()
+                version=self._get_next_version(),
+                room=self.client_rooms.get(client_id, DEFAULT_ROOM)
             )
             
             # Handle event
@@ -201,17 +308,42 @@ class RealTimePreviewSystem:
             logger.error(f"Error processing message from {client_id}: {e}")
             await self._send_error(client_id, str(e))
     
+    async def _process_presence_frame(self, client_id: str, frame: bytes):
+        """Process cursor and selection records sent by a binary client"""
+        _, records = self.presence.decode(self.connected_clients.get(client_id), frame)
+        for kind, _, record_data in records:
+            if kind == KIND_CURSOR:
+                event_type, event_data = PreviewEventType.CURSOR_MOVE, {"cursor": record_data}
+            elif kind == KIND_SELECTION:
+                event_type, event_data = PreviewEventType.SELECTION_CHANGE, {"selection": record_data}
+            else:
+                continue
+            await self._handle_event(PreviewEvent(
+                id=str(uuid.uuid4()),
+                type=event_type,
+                data=event_data,
+                user_id=client_id,
+                timestamp=datetime.now(),
+                version=self._get_next_version(),
+                room=self.client_rooms.get(client_id, DEFAULT_ROOM)
+            ))
+    
     async def _handle_event(self, event: PreviewEvent):
         """Handle preview event"""
-        # Store event in history
-        self.event_history[event.user_id].append(event)
+        # Store event in the client's bounded history
+        history = self.event_history[event.user_id]
+        if len(history) < history.maxlen:
+            self.counters["stored_events"] += 1
+        history.append(event)
+        self.counters["events_processed"] += 1
         
         # Execute event handler
         if event.type in self.event_handlers:
             await self.event_handlers[event.type](event)
         
-        # Broadcast to other clients
-        await self._broadcast_event(event)
+        # Broadcast to other clients; presence and edits follow as ticks and patches
+        if event.type not in DEFERRED_EVENT_TYPES:
+            await self._broadcast_event(event)
     
     # 3. Event Handlers
     async def _handle_content_change(self, event: PreviewEvent):
@@ -219,13 +351,8 @@ class RealTimePreviewSystem:
         content = event.data.get("content", "")
         element_id = event.data.get("element_id", "")
         
-        # Update preview state
-        if element_id in self.preview_states:
-            state = self.preview_states[element_id]
-            state.content = content
-            state.timestamp = datetime.now()
-            state.user_id = event.user_id
-            state.version = event.version
+        # Queue for the element's next patch
+        self.patcher.submit((event.room, element_id), content=content, user_id=event.user_id)
         
         logger.info(f"Content changed for element {element_id} by user {event.user_id}")
     
@@ -234,13 +361,8 @@ class RealTimePreviewSystem:
         styles = event.data.get("styles", {})
         element_id = event.data.get("element_id", "")
         
-        # Update preview state
-        if element_id in self.preview_states:
-            state = self.preview_states[element_id]
-            state.styles.update(styles)
-            state.timestamp = datetime.now()
-            state.user_id = event.user_id
-            state.version = event.version
+        # Queue for the element's next patch
+        self.patcher.submit((event.room, element_id), styles=styles, user_id=event.user_id)
         
         logger.info(f"Styles changed for element {element_id} by user {event.user_id}")
     
@@ -249,51 +371,45 @@ class RealTimePreviewSystem:
         layout = event.data.get("layout", {})
         element_id = event.data.get("element_id", "")
         
-        # Update preview state
-        if element_id in self.preview_states:
-            state = self.preview_states[element_id]
-            state.layout.update(layout)
-            state.timestamp = datetime.now()
-            state.user_id = event.user_id
-            state.version = event.version
+        # Queue for the element's next patch
+        self.patcher.submit((event.room, element_id), layout=layout, user_id=event.user_id)
         
         logger.info(f"Layout changed for element {element_id} by user {event.user_id}")
     
     async def _handle_user_join(self, event: PreviewEvent):
         """Handle user join event"""
         user_info = event.data.get("user_info", {})
-        self.collaborators[event.user_id] = {
+        self._set_collaborator(self._room(event.room), event.user_id, {
             "name": user_info.get("name", "Anonymous"),
             "avatar": user_info.get("avatar", ""),
             "color": user_info.get("color", "#667eea"),
             "joined_at": datetime.now()
-        }
+        })
         
         logger.info(f"User {user_info.get('name', 'Anonymous')} joined")
     
     async def _handle_user_leave(self, event: PreviewEvent):
         """Handle user leave event"""
-        if event.user_id in self.collaborators:
-            del self.collaborators[event.user_id]
+        self._drop_collaborator(self._room(event.room), event.user_id)
         
         logger.info(f"User {event.user_id} left")
     
     async def _handle_cursor_move(self, event: PreviewEvent):
         """Handle cursor move event"""
         cursor_data = event.data.get("cursor", {})
-        self.cursors[event.user_id] = {
+        self._room(event.room).cursors[event.user_id] = {
             "position": cursor_data.get("position", {}),
             "element": cursor_data.get("element", ""),
             "timestamp": datetime.now()
         }
         
         # Broadcast cursor position to other clients
-        await self._broadcast_cursor_update(event.user_id, cursor_data)
+        await self._broadcast_cursor_update(event.user_id, cursor_data, event.room)
     
     async def _handle_selection_change(self, event: PreviewEvent):
         """Handle selection change event"""
         selection_data = event.data.get("selection", {})
-        self.selections[event.user_id] = {
+        self._room(event.room).selections[event.user_id] = {
             "start": selection_data.get("start", {}),
             "end": selection_data.get("end", {}),
             "element": selection_data.get("element", ""),
@@ -301,7 +417,7 @@ class RealTimePreviewSystem:
         }
         
         # Broadcast selection to other clients
-        await self._broadcast_selection_update(event.user_id, selection_data)
+        await self._broadcast_selection_update(event.user_id, selection_data, event.room)
     
     async def _handle_comment_add(self, event: PreviewEvent):
         """Handle comment add event"""
@@ -318,10 +434,11 @@ class RealTimePreviewSystem:
             "replies": []
         }
         
-        self.comments[element_id].append(comment)
+        self._room(event.room).comments[element_id].append(comment)
+        self.counters["comments"] += 1
         
-        # Broadcast comment to all clients
-        await self._broadcast_comment_add(comment)
+        # Broadcast comment to the room
+        await self._broadcast_comment_add(comment, event.room)
     
     async def _handle_comment_update(self, event: PreviewEvent):
         """Handle comment update event"""
@@ -329,29 +446,17 @@ class RealTimePreviewSystem:
         content = event.data.get("content", "")
         
         # Find and update comment
-        for element_id, comments in self.comments.items():
-            for comment in comments:
-                if comment["id"] == comment_id:
-                    comment["content"] = content
-                    comment["updated_at"] = datetime.now()
-                    
-                    # Broadcast update
-                    await self._broadcast_comment_update(comment)
-                    break
+        comment = self.update_comment(comment_id, content, event.room)
+        if comment is not None:
+            await self._broadcast_comment_update(comment, event.room)
     
     async def _handle_comment_delete(self, event: PreviewEvent):
         """Handle comment delete event"""
         comment_id = event.data.get("comment_id", "")
         
         # Find and remove comment
-        for element_id, comments in self.comments.items():
-            for i, comment in enumerate(comments):
-                if comment["id"] == comment_id:
-                    del comments[i]
-                    
-                    # Broadcast deletion
-                    await self._broadcast_comment_delete(comment_id)
-                    break
+        if self.delete_comment(comment_id, event.room):
+            await self._broadcast_comment_delete(comment_id, event.room)
     
     # 4. Broadcasting
     async def _broadcast_event(self, event: PreviewEvent):
@@ -361,52 +466,110 @@ class RealTimePreviewSystem:
             "event": asdict(event)
         }
         
-        await self._broadcast_message(message)
+        await self._broadcast_message(message, room=event.room)
     
-    async def _broadcast_message(self, message: Dict):
-        """Broadcast message to all connected clients"""
-        if not self.connected_clients:
+    async def _broadcast_message(self, message: Dict, coalesce_key: Optional[tuple] = None,
+                                 room: Optional[str] = DEFAULT_ROOM):
+        """Broadcast message to the clients of a room, or to every client when ``room`` is None
+        
+        Serialized once and queued per client; the broadcaster's writer
+        tasks perform the sends concurrently.
+        """
+        if room is None:
+            clients = self.connected_clients
+        elif room in self.rooms:
+            clients = self.rooms[room].clients
+        else:
+            return
+        if not clients:
             return
         
-        message_str = json.dumps(message, default=str)
-        
-        # Send to all connected clients
-        disconnected_clients = []
-        for client_id, websocket in self.connected_clients.items():
-            try:
-                await websocket.send(message_str)
-            except websockets.exceptions.ConnectionClosed:
-                disconnected_clients.append(client_id)
-            except Exception as e:
-                logger.error(f"Error broadcasting to {client_id}: {e}")
-                disconnected_clients.append(client_id)
-        
-        # Remove disconnected clients
-        for client_id in disconnected_clients:
-            await self._handle_client_disconnection(client_id)
+        self.broadcaster.broadcast(clients.values(), message, coalesce_key=coalesce_key)
+    
+    def _flush_element_edit(self, key: tuple, edit: Dict):
+        """Apply a debounced burst of edits to an element and broadcast the patch"""
+        room_key, element_id = key
+        room = self._room(room_key)
+        state = room.preview_states.get(element_id)
+        if state is None:
+            state = PreviewState(content="", styles={}, layout={}, metadata={}, timestamp=datetime.now(),
+                                 user_id=edit["user_id"], version=0)
+            room.preview_states[element_id] = state
+        
+        # Diff against the last state the room has seen
+        content = edit.get("content", state.content)
+        styles = merge_properties(state.styles, edit["styles"])
+        layout = merge_properties(state.layout, edit["layout"])
+        patch = {"element_id": element_id, "base": state.version}
+        for field, change in (("content", diff_text(state.content, content)),
+                              ("styles", diff_properties(state.styles, styles)),
+                              ("layout", diff_properties(state.layout, layout))):
+            if change is not None:
+                patch[field] = change
+        if len(patch) == 2:
+            return
+        
+        state.content, state.styles, state.layout = content, styles, layout
+        state.timestamp = datetime.now()
+        state.user_id = edit["user_id"]
+        state.version += 1
+        patch.update(version=state.version, user_id=state.user_id, edits=edit["edits"])
+        
+        message = json.dumps({"type": "preview_patch", "room": room_key, "patch": patch})
+        self.counters["patches"] += 1
+        self.counters["patch_bytes"] += len(message)
+        if room.clients:
+            self.broadcaster.broadcast(room.clients.values(), message)
+    
+    def _send_resync(self, client_id: str, element_ids: Optional[List[str]] = None):
+        """Send a client the current state and versions after it detected a gap"""
+        websocket = self.connected_clients.get(client_id)
+        if websocket is None:
+            return
+        room = self._client_room(client_id)
+        wanted = set(element_ids) if element_ids else None
+        
+        # Apply pending edits first so the versions sent are the latest
+        self.patcher.flush_where(lambda key: key[0] == room.key and (wanted is None or key[1] in wanted))
+        states = {element_id: state for element_id, state in room.preview_states.items()
+                  if wanted is None or element_id in wanted}
+        self.counters["resyncs"] += 1
+        self.broadcaster.send(websocket, {
+            "type": "preview_resync",
+            "room": room.key,
+            "states": {element_id: asdict(state) for element_id, state in states.items()},
+            "versions": {element_id: state.version for element_id, state in states.items()}
+        })
+    
+    def _on_broadcast_failure(self, websocket):
+        """Clean up a client whose sends failed or fell too far behind"""
+        for client_id, connection in list(self.connected_clients.items()):
+            if connection is websocket:
+                asyncio.get_running_loop().create_task(self._handle_client_disconnection(client_id))
     
     async def _broadcast_user_join(self, user_id: str):
         """Broadcast user join to other clients"""
-        if user_id not in self.collaborators:
+        room = self._client_room(user_id)
+        if user_id not in room.collaborators:
             return
         
         message = {
             "type": "user_join",
-            "user": self.collaborators[user_id]
+            "user": room.collaborators[user_id]
         }
         
-        await self._broadcast_message(message)
+        await self._broadcast_message(message, room=room.key)
     
-    async def _broadcast_user_leave(self, user_id: str):
+    async def _broadcast_user_leave(self, user_id: str, room: str = DEFAULT_ROOM):
         """Broadcast user leave to other clients"""
         message = {
             "type": "user_leave",
             "user_id": user_id
         }
         
-        await self._broadcast_message(message)
+        await self._broadcast_message(message, room=room)
     
-    async def _broadcast_cursor_update(self, user_id: str, cursor_data: Dict):
+    async def _broadcast_cursor_update(self, user_id: str, cursor_data: Dict, room: str = DEFAULT_ROOM):
         """Broadcast cursor update to other clients"""
         message = {
             "type": "cursor_update",
@@ -414,9 +577,10 @@ class RealTimePreviewSystem:
             "cursor": cursor_data
         }
         
-        await self._broadcast_message(message)
+        self.presence.update(room, ("cursor_update", user_id), message, KIND_CURSOR, user_id, cursor_data,
+                             self.connected_clients.get(user_id))
     
-    async def _broadcast_selection_update(self, user_id: str, selection_data: Dict):
+    async def _broadcast_selection_update(self, user_id: str, selection_data: Dict, room: str = DEFAULT_ROOM):
         """Broadcast selection update to other clients"""
         message = {
             "type": "selection_update",
@@ -424,50 +588,54 @@ class RealTimePreviewSystem:
             "selection": selection_data
         }
         
-        await self._broadcast_message(message)
+        self.presence.update(room, ("selection_update", user_id), message, KIND_SELECTION, user_id, selection_data,
+                             self.connected_clients.get(user_id))
     
-    async def _broadcast_comment_add(self, comment: Dict):
+    async def _broadcast_comment_add(self, comment: Dict, room: str = DEFAULT_ROOM):
         """Broadcast comment add to all clients"""
         message = {
             "type": "comment_add",
             "comment": comment
         }
         
-        await self._broadcast_message(message)
+        await self._broadcast_message(message, room=room)
     
-    async def _broadcast_comment_update(self, comment: Dict):
+    async def _broadcast_comment_update(self, comment: Dict, room: str = DEFAULT_ROOM):
         """Broadcast comment update to all clients"""
         message = {
             "type": "comment_update",
             "comment": comment
         }
         
-        await self._broadcast_message(message)
+        await self._broadcast_message(message, room=room)
     
-    async def _broadcast_comment_delete(self, comment_id: str):
+    async def _broadcast_comment_delete(self, comment_id: str, room: str = DEFAULT_ROOM):
         """Broadcast comment delete to all clients"""
         message = {
             "type": "comment_delete",
             "comment_id": comment_id
         }
         
-        await self._broadcast_message(message)
+        await self._broadcast_message(message, room=room)
     
     # 5. State Management
     async def _send_initial_state(self, client_id: str, websocket):
         """Send initial state to new client"""
+        room = self._client_room(client_id)
         initial_state = {
             "type": "initial_state",
             "data": {
-                "preview_states": {k: asdict(v) for k, v in self.preview_states.items()},
-                "collaborators": self.collaborators,
-                "comments": dict(self.comments),
-                "cursors": self.cursors,
-                "selections": self.selections
+                "room": room.key,
+                "preview_states": {k: asdict(v) for k, v in room.preview_states.items()},
+                "versions": {k: v.version for k, v in room.preview_states.items()},
+                "collaborators": room.collaborators,
+                "comments": dict(room.comments),
+                "cursors": room.cursors,
+                "selections": room.selections
             }
         }
         
-        await websocket.send(json.dumps(initial_state, default=str))
+        self.broadcaster.send(websocket, initial_state)
     
     def _get_next_version(self) -> int:
         """Get next version number"""
@@ -497,31 +665,40 @@ class RealTimePreviewSystem:
             "mode": self.current_preview_mode
         }
         
-        await self._broadcast_message(message)
+        await self._broadcast_message(message, room=None)
     
     # 7. Collaboration Features
-    def add_collaborator(self, user_id: str, user_info: Dict):
+    def add_collaborator(self, user_id: str, user_info: Dict, room: str = DEFAULT_ROOM):
         """Add collaborator"""
-        self.collaborators[user_id] = {
+        self._set_collaborator(self._room(room), user_id, {
             "name": user_info.get("name", "Anonymous"),
             "avatar": user_info.get("avatar", ""),
             "color": user_info.get("color", "#667eea"),
             "role": user_info.get("role", "editor"),
             "permissions": user_info.get("permissions", ["edit", "comment"]),
             "joined_at": datetime.now()
-        }
+        })
     
-    def remove_collaborator(self, user_id: str):
+    def remove_collaborator(self, user_id: str, room: str = DEFAULT_ROOM):
         """Remove collaborator"""
-        if user_id in self.collaborators:
-            del self.collaborators[user_id]
+        if room in self.rooms:
+            self._drop_collaborator(self.rooms[room], user_id)
     
-    def get_collaborators(self) -> Dict[str, Dict]:
-        """Get all collaborators"""
-        return self.collaborators.copy()
+    def get_collaborators(self, room: str = DEFAULT_ROOM) -> Dict[str, Dict]:
+        """Get all collaborators of a room"""
+        return self.rooms[room].collaborators.copy() if room in self.rooms else {}
+    
+    def _set_collaborator(self, room: PreviewRoom, user_id: str, info: Dict):
+        if user_id not in room.collaborators:
+            self.counters["collaborators"] += 1
+        room.collaborators[user_id] = info
+    
+    def _drop_collaborator(self, room: PreviewRoom, user_id: str):
+        if room.collaborators.pop(user_id, None) is not None:
+            self.counters["collaborators"] -= 1
     
     # 8. Comments System
-    def add_comment(self, element_id: str, user_id: str, content: str, position: Dict):
+    def add_comment(self, element_id: str, user_id: str, content: str, position: Dict, room: str = DEFAULT_ROOM):
         """Add comment to element"""
         comment = {
             "id": str(uuid.uuid4()),
@@ -533,16 +710,19 @@ class RealTimePreviewSystem:
             "replies": []
         }
         
-        self.comments[element_id].append(comment)
+        self._room(room).comments[element_id].append(comment)
+        self.counters["comments"] += 1
         return comment
     
-    def get_comments(self, element_id: str) -> List[Dict]:
+    def get_comments(self, element_id: str, room: str = DEFAULT_ROOM) -> List[Dict]:
         """Get comments for element"""
-        return self.comments.get(element_id, [])
+        return self.rooms[room].comments.get(element_id, []) if room in self.rooms else []
     
-    def update_comment(self, comment_id: str, content: str):
+    def update_comment(self, comment_id: str, content: str, room: str = DEFAULT_ROOM):
         """Update comment"""
-        for element_id, comments in self.comments.items():
+        if room not in self.rooms:
+            return None
+        for element_id, comments in self.rooms[room].comments.items():
             for comment in comments:
                 if comment["id"] == comment_id:
                     comment["content"] = content
@@ -550,24 +730,27 @@ class RealTimePreviewSystem:
                     return comment
         return None
     
-    def delete_comment(self, comment_id: str):
+    def delete_comment(self, comment_id: str, room: str = DEFAULT_ROOM):
         """Delete comment"""
-        for element_id, comments in self.comments.items():
+        if room not in self.rooms:
+            return False
+        for element_id, comments in self.rooms[room].comments.items():
             for i, comment in enumerate(comments):
                 if comment["id"] == comment_id:
                     del comments[i]
+                    self.counters["comments"] -= 1
                     return True
         return False
     
     # 9. Real-time Synchronization
-    def sync_state(self, element_id: str, state: PreviewState):
+    def sync_state(self, element_id: str, state: PreviewState, room: str = DEFAULT_ROOM):
         """Sync preview state"""
-        self.preview_states[element_id] = state
+        self._room(room).preview_states[element_id] = state
         
         # Broadcast state change
-        asyncio.create_task(self._broadcast_state_change(element_id, state))
+        asyncio.create_task(self._broadcast_state_change(element_id, state, room))
     
-    async def _broadcast_state_change(self, element_id: str, state: PreviewState):
+    async def _broadcast_state_change(self, element_id: str, state: PreviewState, room: str = DEFAULT_ROOM):
         """Broadcast state change"""
         message = {
             "type": "state_change",
@@ -575,16 +758,27 @@ class RealTimePreviewSystem:
             "state": asdict(state)
         }
         
-        await self._broadcast_message(message)
+        await self._broadcast_message(message, room=room)
     
     # 10. Performance Monitoring
     def get_performance_metrics(self) -> Dict:
         """Get performance metrics"""
         return {
             "connected_clients": len(self.connected_clients),
-            "active_collaborators": len(self.collaborators),
-            "total_comments": sum(len(comments) for comments in self.comments.values()),
-            "total_events": sum(len(events) for events in self.event_history.values()),
+            "rooms": len(self.rooms),
+            "active_collaborators": self.counters["collaborators"],
+            "total_comments": self.counters["comments"],
+            "total_events": self.counters["stored_events"],
+            "events_processed": self.counters["events_processed"],
+            "broadcast": self.broadcaster.get_metrics(),
+            "presence": self.presence.get_metrics(),
+            "patches": {
+                **self.patcher.stats,
+                "sent": self.counters["patches"],
+                "bytes": self.counters["patch_bytes"],
+                "resyncs": self.counters["resyncs"],
+                "pending": len(self.patcher.pending)
+            },
             "memory_usage": self._get_memory_usage(),
             "uptime": self._get_uptime()
         }
@@ -614,10 +808,7 @@ class RealTimePreviewSystem:
                 "message": error_message
             }
             
-            try:
-                await self.connected_clients[client_id].send(json.dumps(message))
-            except Exception as e:
-                logger.error(f"Error sending error message to {client_id}: {e}")
+            self.broadcaster.send(self.connected_clients[client_id], message)
     
     # 12. Server Control
     def start(self):
@@ -628,10 +819,18 @@ class RealTimePreviewSystem:
     def stop(self):
         """Stop the preview server"""
         # Close all connections
+        if self.presence.ticker is not None:
+            self.presence.ticker.cancel()
+        self.patcher.cancel()
         for websocket in self.connected_clients.values():
+            self.broadcaster.unregister(websocket)
+            self.presence.forget(websocket)
             asyncio.create_task(websocket.close())
         
         self.connected_clients.clear()
+        self.client_rooms.clear()
+        for room in self.rooms.values():
+            room.clients.clear()
         logger.info("Preview server stopped")
 
 # Example usage and testing
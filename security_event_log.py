@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Security Event Log - Ring-buffered event log with time-window rollups
+Fixed-size storage for recent events, per-minute counters by type, level
+and source IP, and an optional append-only on-disk segment log
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from collections import Counter
+from dataclasses import asdict, is_dataclass
+from datetime import datetime
+from enum import Enum
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+import logging
+
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def serialize_event(event: Any) -> Dict:
+    """Field dict for an event; enums and datetimes are encoded on write"""
+    return asdict(event) if is_dataclass(event) else dict(vars(event))
+
+
+def _event_time(event: Any) -> float:
+    timestamp = event.timestamp
+    return timestamp.timestamp() if isinstance(timestamp, datetime) else float(timestamp)
+
+
+class EventSegmentLog:
+    """Append-only JSON-lines log split into size-bounded segment files
+
+    Segment names carry a sequence number and the timestamp of their first
+    event; since events are appended in time order, reads with ``since``
+    skip whole segments that end before the cutoff.
+    """
+
+    def __init__(self, directory: str, max_segment_bytes: int = 8 * 1024 * 1024,
+                 max_segments: Optional[int] = None, serializer: Callable[[Any], Dict] = serialize_event):
+        self.directory = directory
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segments = max_segments
+        self.serializer = serializer
+        os.makedirs(directory, exist_ok=True)
+        self._handle = None
+        self._segment_bytes = 0
+        self._lock = threading.Lock()
+
+    def segments(self) -> List[str]:
+        """Segment paths, oldest first"""
+        names = sorted(name for name in os.listdir(self.directory)
+                       if name.startswith("segment-") and name.endswith(".jsonl"))
+        return [os.path.join(self.directory, name) for name in names]
+
+    @staticmethod
+    def _segment_start(path: str) -> float:
+        return int(os.path.basename(path)[:-len(".jsonl")].rsplit("-", 1)[1]) / 1000.0
+
+    def append(self, event: Any):
+        line = json.dumps(self.serializer(event), ensure_ascii=False, default=_json_default) + "\n"
+        data = line.encode("utf-8")
+        with self._lock:
+            if self._handle is None or self._segment_bytes + len(data) > self.max_segment_bytes:
+                self._roll(_event_time(event))
+            self._handle.write(data)
+            self._handle.flush()
+            self._segment_bytes += len(data)
+
+    def _roll(self, first_timestamp: float):
+        if self._handle is not None:
+            self._handle.close()
+        existing = self.segments()
+        sequence = int(os.path.basename(existing[-1]).split("-")[1]) + 1 if existing else 0
+        path = os.path.join(self.directory, f"segment-{sequence:010d}-{int(first_timestamp * 1000):015d}.jsonl")
+        self._handle = open(path, "ab")
+        self._segment_bytes = 0
+
+        if self.max_segments is not None:
+            for expired in self.segments()[:-self.max_segments]:
+                os.unlink(expired)
+
+    def read(self, since: Optional[float] = None) -> Iterator[Dict]:
+        """Yield stored events (as dicts) oldest first, optionally from ``since``"""
+        with self._lock:
+            if self._handle is not None:
+                self._handle.flush()
+            paths = self.segments()
+        for index, path in enumerate(paths):
+            following = paths[index + 1] if index + 1 < len(paths) else None
+            if since is not None and following is not None and self._segment_start(following) < since:
+                continue
+            with open(path, "r", encoding="utf-8") as handle:
+                for line in handle:
+                    record = json.loads(line)
+                    if since is not None and datetime.fromisoformat(record["timestamp"]).timestamp() < since:
+                        continue
+                    yield record
+
+    def close(self):
+        with self._lock:
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+
+
+class SecurityEventLog:
+    """Fixed-capacity ring of recent events plus rolling per-bucket counters
+
+    Appends are O(1): the newest event overwrites the oldest slot instead of
+    re-slicing a list. Counters live in circular numpy arrays with one row
+    per time bucket (a minute by default), so a report over any window up to
+    the retention period sums at most ``retention_buckets`` rows regardless
+    of how many events were logged. Window boundaries are bucket-aligned.
+    """
+
+    def __init__(self, types: Sequence[Enum], levels: Sequence[Enum], capacity: int = 1000,
+                 bucket_seconds: int = 60, retention_buckets: int = 24 * 60,
+                 segment_log: Optional[EventSegmentLog] = None, clock: Callable[[], float] = time.time):
+        self.types = list(types)
+        self.levels = list(levels)
+        self._type_index = {member: index for index, member in enumerate(self.types)}
+        self._level_index = {member: index for index, member in enumerate(self.levels)}
+        self.capacity = capacity
+        self.bucket_seconds = bucket_seconds
+        self.retention_buckets = retention_buckets
+        self.segment_log = segment_log
+        self.clock = clock
+
+        # Ring buffer
+        self._events: List[Any] = [None] * capacity
+        self._head = 0
+        self._count = 0
+        self.total_events = 0
+
+        # Rolling counters, one row per bucket
+        self._bucket_ids = np.full(retention_buckets, -1, dtype=np.int64)
+        self._type_counts = np.zeros((retention_buckets, len(self.types)), dtype=np.int64)
+        self._level_counts = np.zeros((retention_buckets, len(self.levels)), dtype=np.int64)
+        self._ip_counts: List[Counter] = [Counter() for _ in range(retention_buckets)]
+        self._lock = threading.Lock()
+
+    def append(self, event: Any):
+        """Record an event with ``type``, ``level``, ``source_ip`` and ``timestamp``"""
+        bucket = int(_event_time(event) // self.bucket_seconds)
+        slot = bucket % self.retention_buckets
+        with self._lock:
+            self._events[self._head] = event
+            self._head = (self._head + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+            self.total_events += 1
+
+            current = self._bucket_ids[slot]
+            if current != bucket:
+                if current > bucket:
+                    # Older than the retention period: kept in the ring only
+                    bucket = None
+                else:
+                    self._bucket_ids[slot] = bucket
+                    self._type_counts[slot] = 0
+                    self._level_counts[slot] = 0
+                    self._ip_counts[slot].clear()
+            if bucket is not None:
+                self._type_counts[slot, self._type_index[event.type]] += 1
+                self._level_counts[slot, self._level_index[event.level]] += 1
+                self._ip_counts[slot][event.source_ip] += 1
+
+        if self.segment_log is not None:
+            self.segment_log.append(event)
+
+    def _window_mask(self, seconds: float) -> np.ndarray:
+        newest = int(self.clock() // self.bucket_seconds)
+        buckets = min(max(1, math.ceil(seconds / self.bucket_seconds)), self.retention_buckets)
+        return (self._bucket_ids > newest - buckets) & (self._bucket_ids <= newest)
+
+    def window_summary(self, seconds: float, top_ips: int = 10) -> Dict:
+        """Event totals over the last ``seconds`` from the rollups"""
+        with self._lock:
+            mask = self._window_mask(seconds)
+            by_type = self._type_counts[mask].sum(axis=0)
+            by_level = self._level_counts[mask].sum(axis=0)
+            ips = Counter()
+            for slot in np.flatnonzero(mask):
+                ips.update(self._ip_counts[slot])
+        return {
+            "total_events": int(by_type.sum()),
+            "events_by_type": {self.types[index].value: int(count)
+                               for index, count in enumerate(by_type) if count},
+            "events_by_level": {self.levels[index].value: int(count)
+                                for index, count in enumerate(by_level) if count},
+            "top_source_ips": dict(ips.most_common(top_ips)),
+        }
+
+    def count_by_ip(self, source_ip: str, seconds: float) -> int:
+        """Events from one IP over the last ``seconds``"""
+        with self._lock:
+            return sum(self._ip_counts[slot][source_ip] for slot in np.flatnonzero(self._window_mask(seconds)))
+
+    def recent(self, limit: int = 10, since: Optional[float] = None) -> List[Any]:
+        """Newest ``limit`` events still in memory, oldest first"""
+        result = []
+        with self._lock:
+            index = self._head
+            for _ in range(self._count):
+                index = (index - 1) % self.capacity
+                event = self._events[index]
+                if len(result) >= limit or (since is not None and _event_time(event) < since):
+                    break
+                result.append(event)
+        result.reverse()
+        return result
+
+    def events(self) -> List[Any]:
+        """All events still in memory, oldest first"""
+        with self._lock:
+            start = (self._head - self._count) % self.capacity
+            return [self._events[(start + offset) % self.capacity] for offset in range(self._count)]
+
+    def clear(self):
+        with self._lock:
+            self._events = [None] * self.capacity
+            self._head = 0
+            self._count = 0
+            self._bucket_ids.fill(-1)
+            self._type_counts.fill(0)
+            self._level_counts.fill(0)
+            for counter in self._ip_counts:
+                counter.clear()
+
+    def close(self):
+        if self.segment_log is not None:
+            self.segment_log.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.events())
+
+
+# Example usage and testing
+if __name__ == "__main__":
+    import random
+    import shutil
+    import tempfile
+    from types import SimpleNamespace
+
+    print("📜 Security Event Log Demo")
+    print("=" * 50)
+
+    class Kind(Enum):
+        XSS = "xss"
+        BRUTE_FORCE = "brute_force"
+
+    class Level(Enum):
+        LOW = "low"
+        HIGH = "high"
+
+    directory = tempfile.mkdtemp(prefix="security-events-")
+    log = SecurityEventLog(Kind, Level, capacity=100, segment_log=EventSegmentLog(directory, max_segment_bytes=4096))
+    now = time.time()
+    for index in range(1000):
+        log.append(SimpleNamespace(type=random.choice(list(Kind)), level=random.choice(list(Level)),
+                                   source_ip=f"10.0.0.{index % 7}", description="demo",
+                                   timestamp=datetime.fromtimestamp(now - (1000 - index) * 30)))
+    print(f"✅ In memory: {len(log)} of {log.total_events} events")
+    print(f"✅ Last hour: {log.window_summary(3600)}")
+    print(f"✅ Segments on disk: {len(log.segment_log.segments())}")
+    log.close()
+    shutil.rmtree(directory)
@@ -0,0 +1,555 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Security Store - Shared session, lockout, IP block and rate limit state
+In-memory and Redis backends so every worker process of the advanced
+security system sees the same sessions and lockouts
+"""
+
+import heapq
+import json
+import secrets
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import asdict
+from datetime import datetime
+from typing import Callable, Deque, Dict, List, Optional, Set, Tuple
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class SecurityStore(ABC):
+    """Storage interface used by AdvancedSecurity
+
+    Times are epoch seconds from the store's clock. Entries expire on their
+    own: callers never have to scan for stale sessions, attempts or blocks.
+    """
+
+    # Sessions
+    @abstractmethod
+    def save_session(self, session, ttl: float):
+        ...
+
+    @abstractmethod
+    def get_session(self, session_id: str):
+        ...
+
+    @abstractmethod
+    def touch_session(self, session_id: str, ttl: float):
+        """Mark activity now and extend expiry; returns the session or None"""
+
+    @abstractmethod
+    def delete_session(self, session_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    def get_user_session_ids(self, user_id: str) -> List[str]:
+        ...
+
+    @abstractmethod
+    def delete_user_sessions(self, user_id: str) -> int:
+        ...
+
+    @abstractmethod
+    def count_sessions(self) -> int:
+        ...
+
+    @abstractmethod
+    def list_sessions(self) -> Dict:
+        ...
+
+    # Failed attempts and lockout
+    @abstractmethod
+    def record_failure(self, identifier: str, window: float, threshold: int) -> int:
+        """Record a failed attempt; returns the attempts inside ``window``"""
+
+    @abstractmethod
+    def is_locked_out(self, identifier: str) -> bool:
+        ...
+
+    @abstractmethod
+    def clear_failures(self, identifier: str):
+        ...
+
+    @abstractmethod
+    def list_failures(self) -> Dict[str, List[float]]:
+        ...
+
+    # IP blocks
+    @abstractmethod
+    def block_ip(self, ip: str, duration: float):
+        ...
+
+    @abstractmethod
+    def is_ip_blocked(self, ip: str) -> bool:
+        ...
+
+    @abstractmethod
+    def unblock_ip(self, ip: str) -> bool:
+        ...
+
+    @abstractmethod
+    def list_blocked_ips(self) -> Dict[str, float]:
+        ...
+
+    # Rate limiting
+    @abstractmethod
+    def hit_rate_limit(self, identifier: str, action: str, max_attempts: int,
+                       window: float) -> Tuple[bool, int]:
+        """Count an attempt if allowed; returns (allowed, retry_after seconds)"""
+
+
+class MemorySecurityStore(SecurityStore):
+    """Single-process store with heap-driven expiry
+
+    Every entry has one record in a min-heap of deadlines. When a record
+    comes due the entry's current deadline is checked: extended entries
+    (touched sessions, new attempts) are pushed back with the new deadline,
+    so activity does not grow the heap and nothing is ever scanned.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self.clock = clock
+        self._sessions: Dict[str, object] = {}
+        self._session_deadlines: Dict[str, float] = {}
+        self._user_sessions: Dict[str, Set[str]] = {}
+        self._failures: Dict[str, Deque[float]] = {}
+        self._failure_windows: Dict[str, float] = {}
+        self._lockouts: Dict[str, float] = {}
+        self._blocked: Dict[str, float] = {}
+        self._rates: Dict[Tuple[str, str], Deque[float]] = {}
+        self._rate_windows: Dict[Tuple[str, str], float] = {}
+        self._heap: List[Tuple[float, int, str, object]] = []
+        self._sequence = 0
+        self._lock = threading.RLock()
+
+    # Expiry
+    def _schedule(self, deadline: float, kind: str, key):
+        self._sequence += 1
+        heapq.heappush(self._heap, (deadline, self._sequence, kind, key))
+
+    def _current_deadline(self, kind: str, key) -> Optional[float]:
+        if kind == "session":
+            return self._session_deadlines.get(key)
+        if kind == "failure":
+            attempts = self._failures.get(key)
+            return attempts[-1] + self._failure_windows[key] if attempts else None
+        if kind == "block":
+            return self._blocked.get(key)
+        attempts = self._rates.get(key)
+        return attempts[-1] + self._rate_windows[key] if attempts else None
+
+    def _drop(self, kind: str, key):
+        if kind == "session":
+            self._remove_session(key)
+        elif kind == "failure":
+            self._failures.pop(key, None)
+            self._failure_windows.pop(key, None)
+            self._lockouts.pop(key, None)
+        elif kind == "block":
+            self._blocked.pop(key, None)
+        else:
+            self._rates.pop(key, None)
+            self._rate_windows.pop(key, None)
+
+    def expire(self) -> int:
+        """Remove everything whose deadline has passed; returns entries removed"""
+        removed = 0
+        with self._lock:
+            now = self.clock()
+            heap = self._heap
+            while heap and heap[0][0] <= now:
+                _, _, kind, key = heapq.heappop(heap)
+                deadline = self._current_deadline(kind, key)
+                if deadline is None:
+                    continue
+                if deadline > now:
+                    self._schedule(deadline, kind, key)
+                else:
+                    self._drop(kind, key)
+                    removed += 1
+        return removed
+
+    # Sessions
+    def save_session(self, session, ttl: float):
+        with self._lock:
+            self.expire()
+            session_id = session.session_id
+            is_new = session_id not in self._session_deadlines
+            self._sessions[session_id] = session
+            self._session_deadlines[session_id] = self.clock() + ttl
+            self._user_sessions.setdefault(session.user_id, set()).add(session_id)
+            if is_new:
+                self._schedule(self._session_deadlines[session_id], "session", session_id)
+
+    def get_session(self, session_id: str):
+        with self._lock:
+            deadline = self._session_deadlines.get(session_id)
+            if deadline is None:
+                return None
+            if deadline <= self.clock():
+                self._remove_session(session_id)
+                return None
+            return self._sessions[session_id]
+
+    def touch_session(self, session_id: str, ttl: float):
+        with self._lock:
+            session = self.get_session(session_id)
+            if session is not None:
+                now = self.clock()
+                session.last_activity = datetime.fromtimestamp(now)
+                self._session_deadlines[session_id] = now + ttl
+            return session
+
+    def delete_session(self, session_id: str) -> bool:
+        with self._lock:
+            return self._remove_session(session_id)
+
+    def _remove_session(self, session_id: str) -> bool:
+        session = self._sessions.pop(session_id, None)
+        self._session_deadlines.pop(session_id, None)
+        if session is None:
+            return False
+        user_sessions = self._user_sessions.get(session.user_id)
+        if user_sessions is not None:
+            user_sessions.discard(session_id)
+            if not user_sessions:
+                del self._user_sessions[session.user_id]
+        return True
+
+    def get_user_session_ids(self, user_id: str) -> List[str]:
+        with self._lock:
+            self.expire()
+            return sorted(self._user_sessions.get(user_id, ()))
+
+    def delete_user_sessions(self, user_id: str) -> int:
+        with self._lock:
+            session_ids = list(self._user_sessions.get(user_id, ()))
+            for session_id in session_ids:
+                self._remove_session(session_id)
+            return len(session_ids)
+
+    def count_sessions(self) -> int:
+        with self._lock:
+            self.expire()
+            return len(self._sessions)
+
+    def list_sessions(self) -> Dict:
+        with self._lock:
+            self.expire()
+            return dict(self._sessions)
+
+    # Failed attempts and lockout
+    def record_failure(self, identifier: str, window: float, threshold: int) -> int:
+        with self._lock:
+            self.expire()
+            now = self.clock()
+            attempts = self._failures.get(identifier)
+            if attempts is None or attempts.maxlen != threshold:
+                attempts = deque(attempts or (), maxlen=threshold)
+                if identifier not in self._failures:
+                    self._schedule(now + window, "failure", identifier)
+                self._failures[identifier] = attempts
+            self._failure_windows[identifier] = window
+            attempts.append(now)
+
+            cutoff = now - window
+            while attempts and attempts[0] <= cutoff:
+                attempts.popleft()
+
+            # Only the last ``threshold`` attempts matter: the identifier stays
+            # locked until the oldest of them leaves the window
+            if len(attempts) >= threshold:
+                self._lockouts[identifier] = attempts[0] + window
+            return len(attempts)
+
+    def is_locked_out(self, identifier: str) -> bool:
+        with self._lock:
+            locked_until = self._lockouts.get(identifier)
+            return locked_until is not None and locked_until > self.clock()
+
+    def clear_failures(self, identifier: str):
+        with self._lock:
+            self._failures.pop(identifier, None)
+            self._failure_windows.pop(identifier, None)
+            self._lockouts.pop(identifier, None)
+
+    def list_failures(self) -> Dict[str, List[float]]:
+        with self._lock:
+            self.expire()
+            now = self.clock()
+            return {identifier: [attempt for attempt in attempts
+                                 if attempt > now - self._failure_windows[identifier]]
+                    for identifier, attempts in self._failures.items()}
+
+    # IP blocks
+    def block_ip(self, ip: str, duration: float):
+        with self._lock:
+            self.expire()
+            is_new = ip not in self._blocked
+            self._blocked[ip] = self.clock() + duration
+            if is_new:
+                self._schedule(self._blocked[ip], "block", ip)
+
+    def is_ip_blocked(self, ip: str) -> bool:
+        with self._lock:
+            until = self._blocked.get(ip)
+            if until is None:
+                return False
+            if until <= self.clock():
+                del self._blocked[ip]
+                return False
+            return True
+
+    def unblock_ip(self, ip: str) -> bool:
+        with self._lock:
+            return self._blocked.pop(ip, None) is not None
+
+    def list_blocked_ips(self) -> Dict[str, float]:
+        with self._lock:
+            self.expire()
+            now = self.clock()
+            return {ip: until for ip, until in self._blocked.items() if until > now}
+
+    # Rate limiting
+    def hit_rate_limit(self, identifier: str, action: str, max_attempts: int,
+                       window: float) -> Tuple[bool, int]:
+        with self._lock:
+            self.expire()
+            now = self.clock()
+            key = (action, identifier)
+            attempts = self._rates.get(key)
+            if attempts is None:
+                attempts = self._rates[key] = deque()
+                self._schedule(now + window, "rate", key)
+            self._rate_windows[key] = window
+
+            while attempts and attempts[0] < now - window:
+                attempts.popleft()
+            if len(attempts) >= max_attempts:
+                return False, int(attempts[0] + window - now) if attempts else int(window)
+
+            attempts.append(now)
+            return True, 0
+
+
+class RedisSecurityStore(SecurityStore):
+    """Store shared by all workers through a Redis server
+
+    ``client`` is a redis-py style client (``redis.Redis`` or a compatible
+    fake). Keys carry Redis TTLs, so the server does the expiry; sorted
+    sets keyed by deadline index sessions, failures and blocks for counts
+    and listings and are trimmed with ZREMRANGEBYSCORE.
+    """
+
+    def __init__(self, client, prefix: str = "security:", clock: Callable[[], float] = time.time):
+        self.client = client
+        self.prefix = prefix
+        self.clock = clock
+
+    @classmethod
+    def from_url(cls, redis_url: str = "redis://localhost:6379", **kwargs) -> "RedisSecurityStore":
+        import redis
+        return cls(redis.from_url(redis_url), **kwargs)
+
+    def _key(self, *parts: str) -> str:
+        return self.prefix + ":".join(parts)
+
+    @staticmethod
+    def _text(value) -> str:
+        return value.decode("utf-8") if isinstance(value, bytes) else value
+
+    @staticmethod
+    def _ttl_ms(seconds: float) -> int:
+        return max(1, int(seconds * 1000))
+
+    # Sessions
+    def _encode_session(self, session) -> str:
+        data = asdict(session)
+        data["created_at"] = session.created_at.isoformat()
+        data["last_activity"] = session.last_activity.isoformat()
+        data["security_level"] = session.security_level.value
+        return json.dumps(data)
+
+    def _decode_session(self, raw):
+        from advanced_security import SecurityLevel, UserSession
+        data = json.loads(self._text(raw))
+        data["created_at"] = datetime.fromisoformat(data["created_at"])
+        data["last_activity"] = datetime.fromisoformat(data["last_activity"])
+        data["security_level"] = SecurityLevel(data["security_level"])
+        return UserSession(**data)
+
+    def _write_session(self, session, ttl: float):
+        deadline = self.clock() + ttl
+        user_index = self._key("user_sessions", session.user_id)
+        pipe = self.client.pipeline(transaction=True)
+        pipe.set(self._key("session", session.session_id), self._encode_session(session), px=self._ttl_ms(ttl))
+        pipe.sadd(user_index, session.session_id)
+        pipe.pexpire(user_index, self._ttl_ms(ttl))
+        pipe.zadd(self._key("sessions"), {session.session_id: deadline})
+        pipe.execute()
+
+    def save_session(self, session, ttl: float):
+        self._write_session(session, ttl)
+
+    def get_session(self, session_id: str):
+        raw = self.client.get(self._key("session", session_id))
+        return self._decode_session(raw) if raw is not None else None
+
+    def touch_session(self, session_id: str, ttl: float):
+        session = self.get_session(session_id)
+        if session is not None:
+            session.last_activity = datetime.fromtimestamp(self.clock())
+            self._write_session(session, ttl)
+        return session
+
+    def delete_session(self, session_id: str) -> bool:
+        session = self.get_session(session_id)
+        pipe = self.client.pipeline(transaction=True)
+        pipe.delete(self._key("session", session_id))
+        pipe.zrem(self._key("sessions"), session_id)
+        if session is not None:
+            pipe.srem(self._key("user_sessions", session.user_id), session_id)
+        return bool(pipe.execute()[0])
+
+    def get_user_session_ids(self, user_id: str) -> List[str]:
+        user_index = self._key("user_sessions", user_id)
+        session_ids = sorted(self._text(member) for member in self.client.smembers(user_index))
+        if not session_ids:
+            return []
+        values = self.client.mget([self._key("session", session_id) for session_id in session_ids])
+        stale = [session_id for session_id, value in zip(session_ids, values) if value is None]
+        if stale:
+            self.client.srem(user_index, *stale)
+        return [session_id for session_id, value in zip(session_ids, values) if value is not None]
+
+    def delete_user_sessions(self, user_id: str) -> int:
+        user_index = self._key("user_sessions", user_id)
+        session_ids = [self._text(member) for member in self.client.smembers(user_index)]
+        if not session_ids:
+            return 0
+        pipe = self.client.pipeline(transaction=True)
+        pipe.delete(*[self._key("session", session_id) for session_id in session_ids])
+        pipe.zrem(self._key("sessions"), *session_ids)
+        pipe.delete(user_index)
+        return pipe.execute()[0]
+
+    def _live_index(self, name: str) -> List[Tuple[str, float]]:
+        index = self._key(name)
+        pipe = self.client.pipeline(transaction=True)
+        pipe.zremrangebyscore(index, "-inf", self.clock())
+        pipe.zrangebyscore(index, "-inf", "+inf", withscores=True)
+        return [(self._text(member), score) for member, score in pipe.execute()[1]]
+
+    def count_sessions(self) -> int:
+        index = self._key("sessions")
+        pipe = self.client.pipeline(transaction=True)
+        pipe.zremrangebyscore(index, "-inf", self.clock())
+        pipe.zcard(index)
+        return pipe.execute()[1]
+
+    def list_sessions(self) -> Dict:
+        session_ids = [session_id for session_id, _ in self._live_index("sessions")]
+        if not session_ids:
+            return {}
+        values = self.client.mget([self._key("session", session_id) for session_id in session_ids])
+        return {session_id: self._decode_session(value)
+                for session_id, value in zip(session_ids, values) if value is not None}
+
+    # Failed attempts and lockout
+    def record_failure(self, identifier: str, window: float, threshold: int) -> int:
+        now = self.clock()
+        failures = self._key("failures", identifier)
+        pipe = self.client.pipeline(transaction=True)
+        pipe.lpush(failures, repr(now))
+        pipe.ltrim(failures, 0, threshold - 1)
+        pipe.pexpire(failures, self._ttl_ms(window))
+        pipe.zadd(self._key("failure_index"), {identifier: now + window})
+        pipe.lrange(failures, 0, -1)
+        attempts = [float(self._text(value)) for value in pipe.execute()[-1]]
+
+        recent = [attempt for attempt in attempts if attempt > now - window]
+        if len(recent) >= threshold:
+            locked_until = min(recent) + window
+            self.client.set(self._key("lockout", identifier), repr(locked_until),
+                            px=self._ttl_ms(locked_until - now))
+        return len(recent)
+
+    def is_locked_out(self, identifier: str) -> bool:
+        return bool(self.client.exists(self._key("lockout", identifier)))
+
+    def clear_failures(self, identifier: str):
+        pipe = self.client.pipeline(transaction=True)
+        pipe.delete(self._key("failures", identifier), self._key("lockout", identifier))
+        pipe.zrem(self._key("failure_index"), identifier)
+        pipe.execute()
+
+    def list_failures(self) -> Dict[str, List[float]]:
+        result = {}
+        for identifier, expires_at in self._live_index("failure_index"):
+            values = self.client.lrange(self._key("failures", identifier), 0, -1)
+            if values:
+                result[identifier] = sorted(float(self._text(value)) for value in values)
+        return result
+
+    # IP blocks
+    def block_ip(self, ip: str, duration: float):
+        until = self.clock() + duration
+        pipe = self.client.pipeline(transaction=True)
+        pipe.set(self._key("blocked", ip), repr(until), px=self._ttl_ms(duration))
+        pipe.zadd(self._key("blocked_index"), {ip: until})
+        pipe.execute()
+
+    def is_ip_blocked(self, ip: str) -> bool:
+        return bool(self.client.exists(self._key("blocked", ip)))
+
+    def unblock_ip(self, ip: str) -> bool:
+        pipe = self.client.pipeline(transaction=True)
+        pipe.delete(self._key("blocked", ip))
+        pipe.zrem(self._key("blocked_index"), ip)
+        return bool(pipe.execute()[0])
+
+    def list_blocked_ips(self) -> Dict[str, float]:
+        return dict(self._live_index("blocked_index"))
+
+    # Rate limiting
+    def hit_rate_limit(self, identifier: str, action: str, max_attempts: int,
+                       window: float) -> Tuple[bool, int]:
+        # Record the attempt and count in one transaction, then roll back a rejected
+        # one, so concurrent workers can never admit more than max_attempts
+        now = self.clock()
+        key = self._key("rate", action, identifier)
+        member = f"{now!r}:{secrets.token_hex(4)}"
+        pipe = self.client.pipeline(transaction=True)
+        pipe.zremrangebyscore(key, "-inf", now - window)
+        pipe.zadd(key, {member: now})
+        pipe.zcard(key)
+        pipe.pexpire(key, self._ttl_ms(window))
+        pipe.zrange(key, 0, 0, withscores=True)
+        _, _, count, _, oldest = pipe.execute()
+        if count > max_attempts:
+            self.client.zrem(key, member)
+            return False, int(oldest[0][1] + window - now) if oldest else int(window)
+        return True, 0
+
+
+# Example usage and testing
+if __name__ == "__main__":
+    print("🗝️ Security Store Demo")
+    print("=" * 50)
+
+    store = MemorySecurityStore()
+    for attempt in range(5):
+        count = store.record_failure("user@example.com", window=300, threshold=5)
+    print(f"✅ Failed attempts: {count}, locked out: {store.is_locked_out('user@example.com')}")
+
+    store.block_ip("203.0.113.7", duration=60)
+    print(f"✅ Blocked IPs: {list(store.list_blocked_ips())}")
+
+    allowed = [store.hit_rate_limit("203.0.113.7", "login", 3, 60)[0] for _ in range(4)]
+    print(f"✅ Rate limit decisions: {allowed}")
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Static Site Export Pipeline - Parallel multi-page static site export
+Renders pages in a worker pool and writes them straight to disk or a ZIP stream,
+with shared fingerprinted assets and an incrementally written sitemap
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from itertools import islice
+from pathlib import Path, PurePosixPath
+from typing import BinaryIO, Deque, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from xml.sax.saxutils import escape
+import logging
+
+from advanced_export_system import AdvancedExportSystem, ExportOptions
+from streaming_zip import StreamingZipWriter
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PageSource = Union[Dict[str, str], Iterable[Tuple[str, str]]]
+
+# Sitemap protocol limit per file
+SITEMAP_MAX_URLS = 50000
+
+# Per-process export system used by process pool workers
+_worker_system: Optional[AdvancedExportSystem] = None
+
+
+def _create_worker_system(export_templates: Dict[str, str]) -> AdvancedExportSystem:
+    """Export system with the caller's templates"""
+    system = AdvancedExportSystem()
+    system.export_templates = dict(export_templates)
+    return system
+
+
+def _init_worker(export_templates: Dict[str, str]):
+    """Create the worker process's export system"""
+    global _worker_system
+    _worker_system = _create_worker_system(export_templates)
+
+
+def _render_batch(batch: List[Tuple[str, str]], options: ExportOptions, metadata: Dict,
+                  assets: Dict[str, str], output_dir: Optional[str],
+                  system: Optional[AdvancedExportSystem] = None) -> List[Tuple[str, Union[str, int]]]:
+    """Render a batch of pages
+
+    ``assets`` maps metadata keys to shared asset files at the export root;
+    each page links them relative to its own directory. Thread pools pass
+    their pipeline's ``system``; process workers use the one made by
+    ``_init_worker``. With ``output_dir`` the pages are written by the worker
+    and only their sizes are returned, so rendered HTML never travels back to
+    the parent process.
+    """
+    system = system if system is not None else _worker_system
+    results: List[Tuple[str, Union[str, int]]] = []
+    for page_path, page_content in batch:
+        prefix = "../" * page_path.count("/")
+        page_metadata = {**metadata, "title": f"{metadata.get('title', 'Site')} - {page_path}"}
+        page_metadata.update({key: prefix + file_name for key, file_name in assets.items()})
+        html_content = system.export_html(page_content, options, page_metadata)
+        if output_dir is None:
+            results.append((page_path, html_content))
+            continue
+        data = html_content.encode("utf-8")
+        target = Path(output_dir) / page_path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(data)
+        results.append((page_path, len(data)))
+    return results
+
+
+class SitemapWriter:
+    """Sitemap written one URL at a time
+
+    URLs are appended to ``sitemap-N.xml`` parts of at most ``max_urls`` entries.
+    On close a single part is renamed to ``sitemap.xml``; several parts get a
+    ``sitemap.xml`` sitemap index instead.
+    """
+
+    def __init__(self, directory: Union[str, Path], base_url: str, max_urls: int = SITEMAP_MAX_URLS):
+        self.directory = Path(directory)
+        self.base_url = base_url.rstrip("/")
+        self.max_urls = max_urls
+        self.lastmod = datetime.now().strftime("%Y-%m-%d")
+        self.parts: List[Path] = []
+        self.url_count = 0
+        self._handle = None
+        self._part_count = 0
+
+    def add(self, page_path: str):
+        """Append one page URL"""
+        if self._handle is None or self._part_count >= self.max_urls:
+            self._open_part()
+        self._handle.write(
+            f'  <url>\n'
+            f'    <loc>{escape(self.base_url + "/" + page_path)}</loc>\n'
+            f'    <lastmod>{self.lastmod}</lastmod>\n'
+            f'    <changefreq>weekly</changefreq>\n'
+            f'    <priority>0.8</priority>\n'
+            f'  </url>\n'
+        )
+        self._part_count += 1
+        self.url_count += 1
+
+    def close(self) -> List[Path]:
+        """Finish the sitemap and return the files written"""
+        self._close_part()
+        if not self.parts:
+            self._open_part()
+            self._close_part()
+
+        sitemap_path = self.directory / "sitemap.xml"
+        if len(self.parts) == 1:
+            self.parts[0].replace(sitemap_path)
+            self.parts = []
+            return [sitemap_path]
+
+        with open(sitemap_path, "w", encoding="utf-8") as index:
+            index.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+            index.write('<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+            for part in self.parts:
+                index.write(f'  <sitemap>\n'
+                            f'    <loc>{escape(self.base_url + "/" + part.name)}</loc>\n'
+                            f'    <lastmod>{self.lastmod}</lastmod>\n'
+                            f'  </sitemap>\n')
+            index.write('</sitemapindex>\n')
+        return [sitemap_path] + self.parts
+
+    def _open_part(self):
+        self._close_part()
+        part = self.directory / f"sitemap-{len(self.parts) + 1}.xml"
+        self.parts.append(part)
+        self._handle = open(part, "w", encoding="utf-8")
+        self._handle.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        self._handle.write('<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+        self._part_count = 0
+
+    def _close_part(self):
+        if self._handle is not None:
+            self._handle.write('</urlset>\n')
+            self._handle.close()
+            self._handle = None
+
+
+class StaticSiteExportPipeline:
+    """Parallel static site exporter with bounded memory
+
+    Pages are rendered in batches on a process pool (or a thread pool with
+    ``use_processes=False``); at most ``max_pending`` batches are in flight, so
+    memory does not grow with the number of pages. Shared CSS/JS is minified
+    once and written at the export root under content-hashed names that every
+    page references by a path relative to its own directory.
+    """
+
+    def __init__(self, export_system: Optional[AdvancedExportSystem] = None,
+                 max_workers: Optional[int] = None, batch_size: int = 32,
+                 max_pending: Optional[int] = None, use_processes: bool = True):
+        self.export_system = export_system or AdvancedExportSystem()
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.max_pending = max_pending or self.max_workers * 2
+        self.use_processes = use_processes
+
+    # Public API
+    def export_to_directory(self, pages: PageSource, options: ExportOptions,
+                            output_dir: Union[str, Path], metadata: Dict = None,
+                            shared_css: str = "", shared_js: str = "") -> Dict:
+        """Export a static site into ``output_dir``"""
+        start = time.perf_counter()
+        metadata = dict(metadata or {})
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        report = self._new_report()
+        for file_name, content in self._shared_assets(options, shared_css, shared_js, report):
+            report["bytes_written"] += self._write_file(output_dir / file_name, content)
+
+        sitemap = SitemapWriter(output_dir, metadata.get("base_url", ""))
+        for page_path, size in self._render_pages(pages, options, metadata, report, str(output_dir)):
+            sitemap.add(page_path)
+            report["pages"] += 1
+            report["bytes_written"] += size
+
+        report["sitemaps"] = [path.name for path in sitemap.close()]
+        robots = self.export_system._generate_robots_txt(metadata.get("base_url", ""))
+        report["bytes_written"] += self._write_file(output_dir / "robots.txt", robots)
+        report["duration"] = time.perf_counter() - start
+        logger.info(f"Exported {report['pages']} pages to {output_dir}")
+        return report
+
+    def iter_zip(self, pages: PageSource, options: ExportOptions, metadata: Dict = None,
+                 shared_css: str = "", shared_js: str = "",
+                 report: Optional[Dict] = None) -> Iterator[bytes]:
+        """Export a static site as a streamed ZIP archive"""
+        metadata = dict(metadata or {})
+        report = report if report is not None else {}
+        report.update(self._new_report())
+        writer = StreamingZipWriter(
+            compresslevel=self.export_system.optimization_settings["compression_level"][options.quality.value]
+        )
+        # Sitemap parts are spooled to disk while pages stream into the archive
+        with tempfile.TemporaryDirectory(prefix="sitemap-") as spool_dir:
+            yield from writer.iter_zip(
+                self._iter_zip_entries(pages, options, metadata, shared_css, shared_js, spool_dir, report)
+            )
+        report["bytes_written"] = writer.last_stats["bytes_out"]
+
+    def export_to_zip(self, pages: PageSource, options: ExportOptions, fileobj: BinaryIO,
+                      metadata: Dict = None, shared_css: str = "", shared_js: str = "") -> Dict:
+        """Export a static site as a ZIP archive into a binary file object"""
+        start = time.perf_counter()
+        report: Dict = {}
+        for chunk in self.iter_zip(pages, options, metadata, shared_css, shared_js, report):
+            fileobj.write(chunk)
+        report["duration"] = time.perf_counter() - start
+        return report
+
+    # Pipeline stages
+    def _iter_zip_entries(self, pages: PageSource, options: ExportOptions, metadata: Dict,
+                          shared_css: str, shared_js: str, spool_dir: str,
+                          report: Dict) -> Iterator[Tuple[str, Union[str, Path]]]:
+        yield from self._shared_assets(options, shared_css, shared_js, report)
+
+        sitemap = SitemapWriter(spool_dir, metadata.get("base_url", ""))
+        for page_path, html_content in self._render_pages(pages, options, metadata, report, None):
+            sitemap.add(page_path)
+            report["pages"] += 1
+            yield page_path, html_content
+
+        sitemap_files = sitemap.close()
+        report["sitemaps"] = [path.name for path in sitemap_files]
+        for path in sitemap_files:
+            yield path.name, path
+        yield "robots.txt", self.export_system._generate_robots_txt(metadata.get("base_url", ""))
+
+    def _shared_assets(self, options: ExportOptions, shared_css: str,
+                       shared_js: str, report: Dict) -> List[Tuple[str, str]]:
+        """Minify shared CSS/JS once under fingerprinted names recorded in the report"""
+        assets: List[Tuple[str, str]] = []
+        for content, stem, extension in ((shared_css, "styles", "css"), (shared_js, "script", "js")):
+            if not content:
+                continue
+            if options.minify:
+                minify = self.export_system._minify_css if extension == "css" else self.export_system._minify_js
+                content = minify(content)
+            fingerprint = hashlib.sha256(content.encode("utf-8")).hexdigest()[:10]
+            file_name = f"{stem}.{fingerprint}.{extension}"
+            report["shared_assets"][extension] = file_name
+            assets.append((file_name, content))
+        return assets
+
+    def _render_pages(self, pages: PageSource, options: ExportOptions, metadata: Dict, report: Dict,
+                      output_dir: Optional[str]) -> Iterator[Tuple[str, Union[str, int]]]:
+        """Render pages in order with a bounded number of batches in flight"""
+        page_iter = (self._checked_page(output_dir, page)
+                     for page in (pages.items() if isinstance(pages, dict) else pages))
+        assets = {f"{extension}_file": file_name for extension, file_name in report["shared_assets"].items()}
+
+        pending: Deque = deque()
+        executor, system = self._create_executor()
+        with executor:
+            while True:
+                batch = list(islice(page_iter, self.batch_size))
+                if batch:
+                    pending.append(executor.submit(_render_batch, batch, options, metadata, assets,
+                                                   output_dir, system))
+                if pending and (len(pending) >= self.max_pending or not batch):
+                    yield from pending.popleft().result()
+                if not batch and not pending:
+                    break
+
+    def _create_executor(self) -> Tuple[Executor, Optional[AdvancedExportSystem]]:
+        """Worker pool and, for threads, the export system its batches share"""
+        templates = self.export_system.export_templates
+        if self.use_processes:
+            return ProcessPoolExecutor(max_workers=self.max_workers,
+                                       initializer=_init_worker, initargs=(templates,)), None
+        return ThreadPoolExecutor(max_workers=self.max_workers), _create_worker_system(templates)
+
+    # Helpers
+    @staticmethod
+    def _checked_page(output_dir: Optional[str], page: Tuple[str, str]) -> Tuple[str, str]:
+        """Normalised relative page path; rejects anything that could land outside the export
+
+        Applies to ZIP entries too, so extracting an archive cannot write
+        outside the extraction directory.
+        """
+        page_path, content = page
+        parts = PurePosixPath(page_path).parts
+        if not parts or "\\" in page_path or page_path.startswith("/") or ".." in parts or ":" in parts[0]:
+            raise ValueError(f"Page path escapes the export directory: {page_path}")
+        page_path = str(PurePosixPath(*parts))
+        if output_dir is not None:
+            root = Path(output_dir).resolve()
+            if root not in (root / page_path).resolve().parents:
+                raise ValueError(f"Page path escapes the export directory: {page_path}")
+        return page_path, content
+
+    @staticmethod
+    def _write_file(path: Path, content: str) -> int:
+        data = content.encode("utf-8")
+        path.write_bytes(data)
+        return len(data)
+
+    @staticmethod
+    def _new_report() -> Dict:
+        return {"pages": 0, "bytes_written": 0, "shared_assets": {}, "sitemaps": []}
+
+
+# Example usage and testing
+if __name__ == "__main__":
+    print("🗂️ Static Site Export Pipeline Demo")
+    print("=" * 50)
+
+    pipeline = StaticSiteExportPipeline()
+    options = pipeline.export_system.export_presets["production"]
+    pages = ((f"blog/post-{i}.html", f"<h1>Post {i}</h1><p>Content</p>") for i in range(2000))
+
+    output = Path(tempfile.mkdtemp(prefix="static-site-"))
+    report = pipeline.export_to_directory(
+        pages, options, output,
+        {"title": "My Site", "base_url": "https://mysite.com"},
+        shared_css="body { color: #333; }", shared_js="console.log('ready');"
+    )
+    print(f"✅ Exported {report['pages']} pages in {report['duration']:.2f}s")
+    print(f"   Shared assets: {report['shared_assets']}")
+    print(f"   Sitemaps: {report['sitemaps']}")
+    shutil.rmtree(output, ignore_errors=True)
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Streaming ZIP Writer - Chunked ZIP archive generation for exports
+Writes archives entry by entry without building them in memory or in a temp file
+"""
+
+import os
+import struct
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, Deque, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ZipSource = Union[bytes, str, Path]
+
+# Formats that are already compressed; deflating them again only burns CPU
+PRECOMPRESSED_EXTENSIONS = frozenset({
+    "png", "jpg", "jpeg", "gif", "webp", "avif", "ico",
+    "woff", "woff2", "gz", "tgz", "bz2", "xz", "zst", "br", "zip", "rar", "7z",
+    "mp3", "mp4", "m4a", "webm", "ogg", "mov", "pdf",
+})
+
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+ZIP64_LIMIT = (1 << 31) - 1
+ZIP_MAX_VALUE = 0xFFFFFFFF
+ZIP_MAX_ENTRIES = 0xFFFF
+
+_FLAG_DATA_DESCRIPTOR = 0x08
+_FLAG_UTF8 = 0x800
+_LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+_CENTRAL_HEADER = struct.Struct("<IHHHHHHIIIHHHHHII")
+_END_RECORD = struct.Struct("<IHHHHIIH")
+_ZIP64_END_RECORD = struct.Struct("<IQHHIIQQQQ")
+_ZIP64_END_LOCATOR = struct.Struct("<IIQI")
+
+
+def _dos_datetime(timestamp: Optional[float] = None) -> Tuple[int, int]:
+    """Convert a timestamp to the (time, date) pair stored in ZIP headers"""
+    t = time.localtime(timestamp if timestamp is not None else time.time())
+    year = max(t.tm_year, 1980)
+    dos_time = (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2)
+    dos_date = ((year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday
+    return dos_time, dos_date
+
+
+def _compress_block(data: bytes, method: int, level: int) -> Tuple[int, int, bytes]:
+    """Compress one in-memory entry; runs in a worker thread (zlib releases the GIL)"""
+    crc = zlib.crc32(data)
+    if method == ZIP_DEFLATED:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+        payload = compressor.compress(data) + compressor.flush()
+        # Incompressible text (already minified/encoded data) is cheaper stored
+        if len(payload) < len(data):
+            return ZIP_DEFLATED, crc, payload
+    return ZIP_STORED, crc, data
+
+
+class _CentralEntry:
+    """Central directory bookkeeping for one written entry"""
+
+    __slots__ = ("name", "flags", "method", "dos_time", "dos_date",
+                 "crc", "compress_size", "file_size", "offset")
+
+    def __init__(self, name: bytes, flags: int, method: int, dos_time: int, dos_date: int,
+                 crc: int, compress_size: int, file_size: int, offset: int):
+        self.name = name
+        self.flags = flags
+        self.method = method
+        self.dos_time = dos_time
+        self.dos_date = dos_date
+        self.crc = crc
+        self.compress_size = compress_size
+        self.file_size = file_size
+        self.offset = offset
+
+
+class StreamingZipWriter:
+    """Streaming ZIP archive writer
+
+    Yields the archive as byte chunks, suitable for an HTTP streaming response
+    or for writing straight to a file. Already-compressed formats are stored,
+    text entries are deflated in parallel on a thread pool, and large files are
+    streamed from disk in ``chunk_size`` pieces. ZIP64 records are emitted
+    automatically when sizes, offsets or entry counts require them.
+    """
+
+    def __init__(self, compresslevel: int = 6, max_workers: Optional[int] = None,
+                 chunk_size: int = 64 * 1024, inline_limit: int = 8 * 1024 * 1024,
+                 precompressed_extensions: Optional[Iterable[str]] = None):
+        self.compresslevel = compresslevel
+        self.max_workers = max_workers or min(8, os.cpu_count() or 1)
+        self.chunk_size = chunk_size
+        self.inline_limit = inline_limit
+        self.precompressed_extensions = frozenset(
+            ext.lower().lstrip(".") for ext in precompressed_extensions
+        ) if precompressed_extensions is not None else PRECOMPRESSED_EXTENSIONS
+        self.last_stats: Dict[str, int] = {}
+
+    # Public API
+    def iter_zip(self, entries: Iterable[Tuple[str, ZipSource]]) -> Iterator[bytes]:
+        """Yield the archive for ``(arcname, source)`` entries as byte chunks
+
+        ``source`` may be ``bytes``, ``str`` (encoded as UTF-8) or a ``Path``
+        to a file on disk. Entries are written in the order given.
+        """
+        self._reset()
+        max_pending = self.max_workers * 2
+        pending: Deque = deque()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for arcname, source in entries:
+                if isinstance(source, Path) and source.stat().st_size > self.inline_limit:
+                    # Keep archive order: drain queued entries before streaming from disk
+                    while pending:
+                        yield from self._emit_block(*self._pop(pending))
+                    yield from self._emit_file(arcname, source)
+                    continue
+
+                method = self._method_for(arcname)
+                future = pool.submit(self._load_and_compress, source, method)
+                pending.append((arcname, self._source_mtime(source), future))
+
+                while len(pending) >= max_pending:
+                    yield from self._emit_block(*self._pop(pending))
+
+            while pending:
+                yield from self._emit_block(*self._pop(pending))
+
+        yield from self._emit_central_directory()
+
+    def write_zip(self, entries: Iterable[Tuple[str, ZipSource]], fileobj: BinaryIO) -> int:
+        """Write the archive to a binary file object, returning the number of bytes written"""
+        for chunk in self.iter_zip(entries):
+            fileobj.write(chunk)
+        return self.last_stats["bytes_out"]
+
+    @staticmethod
+    def iter_directory(folder: Union[str, Path]) -> Iterator[Tuple[str, Path]]:
+        """Yield ``(arcname, path)`` entries for every file below ``folder``"""
+        folder = Path(folder)
+        for file_path in sorted(folder.rglob('*')):
+            if file_path.is_file():
+                yield file_path.relative_to(folder).as_posix(), file_path
+
+    # Internal helpers
+    def _reset(self):
+        self._offset = 0
+        self._central: List[_CentralEntry] = []
+        self.last_stats = {
+            "entries": 0,
+            "stored": 0,
+            "deflated": 0,
+            "bytes_in": 0,
+            "bytes_out": 0,
+        }
+
+    def _method_for(self, arcname: str) -> int:
+        extension = arcname.rsplit(".", 1)[-1].lower() if "." in arcname else ""
+        return ZIP_STORED if extension in self.precompressed_extensions else ZIP_DEFLATED
+
+    @staticmethod
+    def _source_mtime(source: ZipSource) -> Optional[float]:
+        return source.stat().st_mtime if isinstance(source, Path) else None
+
+    def _load_and_compress(self, source: ZipSource, method: int) -> Tuple[int, int, int, bytes]:
+        if isinstance(source, Path):
+            data = source.read_bytes()
+        elif isinstance(source, str):
+            data = source.encode("utf-8")
+        else:
+            data = bytes(source)
+        actual_method, crc, payload = _compress_block(data, method, self.compresslevel)
+        return actual_method, crc, len(data), payload
+
+    @staticmethod
+    def _pop(pending: Deque) -> Tuple:
+        arcname, mtime, future = pending.popleft()
+        method, crc, file_size, payload = future.result()
+        return arcname, mtime, method, crc, file_size, payload
+
+    def _local_header(self, name: bytes, flags: int, method: int, dos_time: int, dos_date: int,
+                      crc: int, compress_size: int, file_size: int, zip64: bool) -> bytes:
+        extra = b""
+        if zip64:
+            extra = struct.pack("<HHQQ", 0x0001, 16, file_size, compress_size)
+            compress_size = file_size = ZIP_MAX_VALUE
+        header = _LOCAL_HEADER.pack(
+            0x04034B50, 45 if zip64 else 20, flags, method, dos_time, dos_date,
+            crc, compress_size, file_size, len(name), len(extra)
+        )
+        return header + name + extra
+
+    def _record(self, entry: _CentralEntry, written: int):
+        self._central.append(entry)
+        self._offset += written
+        self.last_stats["entries"] += 1
+        self.last_stats["bytes_in"] += entry.file_size
+        self.last_stats["stored" if entry.method == ZIP_STORED else "deflated"] += 1
+
+    def _emit_block(self, arcname: str, mtime: Optional[float], method: int,
+                    crc: int, file_size: int, payload: bytes) -> Iterator[bytes]:
+        name = arcname.encode("utf-8")
+        dos_time, dos_date = _dos_datetime(mtime)
+        zip64 = max(file_size, len(payload)) > ZIP64_LIMIT
+        header = self._local_header(name, _FLAG_UTF8, method, dos_time, dos_date,
+                                    crc, len(payload), file_size, zip64)
+        entry = _CentralEntry(name, _FLAG_UTF8, method, dos_time, dos_date,
+                              crc, len(payload), file_size, self._offset)
+        yield header
+        view = memoryview(payload)
+        for start in range(0, len(view), self.chunk_size):
+            yield bytes(view[start:start + self.chunk_size])
+        self._record(entry, len(header) + len(payload))
+        self.last_stats["bytes_out"] = self._offset
+
+    def _emit_file(self, arcname: str, path: Path) -> Iterator[bytes]:
+        """Stream a large file from disk, trailing sizes in a data descriptor"""
+        name = arcname.encode("utf-8")
+        stat = path.stat()
+        method = self._method_for(arcname)
+        flags = _FLAG_UTF8 | _FLAG_DATA_DESCRIPTOR
+        dos_time, dos_date = _dos_datetime(stat.st_mtime)
+        zip64 = stat.st_size * 1.05 > ZIP64_LIMIT
+        header = self._local_header(name, flags, method, dos_time, dos_date, 0, 0, 0, zip64)
+        offset = self._offset
+        yield header
+
+        crc = 0
+        file_size = 0
+        compress_size = 0
+        compressor = zlib.compressobj(self.compresslevel, zlib.DEFLATED, -15) \
+            if method == ZIP_DEFLATED else None
+        with open(path, "rb") as handle:
+            while True:
+                chunk = handle.read(self.chunk_size)
+                if not chunk:
+                    break
+                crc = zlib.crc32(chunk, crc)
+                file_size += len(chunk)
+                if compressor is not None:
+                    chunk = compressor.compress(chunk)
+                    if not chunk:
+                        continue
+                compress_size += len(chunk)
+                yield chunk
+        if compressor is not None:
+            tail = compressor.flush()
+            compress_size += len(tail)
+            yield tail
+
+        if zip64:
+            descriptor = struct.pack("<IIQQ", 0x08074B50, crc, compress_size, file_size)
+        else:
+            descriptor = struct.pack("<IIII", 0x08074B50, crc, compress_size, file_size)
+        yield descriptor
+
+        entry = _CentralEntry(name, flags, method, dos_time, dos_date,
+                              crc, compress_size, file_size, offset)
+        self._record(entry, len(header) + compress_size + len(descriptor))
+        self.last_stats["bytes_out"] = self._offset
+
+    def _emit_central_directory(self) -> Iterator[bytes]:
+        cd_offset = self._offset
+        cd_size = 0
+        buffer: List[bytes] = []
+        buffered = 0
+
+        for entry in self._central:
+            extra_fields = []
+            file_size, compress_size, offset = entry.file_size, entry.compress_size, entry.offset
+            if file_size > ZIP64_LIMIT:
+                extra_fields.append(file_size)
+                file_size = ZIP_MAX_VALUE
+            if compress_size > ZIP64_LIMIT:
+                extra_fields.append(compress_size)
+                compress_size = ZIP_MAX_VALUE
+            if offset > ZIP64_LIMIT:
+                extra_fields.append(offset)
+                offset = ZIP_MAX_VALUE
+            extra = b""
+            if extra_fields:
+                extra = struct.pack("<HH" + "Q" * len(extra_fields),
+                                    0x0001, 8 * len(extra_fields), *extra_fields)
+            version = 45 if extra_fields else 20
+            record = _CENTRAL_HEADER.pack(
+                0x02014B50, (3 << 8) | version, version, entry.flags, entry.method,
+                entry.dos_time, entry.dos_date, entry.crc, compress_size, file_size,
+                len(entry.name), len(extra), 0, 0, 0, 0o100644 << 16, offset
+            ) + entry.name + extra
+            buffer.append(record)
+            buffered += len(record)
+            cd_size += len(record)
+            if buffered >= self.chunk_size:
+                yield b"".join(buffer)
+                buffer, buffered = [], 0
+
+        count = len(self._central)
+        if count >= ZIP_MAX_ENTRIES or cd_offset > ZIP64_LIMIT or cd_size > ZIP64_LIMIT:
+            zip64_end_offset = cd_offset + cd_size
+            buffer.append(_ZIP64_END_RECORD.pack(
+                0x06064B50, _ZIP64_END_RECORD.size - 12, 45, 45, 0, 0,
+                count, count, cd_size, cd_offset
+            ))
+            buffer.append(_ZIP64_END_LOCATOR.pack(0x07064B50, 0, zip64_end_offset, 1))
+        buffer.append(_END_RECORD.pack(
+            0x06054B50, 0, 0, min(count, ZIP_MAX_ENTRIES), min(count, ZIP_MAX_ENTRIES),
+            min(cd_size, ZIP_MAX_VALUE), min(cd_offset, ZIP_MAX_VALUE), 0
+        ))
+        tail = b"".join(buffer)
+        self._offset += len(tail)
+        self.last_stats["bytes_out"] = self._offset
+        yield tail
+
+
+# Example usage and testing
+if __name__ == "__main__":
+    import io
+    import zipfile
+
+    print("📦 Streaming ZIP Writer Demo")
+    print("=" * 50)
+
+    writer = StreamingZipWriter()
+    files = {
+        "index.html": "<html><body>" + "<p>Hello</p>" * 1000 + "</body></html>",
+        "styles.css": "body { color: #333; }\n" * 500,
+        "images/logo.png": os.urandom(4096),
+    }
+    output = io.BytesIO()
+    writer.write_zip(files.items(), output)
+
+    with zipfile.ZipFile(io.BytesIO(output.getvalue())) as archive:
+        print(f"✅ Archive valid: {archive.testzip() is None}")
+        for info in archive.infolist():
+            print(f"   {info.filename}: {info.file_size} -> {info.compress_size} bytes")
+    print(f"✅ Stats: {writer.last_stats}")
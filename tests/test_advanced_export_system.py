@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+📤 تست‌های سیستم خروجی پیشرفته
+"""
+
+import unittest
+import os
+import sys
+
+# اضافه کردن مسیر پروژه
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from advanced_export_system import (
+    AdvancedExportSystem, CompiledTemplate, ExportOptions, ExportFormat, ExportQuality
+)
+
+
+class TestCompiledTemplates(unittest.TestCase):
+    """تست‌های موتور قالب کامپایل شده"""
+
+    def setUp(self):
+        """راه‌اندازی قبل از هر تست"""
+        self.export_system = AdvancedExportSystem()
+        self.options = ExportOptions(format=ExportFormat.HTML, quality=ExportQuality.HIGH, minify=False)
+
+    def test_render_matches_str_replace(self):
+        """تست برابری خروجی با جایگزینی رشته‌ای"""
+        template = "<title>{{title}}</title>{{content}}<a href='{{url}}'>{{title}}</a>"
+        data = {"title": "عنوان", "content": "<p>متن</p>", "url": 42}
+
+        expected = template
+        for key, value in data.items():
+            expected = expected.replace(f"{{{{{key}}}}}", str(value))
+
+        self.assertEqual(CompiledTemplate(template).render(data), expected)
+
+    def test_unknown_placeholders_are_kept(self):
+        """تست حفظ placeholderهای بدون مقدار"""
+        compiled = CompiledTemplate("{{known}} and {{unknown}}")
+        self.assertEqual(compiled.render({"known": "x"}), "x and {{unknown}}")
+
+    def test_values_are_not_rescanned(self):
+        """تست عدم پردازش مجدد مقادیر درج شده"""
+        compiled = CompiledTemplate("{{content}}")
+        self.assertEqual(compiled.render({"content": "{{title}}", "title": "x"}), "{{title}}")
+
+    def test_compiled_template_cache(self):
+        """تست کش قالب‌های کامپایل شده بر اساس نام"""
+        first = self.export_system.get_compiled_template("responsive_html")
+        self.assertIs(self.export_system.get_compiled_template("responsive_html"), first)
+
+        self.export_system.export_templates["responsive_html"] = "<body>{{content}}</body>"
+        html = self.export_system.export_html("<h1>Hi</h1>", self.options)
+        self.assertEqual(html, "<body><h1>Hi</h1></body>")
+
+    def test_static_site_export(self):
+        """تست خروجی سایت استاتیک"""
+        files = self.export_system.export_static_site(
+            {"index.html": "<h1>Home</h1>", "about.html": "<h1>About</h1>"},
+            self.options,
+            {"title": "My Site", "base_url": "https://mysite.com"}
+        )
+
+        self.assertIn("<title>My Site - about.html</title>", files["about.html"])
+        self.assertNotIn("{{content}}", files["index.html"])
+        self.assertIn("https://mysite.com/about.html", files["sitemap.xml"])
+
+
+if __name__ == '__main__':
+    unittest.main()
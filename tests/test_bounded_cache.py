@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+🗄️ تست‌های کش محدود LRU + TTL و ذخیره‌ساز کلید
+"""
+
+import unittest
+import os
+import sys
+import asyncio
+import tempfile
+
+import numpy as np
+
+# اضافه کردن مسیر پروژه
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bounded_cache import BoundedCache, MappedBlobStore
+from quantum_resistant_security import QuantumKeyStore, QuantumResistantSecurity, SecurityLevel
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestBoundedCache(unittest.TestCase):
+    """تست‌های BoundedCache"""
+
+    def setUp(self):
+        """راه‌اندازی قبل از هر تست"""
+        self.clock = FakeClock()
+
+    def test_lru_eviction_by_bytes(self):
+        """تست حذف کم‌استفاده‌ترین مورد با رسیدن به سقف حجم"""
+        cache = BoundedCache(max_bytes=300, default_ttl=None, clock=self.clock)
+        cache.set("a", b"x" * 100)
+        cache.set("b", b"x" * 100)
+        cache.set("c", b"x" * 100)
+        cache.get("a")
+        cache.set("d", b"x" * 100)
+
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertEqual(cache.current_bytes, 300)
+        self.assertFalse(cache.set("huge", b"x" * 301))
+
+        metrics = cache.get_metrics()
+        self.assertEqual(metrics["evictions"], 1)
+        self.assertEqual(metrics["rejections"], 1)
+        self.assertEqual(metrics["hits"], 1)
+
+    def test_ttl_expiry(self):
+        """تست انقضای موارد با زمان‌سنج جعلی"""
+        cache = BoundedCache(max_bytes=1000, default_ttl=10, clock=self.clock)
+        cache.set("short", b"1", ttl=1)
+        cache.set("long", b"2")
+        cache.set("short", b"3", ttl=5)
+
+        self.clock.now = 2
+        self.assertEqual(cache.get("short"), b"3")
+        self.clock.now = 6
+        self.assertEqual(cache.purge_expired(), 1)
+        self.assertEqual(cache.get("long"), b"2")
+        self.clock.now = 11
+        self.assertIsNone(cache.get("long"))
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.current_bytes, 0)
+        self.assertEqual(cache.get_metrics()["expirations"], 2)
+
+    def test_array_sizes_and_hit_rate(self):
+        """تست محاسبه حجم آرایه‌ها و نرخ برخورد"""
+        cache = BoundedCache(max_bytes=10_000)
+        cache.set("array", np.zeros(100, dtype=np.int64))
+        cache.get("array")
+        cache.get("missing")
+        metrics = cache.get_metrics()
+        self.assertEqual(metrics["bytes"], 800)
+        self.assertEqual(metrics["hit_rate"], 0.5)
+
+
+class TestMappedBlobStore(unittest.TestCase):
+    """تست‌های MappedBlobStore"""
+
+    def setUp(self):
+        """راه‌اندازی قبل از هر تست"""
+        self.directory = tempfile.mkdtemp()
+        self.store = MappedBlobStore(self.directory, max_bytes=2048)
+
+    def tearDown(self):
+        """پاکسازی بعد از هر تست"""
+        self.store.close()
+
+    def test_mapped_values_and_eviction(self):
+        """تست نگاشت حافظه و حذف با سقف حجم دیسک"""
+        payload = os.urandom(1024)
+        self.store.set("first", payload)
+        mapped = self.store.get("first")
+        self.assertEqual(mapped[:], payload)
+        self.assertEqual(np.frombuffer(mapped, dtype=np.uint8).sum(), sum(payload))
+
+        self.store.set("second", os.urandom(1024))
+        self.store.set("third", os.urandom(1024))
+        self.assertNotIn("first", self.store)
+        self.assertEqual(len(os.listdir(self.directory)), 2)
+        # نگاشت قبلی پس از حذف فایل همچنان معتبر است
+        self.assertEqual(mapped[:16], payload[:16])
+        self.assertEqual(self.store.get("empty", b"-"), b"-")
+
+
+class TestQuantumKeyStore(unittest.TestCase):
+    """تست‌های یکپارچگی با QuantumResistantSecurity"""
+
+    def test_large_public_keys_are_mapped(self):
+        """تست نگهداری کلیدهای عمومی بزرگ در فایل نگاشت‌شده"""
+        directory = tempfile.mkdtemp()
+        security = QuantumResistantSecurity(key_storage_directory=directory)
+        security.keys.map_threshold = 1024
+        code_key = asyncio.run(security.generate_code_based_key(SecurityLevel.LEVEL_1))
+        hash_key = asyncio.run(security.generate_hash_based_key(SecurityLevel.LEVEL_1))
+
+        self.assertIsInstance(security.keys, QuantumKeyStore)
+        self.assertNotIsInstance(code_key.public_key, bytes)
+        self.assertIsInstance(hash_key.public_key, bytes)
+
+        first = asyncio.run(security.encrypt_quantum_resistant(b"data", code_key.id))
+        second = asyncio.run(security.encrypt_quantum_resistant(b"data", code_key.id))
+        self.assertEqual(len(first), len(second))
+        self.assertEqual(security.encryption_cache.get_metrics()["hits"], 1)
+
+        analytics = asyncio.run(security.get_security_analytics())
+        self.assertEqual(analytics["key_store"]["mapped_keys"], 1)
+        self.assertEqual(analytics["key_store"]["mapped_bytes"], len(code_key.public_key))
+
+        del security.keys[code_key.id]
+        self.assertEqual(os.listdir(directory), [])
+
+    def test_private_keys_stay_out_of_shared_cache(self):
+        """تست نگهداری کلید خصوصی خارج از کش مشترک و حذف آن پس از چرخش کلید"""
+        shared_cache = BoundedCache()
+        security = QuantumResistantSecurity(encryption_cache=shared_cache)
+        key = asyncio.run(security.generate_code_based_key(SecurityLevel.LEVEL_1))
+        ciphertext = asyncio.run(security.encrypt_quantum_resistant(b"data", key.id))
+        asyncio.run(security.decrypt_quantum_resistant(ciphertext, key.id))
+
+        self.assertIn(("public", key.id), shared_cache)
+        self.assertEqual(len(shared_cache), 1)
+        self.assertIn(key.id, security.private_key_cache)
+
+        asyncio.run(security.rotate_key(key.id))
+        self.assertEqual(len(shared_cache), 0)
+        self.assertNotIn(key.id, security.private_key_cache)
+
+    def test_signature_cache_is_scoped_per_key(self):
+        """تست کش امضا به تفکیک کلید"""
+        security = QuantumResistantSecurity()
+        key_a = asyncio.run(security.generate_hash_based_key(SecurityLevel.LEVEL_1))
+        key_b = asyncio.run(security.generate_hash_based_key(SecurityLevel.LEVEL_1))
+
+        signature_a = asyncio.run(security.sign_quantum_resistant(b"message", key_a.id))
+        signature_b = asyncio.run(security.sign_quantum_resistant(b"message", key_b.id))
+        self.assertNotEqual(signature_a, signature_b)
+        self.assertEqual(asyncio.run(security.sign_quantum_resistant(b"message", key_a.id)), signature_a)
+        self.assertEqual(security.signature_cache.get_metrics()["hits"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+🖼️ تست‌های استخر مرورگر برای خروجی تصویر و PDF
+"""
+
+import unittest
+import os
+import sys
+import asyncio
+import threading
+
+# اضافه کردن مسیر پروژه
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import browser_pool
+from browser_pool import BrowserPool, RenderJob, RenderTimeoutError, SyncBrowserPool
+
+
+class FakePage:
+    def __init__(self, browser):
+        self.browser = browser
+        self.html = ""
+
+    async def set_content(self, html, wait_until=None):
+        self.html = html
+        if "slow" in html:
+            await asyncio.sleep(1)
+
+    async def screenshot(self, type="png", full_page=True):
+        self.browser.active_pages += 1
+        self.browser.max_active_pages = max(self.browser.max_active_pages, self.browser.active_pages)
+        await asyncio.sleep(0.01)
+        self.browser.active_pages -= 1
+        return f"{type}:{self.html}".encode()
+
+    async def pdf(self, format="A4", print_background=True):
+        return f"pdf:{self.html}".encode()
+
+
+class FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+
+    async def new_page(self):
+        return FakePage(self.browser)
+
+    async def close(self):
+        self.browser.contexts_closed += 1
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.closed = False
+        self.active_pages = 0
+        self.max_active_pages = 0
+        self.contexts_closed = 0
+
+    async def new_context(self, viewport=None):
+        return FakeContext(self)
+
+    def is_connected(self):
+        return not self.closed
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeLauncher:
+    def __init__(self):
+        self.browsers = []
+
+    async def launch(self, **options):
+        browser = FakeBrowser()
+        self.browsers.append(browser)
+        return browser
+
+
+class FakePlaywright:
+    def __init__(self):
+        self.chromium = FakeLauncher()
+        self.stopped = False
+
+    async def start(self):
+        return self
+
+    async def stop(self):
+        self.stopped = True
+
+
+class TestBrowserPool(unittest.TestCase):
+    """تست‌های BrowserPool با Playwright جعلی"""
+
+    def setUp(self):
+        """راه‌اندازی قبل از هر تست"""
+        self.playwright = FakePlaywright()
+
+    def _pool(self, **options):
+        return BrowserPool(playwright_factory=lambda: self.playwright, **options)
+
+    def test_batch_reuses_browser_and_bounds_contexts(self):
+        """تست استفاده مجدد از مرورگر و محدودیت context همزمان"""
+        async def run():
+            async with self._pool(max_contexts=2) as pool:
+                jobs = [RenderJob(html=f"page {i}", format="jpg") for i in range(6)]
+                return await pool.render_batch(jobs), pool.stats
+
+        results, stats = asyncio.run(run())
+
+        self.assertEqual(results[3], b"jpeg:page 3")
+        browsers = self.playwright.chromium.browsers
+        self.assertEqual(len(browsers), 1)
+        self.assertEqual(browsers[0].max_active_pages, 2)
+        self.assertEqual(browsers[0].contexts_closed, 6)
+        self.assertEqual(stats["renders"], 6)
+        self.assertTrue(self.playwright.stopped)
+
+    def test_browser_recycled_after_n_renders(self):
+        """تست بازیافت مرورگر پس از N رندر"""
+        async def run():
+            async with self._pool(max_contexts=1, recycle_after=2) as pool:
+                for i in range(5):
+                    await pool.screenshot(f"page {i}")
+                return pool.stats
+
+        stats = asyncio.run(run())
+
+        browsers = self.playwright.chromium.browsers
+        self.assertEqual(len(browsers), 3)
+        self.assertTrue(all(browser.closed for browser in browsers))
+        self.assertEqual(stats["browsers_recycled"], 2)
+
+    def test_job_timeout(self):
+        """تست محدودیت زمانی هر کار"""
+        async def run():
+            async with self._pool(job_timeout=0.05) as pool:
+                results = await pool.render_batch([RenderJob(html="slow"), RenderJob(html="fast")])
+                return results, pool.stats
+
+        results, stats = asyncio.run(run())
+
+        self.assertIsInstance(results[0], RenderTimeoutError)
+        self.assertEqual(results[1], b"png:fast")
+        self.assertEqual(stats["timeouts"], 1)
+        self.assertEqual(self.playwright.chromium.browsers[0].contexts_closed, 2)
+
+    def test_sync_facade_pdf(self):
+        """تست رابط همگام و تولید PDF"""
+        pool = SyncBrowserPool(playwright_factory=lambda: self.playwright)
+        try:
+            self.assertEqual(pool.pdf("<h1>Doc</h1>"), b"pdf:<h1>Doc</h1>")
+            self.assertEqual(pool.screenshot("<p>x</p>"), b"png:<p>x</p>")
+        finally:
+            pool.close()
+        self.assertTrue(self.playwright.stopped)
+
+    def test_shared_pool_fails_fast_without_playwright(self):
+        """تست خطای سریع بدون ساخت استخر وقتی Playwright نصب نیست"""
+        original = browser_pool.importlib.util.find_spec
+        browser_pool.importlib.util.find_spec = lambda name: None
+        browser_pool._playwright_missing = None
+        threads = threading.active_count()
+        try:
+            for _ in range(3):
+                with self.assertRaises(ImportError):
+                    browser_pool.get_shared_browser_pool()
+            self.assertIsNone(browser_pool._shared_pool)
+            self.assertEqual(threading.active_count(), threads)
+        finally:
+            browser_pool.importlib.util.find_spec = original
+            browser_pool._playwright_missing = None
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+🗂️ تست‌های مخزن کش شاخص‌دار CDN
+"""
+
+import unittest
+import os
+import sys
+import asyncio
+import random
+
+# اضافه کردن مسیر پروژه
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cdn_cache_store import CACHE_EXPIRED, CACHE_HIT, CACHE_MISS, POLICY_LFU, CDNCacheStore
+from global_cdn import GlobalCDN
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCDNCacheStore(unittest.TestCase):
+    """تست‌های CDNCacheStore"""
+
+    def test_lookup_is_per_node(self):
+        """تست جستجو با کلید (گره، کلید کش)"""
+        store = CDNCacheStore()
+        store.put("london", "k1", "london copy", 10)
+        self.assertEqual(store.lookup("london", "k1"), ("london copy", CACHE_HIT))
+        self.assertEqual(store.lookup("tokyo", "k1"), (None, CACHE_MISS))
+        store.put("london", "k1", "replaced", 20)
+        self.assertEqual(len(store), 1)
+        self.assertEqual(store.node_usage("london")["bytes"], 20)
+
+    def test_lru_eviction_per_node(self):
+        """تست حذف LRU با رعایت ظرفیت هر گره"""
+        store = CDNCacheStore(node_capacity=300)
+        for key in ("a", "b", "c"):
+            store.put("london", key, key, 100)
+        store.put("tokyo", "z", "z", 300)
+        store.get("london", "a")
+        store.put("london", "d", "d", 100)
+
+        self.assertIsNone(store.get("london", "b"))
+        self.assertEqual([store.get("london", key) for key in ("a", "c", "d")], ["a", "c", "d"])
+        self.assertEqual(store.get("tokyo", "z"), "z")
+        self.assertEqual(store.get_metrics()["evictions"], 1)
+        self.assertFalse(store.put("london", "huge", "huge", 301))
+
+        store.set_capacity("london", 100)
+        self.assertEqual(store.node_usage("london"), {"entries": 1, "bytes": 100, "capacity": 100})
+
+    def test_lfu_keeps_popular_entries(self):
+        """تست نگه داشتن محتوای پرتکرار در سیاست LFU"""
+        store = CDNCacheStore(node_capacity=300, policy=POLICY_LFU)
+        for key in ("logo", "home", "rare"):
+            store.put("london", key, key, 100)
+        for _ in range(3):
+            store.get("london", "logo")
+        store.get("london", "home")
+        store.put("london", "new", "new", 100)
+        self.assertIsNone(store.get("london", "rare"))
+        store.put("london", "newer", "newer", 100)
+        self.assertIsNone(store.get("london", "new"))
+        self.assertEqual(store.get("london", "logo"), "logo")
+        self.assertEqual(store.get("london", "home"), "home")
+
+    def test_ttl_expiry(self):
+        """تست انقضای ورودی‌ها بر اساس TTL"""
+        clock = FakeClock()
+        store = CDNCacheStore(default_ttl=10, clock=clock)
+        store.put("london", "short", "short", 1, ttl=1)
+        store.put("london", "long", "long", 1)
+        clock.now = 5
+        self.assertEqual(store.lookup("london", "short"), (None, CACHE_EXPIRED))
+        self.assertEqual(store.ttl_remaining("london", "long"), 5)
+        clock.now = 11
+        self.assertEqual(store.purge_expired(), 1)
+        self.assertEqual(len(store), 0)
+        self.assertEqual(store.node_usage("london")["bytes"], 0)
+
+    def test_tag_and_prefix_invalidation(self):
+        """تست ابطال بر اساس برچسب و پیشوند آدرس در برابر پیمایش کامل"""
+        rng = random.Random(3)
+        store = CDNCacheStore()
+        entries = {}
+        for index in range(2000):
+            url = rng.choice(["https://a.com/", "https://a.com/shop/", "https://a.com/shop/items/",
+                              "https://b.com/shop/", "/local/", ""]) + f"p{index}"
+            tags = (rng.choice(["red", "blue"]),)
+            node = rng.choice(["london", "tokyo"])
+            store.put(node, f"key-{index}", url, 1, url=url, tags=tags)
+            entries[(node, f"key-{index}")] = (url, tags)
+
+        removed = store.invalidate_tag("red")
+        self.assertEqual(sorted(url for _, url in removed),
+                         sorted(url for url, tags in entries.values() if "red" in tags))
+        entries = {key: value for key, value in entries.items() if "red" not in value[1]}
+
+        for prefix in ("https://a.com/shop/i", "https://a.com/shop/", "/lo", "https://b", "p1"):
+            removed = store.invalidate_prefix(prefix)
+            self.assertEqual(sorted(url for _, url in removed),
+                             sorted(url for url, _ in entries.values() if url.startswith(prefix)))
+            entries = {key: value for key, value in entries.items() if not value[0].startswith(prefix)}
+        self.assertEqual(len(store), len(entries))
+
+        store.invalidate_prefix("")
+        self.assertEqual(len(store), 0)
+        self.assertEqual((store.tags, store.directories), ({}, {}))
+        self.assertEqual(store.subdirectories, {"": set()})
+
+
+class TestGlobalCDNCache(unittest.TestCase):
+    """تست‌های اتصال مخزن کش به GlobalCDN"""
+
+    def test_cached_per_nearest_node_and_invalidated(self):
+        """تست کش شدن در نزدیک‌ترین گره و ابطال"""
+        async def run():
+            cdn = GlobalCDN(node_cache_capacity=10 ** 6)
+            url = "https://example.com/shop/index.html"
+            first = await cdn.get_cached_content(url, "UK")
+            second = await cdn.get_cached_content(url, "UK")
+            other = await cdn.get_cached_content(url, "JP")
+
+            self.assertFalse(first["cache_hit"])
+            self.assertTrue(second["cache_hit"])
+            self.assertEqual(second["served_from"], "London")
+            self.assertFalse(other["cache_hit"])
+            self.assertEqual(len(cdn.content_caches), 2)
+
+            result = await cdn.invalidate_by_prefix("https://example.com/shop/")
+            self.assertEqual(result["invalidated_entries"], 2)
+            statistics = cdn._get_cache_statistics()
+            self.assertEqual((statistics["total_hits"], statistics["total_misses"]), (1, 2))
+        asyncio.run(run())
+
+
+if __name__ == '__main__':
+    unittest.main()
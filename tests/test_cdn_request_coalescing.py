@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+🛬 تست‌های یکی‌سازی درخواست‌های مبدأ، سرویس محتوای کهنه و کش منفی در CDN
+"""
+
+import unittest
+import os
+import sys
+import asyncio
+
+# اضافه کردن مسیر پروژه
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from global_cdn import GlobalCDN
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingCDN(GlobalCDN):
+    """CDN با مبدأ ساختگی که درخواست‌ها را می‌شمارد"""
+
+    def __init__(self, failures=0, cache_control="max-age=10, stale-while-revalidate=20"):
+        super().__init__()
+        self.failures = failures
+        self.cache_control = cache_control
+        self.origin_calls = 0
+        self.content_caches.clock = self.negative_caches.clock = self.clock = FakeClock()
+
+    async def _fetch_from_origin(self, content_url):
+        self.origin_calls += 1
+        await asyncio.sleep(0.05)
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("origin unavailable")
+        return {"url": content_url, "content": f"version {self.origin_calls}", "size": 100,
+                "content_type": "text/html", "headers": {"cache-control": self.cache_control, "surrogate-key": "shop"}}
+
+
+URL = "https://example.com/shop/index.html"
+
+
+class TestRequestCoalescing(unittest.TestCase):
+    """تست‌های یکی‌سازی درخواست‌های هم‌زمان"""
+
+    def test_concurrent_misses_share_one_fetch(self):
+        """تست یک درخواست مبدأ برای پنجاه خطای کش هم‌زمان"""
+        async def run():
+            cdn = CountingCDN()
+            results = await asyncio.gather(*(cdn.get_cached_content(URL, "UK") for _ in range(50)))
+            self.assertEqual(cdn.origin_calls, 1)
+            self.assertTrue(all(result["success"] and not result["cache_hit"] for result in results))
+            self.assertEqual(sum(result["coalesced"] for result in results), 49)
+            self.assertEqual(len(cdn.content_caches), 1)
+            self.assertEqual(cdn.origin_fetches, {})
+
+            # Another node fetches for itself
+            await asyncio.gather(*(cdn.get_cached_content(URL, "JP") for _ in range(5)))
+            self.assertEqual(cdn.origin_calls, 2)
+            self.assertTrue((await cdn.get_cached_content(URL, "UK"))["cache_hit"])
+            origin = cdn._get_cache_statistics()["origin"]
+            self.assertEqual((origin["origin_fetches"], origin["coalesced_requests"], origin["in_flight"]), (2, 53, 0))
+        asyncio.run(run())
+
+    def test_stale_while_revalidate(self):
+        """تست سرویس محتوای کهنه و تازه‌سازی پس‌زمینه"""
+        async def run():
+            cdn = CountingCDN()
+            await cdn.get_cached_content(URL, "UK")
+            cdn.clock.now += 15
+
+            results = await asyncio.gather(*(cdn.get_cached_content(URL, "UK") for _ in range(10)))
+            self.assertTrue(all(result["cache_hit"] and result["stale"] for result in results))
+            self.assertEqual(len(cdn.origin_fetches), 1)
+            await asyncio.gather(*cdn.origin_fetches.values())
+
+            fresh = await cdn.get_cached_content(URL, "UK")
+            self.assertTrue(fresh["cache_hit"])
+            self.assertFalse(fresh["stale"])
+            self.assertEqual(fresh["ttl_remaining"], 10)
+            self.assertEqual(cdn.origin_calls, 2)
+            origin = cdn._get_cache_statistics()["origin"]
+            self.assertEqual((origin["stale_served"], origin["revalidations"]), (10, 1))
+
+            # Past the stale window the entry is a miss again
+            cdn.clock.now += 31
+            result = await cdn.get_cached_content(URL, "UK")
+            self.assertFalse(result["cache_hit"])
+            self.assertEqual(cdn.origin_calls, 3)
+        asyncio.run(run())
+
+    def test_origin_errors_are_negative_cached(self):
+        """تست کش منفی خطاهای مبدأ"""
+        async def run():
+            cdn = CountingCDN(failures=1)
+            results = await asyncio.gather(*(cdn.get_cached_content(URL, "UK") for _ in range(20)))
+            self.assertTrue(all(not result["success"] for result in results))
+            self.assertEqual(cdn.origin_calls, 1)
+
+            cached = await cdn.get_cached_content(URL, "UK")
+            self.assertEqual(cached, {"success": False, "error": "origin unavailable", "negative_cached": True})
+            self.assertEqual(cdn.origin_calls, 1)
+
+            # The negative entry expires, and invalidation drops it right away
+            cdn.clock.now += 31
+            self.assertTrue((await cdn.get_cached_content(URL, "UK"))["success"])
+            cdn.failures = 1
+            await cdn.invalidate_cache(URL)
+            await cdn.get_cached_content(URL, "UK")
+            await cdn.invalidate_cache(URL)
+            self.assertTrue((await cdn.get_cached_content(URL, "UK"))["success"])
+            origin = cdn._get_cache_statistics()["origin"]
+            self.assertEqual((origin["origin_errors"], origin["negative_hits"]), (2, 1))
+        asyncio.run(run())
+
+    def test_purge_fences_in_flight_fetches(self):
+        """تست کش نشدن پاسخ‌های در جریان پس از پاکسازی"""
+        async def run():
+            cdn = CountingCDN()
+            waiting = asyncio.ensure_future(cdn.get_cached_content(URL, "UK"))
+            await asyncio.sleep(0.09)
+            self.assertEqual(len(cdn.origin_fetches), 1)
+            await cdn.invalidate_cache(URL)
+            self.assertEqual(cdn.origin_fetches, {})
+
+            # The waiter still gets its answer, but nothing outdated is cached
+            result = await waiting
+            self.assertTrue(result["success"])
+            self.assertFalse(result["cached"])
+            self.assertEqual(len(cdn.content_caches), 0)
+
+            # A background revalidation is fenced by a prefix purge the same way
+            await cdn.get_cached_content(URL, "UK")
+            cdn.clock.now += 15
+            self.assertTrue((await cdn.get_cached_content(URL, "UK"))["stale"])
+            revalidation = next(iter(cdn.origin_fetches.values()))
+            await cdn.invalidate_by_prefix("https://example.com/shop/")
+            await revalidation
+            self.assertEqual(len(cdn.content_caches), 0)
+            self.assertEqual(cdn._get_cache_statistics()["origin"]["fenced_fetches"], 2)
+        asyncio.run(run())
+
+    def test_tag_and_prefix_purges_clear_negative_cache(self):
+        """تست حذف کش منفی با پاکسازی برچسب و پیشوند"""
+        async def run():
+            cdn = CountingCDN()
+            self.assertTrue((await cdn.get_cached_content(URL, "UK"))["success"])
+            cdn.failures = 1
+            await cdn.get_cached_content(URL, "JP")
+            self.assertTrue((await cdn.get_cached_content(URL, "JP"))["negative_cached"])
+
+            # The UK copy carries the tag, so the JP failure for the same key goes with it
+            await cdn.invalidate_by_tag("shop")
+            self.assertTrue((await cdn.get_cached_content(URL, "JP"))["success"])
+
+            cdn.failures = 1
+            await cdn.get_cached_content(URL + "?v=2", "JP")
+            await cdn.invalidate_by_prefix("https://example.com/shop/")
+            self.assertEqual(len(cdn.negative_caches), 0)
+            self.assertTrue((await cdn.get_cached_content(URL + "?v=2", "JP"))["success"])
+        asyncio.run(run())
+
+    def test_cache_control_is_respected(self):
+        """تست رعایت دستورات Cache-Control مبدأ"""
+        async def run():
+            for cache_control in ("no-store", "private, max-age=60", "no-cache", "max-age=0"):
+                cdn = CountingCDN(cache_control=cache_control)
+                self.assertFalse((await cdn.get_cached_content(URL, "UK"))["cached"])
+                self.assertFalse((await cdn.get_cached_content(URL, "UK"))["cache_hit"])
+                self.assertEqual((cdn.origin_calls, len(cdn.content_caches)), (2, 0))
+
+            # max-age=0 only gets a stale window when the origin asks for one
+            cdn = CountingCDN(cache_control="max-age=0, stale-while-revalidate=30")
+            await cdn.get_cached_content(URL, "UK")
+            self.assertTrue((await cdn.get_cached_content(URL, "UK"))["stale"])
+
+            cdn = CountingCDN(cache_control="max-age=10, must-revalidate")
+            await cdn.get_cached_content(URL, "UK")
+            cdn.clock.now += 11
+            self.assertFalse((await cdn.get_cached_content(URL, "UK"))["cache_hit"])
+        asyncio.run(run())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+🧭 تست‌های مسیریابی جغرافیایی CDN
+"""
+
+import unittest
+import os
+import sys
+import asyncio
+import random
+from types import SimpleNamespace
+
+# اضافه کردن مسیر پروژه
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cdn_routing import COUNTRY_COORDINATES, GeoRoutingTable, haversine_km
+from global_cdn import GlobalCDN
+
+
+def make_node(node_id, latitude, longitude, latency, load=0.0):
+    return SimpleNamespace(id=node_id, latitude=latitude, longitude=longitude, latency=latency,
+                           current_load=load, status="active")
+
+
+def brute_force(table, location, count):
+    """انتخاب مرجع با مرتب‌سازی کامل"""
+    key, coordinates = table.resolve(location)
+    costs = []
+    for node in table.nodes.values():
+        if node.status != "active":
+            continue
+        distance = haversine_km(coordinates, (node.latitude, node.longitude)) / 100 if coordinates else 0.0
+        costs.append((distance + table.latencies[node.id] + table.load_penalty * node.current_load, node.id))
+    return [node_id for _, node_id in sorted(costs)[:count]]
+
+
+class TestGeoRoutingTable(unittest.TestCase):
+    """تست‌های GeoRoutingTable"""
+
+    def test_haversine(self):
+        """تست فاصله دایره بزرگ"""
+        self.assertAlmostEqual(haversine_km((51.51, -0.13), (40.71, -74.01)), 5570, delta=20)
+        self.assertEqual(haversine_km((10, 20), (10, 20)), 0)
+
+    def test_global_cdn_nodes_by_country(self):
+        """تست انتخاب نزدیک‌ترین گره برای هر کشور"""
+        cdn = GlobalCDN()
+        nearest = {code: asyncio.run(cdn._find_nearest_node(code)).location
+                   for code in ("US", "UK", "JP", "AU", "BR", "IN", "AE", "ZA", "IR", "DE", "SG", "XX")}
+        self.assertEqual(nearest, {
+            "US": "New York", "UK": "London", "JP": "Tokyo", "AU": "Sydney", "BR": "São Paulo",
+            "IN": "Mumbai", "AE": "Dubai", "ZA": "Cape Town", "IR": "Dubai", "DE": "London",
+            "SG": "Mumbai", "XX": "New York"
+        })
+        self.assertEqual(cdn.routing.nearest("35.7, 51.4").location, "Dubai")
+
+    def test_load_and_status_shift_traffic(self):
+        """تست جابه‌جایی ترافیک با بار و وضعیت گره"""
+        nodes = {"fra": make_node("fra", 50.1, 8.7, 5), "ams": make_node("ams", 52.4, 4.9, 6)}
+        table = GeoRoutingTable(nodes)
+        self.assertEqual(table.nearest("DE").id, "fra")
+        nodes["fra"].current_load = 0.5
+        self.assertEqual(table.nearest("DE").id, "ams")
+        nodes["fra"].current_load = 0.0
+        nodes["fra"].status = "maintenance"
+        self.assertEqual(table.nearest("DE").id, "ams")
+        nodes["ams"].status = "maintenance"
+        self.assertIsNone(table.nearest("DE"))
+
+    def test_incremental_updates_match_full_ranking(self):
+        """تست برابری به‌روزرسانی افزایشی با رتبه‌بندی کامل"""
+        rng = random.Random(5)
+        nodes = {f"n{index}": make_node(f"n{index}", rng.uniform(-60, 60), rng.uniform(-180, 180),
+                                        rng.uniform(2, 30)) for index in range(40)}
+        table = GeoRoutingTable(nodes)
+        locations = list(COUNTRY_COORDINATES)[:15] + ["10,10", None]
+        for step in range(300):
+            node_id = rng.choice(list(nodes))
+            action = rng.random()
+            if action < 0.5:
+                table.update_latency(node_id, rng.uniform(1, 120))
+            elif action < 0.8:
+                nodes[node_id].current_load = rng.random()
+            elif action < 0.9:
+                nodes[node_id].status = rng.choice(["active", "active", "down"])
+            else:
+                table.remove_node(node_id)
+                table.add_node(nodes[node_id])
+            location = rng.choice(locations)
+            self.assertEqual([node.id for node in table.rank(location, 3)], brute_force(table, location, 3))
+        for key, ranking in table.rankings.items():
+            self.assertEqual(ranking, sorted(ranking))
+            self.assertEqual(len(ranking), len(nodes))
+        self.assertLess(table.get_metrics()["average_scan"], 20)
+
+    def test_metrics_feed_routing(self):
+        """تست به‌روزرسانی تأخیر مسیریابی از معیارهای عملکرد"""
+        async def run():
+            cdn = GlobalCDN()
+            london = next(node for node in cdn.cdn_nodes.values() if node.location == "London")
+            before = cdn.routing.latencies[london.id]
+            metrics = await cdn.collect_performance_metrics(london.id)
+            expected = before + 0.3 * (metrics["latency"] - before)
+            self.assertAlmostEqual(cdn.routing.latencies[london.id], expected)
+            self.assertEqual(london.current_load, metrics["bandwidth_usage"])
+            for _ in range(10):
+                cdn.routing.update_latency(london.id, 500)
+            self.assertNotEqual(cdn.routing.nearest("UK").location, "London")
+        asyncio.run(run())
+
+
+if __name__ == '__main__':
+    unittest.main()
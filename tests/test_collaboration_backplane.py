@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+🛰️ تست‌های مقیاس‌پذیری افقی همکاری از طریق backplane انتشار/اشتراک
+"""
+
+import unittest
+import os
+import sys
+import asyncio
+import json
+import random
+
+import jwt
+
+# اضافه کردن مسیر پروژه
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from collaboration_backplane import InMemoryBackplane, InMemoryBus, owner_node
+from collaboration_merge import ROOT, ElementDocument, MergeClient, operation_to_change
+from real_time_collaboration import RealTimeCollaboration
+
+
+class QueueSocket:
+    """اتصال آزمایشی که پیام‌ها را از صف می‌خواند و در صف می‌نویسد"""
+
+    def __init__(self):
+        self.id = object()
+        self.incoming = asyncio.Queue()
+        self.outgoing = asyncio.Queue()
+        self.closed = False
+
+    async def send(self, payload):
+        self.outgoing.put_nowait(json.loads(payload))
+
+    async def close(self, code=1000, reason=""):
+        self.closed = True
+        self.incoming.put_nowait(None)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        message = await self.incoming.get()
+        if message is None:
+            raise StopAsyncIteration
+        return json.dumps(message)
+
+
+class Editor:
+    """کلاینت ویرایشگر با یک تغییر در حال ارسال"""
+
+    def __init__(self, name, node, token):
+        self.name = name
+        self.node = node
+        self.socket = QueueSocket()
+        self.client = None
+        self.received = []
+        self.counter = 0
+        self.server = asyncio.get_running_loop().create_task(
+            node.handle_connection(self.socket, f"/project1/{token}"))
+        self.reader = asyncio.get_running_loop().create_task(self.read())
+
+    async def read(self):
+        while True:
+            message = await self.socket.outgoing.get()
+            self.received.append(message)
+            if message["type"] == "project_state":
+                snapshot = message["data"]["snapshot"]
+                self.client = MergeClient(ElementDocument.from_dict(snapshot["document"]), snapshot["version"])
+                for record in message["data"]["operations"]:
+                    self.client.document.apply(record["data"])
+                    self.client.version = record["version"]
+            elif message["type"] == "operation":
+                self.client.receive(message["data"]["data"])
+            elif message["type"] == "operation_ack":
+                self.client.acknowledge()
+
+    def edit(self, operation_type, element_id, data):
+        self.client.apply_local(operation_to_change(operation_type, element_id, data))
+        self.socket.incoming.put_nowait({
+            "type": "operation", "operation_type": operation_type, "element_id": element_id,
+            "data": data, "base_version": self.client.version, "client_id": self.name
+        })
+
+    def random_edit(self, rng):
+        self.counter += 1
+        document = self.client.document
+        live = [element_id for element_id, element in document.elements.items() if not element["removed"]]
+        choice = rng.random()
+        if not live or choice < 0.25:
+            slot = f"{self.name}-{self.counter}"
+            self.edit("add_element", f"el-{slot}", {
+                "type": "text", "slot": slot, "content": "ab",
+                "after": rng.choice([None] + document.sequences.get(ROOT, []))})
+            return
+        element_id = rng.choice(live)
+        if choice < 0.3:
+            self.edit("remove_element", element_id, {})
+        elif choice < 0.45:
+            self.edit("style_change", element_id, {"color": rng.choice(["red", "blue"])})
+        else:
+            content = document.elements[element_id]["content"]
+            position = rng.randint(0, len(content))
+            if position < len(content) and rng.random() < 0.3:
+                self.edit("content_change", element_id, {"delta": [position, -1]})
+            else:
+                self.edit("content_change", element_id, {"delta": [position, self.name]})
+
+    async def disconnect(self):
+        await self.socket.close()
+        await self.server
+        self.reader.cancel()
+        await asyncio.gather(self.reader, return_exceptions=True)
+
+
+class Cluster:
+    """چند نود همکاری متصل به یک bus مشترک"""
+
+    def __init__(self, count):
+        self.bus = InMemoryBus()
+        names = [f"node-{index}" for index in range(count)]
+        self.nodes = [RealTimeCollaboration(backplane=InMemoryBackplane(self.bus), node_id=name, nodes=names)
+                      for name in names]
+        self.owner = next(node for node in self.nodes if node.owner_of("project1") == node.node_id)
+        self.replicas = [node for node in self.nodes if node is not self.owner]
+        self.token = jwt.encode({"user_id": "user1"}, self.owner.jwt_secret, algorithm="HS256")
+
+    async def start(self):
+        for node in self.nodes:
+            await node.join_backplane()
+
+    async def connect(self, name, node):
+        editor = Editor(name, node, self.token)
+        while editor.client is None:
+            await asyncio.sleep(0.001)
+        return editor
+
+    async def settle(self, editors=()):
+        for _ in range(2000):
+            busy = any(not node.backplane.inbox.empty() for node in self.nodes)
+            busy = busy or any(node.broadcaster.get_metrics()["queued"] or node.presence.pending for node in self.nodes)
+            busy = busy or any(editor.client.inflight is not None or not editor.socket.incoming.empty()
+                               or not editor.socket.outgoing.empty() for editor in editors)
+            if not busy:
+                return
+            await asyncio.sleep(0.001)
+        raise AssertionError("cluster did not settle")
+
+    async def close(self, editors=()):
+        for editor in editors:
+            await editor.disconnect()
+        for node in self.nodes:
+            await node.backplane.close()
+            await node.presence.close()
+            await node.broadcaster.close()
+
+
+class TestOwnership(unittest.TestCase):
+    """تست‌های تعیین نود مالک"""
+
+    def test_rendezvous_hashing(self):
+        """تست پایداری و توزیع مالکیت پروژه‌ها"""
+        nodes = ["a", "b", "c", "d"]
+        keys = [f"project-{index}" for index in range(400)]
+        owners = {key: owner_node(key, nodes) for key in keys}
+        self.assertEqual(owners, {key: owner_node(key, list(reversed(nodes))) for key in keys})
+        self.assertTrue(all(60 < list(owners.values()).count(node) < 140 for node in nodes))
+
+        # Removing a node only moves the projects it owned
+        remaining = {key: owner_node(key, ["a", "b", "c"]) for key in keys}
+        moved = [key for key in keys if remaining[key] != owners[key]]
+        self.assertTrue(moved)
+        self.assertTrue(all(owners[key] == "d" for key in moved))
+
+    def test_single_node_owns_everything(self):
+        """تست رفتار بدون backplane"""
+        collaboration = RealTimeCollaboration()
+        self.assertEqual(collaboration.owner_of("project1"), collaboration.node_id)
+
+
+class TestScaleOut(unittest.TestCase):
+    """تست‌های چند نود با کلاینت‌های همزمان"""
+
+    def test_edits_on_replica_are_ordered_by_owner(self):
+        """تست ارسال عملیات از نود غیرمالک و دریافت تایید"""
+        async def run():
+            cluster = Cluster(3)
+            await cluster.start()
+            first = await cluster.connect("first", cluster.replicas[0])
+            second = await cluster.connect("second", cluster.owner)
+            first.edit("add_element", "title", {"type": "heading", "content": "Hello", "slot": "s1"})
+            await cluster.settle([first, second])
+
+            self.assertEqual(first.client.version, 1)
+            self.assertEqual(second.client.document.to_dict(), first.client.document.to_dict())
+            self.assertEqual([message["type"] for message in first.received if "operation" in message["type"]],
+                             ["operation_ack"])
+            self.assertEqual(cluster.replicas[0].get_document("project1"), first.client.document.to_dict())
+            self.assertEqual(cluster.replicas[0].projects["project1"].version, 1)
+            await cluster.close([first, second])
+        asyncio.run(run())
+
+    def test_invalid_operation_rejected_to_sender(self):
+        """تست ارسال پاسخ رد عملیات نامعتبر به فرستنده در نود مالک و غیرمالک"""
+        async def run():
+            cluster = Cluster(3)
+            await cluster.start()
+            forwarded = await cluster.connect("forwarded", cluster.replicas[0])
+            local = await cluster.connect("local", cluster.owner)
+            for editor in (forwarded, local):
+                editor.socket.incoming.put_nowait({
+                    "type": "operation", "operation_type": "add_element", "element_id": f"el-{editor.name}",
+                    "data": {"type": "text", "slot": editor.name, "after": "missing"},
+                    "base_version": 0, "client_id": editor.name
+                })
+            for _ in range(2000):
+                if all(any(message["type"] == "operation_rejected" for message in editor.received)
+                       for editor in (forwarded, local)):
+                    break
+                await asyncio.sleep(0.001)
+
+            for editor in (forwarded, local):
+                rejected = [message for message in editor.received if message["type"] == "operation_rejected"]
+                self.assertEqual(len(rejected), 1)
+                self.assertEqual(rejected[0]["data"]["client_id"], editor.name)
+                self.assertEqual(rejected[0]["data"]["version"], 0)
+                self.assertIn("Unknown anchor slot", rejected[0]["data"]["error"])
+            self.assertEqual(cluster.owner.pending_submits, {})
+            self.assertEqual(cluster.replicas[0].pending_submits, {})
+            self.assertEqual(cluster.owner.projects["project1"].version, 0)
+            await cluster.close([forwarded, local])
+        asyncio.run(run())
+
+    def test_random_clients_across_nodes_converge(self):
+        """تست همگرایی کلاینت‌های همزمان روی چند نود"""
+        async def run():
+            rng = random.Random(7)
+            cluster = Cluster(3)
+            await cluster.start()
+            editors = [await cluster.connect(f"c{index}", cluster.nodes[index % 3]) for index in range(9)]
+
+            for _ in range(400):
+                editor = rng.choice(editors)
+                if editor.client.inflight is None:
+                    editor.random_edit(rng)
+                await asyncio.sleep(0 if rng.random() < 0.8 else 0.001)
+            await cluster.settle(editors)
+
+            expected = cluster.owner.get_document("project1")
+            version = cluster.owner.projects["project1"].version
+            self.assertGreater(version, 100)
+            for node in cluster.nodes:
+                self.assertEqual(node.get_document("project1"), expected, node.node_id)
+                self.assertEqual(node.projects["project1"].version, version)
+            for editor in editors:
+                self.assertEqual(editor.client.document.to_dict(), expected, editor.name)
+                self.assertEqual(editor.client.version, version)
+            await cluster.close(editors)
+        asyncio.run(run())
+
+    def test_reconnect_to_another_node(self):
+        """تست اتصال مجدد به نود دیگر بدون جلسه چسبنده"""
+        async def run():
+            cluster = Cluster(3)
+            await cluster.start()
+            editor = await cluster.connect("mover", cluster.owner)
+            editor.edit("add_element", "title", {"type": "heading", "content": "Hi", "slot": "s1"})
+            await cluster.settle([editor])
+            document = editor.client.document.to_dict()
+            await editor.disconnect()
+
+            # A late-joining replica syncs from the owner on first connection
+            late = cluster.replicas[-1]
+            self.assertNotIn("project1", late.merge_engines)
+            moved = await cluster.connect("mover", late)
+            self.assertEqual(moved.client.version, 1)
+            self.assertEqual(moved.client.document.to_dict(), document)
+            moved.edit("content_change", "title", {"delta": [2, "!"]})
+            await cluster.settle([moved])
+            self.assertEqual(cluster.owner.get_document("project1")["elements"]["title"]["content"], "Hi!")
+            self.assertEqual(late.get_document("project1"), cluster.owner.get_document("project1"))
+            await cluster.close([moved])
+        asyncio.run(run())
+
+    def test_presence_and_chat_relayed(self):
+        """تست رله پیام‌های چت و مکان‌نما بین نودها"""
+        async def run():
+            cluster = Cluster(2)
+            await cluster.start()
+            sender = await cluster.connect("sender", cluster.nodes[0])
+            listener = await cluster.connect("listener", cluster.nodes[1])
+            sender.socket.incoming.put_nowait({"type": "chat_message", "data": {"message": "سلام"}})
+            sender.socket.incoming.put_nowait({"type": "cursor_move", "data": {"position": {"x": 10, "y": 20}}})
+            await cluster.settle([sender, listener])
+
+            types = [message["type"] for message in listener.received]
+            self.assertIn("chat_message", types)
+            self.assertIn("cursor_move", types)
+            self.assertEqual(types.count("chat_message"), 1)
+            self.assertNotIn("cursor_move", [message["type"] for message in sender.received])
+            await cluster.close([sender, listener])
+        asyncio.run(run())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+🔀 تست‌های موتور ادغام تبدیل عملیات و همگرایی کلاینت‌های همزمان
+"""
+
+import unittest
+import os
+import sys
+import asyncio
+import json
+import random
+
+# اضافه کردن مسیر پروژه
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from collaboration_merge import (ROOT, ElementDocument, MergeClient, MergeEngine, ResyncRequired,
+                                 apply_text_delta, normalize_text_delta, operation_to_change,
+                                 transform_text_delta)
+from real_time_collaboration import RealTimeCollaboration
+
+
+def random_change(rng, client_name, counter, document):
+    """ساخت یک تغییر تصادفی روی سند محلی کلاینت"""
+    live = [element_id for element_id, element in document.elements.items() if not element["removed"]]
+    slot = f"{client_name}-{counter}"
+    choice = rng.random()
+    if not live or choice < 0.2:
+        parent = rng.choice([ROOT] + live[:3])
+        after = rng.choice([None] + document.sequences.get(parent, []))
+        return operation_to_change("add_element", f"el-{slot}",
+                                   {"type": "text", "parent": parent, "after": after,
+                                    "content": rng.choice(["", "ab", "hello"])}, slot)
+    element_id = rng.choice(live)
+    element = document.elements[element_id]
+    if choice < 0.3:
+        parent = element["parent"]
+        after = rng.choice([None] + [s for s in document.sequences.get(parent, []) if s != element["slot"]])
+        return operation_to_change("move_element", element_id, {"parent": parent, "after": after}, slot)
+    if choice < 0.35:
+        return operation_to_change("remove_element", element_id, {})
+    if choice < 0.5:
+        return operation_to_change("modify_element", element_id,
+                                   {rng.choice(["href", "alt", "title"]): f"{client_name}-{counter}"})
+    if choice < 0.6:
+        return operation_to_change("style_change", element_id,
+                                   {rng.choice(["color", "margin"]): rng.choice(["red", "blue", None])})
+    if choice < 0.65:
+        return operation_to_change("content_change", element_id, {"text": f"reset by {client_name}"})
+
+    content = element["content"]
+    position = rng.randint(0, len(content))
+    if content and rng.random() < 0.4:
+        delta = [position, -rng.randint(1, len(content) - position)] if position < len(content) else [-1]
+    else:
+        delta = [position, rng.choice(["x", "yz", client_name])]
+    return operation_to_change("content_change", element_id, {"delta": delta})
+
+
+class TestTextDeltas(unittest.TestCase):
+    """تست‌های دلتای متنی"""
+
+    def test_apply_and_normalize(self):
+        """تست اعمال و فشرده‌سازی دلتا"""
+        self.assertEqual(normalize_text_delta([2, 3, "a", "b", -1, -2, 4, 0]), [5, "ab", -3])
+        self.assertEqual(apply_text_delta("hello world", [6, -5, "there"]), "hello there")
+        with self.assertRaises(ValueError):
+            apply_text_delta("abc", [2, -5])
+
+    def test_transform_properties(self):
+        """تست خاصیت همگرایی TP1 روی دلتاهای تصادفی"""
+        rng = random.Random(11)
+        for _ in range(500):
+            text = "".join(rng.choice("abcdef") for _ in range(rng.randint(0, 12)))
+
+            def make():
+                delta, remaining = [], len(text)
+                while remaining and rng.random() < 0.7:
+                    span = rng.randint(1, remaining)
+                    delta.append(rng.choice([span, -span]))
+                    remaining -= span
+                    if rng.random() < 0.5:
+                        delta.append(rng.choice(["X", "YY", "z"]))
+                return delta
+
+            first, second = make(), make()
+            first_prime, second_prime = transform_text_delta(first, second)
+            self.assertEqual(apply_text_delta(apply_text_delta(text, second), first_prime),
+                             apply_text_delta(apply_text_delta(text, first), second_prime))
+
+    def test_concurrent_insert_tie(self):
+        """تست ترتیب درج همزمان در یک موقعیت"""
+        delta, applied = transform_text_delta(["B"], ["A"])
+        self.assertEqual(apply_text_delta(apply_text_delta("", ["A"]), delta), "AB")
+
+
+class TestMergeEngine(unittest.TestCase):
+    """تست‌های MergeEngine"""
+
+    def setUp(self):
+        """راه‌اندازی قبل از هر تست"""
+        self.engine = MergeEngine(max_history=10)
+        self.engine.submit(operation_to_change("add_element", "a", {"type": "text", "content": "Hi"}, "slot-a"))
+
+    def test_concurrent_styles_last_writer_wins(self):
+        """تست برنده شدن آخرین نویسنده در سبک‌ها"""
+        self.engine.submit(operation_to_change("style_change", "a", {"color": "red", "margin": "1px"}), 1)
+        _, change = self.engine.submit(operation_to_change("style_change", "a", {"color": "blue"}), 1)
+        self.assertEqual(change["styles"], {"color": "blue"})
+        self.assertEqual(self.engine.document.elements["a"]["styles"], {"color": "blue", "margin": "1px"})
+
+    def test_concurrent_adds_after_same_anchor(self):
+        """تست درج همزمان پس از یک لنگر"""
+        self.engine.submit(operation_to_change("add_element", "b", {"after": "slot-a"}, "slot-b"), 1)
+        _, change = self.engine.submit(operation_to_change("add_element", "c", {"after": "slot-a"}, "slot-c"), 1)
+        self.assertEqual(change["insert"]["after"], "slot-b")
+        self.assertEqual(self.engine.document.children(), ["a", "b", "c"])
+
+    def test_edit_of_removed_element_is_ignored(self):
+        """تست نادیده گرفتن ویرایش عنصر حذف‌شده"""
+        self.engine.submit(operation_to_change("remove_element", "a", {}), 1)
+        self.engine.submit(operation_to_change("content_change", "a", {"delta": [2, "!"]}), 1)
+        self.assertEqual(self.engine.version, 3)
+        self.assertEqual(self.engine.document.children(), [])
+        self.assertEqual(self.engine.document.elements["a"]["content"], "")
+        self.assertTrue(self.engine.document.elements["a"]["removed"])
+
+    def test_invalid_change_leaves_document_untouched(self):
+        """تست رد تغییر نامعتبر بدون تغییر سند"""
+        before = self.engine.document.to_dict()
+        with self.assertRaises(ValueError):
+            self.engine.submit(operation_to_change("add_element", "b", {"after": "missing"}, "slot-b"))
+        self.assertEqual(self.engine.document.to_dict(), before)
+        self.assertEqual(self.engine.version, 1)
+
+    def test_resync_required(self):
+        """تست نیاز به همگام‌سازی مجدد برای نسخه‌های قدیمی"""
+        for index in range(12):
+            self.engine.submit(operation_to_change("modify_element", "a", {"title": str(index)}))
+        with self.assertRaises(ResyncRequired):
+            self.engine.submit(operation_to_change("modify_element", "a", {"title": "late"}), 1)
+        with self.assertRaises(ValueError):
+            self.engine.submit({}, 99)
+
+    def test_document_round_trip(self):
+        """تست تبدیل سند به دیکشنری و بازسازی"""
+        data = json.loads(json.dumps(self.engine.document.to_dict()))
+        self.assertEqual(ElementDocument.from_dict(data).to_dict(), self.engine.document.to_dict())
+
+
+class TestConvergence(unittest.TestCase):
+    """شبیه‌سازی تصادفی کلاینت‌های همزمان"""
+
+    def simulate(self, seed, clients=6, steps=1500):
+        rng = random.Random(seed)
+        server = MergeEngine()
+        names = [f"c{index}" for index in range(clients)]
+        peers = {name: MergeClient() for name in names}
+        outbox = {name: [] for name in names}
+        inbox = {name: [] for name in names}
+        counters = dict.fromkeys(names, 0)
+
+        def deliver_to_server(name):
+            change, base_version = outbox[name].pop(0)
+            _, committed = server.submit(change, base_version)
+            for other in names:
+                inbox[other].append(("ack", None) if other == name else ("change", committed))
+
+        def deliver_to_client(name):
+            kind, change = inbox[name].pop(0)
+            client = peers[name]
+            if kind == "ack":
+                following = client.acknowledge()
+                if following is not None:
+                    outbox[name].append((following, client.version))
+            else:
+                client.receive(change)
+
+        for _ in range(steps):
+            name = rng.choice(names)
+            action = rng.random()
+            if action < 0.4:
+                counters[name] += 1
+                client = peers[name]
+                change = random_change(rng, name, counters[name], client.document)
+                if client.apply_local(change) is not None:
+                    outbox[name].append((change, client.version))
+            elif action < 0.7 and outbox[name]:
+                deliver_to_server(name)
+            elif inbox[name]:
+                deliver_to_client(name)
+
+        while any(outbox.values()) or any(inbox.values()):
+            for name in names:
+                while outbox[name]:
+                    deliver_to_server(name)
+                while inbox[name]:
+                    deliver_to_client(name)
+
+        expected = server.document.to_dict()
+        for name in names:
+            self.assertEqual(peers[name].document.to_dict(), expected, f"client {name} diverged (seed {seed})")
+            self.assertEqual(peers[name].version, server.version)
+        return server
+
+    def test_random_concurrent_clients_converge(self):
+        """تست همگرایی همه کلاینت‌ها با سرور"""
+        for seed in range(8):
+            server = self.simulate(seed)
+            self.assertGreater(server.version, 200)
+            self.assertTrue(server.document.children())
+
+
+class TestCollaborationMerge(unittest.TestCase):
+    """تست‌های اتصال RealTimeCollaboration به موتور ادغام"""
+
+    class Socket:
+        def __init__(self):
+            self.id = object()
+            self.sent = []
+
+        async def send(self, payload):
+            self.sent.append(json.loads(payload))
+
+    def test_handle_operation_rebases_and_acks(self):
+        """تست بازپایه‌گذاری عملیات و ارسال تایید"""
+        async def run():
+            collaboration = RealTimeCollaboration()
+            project_id = collaboration.create_project("Merge", "user1")
+            user = collaboration.projects[project_id].users["user1"]
+            first, second = self.Socket(), self.Socket()
+            for socket in (first, second):
+                collaboration.active_connections[project_id].add(socket)
+                collaboration.broadcaster.register(socket)
+
+            await collaboration._handle_operation(first, {
+                "operation_type": "add_element", "element_id": "title",
+                "data": {"type": "heading", "content": "Hello", "slot": "s1"}}, user, project_id)
+            await collaboration._handle_operation(first, {
+                "operation_type": "content_change", "element_id": "title",
+                "data": {"delta": [5, "!"]}, "base_version": 1}, user, project_id)
+            await collaboration._handle_operation(second, {
+                "operation_type": "content_change", "element_id": "title",
+                "data": {"delta": ["Oh, "]}, "base_version": 1}, user, project_id)
+            await collaboration.broadcaster.flush(timeout=1)
+
+            document = collaboration.get_document(project_id)
+            self.assertEqual(document["elements"]["title"]["content"], "Oh, Hello!")
+            self.assertEqual(collaboration.projects[project_id].version, 3)
+            self.assertEqual([message["type"] for message in second.sent],
+                             ["operation", "operation", "operation_ack"])
+            self.assertEqual(second.sent[-1]["data"]["version"], 3)
+            self.assertEqual(first.sent[-1]["data"]["data"]["text"], ["Oh, "])
+            await collaboration.broadcaster.close()
+        asyncio.run(run())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+🗄️ تست‌های لاگ پایدار عملیات، تصویر لحظه‌ای و فشرده‌سازی
+"""
+
+import unittest
+import os
+import sys
+import asyncio
+import json
+import shutil
+import tempfile
+
+# اضافه کردن مسیر پروژه
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from collaboration_merge import ElementDocument, MergeEngine, operation_to_change
+from collaboration_store import OperationLog
+from real_time_collaboration import RECENT_OPERATIONS, RealTimeCollaboration
+
+
+class FakeSocket:
+    def __init__(self):
+        self.id = object()
+        self.sent = []
+
+    async def send(self, payload):
+        self.sent.append(json.loads(payload))
+
+
+class TestOperationLog(unittest.TestCase):
+    """تست‌های OperationLog"""
+
+    def setUp(self):
+        """راه‌اندازی قبل از هر تست"""
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "operations.db")
+
+    def tearDown(self):
+        """پاک‌سازی پس از هر تست"""
+        shutil.rmtree(self.directory)
+
+    def test_snapshot_compacts_log(self):
+        """تست فشرده‌سازی لاگ پس از تصویر لحظه‌ای"""
+        log = OperationLog(self.path, snapshot_interval=4)
+        for version in range(1, 7):
+            log.append("p", {"version": version, "type": "modify_element", "data": {}})
+            if log.needs_snapshot(version):
+                log.save_snapshot("p", version, {"elements": {"a": {}}})
+        log.append("other", {"version": 1, "type": "chat_message", "data": {}})
+
+        self.assertEqual(log.latest_snapshot("p"), (4, {"elements": {"a": {}}}))
+        self.assertEqual([op["version"] for op in log.operations_since("p", 4)], [5, 6])
+        self.assertEqual(log.get_stats("p"), {"snapshot_version": 4, "logged_operations": 2})
+        self.assertEqual(log.latest_version("p"), 6)
+        self.assertEqual(log.latest_snapshot("missing"), (0, None))
+        log.close()
+
+        reopened = OperationLog(self.path)
+        self.assertEqual([op["version"] for op in reopened.operations_since("p", 0, limit=1)], [5])
+        reopened.delete_project("p")
+        self.assertEqual(reopened.latest_version("p"), 0)
+        self.assertEqual(reopened.latest_version("other"), 1)
+        reopened.close()
+
+    def test_duplicate_version_rejected(self):
+        """تست رد نسخه تکراری"""
+        log = OperationLog()
+        log.append("p", {"version": 1})
+        with self.assertRaises(Exception):
+            log.append("p", {"version": 1})
+        log.close()
+
+
+class TestEngineCompaction(unittest.TestCase):
+    """تست‌های حذف سنگ‌قبرها از سند"""
+
+    def test_compact_drops_expired_tombstones(self):
+        """تست حذف سنگ‌قبرهای قدیمی‌تر از پنجره تاریخچه"""
+        engine = MergeEngine(max_history=3)
+        engine.submit(operation_to_change("add_element", "a", {}, "a1"))
+        engine.submit(operation_to_change("add_element", "b", {"after": "a1"}, "b1"))
+        engine.submit(operation_to_change("move_element", "a", {"after": "b1"}, "a2"))
+        engine.submit(operation_to_change("remove_element", "b", {}))
+        self.assertEqual(engine.compact(), 0)
+        self.assertEqual(sorted(engine.document.tombstones()), ["a1", "b1"])
+
+        for index in range(3):
+            engine.submit(operation_to_change("modify_element", "a", {"title": str(index)}))
+        self.assertEqual(engine.compact(), 2)
+        self.assertEqual(engine.document.tombstones(), [])
+        self.assertNotIn("b", engine.document.elements)
+        self.assertEqual(engine.document.children(), ["a"])
+
+    def test_restored_engine_tracks_existing_tombstones(self):
+        """تست بازیابی سنگ‌قبرها از تصویر لحظه‌ای"""
+        engine = MergeEngine()
+        engine.submit(operation_to_change("add_element", "a", {}, "a1"))
+        engine.submit(operation_to_change("move_element", "a", {"after": "a1"}, "a2"))
+        restored = MergeEngine(ElementDocument.from_dict(engine.document.to_dict()), engine.version, max_history=1)
+        restored.submit(operation_to_change("modify_element", "a", {"title": "x"}))
+        self.assertEqual(restored.compact(), 1)
+        self.assertEqual(restored.document.sequences, {"root": ["a2"]})
+
+
+class TestCollaborationPersistence(unittest.TestCase):
+    """تست‌های اتصال RealTimeCollaboration به لاگ عملیات"""
+
+    def setUp(self):
+        """راه‌اندازی قبل از هر تست"""
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "operations.db")
+
+    def tearDown(self):
+        """پاک‌سازی پس از هر تست"""
+        shutil.rmtree(self.directory)
+
+    async def edit(self, collaboration, project_id, count):
+        user = collaboration.projects[project_id].users["user1"]
+        socket = FakeSocket()
+        collaboration.broadcaster.register(socket)
+        await collaboration._handle_operation(socket, {
+            "operation_type": "add_element", "element_id": "title",
+            "data": {"type": "heading", "slot": "s1"}}, user, project_id)
+        for index in range(count - 1):
+            await collaboration._handle_operation(socket, {
+                "operation_type": "content_change", "element_id": "title",
+                "data": {"delta": [index, str(index % 10)]}}, user, project_id)
+
+    def test_join_gets_snapshot_and_tail(self):
+        """تست دریافت تصویر لحظه‌ای و عملیات پس از آن هنگام ورود"""
+        async def run():
+            collaboration = RealTimeCollaboration(operation_log=OperationLog(self.path, snapshot_interval=10))
+            project_id = collaboration.create_project("Snapshots", "user1")
+            await self.edit(collaboration, project_id, 23)
+
+            joiner = FakeSocket()
+            collaboration.broadcaster.register(joiner)
+            await collaboration._send_project_state(joiner, collaboration.projects[project_id])
+            await collaboration.broadcaster.flush(timeout=1)
+            state = joiner.sent[0]["data"]
+            self.assertEqual(state["snapshot"]["version"], 20)
+            self.assertEqual([op["version"] for op in state["operations"]], [21, 22, 23])
+            self.assertEqual(state["operations"][0]["type"], "content_change")
+
+            document = ElementDocument.from_dict(state["snapshot"]["document"])
+            for record in state["operations"]:
+                document.apply(record["data"])
+            self.assertEqual(document.to_dict(), collaboration.get_document(project_id))
+            self.assertEqual(document.elements["title"]["content"], "0123456789012345678901")
+            await collaboration.broadcaster.close()
+        asyncio.run(run())
+
+    def test_restart_restores_document(self):
+        """تست بازیابی سند پس از راه‌اندازی مجدد"""
+        async def run():
+            collaboration = RealTimeCollaboration(operation_log=OperationLog(self.path, snapshot_interval=8))
+            project_id = collaboration.create_project("Restart", "user1")
+            await self.edit(collaboration, project_id, 13)
+            expected = collaboration.get_document(project_id)
+            await collaboration.broadcaster.close()
+            collaboration.operation_log.close()
+
+            restarted = RealTimeCollaboration(operation_log=OperationLog(self.path, snapshot_interval=8))
+            restarted.projects[project_id] = collaboration.projects[project_id]
+            self.assertEqual(restarted.get_document(project_id), expected)
+            self.assertEqual(restarted._get_engine(project_id).version, 13)
+            restarted.operation_log.close()
+
+            reopened = RealTimeCollaboration(operation_log_path=self.path)
+            reopened.projects[project_id] = collaboration.projects[project_id]
+            self.assertEqual(reopened.get_document(project_id), expected)
+            self.assertEqual(reopened.operation_log.path, self.path)
+            reopened.operation_log.close()
+        asyncio.run(run())
+
+    def test_memory_stays_bounded(self):
+        """تست محدود ماندن حافظه تاریخچه عملیات"""
+        async def run():
+            collaboration = RealTimeCollaboration()
+            project_id = collaboration.create_project("Bounded", "user1")
+            await self.edit(collaboration, project_id, RECENT_OPERATIONS + 50)
+            project = collaboration.projects[project_id]
+            self.assertIs(project.operations, collaboration.operation_history[project_id])
+            self.assertEqual(len(project.operations), RECENT_OPERATIONS)
+            self.assertEqual(len(collaboration.get_operation_history(project_id, 10)), 10)
+            self.assertEqual(collaboration.operation_log.get_stats(project_id)["logged_operations"], 50)
+            await collaboration.broadcaster.close()
+        asyncio.run(run())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+🧹 تست‌های حذف CSS استفاده نشده
+"""
+
+import unittest
+import os
+import re
+import sys
+
+# اضافه کردن مسیر پروژه
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from css_purger import CSSPurger, SelectorIndex, purge_files
+from advanced_export_system import AdvancedExportSystem, ExportFormat, ExportOptions, ExportQuality
+
+
+class TestCSSPurger(unittest.TestCase):
+    """تست‌های CSSPurger"""
+
+    def setUp(self):
+        """راه‌اندازی قبل از هر تست"""
+        self.index = SelectorIndex().index_html(
+            '<nav id="main-nav" class="navbar md:flex w-1/2" data-state="open">'
+            '<a class="nav-link active" href="#">Home</a></nav>'
+        )
+
+    def test_selector_matching(self):
+        """تست تشخیص انتخابگرهای قابل تطبیق"""
+        purger = CSSPurger(self.index)
+        matching = [
+            ".navbar", "#main-nav .nav-link", "nav > a.active:hover", "a::before",
+            "[data-state=open]", "*", ":root", ".md\\:flex", ".w-1\\/2", "a:not(.disabled)",
+        ]
+        not_matching = [".card", "#footer", "table td", ".navbar .dropdown-menu", "[aria-expanded]"]
+
+        for selector in matching:
+            self.assertTrue(purger.selector_can_match(selector), selector)
+        for selector in not_matching:
+            self.assertFalse(purger.selector_can_match(selector), selector)
+
+    def test_purge_keeps_at_rules_and_prunes_media(self):
+        """تست حفظ at-ruleها و هرس بلوک‌های media"""
+        css = """
+            @charset "utf-8";
+            /*! Bootstrap license */
+            .navbar, .card { display: flex; }
+            .modal { display: none; }
+            @media (min-width: 768px) { .col-md-6 { width: 50%; } .navbar { padding: 0; } }
+            @media print { .card { border: 0; } }
+            @font-face { font-family: "Vazir"; src: url("vazir.woff2"); }
+            @keyframes spin { from { transform: rotate(0); } to { transform: rotate(360deg); } }
+        """
+        purged = CSSPurger(self.index).purge(css)
+
+        self.assertIn('@charset "utf-8";', purged)
+        self.assertIn("/*! Bootstrap license */", purged)
+        self.assertIn(".navbar{ display: flex; }", purged)
+        self.assertNotIn(".card", purged)
+        self.assertNotIn(".modal", purged)
+        self.assertNotIn("@media print", purged)
+        self.assertIn("@media (min-width: 768px){.navbar{ padding: 0; }}", purged)
+        self.assertIn("@font-face", purged)
+        self.assertIn("@keyframes spin", purged)
+
+    def test_safelist(self):
+        """تست فهرست مجاز"""
+        purger = CSSPurger(self.index, ["show", re.compile(r"^modal")])
+        purged = purger.purge(".show{a:1}.modal-open{b:2}.toast{c:3}")
+
+        self.assertEqual(purged, ".show{a:1}\n.modal-open{b:2}")
+
+    def test_script_classes_are_kept(self):
+        """تست حفظ کلاس‌هایی که جاوااسکریپت اضافه می‌کند"""
+        files = {
+            "index.html": '<body><div class="menu"></div>'
+                          '<script>el.classList.add("is-open")</script></body>',
+            "app.js": "toggle('menu--dark highlighted');",
+            "styles.css": ".menu{}.is-open{}.menu--dark{}.highlighted{}.unused{}",
+        }
+        purged_files, reports = purge_files(files)
+
+        self.assertEqual(purged_files["styles.css"], ".menu{}\n.is-open{}\n.menu--dark{}\n.highlighted{}")
+        report = reports["styles.css"]
+        self.assertEqual(report.rules_total, 5)
+        self.assertEqual(report.rules_removed, 1)
+        self.assertEqual(report.bytes_saved, report.original_bytes - report.purged_bytes)
+        self.assertGreater(report.bytes_saved, 0)
+
+    def test_optimize_export_purges_only_when_enabled(self):
+        """تست دست نخوردن CSS در تنظیمات پیش‌فرض و رعایت فهرست مجاز"""
+        system = AdvancedExportSystem()
+        html = '<style>.menu{a:1}.toast{b:2}.modal-open{c:3}</style><div class="menu"></div>'
+        css = ".menu{a:1}.toast{b:2}"
+
+        defaults = ExportOptions(format=ExportFormat.HTML, quality=ExportQuality.HIGH, optimize_images=False)
+        self.assertIn(".toast{b:2}.modal-open{c:3}", system.optimize_export(html, "html", defaults))
+        system.purge_unused_css({"index.html": html})
+        self.assertIn(".toast{b:2}", system.optimize_export(css, "css", defaults))
+
+        purging = ExportOptions(format=ExportFormat.HTML, quality=ExportQuality.HIGH, optimize_images=False,
+                                purge_css=True, css_safelist=[re.compile(r"^modal")])
+        purged = system.optimize_export(html, "html", purging)
+        self.assertNotIn(".toast", purged)
+        self.assertIn(".modal-open{c:3}", purged)
+        self.assertNotIn(".toast", system.optimize_export(css, "css", purging))
+
+
+if __name__ == '__main__':
+    unittest.main()
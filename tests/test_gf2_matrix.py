@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+🧮 تست‌های ماتریس‌های فشرده GF(2) برای رمزنگاری مبتنی بر کد
+"""
+
+import unittest
+import os
+import sys
+import struct
+import asyncio
+
+import numpy as np
+
+# اضافه کردن مسیر پروژه
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gf2_matrix import GF2Matrix, bits_to_bytes, bytes_to_bits
+from quantum_resistant_security import QuantumResistantSecurity, SecurityLevel
+
+
+class TestGF2Matrix(unittest.TestCase):
+    """تست‌های GF2Matrix"""
+
+    def setUp(self):
+        """راه‌اندازی قبل از هر تست"""
+        self.rng = np.random.default_rng(2024)
+
+    def _random_bits(self, rows, cols):
+        return self.rng.integers(0, 2, (rows, cols))
+
+    def test_multiply_matches_reference(self):
+        """تست برابری ضرب با ضرب ماتریسی مرجع به پیمانه ۲"""
+        for rows, inner, cols in ((1, 1, 1), (37, 70, 45), (130, 203, 65)):
+            a = self._random_bits(rows, inner)
+            b = self._random_bits(inner, cols)
+            product = GF2Matrix.from_bits(a).multiply(GF2Matrix.from_bits(b))
+            self.assertTrue(np.array_equal(product.to_bits(), (a @ b) % 2))
+
+    def test_vector_and_inner_products(self):
+        """تست ضرب بردار در ماتریس و ضرب داخلی با popcount"""
+        a = self._random_bits(40, 100)
+        c = self._random_bits(25, 100)
+        vector = self.rng.integers(0, 2, 40)
+        matrix = GF2Matrix.from_bits(a)
+        self.assertTrue(np.array_equal(matrix.vector_multiply(vector), (vector @ a) % 2))
+        self.assertTrue(np.array_equal(matrix.inner_products(GF2Matrix.from_bits(c)).to_bits(), (a @ c.T) % 2))
+
+    def test_permutation_application(self):
+        """تست اعمال جایگشت برابر با ضرب در ماتریس جایگشت"""
+        a = self._random_bits(12, 70)
+        permutation = self.rng.permutation(70)
+        reference = np.zeros((70, 70), dtype=int)
+        reference[np.arange(70), permutation] = 1
+        permutation_matrix = GF2Matrix.from_permutation(permutation)
+
+        self.assertTrue(permutation_matrix.is_permutation())
+        self.assertTrue(np.array_equal(permutation_matrix.permutation(), permutation))
+        self.assertTrue(np.array_equal(GF2Matrix.from_bits(a).apply_permutation(permutation).to_bits(),
+                                       (a @ reference) % 2))
+        self.assertFalse(GF2Matrix.from_bits(a).is_permutation())
+
+    def test_gaussian_elimination(self):
+        """تست رتبه و معکوس با حذف گاوسی"""
+        singular = self._random_bits(30, 30)
+        singular[5] = singular[3] ^ singular[7]
+        self.assertLess(GF2Matrix.from_bits(singular).rank(), 30)
+        with self.assertRaises(ValueError):
+            GF2Matrix.from_bits(singular).inverse()
+
+        # ماتریس بالامثلثی با قطر یک همیشه معکوس‌پذیر است
+        upper = np.triu(self._random_bits(64, 64), 1) | np.eye(64, dtype=int)
+        matrix = GF2Matrix.from_bits(upper[self.rng.permutation(64)])
+        self.assertEqual(matrix.rank(), 64)
+        self.assertEqual(matrix.multiply(matrix.inverse()), GF2Matrix.identity(64))
+
+    def test_legacy_formats(self):
+        """تست سازگاری با فرمت قدیمی ماتریس و بیت‌ها"""
+        rows = [[1, 0, 1], [0, 1, 1]]
+        legacy = struct.pack("II", 2, 3) + bytes([1, 0, 1, 0, 1, 1])
+        matrix = GF2Matrix.from_rows(rows)
+        self.assertEqual(matrix.to_legacy_bytes(), legacy)
+        self.assertEqual(GF2Matrix.from_legacy_bytes(legacy)[0].to_rows(), rows)
+        self.assertEqual(GF2Matrix.from_any_bytes(matrix.to_packed_bytes())[0], matrix)
+
+        self.assertEqual(bytes_to_bits(b"\x01\x80").tolist(), [1] + [0] * 14 + [1])
+        self.assertEqual(bits_to_bytes([1, 0, 0, 0, 0, 0, 0, 0, 1]), b"\x01\x01")
+
+    def test_code_based_key_roundtrip(self):
+        """تست تولید کلید و رمزنگاری مبتنی بر کد با اندازه واقعی"""
+        security = QuantumResistantSecurity()
+        key = asyncio.run(security.generate_code_based_key(SecurityLevel.LEVEL_1))
+        params = key.metadata["mceliece_params"]
+        public_key = security._deserialize_matrix(key.public_key)
+        invertible_matrix, permutation = security._deserialize_private_key(key.private_key)
+
+        self.assertEqual((public_key.rows, public_key.cols), (params["k"], params["n"]))
+        self.assertTrue(permutation.is_permutation())
+        self.assertEqual(security._serialize_matrix(public_key), key.public_key)
+
+        encrypted = asyncio.run(security.encrypt_quantum_resistant(b"secret", key.id))
+        self.assertEqual(len(encrypted), params["n"] // 8)
+        message = np.zeros(params["k"], dtype=np.uint8)
+        message[:48] = bytes_to_bits(b"secret")
+        errors = bytes_to_bits(encrypted) ^ public_key.vector_multiply(message)
+        self.assertEqual(int(errors.sum()), params["t"])
+
+
+if __name__ == '__main__':
+    unittest.main()
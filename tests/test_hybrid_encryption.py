@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+🔐 تست‌های رمزنگاری ترکیبی جریانی و دسته‌ای
+"""
+
+import unittest
+import os
+import sys
+import io
+import asyncio
+
+# اضافه کردن مسیر پروژه
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hybrid_encryption import EncryptedBatch, StreamIntegrityError
+from quantum_resistant_security import QuantumResistantSecurity, SecurityLevel
+
+
+class TestHybridEncryption(unittest.TestCase):
+    """تست‌های رمزنگاری جریانی و دسته‌ای با کپسوله‌سازی NTRU"""
+
+    @classmethod
+    def setUpClass(cls):
+        """ساخت یک کلید مشبکه برای همه تست‌ها"""
+        cls.security = QuantumResistantSecurity()
+        cls.key = asyncio.run(cls.security.generate_lattice_key(SecurityLevel.LEVEL_1))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.security.shutdown()
+
+    def _encrypt(self, data, chunk_size=1000):
+        encrypted = io.BytesIO()
+        asyncio.run(self.security.encrypt_stream(io.BytesIO(data), encrypted, self.key.id, chunk_size))
+        return encrypted.getvalue()
+
+    def _decrypt(self, data):
+        decrypted = io.BytesIO()
+        asyncio.run(self.security.decrypt_stream(io.BytesIO(data), decrypted))
+        return decrypted.getvalue()
+
+    def test_key_encapsulation(self):
+        """تست بازیابی راز مشترک با کلید خصوصی"""
+        for _ in range(20):
+            header, session_key = self.security._new_hybrid_session(self.key.id)
+            self.assertEqual(self.security._open_hybrid_session(header), session_key)
+
+    def test_stream_round_trip(self):
+        """تست رمزنگاری جریانی داده‌های بزرگ‌تر از یک چندجمله‌ای"""
+        for size in (0, 1, 999, 1000, 2000, 25_001):
+            data = os.urandom(size)
+            encrypted = self._encrypt(data)
+            self.assertEqual(self._decrypt(encrypted), data)
+
+    def test_stream_tampering_detected(self):
+        """تست تشخیص تغییر و کوتاه‌سازی جریان"""
+        data = os.urandom(5000)
+        encrypted = self._encrypt(data)
+
+        modified = bytearray(encrypted)
+        modified[-20] ^= 1
+        with self.assertRaises(StreamIntegrityError):
+            self._decrypt(bytes(modified))
+
+        # حذف آخرین رکورد (۴ بایت طول + ۱۰۰۰ بایت داده + ۱۶ بایت برچسب)
+        with self.assertRaises(StreamIntegrityError):
+            self._decrypt(encrypted[:-1020])
+
+    def test_batch_round_trip_with_process_pool(self):
+        """تست حالت دسته‌ای با استخر پردازه"""
+        payloads = [os.urandom(index % 50) for index in range(200)]
+        batch = asyncio.run(self.security.encrypt_batch(payloads, self.key.id, max_workers=2, slice_size=64))
+
+        self.assertEqual(len(batch.ciphertexts), 200)
+        self.assertEqual(asyncio.run(self.security.decrypt_batch(batch.to_bytes(), max_workers=2,
+                                                                  slice_size=64)), payloads)
+
+        swapped = EncryptedBatch(batch.header, [batch.ciphertexts[1], batch.ciphertexts[0]])
+        with self.assertRaises(StreamIntegrityError):
+            asyncio.run(self.security.decrypt_batch(swapped))
+
+    def test_batch_process_pool_reused(self):
+        """تست استفاده مجدد از یک استخر پردازه بین فراخوانی‌ها و بستن آن"""
+        security = QuantumResistantSecurity()
+        key = asyncio.run(security.generate_lattice_key(SecurityLevel.LEVEL_1))
+        payloads = [os.urandom(16) for _ in range(20)]
+        try:
+            batch = asyncio.run(security.encrypt_batch(payloads, key.id, max_workers=2, slice_size=8))
+            executor = security._batch_executor
+            self.assertIsNotNone(executor)
+
+            self.assertEqual(asyncio.run(security.decrypt_batch(batch, max_workers=2, slice_size=8)), payloads)
+            self.assertIs(security._batch_executor, executor)
+        finally:
+            security.shutdown()
+        self.assertIsNone(security._batch_executor)
+        with self.assertRaises(RuntimeError):
+            executor.submit(len, b"")
+
+    def test_batch_truncation_detected(self):
+        """تست تشخیص حذف آیتم‌های انتهایی دسته"""
+        batch = asyncio.run(self.security.encrypt_batch([b"a", b"b", b"c"], self.key.id))
+        for ciphertexts in (batch.ciphertexts[:-1], batch.ciphertexts[:1], []):
+            with self.assertRaises(StreamIntegrityError):
+                asyncio.run(self.security.decrypt_batch(EncryptedBatch(batch.header, ciphertexts).to_bytes()))
+
+    def test_unsupported_algorithm(self):
+        """تست خطا برای کلیدهای غیر مشبکه"""
+        hash_key = asyncio.run(self.security.generate_hash_based_key(SecurityLevel.LEVEL_1))
+        with self.assertRaises(ValueError):
+            asyncio.run(self.security.encrypt_batch([b"x"], hash_key.id))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+🧹 تست‌های پاک‌سازی ورودی با سیاست‌های وابسته به زمینه
+"""
+
+import unittest
+import os
+import sys
+import json
+
+# اضافه کردن مسیر پروژه
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from input_sanitizer import InputSanitizer, SanitizeContext, SanitizerPolicy
+from advanced_security import AdvancedSecurity
+
+
+class TestInputSanitizer(unittest.TestCase):
+    """تست‌های InputSanitizer"""
+
+    def setUp(self):
+        """راه‌اندازی قبل از هر تست"""
+        self.sanitizer = InputSanitizer()
+
+    def test_html_body_escapes_markup(self):
+        """تست escape کردن تگ‌ها در بدنه HTML"""
+        result = self.sanitizer.sanitize("<script>alert(1)</script> it's", "html_body")
+        self.assertEqual(result, "&lt;script&gt;alert(1)&lt;/script&gt; it's")
+
+    def test_html_attribute_escapes_quotes(self):
+        """تست escape کردن نقل‌قول‌ها در مقدار attribute"""
+        result = self.sanitizer.sanitize("\"onmouseover='x'`", SanitizeContext.HTML_ATTRIBUTE)
+        self.assertEqual(result, "&quot;onmouseover=&#x27;x&#x27;&#x60;")
+
+    def test_escaped_entities_survive_comment_removal(self):
+        """تست سالم ماندن entityها با وجود حذف # (حذف پیش از escape)"""
+        self.assertEqual(self.sanitizer.sanitize("it's #1"), "it&#x27;s 1")
+
+    def test_sql_patterns_removed(self):
+        """تست حذف الگوهای تزریق SQL"""
+        result = self.sanitizer.sanitize("x' OR 1=1 -- ; DROP TABLE users", "plain_text")
+        self.assertNotIn("1=1", result)
+        self.assertNotIn("--", result)
+        self.assertNotIn("DROP", result)
+        self.assertIn("TABLE users", result)
+        self.assertNotIn("OR 'a'='a'", self.sanitizer.sanitize("x OR 'a'='a'", "plain_text"))
+
+    def test_keywords_inside_words_kept(self):
+        """تست دست‌نخوردن کلمات حاوی کلیدواژه‌ها"""
+        self.assertEqual(self.sanitizer.sanitize("Selection order", "plain_text"), "Selection order")
+
+    def test_plain_text_strips_markup(self):
+        """تست حذف کامل markup در متن ساده"""
+        self.assertEqual(self.sanitizer.sanitize("<b>Hi</b> <!-- c --> there", "plain_text"), "Hi  there")
+        # حذف در یک گذر نباید تگ جدیدی بسازد
+        self.assertNotIn("<", self.sanitizer.sanitize("<scr<b></b>ipt>alert(1)", "plain_text"))
+
+    def test_removal_cannot_assemble_markup(self):
+        """تست اینکه حذف الگوها تگ اجرایی نمی‌سازد"""
+        result = self.sanitizer.sanitize("<scr--ipt>", "html_body")
+        self.assertEqual(result, "&lt;script&gt;")
+
+    def test_control_characters_removed(self):
+        """تست حذف کاراکترهای کنترلی"""
+        self.assertEqual(self.sanitizer.sanitize("a\x00b\x1bc\nd", "plain_text"), "abc\nd")
+
+    def test_policy_max_length(self):
+        """تست سیاست سفارشی با محدودیت طول"""
+        policy = SanitizerPolicy(SanitizeContext.PLAIN_TEXT, (), strip=False, max_length=4)
+        sanitizer = InputSanitizer({SanitizeContext.PLAIN_TEXT: policy}, "plain_text")
+        self.assertEqual(sanitizer.sanitize(" abcdef"), " abc")
+
+    def test_sanitize_data_with_field_contexts(self):
+        """تست پاک‌سازی گروهی دیکشنری تو در تو با زمینه هر فیلد"""
+        payload = {
+            "title": "<b>Page</b>",
+            "order": 3,
+            "visible": True,
+            "components": [{"content": "<p>a & b</p>", "props": {"href": "/x?q=\"1\""}}],
+        }
+        result = self.sanitizer.sanitize_data(payload, "html_body",
+                                              {"title": "plain_text", "props": "html_attribute"})
+        self.assertEqual(result["title"], "Page")
+        self.assertEqual(result["order"], 3)
+        self.assertIs(result["visible"], True)
+        self.assertEqual(result["components"][0]["content"], "&lt;p&gt;a &amp; b&lt;/p&gt;")
+        self.assertEqual(result["components"][0]["props"]["href"], "/x?q=&quot;1&quot;")
+        self.assertEqual(payload["title"], "<b>Page</b>")
+
+    def test_sanitize_json(self):
+        """تست پاک‌سازی مستقیم JSON"""
+        result = json.loads(self.sanitizer.sanitize_json('{"items": ["<i>x</i>", 1, null]}', "plain_text"))
+        self.assertEqual(result, {"items": ["x", 1, None]})
+
+    def test_sanitize_many(self):
+        """تست پاک‌سازی فهرست رشته‌ها"""
+        self.assertEqual(self.sanitizer.sanitize_many(["<a>", " b "], "html_body"), ["&lt;a&gt;", "b"])
+
+
+class TestAdvancedSecuritySanitization(unittest.TestCase):
+    """تست‌های اتصال AdvancedSecurity به پاک‌ساز"""
+
+    def setUp(self):
+        """راه‌اندازی قبل از هر تست"""
+        self.security = AdvancedSecurity()
+
+    def test_sanitize_input_default_context(self):
+        """تست رفتار پیش‌فرض sanitize_input"""
+        result = self.security.sanitize_input("<script>alert('XSS')</script>; DROP TABLE users; --")
+        self.assertEqual(result, "&lt;script&gt;alert(&#x27;XSS&#x27;)&lt;/script&gt;;  TABLE users;")
+
+    def test_sanitize_payload_accepts_json_text(self):
+        """تست پذیرش متن JSON در sanitize_payload"""
+        result = self.security.sanitize_payload('{"name": "<b>Ali</b>"}', "plain_text")
+        self.assertEqual(json.loads(result), {"name": "Ali"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+🏅 تست‌های جدول امتیازات مبتنی بر skip list و پنجره‌های زمانی
+"""
+
+import unittest
+import os
+import sys
+import random
+
+# اضافه کردن مسیر پروژه
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from leaderboard import (LeaderboardService, MemoryLeaderboardBackend, RankedSkipList,
+                         RedisLeaderboardBackend)
+from viral_features import ViralFeaturesSystem
+
+# دوشنبه ۱۹ اکتبر ۲۰۲۶، ساعت ۱۲ UTC
+MONDAY_NOON = 1792411200.0
+
+
+class FakeClock:
+    def __init__(self, now=MONDAY_NOON):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            return self
+        return queue
+
+    def execute(self):
+        return [getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+
+class FakeRedis:
+    """زیرمجموعه دستورات sorted set در Redis با زمان‌سنج قابل کنترل"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.data = {}
+        self.expiry = {}
+
+    def _alive(self, key):
+        deadline = self.expiry.get(key)
+        if deadline is not None and deadline <= self.clock():
+            self.data.pop(key, None)
+            self.expiry.pop(key, None)
+        return key in self.data
+
+    def _zset(self, key):
+        if not self._alive(key):
+            self.data[key] = {}
+        return self.data[key]
+
+    def _ordered(self, key):
+        items = self.data[key].items() if self._alive(key) else []
+        return sorted(items, key=lambda item: (item[1], item[0]), reverse=True)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def zadd(self, key, mapping):
+        self._zset(key).update({member.encode(): float(score) for member, score in mapping.items()})
+
+    def zincrby(self, key, amount, member):
+        zset = self._zset(key)
+        zset[member.encode()] = zset.get(member.encode(), 0.0) + amount
+        return zset[member.encode()]
+
+    def zrem(self, key, *members):
+        if not self._alive(key):
+            return 0
+        return sum(self.data[key].pop(member.encode(), None) is not None for member in members)
+
+    def zscore(self, key, member):
+        return self.data[key].get(member.encode()) if self._alive(key) else None
+
+    def zrevrank(self, key, member):
+        for index, (name, _) in enumerate(self._ordered(key)):
+            if name == member.encode():
+                return index
+        return None
+
+    def zrevrange(self, key, start, end, withscores=False):
+        return self._ordered(key)[start:end + 1]
+
+    def zcard(self, key):
+        return len(self.data[key]) if self._alive(key) else 0
+
+    def expire(self, key, seconds):
+        if self._alive(key):
+            self.expiry[key] = self.clock() + seconds
+        return True
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+            self.expiry.pop(key, None)
+
+    def hset(self, key, field, value):
+        self.data.setdefault(key, {})[field.encode()] = value.encode()
+
+    def hmget(self, key, fields):
+        values = self.data.get(key, {})
+        return [values.get(field.encode()) for field in fields]
+
+
+class TestRankedSkipList(unittest.TestCase):
+    """تست‌های RankedSkipList در برابر مرتب‌سازی ساده"""
+
+    def test_matches_sorted_reference(self):
+        """تست تطابق رتبه‌ها و بازه‌ها با مرتب‌سازی مرجع"""
+        rng = random.Random(7)
+        skip_list = RankedSkipList(random.Random(3))
+        reference = {}
+        for _ in range(2000):
+            member = f"user-{rng.randint(0, 150)}"
+            action = rng.random()
+            if action < 0.6:
+                score = rng.randint(0, 50)
+                skip_list.set(member, score)
+                reference[member] = float(score)
+            elif action < 0.8:
+                reference[member] = reference.get(member, 0.0) + 2
+                skip_list.increment(member, 2)
+            else:
+                skip_list.remove(member)
+                reference.pop(member, None)
+
+        ordered = sorted(reference.items(), key=lambda item: (item[1], item[0]), reverse=True)
+        self.assertEqual(len(skip_list), len(ordered))
+        self.assertEqual(skip_list.rev_range(0, len(ordered)), ordered)
+        self.assertEqual(skip_list.rev_range(10, 25), ordered[10:25])
+        for index, (member, _) in enumerate(ordered):
+            self.assertEqual(skip_list.rev_rank(member), index)
+        self.assertIsNone(skip_list.rev_rank("missing"))
+
+    def test_ties_follow_redis_order(self):
+        """تست ترتیب امتیازهای برابر مطابق Redis"""
+        skip_list = RankedSkipList()
+        for member in ["b", "a", "c"]:
+            skip_list.set(member, 10)
+        self.assertEqual(list(skip_list), ["c", "b", "a"])
+
+
+class LeaderboardBehaviour:
+    """رفتار مشترک برای هر دو پشتیبان"""
+
+    def make_backend(self, clock):
+        raise NotImplementedError
+
+    def setUp(self):
+        """راه‌اندازی قبل از هر تست"""
+        self.clock = FakeClock()
+        self.service = LeaderboardService(self.make_backend(self.clock), clock=self.clock)
+
+    def test_submit_and_top(self):
+        """تست ثبت امتیاز و دریافت برترین‌ها"""
+        for member, score in [("ali", 100), ("sara", 300), ("reza", 200)]:
+            self.service.submit_score("builders", member, score, {"sites": score // 100})
+        top = self.service.top("builders", 2)
+        self.assertEqual([(entry["user_id"], entry["score"], entry["rank"]) for entry in top],
+                         [("sara", 300, 1), ("reza", 200, 2)])
+        self.assertEqual(top[0]["metadata"], {"sites": 3})
+        self.assertIsNotNone(top[0]["updated_at"])
+        self.assertEqual(self.service.top("builders", 5, offset=2)[0]["user_id"], "ali")
+
+    def test_update_moves_rank(self):
+        """تست جابه‌جایی رتبه پس از تغییر امتیاز"""
+        self.service.submit_score("builders", "ali", 100)
+        self.service.submit_score("builders", "sara", 300)
+        entry = self.service.submit_score("builders", "ali", 500)
+        self.assertEqual(entry["rank"], 1)
+        self.assertEqual(self.service.rank("builders", "sara"), 2)
+        self.assertEqual(self.service.count("builders"), 2)
+
+    def test_add_points_and_windows(self):
+        """تست امتیازدهی تجمعی و جداول روزانه و هفتگی"""
+        self.service.add_points("builders", "ali", 10)
+        self.clock.now += 86400  # سه‌شنبه، همان هفته
+        self.service.add_points("builders", "ali", 5)
+        self.service.add_points("builders", "sara", 7)
+
+        self.assertEqual(self.service.score("builders", "ali"), 15)
+        self.assertEqual(self.service.score("builders", "ali", "weekly"), 15)
+        self.assertEqual(self.service.score("builders", "ali", "daily"), 5)
+        self.assertEqual([entry["user_id"] for entry in self.service.top("builders", 10, "daily")],
+                         ["sara", "ali"])
+
+        self.clock.now += 7 * 86400  # هفته بعد
+        self.assertEqual(self.service.count("builders", "weekly"), 0)
+        self.assertEqual(self.service.count("builders", "daily"), 0)
+        self.assertEqual(self.service.count("builders"), 2)
+
+    def test_around_and_remove(self):
+        """تست همسایه‌های رتبه و حذف کاربر"""
+        for index in range(10):
+            self.service.submit_score("builders", f"user-{index}", index * 10)
+        around = self.service.around("builders", "user-5", radius=1)
+        self.assertEqual([entry["user_id"] for entry in around], ["user-6", "user-5", "user-4"])
+        self.assertEqual([entry["rank"] for entry in around], [4, 5, 6])
+        self.assertTrue(self.service.remove("builders", "user-9"))
+        self.assertEqual(self.service.rank("builders", "user-5"), 4)
+        self.assertIsNone(self.service.rank("builders", "user-9", "daily"))
+        self.assertEqual(self.service.around("builders", "missing"), [])
+
+    def test_unknown_window(self):
+        """تست خطا برای پنجره نامعتبر"""
+        with self.assertRaises(ValueError):
+            self.service.top("builders", 5, "monthly")
+
+    def test_negative_paging_rejected(self):
+        """تست خطا برای offset و limit منفی"""
+        self.service.submit_score("builders", "ali", 100)
+        for limit, offset in ((-1, 0), (5, -1)):
+            with self.assertRaises(ValueError):
+                self.service.top("builders", limit, offset=offset)
+        self.assertEqual(self.service.top("builders", 0), [])
+
+
+class TestMemoryLeaderboard(LeaderboardBehaviour, unittest.TestCase):
+    """تست‌های پشتیبان حافظه"""
+
+    def make_backend(self, clock):
+        return MemoryLeaderboardBackend(clock, seed=1)
+
+
+class TestRedisLeaderboard(LeaderboardBehaviour, unittest.TestCase):
+    """تست‌های پشتیبان Redis"""
+
+    def make_backend(self, clock):
+        return RedisLeaderboardBackend(FakeRedis(clock))
+
+
+class TestViralFeaturesLeaderboard(unittest.TestCase):
+    """تست‌های اتصال ViralFeaturesSystem به جدول امتیازات"""
+
+    def test_update_reports_user_rank(self):
+        """تست ثبت رتبه خود کاربر در رویداد"""
+        viral_system = ViralFeaturesSystem()
+        viral_system.update_leaderboard("weekly_builders", "low", 10)
+        entry = viral_system.update_leaderboard("weekly_builders", "high", 90)
+        viral_system.update_leaderboard("weekly_builders", "mid", 50)
+        self.assertEqual(entry["rank"], 1)
+        self.assertEqual(viral_system.viral_events[-1].data["rank"], 2)
+        self.assertEqual(viral_system.get_leaderboard_rank("weekly_builders", "low"), 3)
+        self.assertEqual(len(viral_system.get_leaderboard("weekly_builders", 10, "daily")), 3)
+        self.assertEqual(len(viral_system.leaderboards["weekly_builders"]), 3)
+        self.assertEqual(viral_system.get_global_stats()["leaderboard_entries"], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+🔑 تست‌های سرویس هش رمز عبور با استخر پردازه
+"""
+
+import unittest
+import os
+import sys
+import asyncio
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+
+import bcrypt
+
+# اضافه کردن مسیر پروژه
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from password_hashing import (HashingOverloadedError, PasswordHashingService, bcrypt_cost,
+                              calibrate_cost)
+from advanced_security import AdvancedSecurity
+
+
+class StallingExecutor(Executor):
+    """اجراکننده‌ای که کارها را تا آزادسازی دستی نگه می‌دارد"""
+
+    def __init__(self):
+        self.futures = []
+
+    def submit(self, function, *args, **kwargs):
+        future = Future()
+        self.futures.append((future, function, args))
+        return future
+
+    def release_all(self):
+        for future, function, args in self.futures:
+            future.set_result(function(*args))
+
+
+class TestPasswordHashingService(unittest.TestCase):
+    """تست‌های PasswordHashingService"""
+
+    def setUp(self):
+        """راه‌اندازی قبل از هر تست"""
+        self.executor = ThreadPoolExecutor(max_workers=2)
+        self.service = PasswordHashingService(cost=4, executor=self.executor)
+
+    def tearDown(self):
+        """پاک‌سازی پس از هر تست"""
+        self.executor.shutdown()
+
+    def test_hash_and_verify_async(self):
+        """تست هش و بررسی ناهمگام"""
+        async def run():
+            hashed = await self.service.hash_password("S3cure!pass")
+            self.assertEqual(bcrypt_cost(hashed), 4)
+            self.assertTrue(await self.service.verify_password("S3cure!pass", hashed))
+            self.assertFalse(await self.service.verify_password("wrong", hashed))
+        asyncio.run(run())
+        self.assertEqual(self.service.get_metrics()["verified"], 2)
+
+    def test_sync_api(self):
+        """تست رابط همگام"""
+        hashed = self.service.hash_password_sync("pässword")
+        self.assertTrue(self.service.verify_password_sync("pässword", hashed))
+
+    def test_rehash_on_cost_change(self):
+        """تست هش مجدد هنگام افزایش هزینه"""
+        service = PasswordHashingService(cost=5, executor=self.executor)
+        old_hash = bcrypt.hashpw(b"password", bcrypt.gensalt(rounds=4)).decode("utf-8")
+
+        async def run():
+            self.assertEqual(await service.verify_and_rehash("wrong", old_hash), (False, None))
+            valid, new_hash = await service.verify_and_rehash("password", old_hash)
+            self.assertTrue(valid)
+            self.assertEqual(bcrypt_cost(new_hash), 5)
+            self.assertEqual(await service.verify_and_rehash("password", new_hash), (True, None))
+        asyncio.run(run())
+        self.assertEqual(service.rehashed, 1)
+
+    def test_stronger_hash_not_downgraded(self):
+        """تست عدم کاهش هزینه هش قوی‌تر ذخیره‌شده"""
+        stored = bcrypt.hashpw(b"password", bcrypt.gensalt(rounds=12)).decode("utf-8")
+        self.assertFalse(self.service.needs_rehash(stored))
+        self.assertEqual(asyncio.run(self.service.verify_and_rehash("password", stored)), (True, None))
+        self.assertEqual(self.service.rehashed, 0)
+
+    def test_backpressure(self):
+        """تست رد درخواست‌ها هنگام پر بودن صف"""
+        executor = StallingExecutor()
+        service = PasswordHashingService(cost=4, executor=executor, max_pending=2)
+        first = service._submit(bcrypt.gensalt, 4)
+        service._submit(bcrypt.gensalt, 4)
+        with self.assertRaises(HashingOverloadedError):
+            service._submit(bcrypt.gensalt, 4)
+        self.assertEqual(service.get_metrics()["rejected"], 1)
+
+        executor.release_all()
+        self.assertTrue(first.done())
+        self.assertEqual(service.get_metrics()["pending"], 0)
+        service._submit(bcrypt.gensalt, 4)
+
+    def test_bcrypt_cost_parsing(self):
+        """تست استخراج هزینه از هش"""
+        self.assertEqual(bcrypt_cost("$2b$12$" + "a" * 53), 12)
+        with self.assertRaises(ValueError):
+            bcrypt_cost("plaintext")
+
+    def test_calibration_bounds(self):
+        """تست محدود بودن هزینه کالیبره شده"""
+        self.assertEqual(calibrate_cost(0.0001, 4, 6), 4)
+        self.assertEqual(calibrate_cost(1000.0, 4, 6), 6)
+
+    def test_process_pool(self):
+        """تست اجرای واقعی در استخر پردازه"""
+        service = PasswordHashingService(cost=4, max_workers=1)
+        try:
+            hashed = service.hash_password_sync("process")
+            self.assertTrue(service.verify_password_sync("process", hashed))
+        finally:
+            service.shutdown()
+
+
+class TestAdvancedSecurityPasswords(unittest.TestCase):
+    """تست‌های اتصال AdvancedSecurity به سرویس هش"""
+
+    def setUp(self):
+        """راه‌اندازی قبل از هر تست"""
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.security = AdvancedSecurity(password_hasher=PasswordHashingService(cost=5, executor=self.executor))
+
+    def tearDown(self):
+        """پاک‌سازی پس از هر تست"""
+        self.executor.shutdown()
+
+    def test_authenticate_password_rehash_and_lockout(self):
+        """تست ورود با هش مجدد و قفل حساب"""
+        old_hash = bcrypt.hashpw(b"Correct#1", bcrypt.gensalt(rounds=4)).decode("utf-8")
+
+        async def run():
+            valid, new_hash = await self.security.authenticate_password("ali", "10.0.0.1", "Correct#1", old_hash)
+            self.assertTrue(valid)
+            self.assertIsNotNone(new_hash)
+            for _ in range(self.security.max_login_attempts):
+                self.assertEqual(await self.security.authenticate_password("ali", "10.0.0.1", "bad", new_hash),
+                                 (False, None))
+            self.assertTrue(self.security.is_locked_out("ali"))
+            self.assertEqual(await self.security.authenticate_password("ali", "10.0.0.1", "Correct#1", new_hash),
+                             (False, None))
+        asyncio.run(run())
+
+    def test_sync_wrappers(self):
+        """تست سازگاری متدهای همگام قبلی"""
+        hashed = self.security.hash_password("Legacy#Pass1")
+        self.assertTrue(self.security.verify_password("Legacy#Pass1", hashed))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+🧮 تست‌های حساب چندجمله‌ای NTT برای رمزنگاری مبتنی بر مشبکه
+"""
+
+import unittest
+import os
+import sys
+import struct
+import random
+
+import numpy as np
+
+# اضافه کردن مسیر پروژه
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from polynomial_ring import PolynomialRing, get_polynomial_ring
+
+
+def schoolbook_multiply(poly1, poly2, modulus):
+    """ضرب مرجع O(n^2)"""
+    n = len(poly1)
+    result = [0] * n
+    for i in range(n):
+        for j in range(n):
+            result[(i + j) % n] = (result[(i + j) % n] + poly1[i] * poly2[j]) % modulus
+    return result
+
+
+class TestPolynomialRing(unittest.TestCase):
+    """تست‌های PolynomialRing"""
+
+    def setUp(self):
+        """راه‌اندازی قبل از هر تست"""
+        self.rng = random.Random(1234)
+
+    def _random_poly(self, n, low, high):
+        return [self.rng.randint(low, high) for _ in range(n)]
+
+    def test_multiply_matches_schoolbook(self):
+        """تست برابری ضرب NTT با ضرب مستقیم"""
+        for n, q, backend in ((64, 2048, "ntt_crt"), (128, 8192, "ntt_crt"),
+                              (256, 7681, "ntt"), (12, 97, "convolution")):
+            ring = get_polynomial_ring(n, q)
+            a = self._random_poly(n, -q, q)
+            b = self._random_poly(n, -1, 1)
+            self.assertEqual(ring.backend, backend)
+            self.assertEqual(ring.multiply(a, b).tolist(), schoolbook_multiply(a, b, q))
+
+    def test_add_and_subtract(self):
+        """تست جمع و تفریق"""
+        ring = PolynomialRing(8, 16)
+        a = [15, 1, 2, 3, -1, 0, 8, 9]
+        b = [1, 15, 14, 13, 1, 0, 8, 7]
+        self.assertEqual(ring.add(a, b).tolist(), [0, 0, 0, 0, 0, 0, 0, 0])
+        self.assertEqual(ring.subtract(a, a).tolist(), [0] * 8)
+
+    def test_inverse_power_of_two_modulus(self):
+        """تست معکوس با بالا بردن نیوتن برای q توان دو"""
+        ring = get_polynomial_ring(512, 2048)
+        f = [0] * 512
+        for position in self.rng.sample(range(512), 73):
+            f[position] = self.rng.choice([1, -1])
+
+        identity = ring.multiply(f, ring.inverse(f))
+        self.assertEqual(identity.tolist(), [1] + [0] * 511)
+
+        with self.assertRaises(ValueError):
+            ring.inverse([1, 1] + [0] * 510)
+
+    def test_inverse_prime_modulus(self):
+        """تست معکوس در حوزه تبدیل برای q اول"""
+        ring = get_polynomial_ring(256, 7681)
+        a = self._random_poly(256, 0, 7680)
+        self.assertEqual(ring.multiply(a, ring.inverse(a)).tolist(), [1] + [0] * 255)
+
+    def test_serialization_matches_struct_format(self):
+        """تست سازگاری فرمت ذخیره‌سازی با struct"""
+        poly = [0, 1, -1, 2047, -2048]
+        data = PolynomialRing.to_bytes(np.array(poly))
+        self.assertEqual(data, struct.pack("<5i", *poly))
+        self.assertEqual(PolynomialRing.from_bytes(data).tolist(), poly)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+🖱️ تست‌های پروتکل باینری و دسته‌بندی تیک‌محور حضور کاربران
+"""
+
+import unittest
+import os
+import sys
+import asyncio
+import json
+
+# اضافه کردن مسیر پروژه
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from presence_protocol import (FLAG_COMPRESSED, KIND_CURSOR, KIND_SELECTION, MAX_FRAME_BYTES, PresenceBatcher,
+                               decode_frame, encode_frame, encode_record)
+from real_time_collaboration import RealTimeCollaboration
+from real_time_preview_system import RealTimePreviewSystem
+from websocket_broadcaster import FanoutBroadcaster
+
+
+class FakeConnection:
+    def __init__(self):
+        self.id = object()
+        self.sent = []
+
+    async def send(self, payload):
+        self.sent.append(payload)
+
+    def json_messages(self):
+        return [json.loads(payload) for payload in self.sent if isinstance(payload, str)]
+
+    def frames(self):
+        return [decode_frame(payload)[1] for payload in self.sent if isinstance(payload, bytes)]
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class TestFrames(unittest.TestCase):
+    """تست‌های کدگذاری فریم"""
+
+    def test_round_trip(self):
+        """تست کدگذاری و بازگشایی رکوردها"""
+        records = [
+            encode_record(KIND_CURSOR, "ali", {"position": {"x": 10, "y": 20.5}, "element": "hero"}),
+            encode_record(KIND_CURSOR, "sara", {"position": {"line": 3}}),
+            encode_record(KIND_SELECTION, "ali", {"start": 1, "end": 4, "element": "title"})
+        ]
+        for compress in (False, True):
+            timestamp, decoded = decode_frame(encode_frame(records, 1234, compress))
+            self.assertEqual(timestamp, 1234)
+            self.assertEqual(decoded, [
+                (KIND_CURSOR, "ali", {"position": {"x": 10.0, "y": 20.5}, "element": "hero"}),
+                (KIND_CURSOR, "sara", {"position": {"line": 3}}),
+                (KIND_SELECTION, "ali", {"start": 1, "end": 4, "element": "title"})
+            ])
+        with self.assertRaises(ValueError):
+            decode_frame(b"\x00" * 20)
+
+    def test_rejects_oversized_and_unnegotiated_compression(self):
+        """تست رد فریم‌های فشرده بزرگ و فشرده‌سازی مذاکره‌نشده"""
+        record = encode_record(KIND_SELECTION, "ali", {"text": "a" * 60000})
+        bomb = encode_frame([record] * 20, 0, compress=True)
+        self.assertLess(len(bomb), MAX_FRAME_BYTES)
+        with self.assertRaisesRegex(ValueError, "too large"):
+            decode_frame(bomb)
+        with self.assertRaisesRegex(ValueError, "too large"):
+            decode_frame(encode_frame([record] * 2, 0))
+
+        batcher = PresenceBatcher(FanoutBroadcaster(), lambda _: [])
+        plain, zipped = FakeConnection(), FakeConnection()
+        batcher.negotiate(plain, {"encodings": ["binary"]})
+        batcher.negotiate(zipped, {"encodings": ["binary"], "compression": ["zlib"]})
+        frame = encode_frame([encode_record(KIND_CURSOR, "ali", {"position": {"x": 1, "y": 2}})], 0, compress=True)
+        with self.assertRaisesRegex(ValueError, "not negotiated"):
+            batcher.decode(plain, frame)
+        with self.assertRaises(ValueError):
+            batcher.decode(FakeConnection(), frame)
+        self.assertEqual(batcher.decode(zipped, frame)[1], [(KIND_CURSOR, "ali", {"position": {"x": 1.0, "y": 2.0}})])
+
+    def test_packed_cursor_is_compact(self):
+        """تست کوچک‌تر بودن مکان‌نمای فشرده از JSON"""
+        legacy = json.dumps({"type": "cursor_move", "data": {
+            "user_id": "user1", "user_name": "Ali", "user_color": "#3b82f6",
+            "position": {"x": 100, "y": 200}, "timestamp": "2024-01-01T12:00:00.000000"}})
+        record = encode_record(KIND_CURSOR, "user1", {"position": {"x": 100, "y": 200}})
+        self.assertEqual(len(record), 16)
+        self.assertLess(len(record) * 5, len(legacy))
+
+
+class TestPresenceBatcher(unittest.TestCase):
+    """تست‌های PresenceBatcher"""
+
+    def test_tick_sends_latest_per_user(self):
+        """تست ارسال آخرین وضعیت هر کاربر در هر تیک"""
+        async def run():
+            broadcaster = FanoutBroadcaster()
+            legacy, binary, compressed = FakeConnection(), FakeConnection(), FakeConnection()
+            room = [legacy, binary, compressed]
+            for connection in room:
+                broadcaster.register(connection)
+            batcher = PresenceBatcher(broadcaster, lambda _: room, compression_threshold=64)
+            self.assertEqual(batcher.negotiate(binary, {"encodings": ["binary", "json"]})["data"],
+                             {"encoding": "binary", "compression": None, "tick_hz": 30})
+            batcher.negotiate(compressed, {"encodings": ["binary"], "compression": ["zlib"]})
+
+            for step in range(5):
+                for user in range(10):
+                    batcher.update("room", ("cursor", user), {"type": "cursor", "user": user, "x": step},
+                                   KIND_CURSOR, f"user-{user}", {"position": {"x": step, "y": 0}},
+                                   source=binary if user == 0 else None)
+            batcher.flush()
+            await broadcaster.flush(timeout=1)
+
+            self.assertEqual(len(legacy.json_messages()), 10)
+            self.assertTrue(all(message["x"] == 4 for message in legacy.json_messages()))
+            self.assertEqual(len(binary.frames()), 1)
+            self.assertEqual(sorted(user_id for _, user_id, _ in binary.frames()[0]),
+                             sorted(f"user-{user}" for user in range(1, 10)))
+            self.assertEqual(len(compressed.frames()[0]), 10)
+            self.assertEqual(compressed.sent[0][1] & FLAG_COMPRESSED, FLAG_COMPRESSED)
+
+            metrics = batcher.get_metrics()
+            self.assertEqual(metrics["coalesced"], 40)
+            self.assertEqual(metrics["binary_frames"], 2)
+            self.assertEqual(metrics["binary_sessions"], 2)
+            self.assertLess(metrics["binary_bytes"], metrics["json_bytes"])
+            await batcher.close()
+            await broadcaster.close()
+        asyncio.run(run())
+
+    def test_ticker_rate_limits_updates(self):
+        """تست محدود شدن نرخ ارسال به نرخ تیک"""
+        async def run():
+            broadcaster = FanoutBroadcaster()
+            client = FakeConnection()
+            broadcaster.register(client)
+            batcher = PresenceBatcher(broadcaster, lambda _: [client], tick_hz=100)
+            for step in range(50):
+                batcher.update("room", ("cursor", "ali"), {"x": step}, KIND_CURSOR, "ali",
+                               {"position": {"x": step, "y": 0}})
+                await asyncio.sleep(0.001)
+            await asyncio.sleep(0.05)
+            await broadcaster.flush(timeout=1)
+
+            received = client.json_messages()
+            self.assertEqual(received[-1], {"x": 49})
+            self.assertLess(len(received), 25)
+            self.assertEqual(len(received), batcher.get_metrics()["ticks"])
+            self.assertTrue(batcher.ticker.done())
+            await broadcaster.close()
+        asyncio.run(run())
+
+
+class TestServerIntegration(unittest.TestCase):
+    """تست‌های اتصال پروتکل به سرورهای همکاری و پیش‌نمایش"""
+
+    def test_collaboration_binary_and_json_clients(self):
+        """تست دریافت فریم باینری و پیام JSON در همکاری"""
+        async def run():
+            collaboration = RealTimeCollaboration()
+            user = collaboration.projects["project1"].users["user1"]
+            sender, binary, legacy = FakeConnection(), FakeConnection(), FakeConnection()
+            for connection in (sender, binary, legacy):
+                collaboration.active_connections["project1"].add(connection)
+                collaboration.broadcaster.register(connection)
+                collaboration.user_sessions[connection.id] = {"user": user, "project_id": "project1"}
+
+            for connection in (sender, binary):
+                await collaboration._handle_message(connection, json.dumps(
+                    {"type": "hello", "data": {"encodings": ["binary"], "compression": ["zlib"]}}))
+            frame = encode_frame([encode_record(KIND_CURSOR, "ignored", {"position": {"x": 5, "y": 6}})], 0)
+            await collaboration._handle_message(sender, frame)
+            collaboration.presence.flush()
+            await collaboration.broadcaster.flush(timeout=1)
+
+            self.assertEqual(binary.json_messages()[0]["type"], "hello")
+            self.assertEqual(binary.frames(), [[(KIND_CURSOR, "user1", {"position": {"x": 5.0, "y": 6.0}})]])
+            self.assertEqual(legacy.json_messages()[0]["type"], "cursor_move")
+            self.assertEqual(legacy.json_messages()[0]["data"]["position"], {"x": 5.0, "y": 6.0})
+            self.assertEqual(sender.frames(), [])
+            self.assertEqual(collaboration.cursors["project1"]["user1"]["position"], {"x": 5.0, "y": 6.0})
+            await collaboration.presence.close()
+            await collaboration.broadcaster.close()
+        asyncio.run(run())
+
+    def test_preview_cursor_batched_without_event_echo(self):
+        """تست ارسال مکان‌نمای پیش‌نمایش فقط از طریق تیک"""
+        async def run():
+            preview = RealTimePreviewSystem()
+            sender, binary = FakeConnection(), FakeConnection()
+            for client_id, connection in (("sender", sender), ("viewer", binary)):
+                preview.join_room(client_id, connection)
+            await preview._process_message("viewer", json.dumps({"type": "hello", "data": {"encodings": ["binary"]}}))
+
+            for x in range(3):
+                await preview._process_message("sender", json.dumps({
+                    "type": "cursor_move", "data": {"cursor": {"position": {"x": x, "y": 1}, "element": "hero"}}}))
+            await settle()
+            self.assertEqual(binary.sent[1:], [])
+            preview.presence.flush()
+            await preview.broadcaster.flush(timeout=1)
+
+            self.assertEqual(binary.frames(), [[(KIND_CURSOR, "sender",
+                                                 {"position": {"x": 2.0, "y": 1.0}, "element": "hero"})]])
+            self.assertEqual(sender.sent, [])
+            self.assertEqual(len(preview.event_history["sender"]), 3)
+            self.assertEqual(preview.get_performance_metrics()["presence"]["coalesced"], 2)
+            await preview.presence.close()
+            await preview.broadcaster.close()
+        asyncio.run(run())
+
+
+if __name__ == '__main__':
+    unittest.main()
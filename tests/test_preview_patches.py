@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+🧩 تست‌های وصله‌های افزایشی و رفع نوسان ویرایش‌های پیش‌نمایش
+"""
+
+import unittest
+import os
+import sys
+import asyncio
+import json
+import random
+from datetime import datetime
+
+# اضافه کردن مسیر پروژه
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from preview_patches import (EditDebouncer, apply_property_patch, apply_text_patch, diff_properties, diff_text,
+                             merge_properties)
+from real_time_preview_system import PreviewState, RealTimePreviewSystem
+
+
+class FakeConnection:
+    def __init__(self):
+        self.id = object()
+        self.sent = []
+
+    async def send(self, payload):
+        self.sent.append(payload)
+
+    async def close(self):
+        pass
+
+    def messages(self, message_type):
+        return [message for message in map(json.loads, self.sent) if message["type"] == message_type]
+
+
+def event(event_type, **data):
+    return json.dumps({"type": event_type, "data": data})
+
+
+class TestDiffs(unittest.TestCase):
+    """تست‌های محاسبه وصله"""
+
+    def test_text_round_trip(self):
+        """تست بازسازی متن از وصله در ویرایش‌های تصادفی"""
+        rng = random.Random(7)
+        for _ in range(500):
+            old = "".join(rng.choice("ab<>/p ") for _ in range(rng.randint(0, 30)))
+            new = "".join(rng.choice("ab<>/p ") for _ in range(rng.randint(0, 30)))
+            patch = diff_text(old, new)
+            if old == new:
+                self.assertIsNone(patch)
+            else:
+                self.assertEqual(apply_text_patch(old, patch), new)
+        self.assertEqual(diff_text("<p>Hello</p>", "<p>Hello!</p>"), {"at": 8, "delete": 0, "insert": "!"})
+        with self.assertRaises(ValueError):
+            apply_text_patch("ab", {"at": 1, "delete": 5, "insert": ""})
+
+    def test_properties(self):
+        """تست وصله ویژگی‌ها و حذف با مقدار None"""
+        old = {"color": "red", "margin": "0"}
+        new = merge_properties(old, {"color": "blue", "margin": None, "padding": "4px"})
+        self.assertEqual(new, {"color": "blue", "padding": "4px"})
+        patch = diff_properties(old, new)
+        self.assertEqual(patch, {"set": {"color": "blue", "padding": "4px"}, "unset": ["margin"]})
+        self.assertEqual(apply_property_patch(old, patch), new)
+        self.assertIsNone(diff_properties(new, dict(new)))
+
+
+class TestEditDebouncer(unittest.TestCase):
+    """تست‌های EditDebouncer"""
+
+    def test_burst_flushes_once(self):
+        """تست تبدیل یک رگبار ویرایش به یک ارسال"""
+        async def run():
+            flushed = []
+            debouncer = EditDebouncer(lambda key, edit: flushed.append((key, edit)), delay=0.01, max_delay=1)
+            for length in range(1, 6):
+                debouncer.submit("title", content="Hello"[:length], user_id="ali")
+            debouncer.submit("title", styles={"color": "red"})
+            debouncer.submit("title", styles={"margin": "0"})
+            await asyncio.sleep(0.05)
+
+            self.assertEqual(len(flushed), 1)
+            key, edit = flushed[0]
+            self.assertEqual((key, edit["content"], edit["edits"]), ("title", "Hello", 7))
+            self.assertEqual(edit["styles"], {"color": "red", "margin": "0"})
+            self.assertEqual(debouncer.stats, {"edits": 7, "flushes": 1})
+            self.assertEqual(debouncer.pending, {})
+        asyncio.run(run())
+
+    def test_max_delay_caps_continuous_typing(self):
+        """تست ارسال دوره‌ای هنگام تایپ پیوسته"""
+        async def run():
+            flushed = []
+            debouncer = EditDebouncer(lambda key, edit: flushed.append(edit["content"]), delay=0.02, max_delay=0.05)
+            for step in range(30):
+                debouncer.submit("body", content=str(step))
+                await asyncio.sleep(0.005)
+            await asyncio.sleep(0.05)
+
+            self.assertGreater(len(flushed), 1)
+            self.assertLess(len(flushed), 30)
+            self.assertEqual(flushed[-1], "29")
+        asyncio.run(run())
+
+
+class TestPreviewIntegration(unittest.TestCase):
+    """تست‌های اتصال وصله‌ها به سیستم پیش‌نمایش"""
+
+    def test_patch_versions_and_resync(self):
+        """تست نسخه‌های پیوسته وصله‌ها و همگام‌سازی مجدد پس از شکاف"""
+        async def run():
+            preview = RealTimePreviewSystem(patch_delay=0.01)
+            editor, viewer = FakeConnection(), FakeConnection()
+            preview.join_room("editor", editor, "site/home")
+            preview.join_room("viewer", viewer, "site/home")
+            body = "<section>" + "<p>Lorem ipsum dolor sit amet</p>" * 50 + "</section>"
+            preview.sync_state("hero", PreviewState(body, {"color": "red"}, {}, {}, datetime.now(), "editor", 3),
+                               "site/home")
+
+            text = body
+            for char in "Hi!":
+                text = text[:9] + char + text[9:]
+                await preview._process_message("editor", event("content_change", element_id="hero", content=text))
+            await preview._process_message("editor", event("style_change", element_id="hero",
+                                                           styles={"color": None, "padding": "4px"}))
+            await asyncio.sleep(0.05)
+            await preview.broadcaster.flush(timeout=1)
+
+            patches = viewer.messages("preview_patch")
+            self.assertEqual(len(patches), 1)
+            patch = patches[0]["patch"]
+            self.assertEqual((patch["base"], patch["version"], patch["edits"]), (3, 4, 4))
+            self.assertEqual(patch["content"], {"at": 9, "delete": 0, "insert": "!iH"})
+            self.assertEqual(patch["styles"], {"set": {"padding": "4px"}, "unset": ["color"]})
+            self.assertEqual(apply_text_patch(body, patch["content"]), text)
+            self.assertLess(len(json.dumps(patches[0])) * 4, len(body))
+            self.assertEqual(viewer.messages("event"), [])
+
+            # An unchanged burst sends nothing
+            await preview._process_message("editor", event("content_change", element_id="hero", content=text))
+            await asyncio.sleep(0.05)
+            self.assertEqual(preview.get_performance_metrics()["patches"]["sent"], 1)
+
+            # A client that missed a version asks for the element again
+            await preview._process_message("editor", event("layout_change", element_id="hero", layout={"width": 1}))
+            await preview._process_message("viewer", event("resync_request", element_ids=["hero"]))
+            await preview.broadcaster.flush(timeout=1)
+            resync = viewer.messages("preview_resync")[0]
+            self.assertEqual(resync["versions"], {"hero": 5})
+            self.assertEqual(resync["states"]["hero"]["content"], text)
+            self.assertEqual(resync["states"]["hero"]["layout"], {"width": 1})
+            self.assertEqual(editor.messages("preview_resync"), [])
+
+            metrics = preview.get_performance_metrics()["patches"]
+            self.assertEqual((metrics["sent"], metrics["resyncs"], metrics["pending"]), (2, 1, 0))
+            preview.stop()
+            await preview.broadcaster.close()
+        asyncio.run(run())
+
+    def test_new_element_starts_at_version_one(self):
+        """تست ایجاد وضعیت برای عنصر جدید"""
+        async def run():
+            preview = RealTimePreviewSystem()
+            viewer = FakeConnection()
+            preview.join_room("viewer", viewer, "site/home")
+            await preview._process_message("viewer", event("content_change", element_id="fresh", content="<b>x</b>"))
+            preview.patcher.flush(("site/home", "fresh"))
+            await preview.broadcaster.flush(timeout=1)
+
+            state = preview.rooms["site/home"].preview_states["fresh"]
+            self.assertEqual((state.content, state.version, state.user_id), ("<b>x</b>", 1, "viewer"))
+            await preview._send_initial_state("viewer", viewer)
+            await preview.broadcaster.flush(timeout=1)
+            self.assertEqual(json.loads(viewer.sent[-1])["data"]["versions"], {"fresh": 1})
+            preview.stop()
+            await preview.broadcaster.close()
+        asyncio.run(run())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+🏠 تست‌های اتاق‌های پیش‌نمایش، تاریخچه محدود و شمارنده‌های افزایشی
+"""
+
+import unittest
+import os
+import sys
+import asyncio
+import json
+from datetime import datetime
+
+# اضافه کردن مسیر پروژه
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from real_time_preview_system import DEFAULT_ROOM, PreviewState, RealTimePreviewSystem
+
+
+class FakeConnection:
+    def __init__(self):
+        self.id = object()
+        self.sent = []
+
+    async def send(self, payload):
+        self.sent.append(json.loads(payload))
+
+    async def close(self):
+        pass
+
+    def types(self):
+        return [message["type"] for message in self.sent]
+
+
+class ClosingConnection(FakeConnection):
+    """اتصالی که پس از پیام‌هایش به‌صورت عادی بسته می‌شود"""
+
+    def __init__(self, messages):
+        super().__init__()
+        self.messages = messages
+
+    async def __aiter__(self):
+        for message in self.messages:
+            yield message
+
+
+def event(event_type, **data):
+    return json.dumps({"type": event_type, "data": data})
+
+
+class TestPreviewRooms(unittest.TestCase):
+    """تست‌های مسیریابی اتاق‌محور"""
+
+    def test_room_key_from_path(self):
+        """تست استخراج کلید اتاق از مسیر اتصال"""
+        self.assertEqual(RealTimePreviewSystem.room_key("/shop/home"), "shop/home")
+        self.assertEqual(RealTimePreviewSystem.room_key("/shop/home/extra"), "shop/home")
+        self.assertEqual(RealTimePreviewSystem.room_key("/shop"), "shop")
+        self.assertEqual(RealTimePreviewSystem.room_key("/"), DEFAULT_ROOM)
+
+    def test_events_stay_in_room(self):
+        """تست محدود ماندن رویدادها و وضعیت به اتاق"""
+        async def run():
+            preview = RealTimePreviewSystem()
+            home, home_peer, blog = FakeConnection(), FakeConnection(), FakeConnection()
+            preview.join_room("home", home, "shop/home")
+            preview.join_room("home-peer", home_peer, "shop/home")
+            preview.join_room("blog", blog, "shop/blog")
+            preview.sync_state("title", PreviewState("Hi", {}, {}, {}, datetime.now(), "home", 1), "shop/home")
+
+            await preview._process_message("home", event("content_change", element_id="title", content="Hello"))
+            await preview._process_message("home", event("comment_add", element_id="title",
+                                                         comment={"content": "nice"}))
+            await preview._process_message("blog", event("cursor_move", cursor={"position": {"x": 1, "y": 2}}))
+            preview.presence.flush()
+            preview.patcher.flush(("shop/home", "title"))
+            await preview.broadcaster.flush(timeout=1)
+
+            self.assertEqual(sorted(home_peer.types()), ["comment_add", "event", "preview_patch", "state_change"])
+            self.assertEqual(blog.types(), [])
+            self.assertEqual(preview.rooms["shop/home"].preview_states["title"].content, "Hello")
+            self.assertEqual(len(preview.get_comments("title", "shop/home")), 1)
+            self.assertEqual(preview.get_comments("title", "shop/blog"), [])
+            self.assertIn("blog", preview.rooms["shop/blog"].cursors)
+
+            await preview._send_initial_state("blog", blog)
+            await preview.broadcaster.flush(timeout=1)
+            self.assertEqual(blog.sent[-1]["data"]["room"], "shop/blog")
+            self.assertEqual(blog.sent[-1]["data"]["preview_states"], {})
+            await preview.presence.close()
+            await preview.broadcaster.close()
+        asyncio.run(run())
+
+    def test_history_bounded_and_counters(self):
+        """تست محدود بودن تاریخچه و به‌روز بودن شمارنده‌ها"""
+        async def run():
+            preview = RealTimePreviewSystem(event_history_limit=5)
+            editor, viewer = FakeConnection(), FakeConnection()
+            preview.join_room("editor", editor, "site/page")
+            preview.join_room("viewer", viewer, "site/page")
+            await preview._process_message("editor", event("user_join", user_info={"name": "Ali"}))
+            for index in range(20):
+                await preview._process_message("editor", event("style_change", element_id="a",
+                                                               styles={"color": str(index)}))
+            await preview._process_message("viewer", event("comment_add", element_id="a", comment={}))
+            comment_id = preview.get_comments("a", "site/page")[0]["id"]
+
+            metrics = preview.get_performance_metrics()
+            self.assertEqual(len(preview.event_history["editor"]), 5)
+            self.assertEqual(metrics["total_events"], 6)
+            self.assertEqual(metrics["events_processed"], 22)
+            self.assertEqual(metrics["active_collaborators"], 1)
+            self.assertEqual(metrics["total_comments"], 1)
+            self.assertEqual(metrics["rooms"], 1)
+
+            await preview._handle_client_disconnection("editor")
+            await preview._process_message("viewer", event("comment_delete", comment_id=comment_id))
+            metrics = preview.get_performance_metrics()
+            self.assertEqual(metrics["total_events"], 2)
+            self.assertEqual(metrics["active_collaborators"], 0)
+            self.assertEqual(metrics["total_comments"], 0)
+            self.assertNotIn("editor", preview.event_history)
+
+            await preview._handle_client_disconnection("viewer")
+            self.assertEqual(preview.get_performance_metrics()["rooms"], 0)
+            self.assertEqual(preview.get_performance_metrics()["total_events"], 0)
+            await preview.broadcaster.close()
+        asyncio.run(run())
+
+    def test_many_rooms_fan_out_locally(self):
+        """تست هزینه پخش متناسب با اندازه اتاق در هزاران جلسه"""
+        async def run():
+            preview = RealTimePreviewSystem()
+            for room in range(2000):
+                for member in range(2):
+                    preview.join_room(f"{room}-{member}", FakeConnection(), f"site-{room}/home")
+            self.assertEqual(preview.get_performance_metrics()["rooms"], 2000)
+
+            before = preview.broadcaster.get_metrics()["enqueued"]
+            await preview._process_message("7-0", event("layout_change", element_id="a", layout={"width": 1}))
+            preview.patcher.flush(("site-7/home", "a"))
+            self.assertEqual(preview.broadcaster.get_metrics()["enqueued"] - before, 2)
+            await preview.broadcaster.close()
+        asyncio.run(run())
+
+    def test_clean_close_releases_client(self):
+        """تست پاکسازی کامل پس از بسته شدن عادی اتصال"""
+        async def run():
+            preview = RealTimePreviewSystem()
+            peer, closing = FakeConnection(), ClosingConnection([event("cursor_move", cursor={"x": 1})])
+            preview.join_room("peer", peer, "shop/home")
+            await preview.handle_client(closing, "/shop/blog")
+
+            self.assertEqual(list(preview.connected_clients), ["peer"])
+            self.assertEqual(list(preview.client_rooms), ["peer"])
+            self.assertNotIn("shop/blog", preview.rooms)
+            self.assertEqual(len(preview.event_history), 0)
+
+            # A second cleanup (e.g. from a failed broadcast) announces nothing
+            client_id = next(iter(preview.rooms["shop/home"].clients))
+            await preview._handle_client_disconnection(client_id)
+            await preview._handle_client_disconnection(client_id)
+            await preview.broadcaster.flush(timeout=1)
+            self.assertEqual(preview.connected_clients, {})
+            self.assertEqual(preview.rooms, {})
+            self.assertNotIn(DEFAULT_ROOM, preview.rooms)
+            await preview.presence.close()
+            await preview.broadcaster.close()
+        asyncio.run(run())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+📜 تست‌های لاگ حلقوی رویدادهای امنیتی و تجمیع پنجره زمانی
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+from datetime import datetime
+
+# اضافه کردن مسیر پروژه
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from security_event_log import EventSegmentLog, SecurityEventLog
+from advanced_security import AdvancedSecurity, SecurityEvent, SecurityLevel, ThreatType
+
+NOW = 1_800_000_000.0
+
+
+class FakeClock:
+    def __init__(self, now=NOW):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def make_event(offset, threat=ThreatType.XSS, level=SecurityLevel.LOW, ip="10.0.0.1"):
+    return SecurityEvent(
+        id=f"event-{offset}",
+        type=threat,
+        level=level,
+        source_ip=ip,
+        user_id=None,
+        timestamp=datetime.fromtimestamp(NOW + offset),
+        description="test",
+        details={"offset": offset},
+    )
+
+
+class TestSecurityEventLog(unittest.TestCase):
+    """تست‌های SecurityEventLog"""
+
+    def setUp(self):
+        """راه‌اندازی قبل از هر تست"""
+        self.clock = FakeClock()
+        self.log = SecurityEventLog(ThreatType, SecurityLevel, capacity=5, clock=self.clock)
+
+    def test_ring_keeps_newest_events(self):
+        """تست نگهداری جدیدترین رویدادها در بافر حلقوی"""
+        for index in range(8):
+            self.log.append(make_event(index - 10))
+        self.assertEqual(len(self.log), 5)
+        self.assertEqual(self.log.total_events, 8)
+        self.assertEqual([event.id for event in self.log.events()],
+                         [f"event-{index - 10}" for index in range(3, 8)])
+        self.assertEqual([event.id for event in self.log.recent(2)], ["event--4", "event--3"])
+
+    def test_rollups_outlive_ring(self):
+        """تست ماندگاری شمارنده‌ها پس از خروج رویداد از بافر"""
+        for index in range(20):
+            self.log.append(make_event(-index * 60, ThreatType.BRUTE_FORCE, SecurityLevel.HIGH))
+        summary = self.log.window_summary(24 * 3600)
+        self.assertEqual(summary["total_events"], 20)
+        self.assertEqual(summary["events_by_type"], {"brute_force": 20})
+        self.assertEqual(summary["events_by_level"], {"high": 20})
+
+    def test_window_boundaries(self):
+        """تست محدود شدن گزارش به پنجره زمانی"""
+        self.log.append(make_event(-30))
+        self.log.append(make_event(-2 * 3600))
+        self.log.append(make_event(-30 * 3600))
+        self.assertEqual(self.log.window_summary(3600)["total_events"], 1)
+        self.assertEqual(self.log.window_summary(3 * 3600)["total_events"], 2)
+        # رویداد قدیمی‌تر از دوره نگهداری در شمارنده‌ها نیست
+        self.assertEqual(self.log.window_summary(48 * 3600)["total_events"], 2)
+
+    def test_bucket_reuse_resets_counters(self):
+        """تست صفر شدن سطل هنگام استفاده مجدد پس از یک دور کامل"""
+        log = SecurityEventLog(ThreatType, SecurityLevel, retention_buckets=60, clock=self.clock)
+        log.append(make_event(-3600))
+        log.append(make_event(0))
+        self.assertEqual(log.window_summary(3600)["total_events"], 1)
+        # رویداد دیرهنگام خارج از دوره نگهداری شمارنده را خراب نمی‌کند
+        log.append(make_event(-3600))
+        self.assertEqual(log.window_summary(3600)["total_events"], 1)
+
+    def test_counts_by_ip(self):
+        """تست شمارش رویدادها بر اساس IP مبدأ"""
+        for ip in ["10.0.0.1", "10.0.0.1", "10.0.0.2"]:
+            self.log.append(make_event(-10, ip=ip))
+        summary = self.log.window_summary(600, top_ips=1)
+        self.assertEqual(summary["top_source_ips"], {"10.0.0.1": 2})
+        self.assertEqual(self.log.count_by_ip("10.0.0.2", 600), 1)
+
+    def test_recent_since(self):
+        """تست فیلتر زمانی رویدادهای اخیر"""
+        self.log.append(make_event(-7200))
+        self.log.append(make_event(-60))
+        self.assertEqual([event.id for event in self.log.recent(10, since=NOW - 3600)], ["event--60"])
+
+
+class TestEventSegmentLog(unittest.TestCase):
+    """تست‌های EventSegmentLog"""
+
+    def setUp(self):
+        """راه‌اندازی قبل از هر تست"""
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """پاک‌سازی پس از هر تست"""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_segments_roll_and_read_back(self):
+        """تست چرخش سگمنت‌ها و خواندن مجدد رویدادها"""
+        segments = EventSegmentLog(self.directory, max_segment_bytes=600)
+        for index in range(10):
+            segments.append(make_event(index * 60))
+        self.assertGreater(len(segments.segments()), 1)
+        records = list(segments.read())
+        self.assertEqual([record["id"] for record in records], [f"event-{index * 60}" for index in range(10)])
+        self.assertEqual(records[0]["type"], "xss")
+        since = [record["id"] for record in segments.read(since=NOW + 420)]
+        self.assertEqual(since, ["event-420", "event-480", "event-540"])
+        segments.close()
+
+        # ادامه نوشتن پس از باز کردن مجدد
+        reopened = EventSegmentLog(self.directory, max_segment_bytes=600)
+        reopened.append(make_event(600))
+        self.assertEqual(list(reopened.read())[-1]["id"], "event-600")
+        reopened.close()
+
+    def test_max_segments(self):
+        """تست حذف قدیمی‌ترین سگمنت‌ها"""
+        segments = EventSegmentLog(self.directory, max_segment_bytes=300, max_segments=2)
+        for index in range(10):
+            segments.append(make_event(index))
+        self.assertEqual(len(segments.segments()), 2)
+        self.assertEqual(list(segments.read())[-1]["id"], "event-9")
+        segments.close()
+
+
+class TestAdvancedSecurityEventLog(unittest.TestCase):
+    """تست‌های اتصال AdvancedSecurity به لاگ رویداد"""
+
+    def test_report_from_rollups(self):
+        """تست گزارش امنیتی از روی شمارنده‌ها"""
+        security = AdvancedSecurity(event_log=SecurityEventLog(ThreatType, SecurityLevel, capacity=3))
+        for _ in range(5):
+            security.log_security_event(ThreatType.XSS, SecurityLevel.MEDIUM, "10.0.0.9", "xss")
+        report = security.get_security_report(hours=1)
+        self.assertEqual(report["total_events"], 5)
+        self.assertEqual(report["events_by_type"], {"xss": 5})
+        self.assertEqual(report["top_source_ips"], {"10.0.0.9": 5})
+        self.assertEqual(len(report["recent_events"]), 3)
+        self.assertEqual(len(security.security_events), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+🗝️ تست‌های ذخیره‌ساز مشترک نشست و قفل حساب
+"""
+
+import unittest
+import os
+import sys
+
+# اضافه کردن مسیر پروژه
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from advanced_security import AdvancedSecurity
+from security_store import MemorySecurityStore, RedisSecurityStore, SecurityStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakePipeline:
+    """صف دستورات مانند pipeline در redis-py"""
+
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.commands.append((name, args, kwargs))
+            return self
+        return queue
+
+    def execute(self):
+        results = [getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self.commands]
+        self.commands = []
+        return results
+
+
+class FakeRedis:
+    """زیرمجموعه کوچکی از دستورات Redis با زمان‌سنج قابل کنترل"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.data = {}
+        self.expiry = {}
+
+    def _alive(self, key):
+        deadline = self.expiry.get(key)
+        if deadline is not None and deadline <= self.clock():
+            self.data.pop(key, None)
+            self.expiry.pop(key, None)
+        return key in self.data
+
+    def _get(self, key, factory):
+        if not self._alive(key):
+            self.data[key] = factory()
+        return self.data[key]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def set(self, key, value, px=None):
+        self.data[key] = value.encode() if isinstance(value, str) else value
+        self.expiry.pop(key, None)
+        if px is not None:
+            self.expiry[key] = self.clock() + px / 1000
+        return True
+
+    def get(self, key):
+        return self.data[key] if self._alive(key) else None
+
+    def mget(self, keys):
+        return [self.get(key) for key in keys]
+
+    def delete(self, *keys):
+        removed = 0
+        for key in keys:
+            if self._alive(key):
+                removed += 1
+            self.data.pop(key, None)
+            self.expiry.pop(key, None)
+        return removed
+
+    def exists(self, key):
+        return int(self._alive(key))
+
+    def pexpire(self, key, milliseconds):
+        if self._alive(key):
+            self.expiry[key] = self.clock() + milliseconds / 1000
+        return True
+
+    def sadd(self, key, *members):
+        self._get(key, set).update(m.encode() for m in members)
+
+    def srem(self, key, *members):
+        if self._alive(key):
+            self.data[key].difference_update(m.encode() for m in members)
+
+    def smembers(self, key):
+        return set(self.data[key]) if self._alive(key) else set()
+
+    def zadd(self, key, mapping):
+        self._get(key, dict).update({m.encode(): float(s) for m, s in mapping.items()})
+
+    def zrem(self, key, *members):
+        if self._alive(key):
+            for member in members:
+                self.data[key].pop(member.encode(), None)
+
+    def zcard(self, key):
+        return len(self.data[key]) if self._alive(key) else 0
+
+    def _score(self, value):
+        return {"-inf": float("-inf"), "+inf": float("inf")}.get(value, value)
+
+    def zremrangebyscore(self, key, low, high):
+        if not self._alive(key):
+            return 0
+        low, high = self._score(low), self._score(high)
+        doomed = [m for m, s in self.data[key].items() if low <= s <= high]
+        for member in doomed:
+            del self.data[key][member]
+        return len(doomed)
+
+    def zrangebyscore(self, key, low, high, withscores=False):
+        if not self._alive(key):
+            return []
+        low, high = self._score(low), self._score(high)
+        items = sorted((s, m) for m, s in self.data[key].items() if low <= s <= high)
+        return [(m, s) for s, m in items] if withscores else [m for s, m in items]
+
+    def zrange(self, key, start, end, withscores=False):
+        items = self.zrangebyscore(key, "-inf", "+inf", withscores)
+        return items[start:None if end == -1 else end + 1]
+
+    def lpush(self, key, *values):
+        items = self._get(key, list)
+        for value in values:
+            items.insert(0, value.encode())
+        return len(items)
+
+    def ltrim(self, key, start, end):
+        if self._alive(key):
+            self.data[key] = self.data[key][start:end + 1]
+
+    def lrange(self, key, start, end):
+        if not self._alive(key):
+            return []
+        return self.data[key][start:None if end == -1 else end + 1]
+
+
+class StoreBehaviour:
+    """تست‌های مشترک برای همه پیاده‌سازی‌های ذخیره‌ساز"""
+
+    def make_security(self):
+        security = AdvancedSecurity(store=self.make_store())
+        security.session_timeout = 100
+        security.lockout_duration = 60
+        security.max_login_attempts = 3
+        return security
+
+    def setUp(self):
+        """راه‌اندازی قبل از هر تست"""
+        self.clock = FakeClock()
+        self.security = self.make_security()
+
+    def test_session_expiry_and_touch(self):
+        """تست انقضای نشست و تمدید با فعالیت"""
+        session_id = self.security.create_session("alice", "10.0.0.1", "UA")
+        self.clock.now += 80
+        self.assertTrue(self.security.validate_session(session_id)[0])
+        self.clock.now += 80
+        valid, session = self.security.validate_session(session_id)
+        self.assertTrue(valid)
+        self.assertEqual(session.user_id, "alice")
+        self.clock.now += 101
+        self.assertFalse(self.security.validate_session(session_id)[0])
+        self.assertEqual(self.security.store.count_sessions(), 0)
+
+    def test_terminate_all_user_sessions_uses_index(self):
+        """تست حذف همه نشست‌های کاربر با ایندکس ثانویه"""
+        alice = [self.security.create_session("alice", "10.0.0.1", "UA") for _ in range(3)]
+        bob = self.security.create_session("bob", "10.0.0.2", "UA")
+
+        self.assertEqual(sorted(self.security.store.get_user_session_ids("alice")), sorted(alice))
+        self.security.terminate_all_user_sessions("alice")
+
+        self.assertEqual(self.security.store.get_user_session_ids("alice"), [])
+        self.assertTrue(self.security.validate_session(bob)[0])
+        self.assertEqual(list(self.security.active_sessions), [bob])
+
+    def test_lockout_window(self):
+        """تست قفل شدن پس از تلاش‌های ناموفق و باز شدن پس از پنجره زمانی"""
+        for _ in range(2):
+            self.security.record_failed_attempt("alice", "10.0.0.1")
+            self.clock.now += 10
+        self.assertFalse(self.security.is_locked_out("alice"))
+
+        self.security.record_failed_attempt("alice", "10.0.0.1")
+        self.assertTrue(self.security.is_locked_out("alice"))
+        self.assertEqual(len(self.security.failed_attempts["alice"]), 3)
+
+        # اولین تلاش در ثانیه ۰ بوده است؛ قفل در ثانیه ۶۰ باز می‌شود
+        self.clock.now += 39
+        self.assertTrue(self.security.is_locked_out("alice"))
+        self.clock.now += 2
+        self.assertFalse(self.security.is_locked_out("alice"))
+
+        self.security.record_failed_attempt("bob", "10.0.0.2")
+        self.security.clear_failed_attempts("bob")
+        self.assertNotIn("bob", self.security.failed_attempts)
+
+    def test_ip_blocks_and_rate_limits(self):
+        """تست مسدودسازی IP و محدودیت نرخ"""
+        self.security.block_ip("10.0.0.9", duration=30)
+        self.assertTrue(self.security.is_ip_blocked("10.0.0.9"))
+        self.assertIn("10.0.0.9", self.security.blocked_ips)
+        self.clock.now += 31
+        self.assertFalse(self.security.is_ip_blocked("10.0.0.9"))
+        self.assertEqual(self.security.get_security_status()["blocked_ips"], 0)
+
+        results = [self.security.check_rate_limit("10.0.0.1", "password_reset") for _ in range(4)]
+        self.assertEqual([allowed for allowed, _ in results], [True, True, True, False])
+        self.assertEqual(results[-1][1]["retry_after"], 3600)
+        # محدودیت هر عمل جداگانه شمرده می‌شود
+        self.assertTrue(self.security.check_rate_limit("10.0.0.1", "login")[0])
+        self.clock.now += 3601
+        self.assertTrue(self.security.check_rate_limit("10.0.0.1", "password_reset")[0])
+
+
+class TestMemorySecurityStore(StoreBehaviour, unittest.TestCase):
+    """تست‌های ذخیره‌ساز درون حافظه"""
+
+    def make_store(self):
+        return MemorySecurityStore(clock=self.clock)
+
+    def test_heap_expiry_without_scans(self):
+        """تست پاکسازی مبتنی بر heap"""
+        store = self.security.store
+        for index in range(100):
+            self.security.create_session(f"user{index}", "10.0.0.1", "UA")
+        self.clock.now += 101
+        self.assertEqual(store.expire(), 100)
+        self.assertEqual(store._user_sessions, {})
+
+    def test_interface_is_abstract(self):
+        """تست الزام پیاده‌سازی همه متدهای رابط"""
+        class PartialStore(SecurityStore):
+            def save_session(self, session, ttl):
+                pass
+
+        for store_class in (SecurityStore, PartialStore):
+            with self.assertRaises(TypeError):
+                store_class()
+
+
+class TestRedisSecurityStore(StoreBehaviour, unittest.TestCase):
+    """تست‌های ذخیره‌ساز Redis با سرور جعلی"""
+
+    def setUp(self):
+        """راه‌اندازی قبل از هر تست"""
+        self.clock = FakeClock()
+        self.redis = FakeRedis(self.clock)
+        self.security = self.make_security()
+
+    def make_store(self):
+        return RedisSecurityStore(self.redis, clock=self.clock)
+
+    def test_workers_share_state(self):
+        """تست سازگاری نشست و قفل بین چند پردازه کارگر"""
+        other_worker = self.make_security()
+        session_id = self.security.create_session("alice", "10.0.0.1", "UA")
+        for _ in range(3):
+            other_worker.record_failed_attempt("mallory", "10.0.0.66")
+
+        self.assertTrue(other_worker.validate_session(session_id)[0])
+        self.assertTrue(self.security.is_locked_out("mallory"))
+        other_worker.terminate_all_user_sessions("alice")
+        self.assertFalse(self.security.validate_session(session_id)[0])
+
+    def test_concurrent_rate_limit_hits_are_atomic(self):
+        """تست عدم عبور درخواست‌های هم‌زمان از سقف محدودیت نرخ"""
+        other_worker = self.make_security()
+        for _ in range(2):
+            self.assertTrue(self.security.check_rate_limit("10.0.0.1", "password_reset")[0])
+
+        # The other worker takes the last slot right after our first round trip
+        decisions = []
+        execute = FakePipeline.execute
+
+        def racing_execute(pipeline):
+            results = execute(pipeline)
+            FakePipeline.execute = execute
+            decisions.append(other_worker.check_rate_limit("10.0.0.1", "password_reset")[0])
+            return results
+
+        FakePipeline.execute = racing_execute
+        try:
+            decisions.append(self.security.check_rate_limit("10.0.0.1", "password_reset")[0])
+        finally:
+            FakePipeline.execute = execute
+
+        self.assertEqual(sorted(decisions), [False, True])
+        self.assertEqual(self.redis.zcard("security:rate:password_reset:10.0.0.1"), 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+🗂️ تست‌های خط لوله خروجی سایت استاتیک
+"""
+
+import unittest
+import os
+import sys
+import io
+import re
+import tempfile
+import shutil
+import zipfile
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+# اضافه کردن مسیر پروژه
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from static_site_pipeline import StaticSiteExportPipeline, SitemapWriter
+from advanced_export_system import ExportOptions, ExportFormat, ExportQuality
+
+
+class TestStaticSiteExportPipeline(unittest.TestCase):
+    """تست‌های StaticSiteExportPipeline"""
+
+    def setUp(self):
+        """راه‌اندازی قبل از هر تست"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.options = ExportOptions(format=ExportFormat.HTML, quality=ExportQuality.HIGH)
+        self.metadata = {"title": "My Site", "base_url": "https://mysite.com"}
+
+    def tearDown(self):
+        """پاکسازی بعد از هر تست"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _pages(self, count):
+        return ((f"pages/page-{i}.html", f"<h1>Page {i}</h1>") for i in range(count))
+
+    def test_export_to_directory(self):
+        """تست خروجی مستقیم روی دیسک با فرایندهای موازی"""
+        pipeline = StaticSiteExportPipeline(max_workers=2, batch_size=4)
+        report = pipeline.export_to_directory(
+            self._pages(20), self.options, self.temp_dir, self.metadata,
+            shared_css="body { color: red; }", shared_js="console.log('x');"
+        )
+
+        css_name = report["shared_assets"]["css"]
+        self.assertEqual(report["pages"], 20)
+        self.assertRegex(css_name, r"^styles\.[0-9a-f]{10}\.css$")
+        self.assertTrue((self.temp_dir / css_name).exists())
+        self.assertTrue((self.temp_dir / "robots.txt").exists())
+
+        page_path = self.temp_dir / "pages" / "page-7.html"
+        page = page_path.read_text(encoding="utf-8")
+        css_link = re.search(r'href="([^"]+\.css)"', page).group(1)
+        js_link = re.search(r'src="([^"]+\.js)"', page).group(1)
+        self.assertEqual(css_link, f"../{css_name}")
+        self.assertTrue((page_path.parent / css_link).resolve().is_file())
+        self.assertTrue((page_path.parent / js_link).resolve().is_file())
+        self.assertIn("<h1>Page 7</h1>", page)
+
+        sitemap = (self.temp_dir / "sitemap.xml").read_text(encoding="utf-8")
+        self.assertEqual(sitemap.count("<url>"), 20)
+
+    def test_export_to_zip(self):
+        """تست خروجی ZIP جریانی"""
+        pipeline = StaticSiteExportPipeline(max_workers=2, batch_size=3, use_processes=False)
+        output = io.BytesIO()
+        report = pipeline.export_to_zip(self._pages(10), self.options, output, self.metadata,
+                                        shared_css="a { color: blue; }")
+
+        with zipfile.ZipFile(io.BytesIO(output.getvalue())) as archive:
+            names = archive.namelist()
+            self.assertEqual(names[0], report["shared_assets"]["css"])
+            self.assertEqual(names[1:11], [f"pages/page-{i}.html" for i in range(10)])
+            self.assertEqual(names[-2:], ["sitemap.xml", "robots.txt"])
+        self.assertEqual(report["bytes_written"], len(output.getvalue()))
+
+    def test_concurrent_thread_pipelines_keep_their_templates(self):
+        """تست جدا ماندن قالب‌های خط لوله‌های هم‌زمان در حالت رشته‌ای"""
+        pipelines = []
+        for marker in ("alpha", "beta"):
+            pipeline = StaticSiteExportPipeline(max_workers=2, batch_size=1, use_processes=False)
+            pipeline.export_system.export_templates["responsive_html"] = f"<!-- {marker} -->{{{{content}}}}"
+            pipelines.append((marker, pipeline))
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [executor.submit(pipeline.export_to_directory, self._pages(30), self.options,
+                                       self.temp_dir / marker) for marker, pipeline in pipelines]
+            for future in futures:
+                future.result()
+
+        for marker, _ in pipelines:
+            for path in (self.temp_dir / marker / "pages").iterdir():
+                self.assertTrue(path.read_text(encoding="utf-8").startswith(f"<!-- {marker} -->"))
+
+        # A root-level page links the shared assets without a prefix
+        pipeline = StaticSiteExportPipeline(max_workers=1, use_processes=False)
+        report = pipeline.export_to_directory({"index.html": "<p>Home</p>"}, self.options,
+                                              self.temp_dir / "root", shared_css="p { margin: 0; }")
+        self.assertIn(f'href="{report["shared_assets"]["css"]}"',
+                      (self.temp_dir / "root" / "index.html").read_text(encoding="utf-8"))
+
+    def test_rejects_paths_outside_export(self):
+        """تست جلوگیری از نوشتن خارج از پوشه خروجی"""
+        pipeline = StaticSiteExportPipeline(max_workers=1, use_processes=False)
+        with self.assertRaises(ValueError):
+            pipeline.export_to_directory({"../evil.html": "x"}, self.options, self.temp_dir / "site")
+
+    def test_zip_rejects_unsafe_entry_names(self):
+        """تست جلوگیری از مسیرهای خطرناک در فایل ZIP"""
+        pipeline = StaticSiteExportPipeline(max_workers=1, use_processes=False)
+        for page_path in ("../../evil.html", "/abs.html", "pages\\..\\..\\evil.html", "C:evil.html", ""):
+            with self.assertRaises(ValueError):
+                pipeline.export_to_zip({page_path: "x"}, self.options, io.BytesIO())
+
+        output = io.BytesIO()
+        pipeline.export_to_zip({"./blog//post.html": "x"}, self.options, output)
+        with zipfile.ZipFile(io.BytesIO(output.getvalue())) as archive:
+            self.assertEqual(archive.namelist()[0], "blog/post.html")
+
+    def test_sitemap_index_for_many_urls(self):
+        """تست تقسیم نقشه سایت به چند فایل"""
+        writer = SitemapWriter(self.temp_dir, "https://mysite.com", max_urls=3)
+        for i in range(7):
+            writer.add(f"p{i}.html?a=1&b=2")
+        files = writer.close()
+
+        self.assertEqual([path.name for path in files],
+                         ["sitemap.xml", "sitemap-1.xml", "sitemap-2.xml", "sitemap-3.xml"])
+        index = (self.temp_dir / "sitemap.xml").read_text(encoding="utf-8")
+        self.assertIn("<sitemapindex", index)
+        self.assertIn("&amp;b=2", (self.temp_dir / "sitemap-3.xml").read_text(encoding="utf-8"))
+
+
+if __name__ == '__main__':
+    unittest.main()
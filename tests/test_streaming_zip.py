@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+📦 تست‌های نویسنده ZIP جریانی
+"""
+
+import unittest
+import os
+import sys
+import io
+import tempfile
+import shutil
+import zipfile
+from pathlib import Path
+
+# اضافه کردن مسیر پروژه
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from streaming_zip import StreamingZipWriter, ZIP_STORED, ZIP_DEFLATED
+
+
+class TestStreamingZipWriter(unittest.TestCase):
+    """تست‌های StreamingZipWriter"""
+
+    def setUp(self):
+        """راه‌اندازی قبل از هر تست"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        """پاکسازی بعد از هر تست"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _read_archive(self, data: bytes) -> zipfile.ZipFile:
+        archive = zipfile.ZipFile(io.BytesIO(data))
+        self.assertIsNone(archive.testzip())
+        return archive
+
+    def test_round_trip(self):
+        """تست خواندن آرشیو تولید شده با zipfile"""
+        files = {
+            "index.html": "<h1>سلام</h1>" * 200,
+            "assets/app.js": b"console.log('hi');" * 100,
+        }
+        data = b"".join(StreamingZipWriter().iter_zip(files.items()))
+        archive = self._read_archive(data)
+
+        self.assertEqual(archive.read("index.html").decode("utf-8"), files["index.html"])
+        self.assertEqual(archive.read("assets/app.js"), files["assets/app.js"])
+
+    def test_precompressed_formats_are_stored(self):
+        """تست ذخیره فرمت‌های فشرده بدون deflate مجدد"""
+        files = [
+            ("logo.png", b"\x89PNG" + b"\x00" * 4096),
+            ("font.woff2", b"wOF2" + b"\x00" * 4096),
+            ("styles.css", "body { color: red; }\n" * 200),
+        ]
+        archive = self._read_archive(b"".join(StreamingZipWriter().iter_zip(files)))
+
+        self.assertEqual(archive.getinfo("logo.png").compress_type, ZIP_STORED)
+        self.assertEqual(archive.getinfo("font.woff2").compress_type, ZIP_STORED)
+        self.assertEqual(archive.getinfo("styles.css").compress_type, ZIP_DEFLATED)
+
+    def test_large_files_are_streamed_from_disk(self):
+        """تست جریان فایل‌های بزرگ از دیسک با data descriptor"""
+        big_file = self.temp_dir / "big.txt"
+        big_file.write_text("line of text\n" * 20000)
+        writer = StreamingZipWriter(inline_limit=1024, chunk_size=4096)
+
+        chunks = list(writer.iter_zip([("small.txt", "x"), ("big.txt", big_file)]))
+        archive = self._read_archive(b"".join(chunks))
+
+        self.assertGreater(len(chunks), 2)
+        self.assertEqual(archive.read("big.txt"), big_file.read_bytes())
+        self.assertEqual(writer.last_stats["entries"], 2)
+        self.assertEqual(writer.last_stats["bytes_out"], sum(len(chunk) for chunk in chunks))
+
+    def test_zip64_entry_count(self):
+        """تست رکوردهای ZIP64 برای بیش از ۶۵۵۳۵ فایل"""
+        entries = ((f"page-{i}.html", f"<p>{i}</p>") for i in range(70000))
+        archive = self._read_archive(b"".join(StreamingZipWriter().iter_zip(entries)))
+
+        self.assertEqual(len(archive.infolist()), 70000)
+        self.assertEqual(archive.read("page-69999.html"), b"<p>69999</p>")
+
+    def test_directory_to_file(self):
+        """تست فشرده‌سازی پوشه در فایل"""
+        (self.temp_dir / "site" / "css").mkdir(parents=True)
+        (self.temp_dir / "site" / "index.html").write_text("<html></html>")
+        (self.temp_dir / "site" / "css" / "main.css").write_text("a{}")
+        zip_path = self.temp_dir / "site.zip"
+
+        writer = StreamingZipWriter()
+        with open(zip_path, "wb") as zip_file:
+            written = writer.write_zip(writer.iter_directory(self.temp_dir / "site"), zip_file)
+
+        self.assertEqual(written, zip_path.stat().st_size)
+        with zipfile.ZipFile(zip_path) as archive:
+            self.assertEqual(sorted(archive.namelist()), ["css/main.css", "index.html"])
+
+
+if __name__ == '__main__':
+    unittest.main()
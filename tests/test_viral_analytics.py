@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+📈 تست‌های ذخیره‌ساز رویداد و تجمیع‌های تحلیل وایرال
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+from types import SimpleNamespace
+
+# اضافه کردن مسیر پروژه
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from viral_analytics import DAY, HOUR, ViralEventStore
+from viral_features import ViralFeaturesSystem
+
+NOW = 1_800_000_000.0
+
+
+class FakeClock:
+    def __init__(self, now=NOW):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def make_event(offset, user_id="user-1", event_type="gamification", **data):
+    return SimpleNamespace(id=f"event-{offset}", type=event_type, user_id=user_id,
+                           timestamp=NOW + offset, data=data)
+
+
+class TestViralEventStore(unittest.TestCase):
+    """تست‌های ViralEventStore"""
+
+    def setUp(self):
+        """راه‌اندازی قبل از هر تست"""
+        self.clock = FakeClock()
+        self.store = ViralEventStore(clock=self.clock)
+
+    def tearDown(self):
+        """پاک‌سازی پس از هر تست"""
+        self.store.close()
+
+    def test_summary_from_rollups(self):
+        """تست خلاصه پنجره زمانی از روی تجمیع‌ها"""
+        self.store.append(make_event(-HOUR, action="create_website"))
+        self.store.append(make_event(-2 * HOUR, "user-2", action="create_website"))
+        self.store.append(make_event(-3 * DAY, "user-3", "referral"))
+        self.store.append(make_event(-10 * DAY, "user-4", action="voice_command"))
+
+        summary = self.store.summary(1)
+        self.assertEqual(summary["total_events"], 2)
+        self.assertEqual(summary["unique_users"], 2)
+        self.assertEqual(summary["events_by_action"], {"create_website": 2})
+
+        week = self.store.summary(7)
+        self.assertEqual(week["total_events"], 3)
+        self.assertEqual(week["events_by_type"], {"gamification": 2, "referral": 1})
+
+        self.assertEqual(self.store.summary(60)["total_events"], 4)
+
+    def test_totals(self):
+        """تست آمار کل"""
+        for index in range(3):
+            self.store.append(make_event(-index, f"user-{index % 2}", action="use_ai_content"))
+        totals = self.store.totals()
+        self.assertEqual(totals["total_users"], 2)
+        self.assertEqual(totals["events_by_action"], {"use_ai_content": 3})
+        self.assertEqual(totals["counts"], {"gamification": {"use_ai_content": 3}})
+
+    def test_hourly_rollups_pruned(self):
+        """تست حذف تجمیع‌های ساعتی قدیمی با حفظ تجمیع روزانه"""
+        store = ViralEventStore(hourly_retention_days=1, clock=self.clock)
+        store.append(make_event(-5 * DAY))
+        store.append(make_event(0))
+        hourly = store.connection.execute("SELECT COUNT(*) FROM rollups WHERE granularity = ?", (HOUR,)).fetchone()[0]
+        self.assertEqual(hourly, 1)
+        self.assertEqual(store.summary(7)["total_events"], 2)
+        store.close()
+
+    def test_trending_decay(self):
+        """تست رتبه‌بندی داغ با کاهش نمایی امتیاز"""
+        self.store.append(make_event(-2 * DAY, event_type="template_sharing", template_id="old",
+                                     template_name="Old", interaction="publish"))
+        for _ in range(10):
+            self.store.append(make_event(-2 * DAY, event_type="template_sharing", template_id="old",
+                                         interaction="download"))
+        self.store.append(make_event(-HOUR, event_type="template_sharing", template_id="new",
+                                     template_name="New", category="portfolio", tags=["AI"], interaction="publish"))
+        self.store.append(make_event(0, event_type="template_sharing", template_id="new", interaction="share"))
+        self.store.append(make_event(0, event_type="template_sharing", template_id="new",
+                                     interaction="rating", rating=4.0))
+
+        trending = self.store.trending_templates(5)
+        self.assertEqual([template["id"] for template in trending], ["new", "old"])
+        self.assertEqual(trending[0]["name"], "New")
+        self.assertEqual(trending[0]["tags"], ["AI"])
+        self.assertEqual(trending[0]["rating"], 4.0)
+        self.assertEqual(trending[1]["downloads"], 10)
+        # ۱۱ واحد امتیاز با ۸ نیمه‌عمر: 11 / 256
+        self.assertAlmostEqual(trending[1]["trending_score"], 11 / 256)
+
+    def test_rebuild_and_persistence(self):
+        """تست بازسازی تجمیع‌ها از لاگ و ماندگاری روی دیسک"""
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, "viral.db")
+            store = ViralEventStore(path, clock=self.clock)
+            store.append(make_event(-HOUR, action="collaborate"))
+            store.append(make_event(0, event_type="template_sharing", template_id="t", interaction="publish"))
+            store.close()
+
+            reopened = ViralEventStore(path, clock=self.clock)
+            before = reopened.totals()
+            reopened.connection.execute("DELETE FROM rollups")
+            reopened.rebuild()
+            self.assertEqual(reopened.totals(), before)
+            self.assertEqual([event["id"] for event in reopened.iter_events(since=NOW - 60)], ["event-0"])
+            self.assertEqual(len(list(reopened.iter_events(event_type="gamification"))), 1)
+            self.assertEqual(len(reopened.trending_templates()), 1)
+            reopened.close()
+        finally:
+            shutil.rmtree(directory)
+
+
+class TestViralFeaturesAnalytics(unittest.TestCase):
+    """تست‌های اتصال ViralFeaturesSystem به ذخیره‌ساز رویداد"""
+
+    def test_analytics_and_trending(self):
+        """تست تحلیل‌ها و قالب‌های داغ"""
+        viral_system = ViralFeaturesSystem()
+        viral_system.award_experience("ali", "create_website")
+        viral_system.award_experience("sara", "create_website")
+        shared = viral_system.share_template("sara", {"name": "Shop", "category": "ecommerce"})
+        viral_system.track_template_interaction("ali", shared["share_id"], "download")
+
+        analytics = viral_system.get_viral_analytics(7)
+        self.assertEqual(analytics["total_events"], 4)
+        self.assertEqual(analytics["unique_users"], 2)
+        self.assertEqual(analytics["engagement_score"], 2)
+
+        stats = viral_system.get_global_stats()
+        self.assertEqual(stats["total_websites_created"], 2)
+        self.assertEqual(stats["total_templates_shared"], 1)
+
+        trending = viral_system.get_trending_templates(5)
+        self.assertEqual(trending[0]["id"], shared["share_id"])
+        self.assertEqual(trending[0]["downloads"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+📡 تست‌های پخش همزمان پیام با صف ارسال جداگانه برای هر کلاینت
+"""
+
+import unittest
+import os
+import sys
+import asyncio
+import json
+import uuid
+
+# اضافه کردن مسیر پروژه
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from websocket_broadcaster import SLOW_CONSUMER_CLOSE_CODE, FanoutBroadcaster
+from real_time_collaboration import RealTimeCollaboration
+
+
+class FakeConnection:
+    """اتصال ساختگی که می‌تواند ارسال را تا آزادسازی متوقف کند"""
+
+    def __init__(self, blocked=False, fail=False):
+        self.id = uuid.uuid4()
+        self.received = []
+        self.gate = asyncio.Event()
+        self.fail = fail
+        self.closed_with = None
+        if not blocked:
+            self.gate.set()
+
+    async def send(self, payload):
+        if self.fail:
+            raise ConnectionError("broken pipe")
+        await self.gate.wait()
+        self.received.append(payload)
+
+    async def close(self, code=1000, reason=""):
+        self.closed_with = code
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class TestFanoutBroadcaster(unittest.TestCase):
+    """تست‌های FanoutBroadcaster"""
+
+    def test_serializes_once_and_excludes_sender(self):
+        """تست سریال‌سازی یکباره و حذف فرستنده"""
+        async def run():
+            broadcaster = FanoutBroadcaster()
+            connections = [FakeConnection() for _ in range(3)]
+            for connection in connections:
+                broadcaster.register(connection)
+            self.assertEqual(broadcaster.broadcast(connections, {"type": "chat"}, exclude=connections[0]), 2)
+            await broadcaster.flush(timeout=1)
+            self.assertEqual(connections[0].received, [])
+            self.assertIs(connections[1].received[0], connections[2].received[0])
+            self.assertEqual(json.loads(connections[1].received[0]), {"type": "chat"})
+            await broadcaster.close()
+        asyncio.run(run())
+
+    def test_slow_client_does_not_block_others(self):
+        """تست عدم توقف کلاینت‌های سریع به خاطر کلاینت کند"""
+        async def run():
+            broadcaster = FanoutBroadcaster()
+            slow, fast = FakeConnection(blocked=True), FakeConnection()
+            broadcaster.register(slow)
+            broadcaster.register(fast)
+            await settle()
+            for index in range(10):
+                broadcaster.broadcast([slow, fast], {"index": index})
+            await settle()
+            self.assertEqual(len(fast.received), 10)
+            self.assertEqual(slow.received, [])
+            self.assertEqual(broadcaster.queue_depth(slow), 9)
+
+            slow.gate.set()
+            await broadcaster.flush(timeout=1)
+            self.assertEqual([json.loads(payload)["index"] for payload in slow.received], list(range(10)))
+            metrics = broadcaster.get_metrics()
+            self.assertEqual(metrics["sent"], 20)
+            self.assertEqual(metrics["max_queue_depth"], 10)
+            self.assertGreaterEqual(metrics["delivery_latency"]["max"], metrics["delivery_latency"]["p50"])
+            await broadcaster.close()
+        asyncio.run(run())
+
+    def test_presence_updates_coalesce(self):
+        """تست ادغام به‌روزرسانی‌های مکان‌نما در صف"""
+        async def run():
+            broadcaster = FanoutBroadcaster()
+            client = FakeConnection(blocked=True)
+            broadcaster.register(client)
+            for position in range(5):
+                broadcaster.send(client, {"position": position}, coalesce_key=("cursor", "ali"))
+                await settle()
+            broadcaster.send(client, {"type": "operation"})
+            broadcaster.send(client, {"position": 9}, coalesce_key=("cursor", "ali"))
+            client.gate.set()
+            await broadcaster.flush(timeout=1)
+            # اولی در حال ارسال بود؛ بقیه در همان جایگاه صف ادغام شدند
+            self.assertEqual([json.loads(payload) for payload in client.received],
+                             [{"position": 0}, {"position": 9}, {"type": "operation"}])
+            self.assertEqual(broadcaster.get_metrics()["coalesced"], 4)
+            await broadcaster.close()
+        asyncio.run(run())
+
+    def test_full_queue_drops_presence_then_disconnects(self):
+        """تست دور ریختن پیام‌های حضور و قطع کلاینت کند"""
+        async def run():
+            dropped = []
+            broadcaster = FanoutBroadcaster(max_queue=2, on_disconnect=dropped.append)
+            client = FakeConnection(blocked=True)
+            broadcaster.register(client)
+            broadcaster.send(client, "in-flight")
+            await settle()
+
+            broadcaster.send(client, "cursor-1", coalesce_key=("cursor", "ali"))
+            broadcaster.send(client, "operation-1")
+            # صف پر است: پیام حضور قدیمی‌تر جای خود را به جدیدتر می‌دهد
+            self.assertTrue(broadcaster.send(client, "cursor-2", coalesce_key=("cursor", "sara")))
+            self.assertTrue(broadcaster.send(client, "operation-2"))
+            self.assertEqual(list(entry[0] for entry in broadcaster.channels[client].queue),
+                             ["operation-1", "operation-2"])
+            self.assertEqual(broadcaster.get_metrics()["dropped"], 2)
+
+            self.assertFalse(broadcaster.send(client, "operation-3"))
+            await settle()
+            self.assertEqual(dropped, [client])
+            self.assertEqual(client.closed_with, SLOW_CONSUMER_CLOSE_CODE)
+            self.assertEqual(broadcaster.get_metrics()["slow_disconnects"], 1)
+            self.assertNotIn(client, broadcaster.channels)
+            await broadcaster.close()
+        asyncio.run(run())
+
+    def test_send_failure_drops_connection(self):
+        """تست حذف اتصال پس از خطای ارسال"""
+        async def run():
+            dropped = []
+            broadcaster = FanoutBroadcaster(on_disconnect=dropped.append)
+            broken = FakeConnection(fail=True)
+            broadcaster.register(broken)
+            broadcaster.broadcast([broken], {"type": "chat"})
+            await settle()
+            self.assertEqual(dropped, [broken])
+            self.assertEqual(broadcaster.get_metrics()["send_errors"], 1)
+            self.assertEqual(broadcaster.broadcast([broken], {"type": "chat"}), 0)
+            await broadcaster.close()
+        asyncio.run(run())
+
+
+class TestCollaborationBroadcast(unittest.TestCase):
+    """تست‌های اتصال RealTimeCollaboration به پخش‌کننده"""
+
+    def test_project_broadcast_uses_queues(self):
+        """تست پخش پیام پروژه از طریق صف‌ها"""
+        async def run():
+            collaboration = RealTimeCollaboration()
+            project_id = collaboration.create_project("Queues", "user1")
+            user = collaboration.projects[project_id].users["user1"]
+            sender, slow = FakeConnection(), FakeConnection(blocked=True)
+            for connection in (sender, slow):
+                collaboration.active_connections[project_id].add(connection)
+                collaboration.broadcaster.register(connection)
+                collaboration.user_sessions[connection.id] = {"user": user, "project_id": project_id}
+            await settle()
+
+            for position in range(3):
+                await collaboration._broadcast_cursor_move(project_id, user, {"position": position}, sender)
+            self.assertEqual(collaboration.get_presence_metrics()["coalesced"], 2)
+            collaboration.presence.flush()
+            slow.gate.set()
+            await collaboration.broadcaster.flush(timeout=1)
+            self.assertEqual(sender.received, [])
+            self.assertEqual([json.loads(payload)["data"]["position"] for payload in slow.received], [2])
+
+            broken = FakeConnection(fail=True)
+            collaboration.active_connections[project_id].add(broken)
+            collaboration.broadcaster.register(broken)
+            collaboration.user_sessions[broken.id] = {"user": user, "project_id": project_id}
+            await collaboration._broadcast_chat_message(project_id, {"message": "hi"})
+            await settle()
+            self.assertNotIn(broken, collaboration.active_connections[project_id])
+            await collaboration.presence.close()
+            await collaboration.broadcaster.close()
+        asyncio.run(run())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Viral Analytics - Event-sourced viral analytics store
+Append-only SQLite event log with incremental hourly/daily rollups and a
+decayed trending index for shared templates
+"""
+
+import json
+import math
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from enum import Enum
+from typing import Any, Callable, Dict, Iterator, List, Optional
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+HOUR = 3600
+DAY = 86400
+
+TEMPLATE_EVENT_TYPE = "template_sharing"
+
+# How much each template interaction adds to its trending score
+TRENDING_WEIGHTS = {
+    "publish": 1.0,
+    "view": 0.1,
+    "download": 1.0,
+    "share": 3.0,
+    "rating": 0.5,
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL,
+    type TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_by_time ON events (timestamp);
+
+CREATE TABLE IF NOT EXISTS rollups (
+    granularity INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    action TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (granularity, bucket, type, action)
+);
+
+CREATE TABLE IF NOT EXISTS active_users (
+    day INTEGER NOT NULL,
+    user_id TEXT NOT NULL,
+    PRIMARY KEY (day, user_id)
+);
+
+CREATE TABLE IF NOT EXISTS users (
+    user_id TEXT PRIMARY KEY,
+    first_seen REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS templates (
+    template_id TEXT PRIMARY KEY,
+    owner TEXT,
+    name TEXT,
+    category TEXT,
+    tags TEXT,
+    created_at REAL,
+    views INTEGER NOT NULL DEFAULT 0,
+    downloads INTEGER NOT NULL DEFAULT 0,
+    shares INTEGER NOT NULL DEFAULT 0,
+    rating_total REAL NOT NULL DEFAULT 0,
+    rating_count INTEGER NOT NULL DEFAULT 0,
+    trend_key REAL
+);
+CREATE INDEX IF NOT EXISTS templates_by_trend ON templates (trend_key DESC);
+"""
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _logaddexp2(current: Optional[float], addition: float) -> float:
+    """log2(2**current + 2**addition) without overflow"""
+    if current is None:
+        return addition
+    high, low = max(current, addition), min(current, addition)
+    return high + math.log2(1.0 + 2.0 ** (low - high))
+
+
+class ViralEventStore:
+    """Append-only viral event log with rollups maintained on write
+
+    Each append inserts the raw event and bumps per-hour and per-day
+    counters by event type and action, so dashboards read a few hundred
+    rollup rows instead of rescanning every event. Unique users are kept
+    as one row per user per day.
+
+    Trending uses exponentially decayed scores stored in log2 space
+    relative to a fixed epoch: ``trend_key = log2(sum(w * 2**(t / half_life)))``.
+    Decay shifts every key equally, so ranking never changes with time and
+    the top-k query is a plain index scan; the current score is
+    ``2 ** (trend_key - now / half_life)``.
+    """
+
+    def __init__(self, path: str = ":memory:", trending_half_life: float = 6 * HOUR,
+                 hourly_retention_days: int = 30, clock: Callable[[], float] = time.time):
+        self.path = path
+        self.trending_half_life = trending_half_life
+        self.hourly_retention_days = hourly_retention_days
+        self.clock = clock
+        self._lock = threading.RLock()
+        self._last_pruned_hour: Optional[int] = None
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.create_function("logaddexp2", 2, _logaddexp2, deterministic=True)
+        if path != ":memory:":
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(_SCHEMA)
+
+    # 1. Writes
+    def append(self, event: Any):
+        """Record a ViralEvent-like object (``id``, ``type``, ``user_id``, ``timestamp``, ``data``)"""
+        event_type = event.type.value if isinstance(event.type, Enum) else str(event.type)
+        timestamp = event.timestamp.timestamp() if isinstance(event.timestamp, datetime) else float(event.timestamp)
+        data = event.data or {}
+        with self._lock, self.connection:
+            self.connection.execute(
+                "INSERT INTO events (id, type, user_id, timestamp, data) VALUES (?, ?, ?, ?, ?)",
+                (event.id, event_type, event.user_id, timestamp, json.dumps(data, default=_json_default)))
+            self._apply(event_type, event.user_id, timestamp, data)
+
+    def _apply(self, event_type: str, user_id: str, timestamp: float, data: Dict):
+        """Fold one event into the rollups and indexes"""
+        # Rollups are keyed by type and action (template events: the interaction)
+        action = str(data.get("action", data.get("interaction", "")))
+        hour = int(timestamp // HOUR) * HOUR
+        day = int(timestamp // DAY) * DAY
+        execute = self.connection.execute
+        for granularity, bucket in ((HOUR, hour), (DAY, day)):
+            execute("INSERT INTO rollups (granularity, bucket, type, action, count) VALUES (?, ?, ?, ?, 1) "
+                    "ON CONFLICT (granularity, bucket, type, action) DO UPDATE SET count = count + 1",
+                    (granularity, bucket, event_type, action))
+        execute("INSERT OR IGNORE INTO active_users (day, user_id) VALUES (?, ?)", (day, user_id))
+        execute("INSERT OR IGNORE INTO users (user_id, first_seen) VALUES (?, ?)", (user_id, timestamp))
+
+        if event_type == TEMPLATE_EVENT_TYPE and "template_id" in data:
+            self._apply_template_event(user_id, timestamp, data)
+
+        if self._last_pruned_hour is None or hour > self._last_pruned_hour:
+            self._last_pruned_hour = hour
+            execute("DELETE FROM rollups WHERE granularity = ? AND bucket < ?",
+                    (HOUR, hour - self.hourly_retention_days * DAY))
+
+    def _apply_template_event(self, user_id: str, timestamp: float, data: Dict):
+        template_id = data["template_id"]
+        interaction = data.get("interaction", "publish")
+        execute = self.connection.execute
+        if interaction == "publish":
+            execute("INSERT INTO templates (template_id, owner, name, category, tags, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (template_id) DO UPDATE SET "
+                    "name = excluded.name, category = excluded.category, tags = excluded.tags",
+                    (template_id, user_id, data.get("template_name", "Untitled"),
+                     data.get("category", "general"), json.dumps(data.get("tags", [])), timestamp))
+        else:
+            execute("INSERT OR IGNORE INTO templates (template_id, created_at) VALUES (?, ?)",
+                    (template_id, timestamp))
+
+        counter = {"view": "views", "download": "downloads", "share": "shares"}.get(interaction)
+        if counter is not None:
+            execute(f"UPDATE templates SET {counter} = {counter} + 1 WHERE template_id = ?", (template_id,))
+        if interaction == "rating" and "rating" in data:
+            execute("UPDATE templates SET rating_total = rating_total + ?, rating_count = rating_count + 1 "
+                    "WHERE template_id = ?", (float(data["rating"]), template_id))
+
+        weight = float(data.get("weight", TRENDING_WEIGHTS.get(interaction, 0.0)))
+        if weight > 0:
+            key = math.log2(weight) + timestamp / self.trending_half_life
+            execute("UPDATE templates SET trend_key = logaddexp2(trend_key, ?) WHERE template_id = ?",
+                    (key, template_id))
+
+    def rebuild(self):
+        """Recompute every rollup and index by replaying the event log"""
+        with self._lock, self.connection:
+            for table in ("rollups", "active_users", "users", "templates"):
+                self.connection.execute(f"DELETE FROM {table}")
+            self._last_pruned_hour = None
+            rows = self.connection.execute("SELECT type, user_id, timestamp, data FROM events ORDER BY seq").fetchall()
+            for row in rows:
+                self._apply(row["type"], row["user_id"], row["timestamp"], json.loads(row["data"]))
+
+    # 2. Reads
+    def iter_events(self, since: Optional[float] = None, event_type: Optional[str] = None) -> Iterator[Dict]:
+        """Raw events in append order"""
+        query = "SELECT id, type, user_id, timestamp, data FROM events WHERE timestamp >= ?"
+        params: List[Any] = [since if since is not None else float("-inf")]
+        if event_type is not None:
+            query += " AND type = ?"
+            params.append(event_type)
+        with self._lock:
+            rows = self.connection.execute(query + " ORDER BY seq", params).fetchall()
+        for row in rows:
+            yield {"id": row["id"], "type": row["type"], "user_id": row["user_id"],
+                   "timestamp": row["timestamp"], "data": json.loads(row["data"])}
+
+    def summary(self, days: float) -> Dict:
+        """Event counts over the last ``days`` from the rollups
+
+        Counts use hourly rollups (hour-aligned window) while they are
+        retained and daily rollups beyond that; unique users are counted
+        per whole day.
+        """
+        now = self.clock()
+        if days <= self.hourly_retention_days:
+            granularity, start = HOUR, int((now - days * DAY) // HOUR + 1) * HOUR
+        else:
+            granularity, start = DAY, int((now - days * DAY) // DAY + 1) * DAY
+        first_day = int((now - days * DAY) // DAY + 1) * DAY
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT type, action, SUM(count) AS total FROM rollups WHERE granularity = ? AND bucket >= ? "
+                "GROUP BY type, action", (granularity, start)).fetchall()
+            unique_users = self.connection.execute(
+                "SELECT COUNT(DISTINCT user_id) FROM active_users WHERE day >= ?", (first_day,)).fetchone()[0]
+
+        result = self._aggregate(rows)
+        result["unique_users"] = unique_users
+        return result
+
+    def totals(self) -> Dict:
+        """All-time counts by type, by action and by (type, action) plus distinct users"""
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT type, action, SUM(count) AS total FROM rollups WHERE granularity = ? GROUP BY type, action",
+                (DAY,)).fetchall()
+            total_users = self.connection.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+        result = self._aggregate(rows)
+        result["total_users"] = total_users
+        return result
+
+    @staticmethod
+    def _aggregate(rows) -> Dict:
+        events_by_type: Dict[str, int] = {}
+        events_by_action: Dict[str, int] = {}
+        counts: Dict[str, Dict[str, int]] = {}
+        for row in rows:
+            events_by_type[row["type"]] = events_by_type.get(row["type"], 0) + row["total"]
+            counts.setdefault(row["type"], {})[row["action"]] = row["total"]
+            if row["action"]:
+                events_by_action[row["action"]] = events_by_action.get(row["action"], 0) + row["total"]
+        return {
+            "total_events": sum(events_by_type.values()),
+            "events_by_type": events_by_type,
+            "events_by_action": events_by_action,
+            "counts": counts,
+        }
+
+    def trending_templates(self, limit: int = 10) -> List[Dict]:
+        """Templates ordered by decayed interaction score"""
+        now_key = self.clock() / self.trending_half_life
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT * FROM templates WHERE trend_key IS NOT NULL ORDER BY trend_key DESC LIMIT ?",
+                (limit,)).fetchall()
+        return [{
+            "id": row["template_id"],
+            "name": row["name"] or "Untitled",
+            "category": row["category"] or "general",
+            "owner": row["owner"],
+            "tags": json.loads(row["tags"]) if row["tags"] else [],
+            "views": row["views"],
+            "downloads": row["downloads"],
+            "shares": row["shares"],
+            "rating": round(row["rating_total"] / row["rating_count"], 2) if row["rating_count"] else 0.0,
+            "trending_score": 2.0 ** (row["trend_key"] - now_key),
+        } for row in rows]
+
+    def close(self):
+        with self._lock:
+            self.connection.close()
+
+
+# Example usage and testing
+if __name__ == "__main__":
+    import random
+    from types import SimpleNamespace
+
+    print("📈 Viral Analytics Demo")
+    print("=" * 50)
+
+    store = ViralEventStore()
+    now = time.time()
+    start = time.perf_counter()
+    for index in range(20000):
+        store.append(SimpleNamespace(
+            id=f"event-{index}", type="gamification", user_id=f"user-{index % 500}",
+            timestamp=now - random.uniform(0, 14 * DAY),
+            data={"action": random.choice(["create_website", "use_ai_content", "voice_command"])}))
+    print(f"✅ Appended 20000 events in {time.perf_counter() - start:.2f}s")
+
+    for template in range(5):
+        store.append(SimpleNamespace(id=f"t{template}", type=TEMPLATE_EVENT_TYPE, user_id="designer",
+                                     timestamp=now - template * HOUR,
+                                     data={"template_id": f"template-{template}", "template_name": f"T{template}"}))
+        for _ in range(template * 3):
+            store.append(SimpleNamespace(id="d", type=TEMPLATE_EVENT_TYPE, user_id="fan", timestamp=now,
+                                         data={"template_id": f"template-{template}", "interaction": "download"}))
+
+    start = time.perf_counter()
+    summary = store.summary(7)
+    print(f"✅ 7-day summary in {(time.perf_counter() - start) * 1000:.2f} ms: {summary['events_by_action']}")
+    print(f"✅ Trending: {[(t['id'], round(t['trending_score'], 2)) for t in store.trending_templates(3)]}")
+    store.close()
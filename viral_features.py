@@ -9,7 +9,8 @@ import json
 import random
 import time
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Deque, Dict, List, Optional, Any
+from collections import deque
 from dataclasses import dataclass
 from enum import Enum
 import logging
@@ -18,6 +19,9 @@ import qrcode
 from io import BytesIO
 import base64
 
+from leaderboard import LeaderboardBackend, LeaderboardService
+from viral_analytics import ViralEventStore
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -49,10 +53,14 @@ class ViralEvent:
 class ViralFeaturesSystem:
     """System for creating viral features that attract global users"""
     
-    def __init__(self):
-        self.viral_events: List[ViralEvent] = []
+    def __init__(self, leaderboard_backend: Optional[LeaderboardBackend] = None,
+                 event_store: Optional[ViralEventStore] = None):
+        # Recent events in memory; the event store keeps the full log and rollups
+        self.viral_events: Deque[ViralEvent] = deque(maxlen=1000)
+        self.event_store = event_store if event_store is not None else ViralEventStore()
         self.user_achievements: Dict[str, List[str]] = {}
-        self.leaderboards: Dict[str, List[Dict]] = {}
+        # Skip-list (or Redis sorted-set) boards with daily and weekly windows
+        self.leaderboard_service = LeaderboardService(leaderboard_backend)
         self.challenges: Dict[str, Dict] = {}
         self.referral_codes: Dict[str, str] = {}
         
@@ -108,13 +116,14 @@ class ViralFeaturesSystem:
         }
         
         # Initialize leaderboards
-        self.leaderboards = {
-            "weekly_builders": [],
-            "ai_content_creators": [],
-            "global_collaborators": [],
-            "voice_commanders": [],
-            "security_experts": []
-        }
+        for leaderboard_type in ["weekly_builders", "ai_content_creators", "global_collaborators",
+                                 "voice_commanders", "security_experts"]:
+            self.leaderboard_service.register(leaderboard_type)
+    
+    @property
+    def leaderboards(self) -> Dict[str, List[Dict]]:
+        """Snapshot of every all-time board (O(n); use get_leaderboard for pages)"""
+        return {name: self.leaderboard_service.top(name, limit=None) for name in self.leaderboard_service.names}
     
     # 1. Gamification System
     def create_user_profile(self, user_id: str, username: str) -> Dict:
@@ -264,37 +273,9 @@ class ViralFeaturesSystem:
         }
     
     # 4. Leaderboards
-    def update_leaderboard(self, leaderboard_type: str, user_id: str, score: int, metadata: Dict = None):
+    def update_leaderboard(self, leaderboard_type: str, user_id: str, score: int, metadata: Dict = None) -> Dict:
         """Update leaderboard"""
-        if leaderboard_type not in self.leaderboards:
-            self.leaderboards[leaderboard_type] = []
-        
-        # Find existing entry
-        existing_index = None
-        for i, entry in enumerate(self.leaderboards[leaderboard_type]):
-            if entry["user_id"] == user_id:
-                existing_index = i
-                break
-        
-        entry = {
-            "user_id": user_id,
-            "score": score,
-            "rank": 0,
-            "updated_at": datetime.now(),
-            "metadata": metadata or {}
-        }
-        
-        if existing_index is not None:
-            self.leaderboards[leaderboard_type][existing_index] = entry
-        else:
-            self.leaderboards[leaderboard_type].append(entry)
-        
-        # Sort by score
-        self.leaderboards[leaderboard_type].sort(key=lambda x: x["score"], reverse=True)
-        
-        # Update ranks
-        for i, entry in enumerate(self.leaderboards[leaderboard_type]):
-            entry["rank"] = i + 1
+        entry = self.leaderboard_service.submit_score(leaderboard_type, user_id, score, metadata)
         
         # Log viral event
         self._log_viral_event(ViralFeatureType.LEADERBOARD, user_id, {
@@ -302,13 +283,25 @@ class ViralFeaturesSystem:
             "score": score,
             "rank": entry["rank"]
         })
+        
+        return entry
+    
+    def add_leaderboard_points(self, leaderboard_type: str, user_id: str, points: int,
+                               metadata: Dict = None) -> Dict:
+        """Add points to a user's score (period boards count points earned in the period)"""
+        return self.leaderboard_service.add_points(leaderboard_type, user_id, points, metadata)
     
-    def get_leaderboard(self, leaderboard_type: str, limit: int = 10) -> List[Dict]:
-        """Get leaderboard"""
-        if leaderboard_type not in self.leaderboards:
-            return []
+    def get_leaderboard(self, leaderboard_type: str, limit: int = 10, window: str = "all_time",
+                        offset: int = 0) -> List[Dict]:
+        """Get leaderboard
         
-        return self.leaderboards[leaderboard_type][:limit]
+        ``window`` is "all_time", "daily" or "weekly".
+        """
+        return self.leaderboard_service.top(leaderboard_type, limit, window, offset)
+    
+    def get_leaderboard_rank(self, leaderboard_type: str, user_id: str, window: str = "all_time") -> Optional[int]:
+        """1-based rank of a user, or None if they are not on the board"""
+        return self.leaderboard_service.rank(leaderboard_type, user_id, window)
     
     # 5. Referral System
     def _generate_referral_code(self, user_id: str) -> str:
@@ -432,7 +425,10 @@ class ViralFeaturesSystem:
         # Log viral event
         self._log_viral_event(ViralFeatureType.TEMPLATE_SHARING, user_id, {
             "template_id": share_id,
-            "template_name": template_data.get("name", "Untitled")
+            "template_name": template_data.get("name", "Untitled"),
+            "interaction": "publish",
+            "category": shared_template["category"],
+            "tags": shared_template["tags"]
         })
         
         return {
@@ -441,9 +437,25 @@ class ViralFeaturesSystem:
             "template": shared_template
         }
     
+    def track_template_interaction(self, user_id: str, template_id: str, interaction: str,
+                                   rating: float = None):
+        """Record a view, download, share or rating of a shared template"""
+        data = {"template_id": template_id, "interaction": interaction}
+        if rating is not None:
+            data["rating"] = rating
+        self._log_viral_event(ViralFeatureType.TEMPLATE_SHARING, user_id, data)
+    
     def get_trending_templates(self, limit: int = 10) -> List[Dict]:
-        """Get trending templates"""
-        # Mock trending templates
+        """Get trending templates
+        
+        Read from the decayed-score index maintained by the event store;
+        featured templates are shown until anything has been shared.
+        """
+        trending = self.event_store.trending_templates(limit)
+        if trending:
+            return trending
+        
+        # Featured templates
         trending = [
             {
                 "id": "trending_1",
@@ -536,27 +548,16 @@ class ViralFeaturesSystem:
         )
         
         self.viral_events.append(event)
-        
-        # Keep only last 1000 events
-        if len(self.viral_events) > 1000:
-            self.viral_events = self.viral_events[-1000:]
+        self.event_store.append(event)
     
     def get_viral_analytics(self, days: int = 7) -> Dict:
         """Get viral analytics"""
-        cutoff_date = datetime.now() - timedelta(days=days)
-        recent_events = [e for e in self.viral_events if e.timestamp > cutoff_date]
-        
-        # Group by type
-        events_by_type = {}
-        for event in recent_events:
-            event_type = event.type.value
-            if event_type not in events_by_type:
-                events_by_type[event_type] = 0
-            events_by_type[event_type] += 1
+        summary = self.event_store.summary(days)
+        events_by_type = summary["events_by_type"]
         
         # Calculate engagement score
-        total_events = len(recent_events)
-        unique_users = len(set(e.user_id for e in recent_events))
+        total_events = summary["total_events"]
+        unique_users = summary["unique_users"]
         engagement_score = (total_events / unique_users) if unique_users > 0 else 0
         
         return {
@@ -570,16 +571,19 @@ class ViralFeaturesSystem:
     
     def get_global_stats(self) -> Dict:
         """Get global platform statistics"""
+        totals = self.event_store.totals()
+        by_action = totals["events_by_action"]
+        by_type = totals["events_by_type"]
         return {
-            "total_users": len(set(e.user_id for e in self.viral_events)),
-            "total_websites_created": sum(1 for e in self.viral_events if e.data.get("action") == "create_website"),
-            "total_ai_content_generated": sum(1 for e in self.viral_events if e.data.get("action") == "use_ai_content"),
-            "total_voice_commands": sum(1 for e in self.viral_events if e.data.get("action") == "voice_command"),
-            "total_collaborations": sum(1 for e in self.viral_events if e.data.get("action") == "collaborate"),
-            "total_templates_shared": sum(1 for e in self.viral_events if e.type == ViralFeatureType.TEMPLATE_SHARING),
-            "total_referrals": sum(1 for e in self.viral_events if e.type == ViralFeatureType.REFERRAL),
+            "total_users": totals["total_users"],
+            "total_websites_created": by_action.get("create_website", 0),
+            "total_ai_content_generated": by_action.get("use_ai_content", 0),
+            "total_voice_commands": by_action.get("voice_command", 0),
+            "total_collaborations": by_action.get("collaborate", 0),
+            "total_templates_shared": totals["counts"].get(ViralFeatureType.TEMPLATE_SHARING.value, {}).get("publish", 0),
+            "total_referrals": by_type.get(ViralFeatureType.REFERRAL.value, 0),
             "active_challenges": len([c for c in self.challenges.values() if c["participants"] > 0]),
-            "leaderboard_entries": sum(len(lb) for lb in self.leaderboards.values())
+            "leaderboard_entries": sum(self.leaderboard_service.count(name) for name in self.leaderboard_service.names)
         }
 
 # Example usage and testing
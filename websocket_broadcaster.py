@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WebSocket Broadcaster - Concurrent fan-out with per-client send queues
+Serializes each message once, pushes it to bounded per-connection queues
+drained by dedicated writer tasks, coalesces presence updates for slow
+consumers and reports queue depth and delivery latency
+"""
+
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Hashable, Iterable, List, Optional, Union
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SLOW_CONSUMER_CLOSE_CODE = 1013  # "Try Again Later"
+LATENCY_SAMPLES = 1024
+
+
+def serialize_message(message: Union[str, bytes, Dict[str, Any]]) -> Union[str, bytes]:
+    """Encode a message for the wire; pre-encoded payloads pass through"""
+    if isinstance(message, (str, bytes)):
+        return message
+    return json.dumps(message, default=str)
+
+
+class ClientChannel:
+    """Bounded send queue and writer task for a single connection
+
+    Entries are ``[payload, coalesce_key, enqueued_at]`` lists so that a
+    pending presence update can be overwritten in place.
+    """
+
+    def __init__(self, connection: Any, max_queue: int):
+        self.connection = connection
+        self.max_queue = max_queue
+        self.queue: Deque[List[Any]] = deque()
+        self.pending: Dict[Hashable, List[Any]] = {}
+        self.wakeup = asyncio.Event()
+        self.writer: Optional[asyncio.Task] = None
+        self.closed = False
+        self.sent = 0
+
+    def __len__(self) -> int:
+        return len(self.queue)
+
+    def _evict_droppable(self) -> bool:
+        """Drop the oldest pending presence update to make room"""
+        for entry in self.queue:
+            if entry[1] is not None:
+                self.queue.remove(entry)
+                del self.pending[entry[1]]
+                return True
+        return False
+
+
+class FanoutBroadcaster:
+    """Concurrent fan-out to many websocket connections
+
+    ``broadcast`` never awaits a socket: it serializes once and appends the
+    payload to each recipient's queue, so one slow client cannot stall the
+    rest. Messages sent with a ``coalesce_key`` (cursor moves, selections)
+    replace a still-queued message with the same key and are the first to
+    go when a queue is full. A client whose queue is full of messages that
+    cannot be dropped is disconnected.
+    """
+
+    def __init__(self, max_queue: int = 256,
+                 on_disconnect: Optional[Callable[[Any], None]] = None,
+                 clock: Callable[[], float] = time.perf_counter):
+        self.max_queue = max_queue
+        self.on_disconnect = on_disconnect
+        self.clock = clock
+        self.channels: Dict[Any, ClientChannel] = {}
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self.fanout_times: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self.stats = {
+            "broadcasts": 0,
+            "enqueued": 0,
+            "sent": 0,
+            "coalesced": 0,
+            "dropped": 0,
+            "send_errors": 0,
+            "slow_disconnects": 0,
+            "max_queue_depth": 0
+        }
+
+    # 1. Connection Lifecycle
+    def register(self, connection: Any) -> ClientChannel:
+        """Create the send queue and writer task for a connection"""
+        channel = self.channels.get(connection)
+        if channel is None:
+            channel = ClientChannel(connection, self.max_queue)
+            channel.writer = asyncio.get_running_loop().create_task(self._writer(channel))
+            self.channels[connection] = channel
+        return channel
+
+    def unregister(self, connection: Any):
+        """Stop the writer task and discard anything still queued"""
+        channel = self.channels.pop(connection, None)
+        if channel is None:
+            return
+        channel.closed = True
+        channel.queue.clear()
+        channel.pending.clear()
+        if channel.writer is not None and channel.writer is not asyncio.current_task():
+            channel.writer.cancel()
+
+    async def close(self):
+        """Stop every writer task"""
+        writers = [channel.writer for channel in self.channels.values() if channel.writer is not None]
+        for connection in list(self.channels):
+            self.unregister(connection)
+        await asyncio.gather(*writers, return_exceptions=True)
+
+    async def flush(self, timeout: Optional[float] = None):
+        """Wait until every queue has been drained"""
+        async def drained():
+            while any(channel.queue for channel in self.channels.values()):
+                await asyncio.sleep(0.001)
+        await asyncio.wait_for(drained(), timeout)
+
+    # 2. Fan-out
+    def broadcast(self, connections: Iterable[Any], message: Union[str, bytes, Dict[str, Any]],
+                  exclude: Any = None, coalesce_key: Optional[Hashable] = None) -> int:
+        """Queue one serialized copy of ``message`` for every connection
+
+        Returns the number of connections it was queued for.
+        """
+        start = self.clock()
+        payload = serialize_message(message)
+        delivered = 0
+        for connection in list(connections):
+            if connection is exclude:
+                continue
+            channel = self.channels.get(connection)
+            if channel is not None and self._enqueue(channel, payload, coalesce_key, start):
+                delivered += 1
+        self.stats["broadcasts"] += 1
+        self.fanout_times.append(self.clock() - start)
+        return delivered
+
+    def send(self, connection: Any, message: Union[str, bytes, Dict[str, Any]],
+             coalesce_key: Optional[Hashable] = None) -> bool:
+        """Queue a message for one connection, ordered after earlier broadcasts"""
+        channel = self.channels.get(connection)
+        if channel is None:
+            return False
+        return self._enqueue(channel, serialize_message(message), coalesce_key, self.clock())
+
+    def _enqueue(self, channel: ClientChannel, payload: Union[str, bytes],
+                 coalesce_key: Optional[Hashable], now: float) -> bool:
+        if channel.closed:
+            return False
+        if coalesce_key is not None:
+            entry = channel.pending.get(coalesce_key)
+            if entry is not None:
+                entry[0] = payload
+                entry[2] = now
+                self.stats["coalesced"] += 1
+                return True
+
+        if len(channel.queue) >= channel.max_queue:
+            if not channel._evict_droppable():
+                if coalesce_key is None:
+                    self._disconnect_slow(channel)
+                    return False
+                self.stats["dropped"] += 1
+                return False
+            self.stats["dropped"] += 1
+
+        entry = [payload, coalesce_key, now]
+        channel.queue.append(entry)
+        if coalesce_key is not None:
+            channel.pending[coalesce_key] = entry
+        self.stats["enqueued"] += 1
+        self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], len(channel.queue))
+        channel.wakeup.set()
+        return True
+
+    # 3. Writers
+    async def _writer(self, channel: ClientChannel):
+        """Drain one connection's queue in order"""
+        try:
+            while not channel.closed:
+                if not channel.queue:
+                    channel.wakeup.clear()
+                    await channel.wakeup.wait()
+                    continue
+                payload, coalesce_key, enqueued_at = channel.queue.popleft()
+                if coalesce_key is not None:
+                    del channel.pending[coalesce_key]
+                await channel.connection.send(payload)
+                channel.sent += 1
+                self.stats["sent"] += 1
+                self.latencies.append(self.clock() - enqueued_at)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Dropping connection after send failure: {e}")
+            self.stats["send_errors"] += 1
+            self._drop(channel)
+
+    def _disconnect_slow(self, channel: ClientChannel):
+        """Close a client that cannot keep up with non-droppable traffic"""
+        logger.warning(f"Disconnecting slow consumer with {len(channel)} queued messages")
+        self.stats["slow_disconnects"] += 1
+        self._drop(channel)
+        close = getattr(channel.connection, "close", None)
+        if close is not None:
+            asyncio.get_running_loop().create_task(close(code=SLOW_CONSUMER_CLOSE_CODE, reason="Client too slow"))
+
+    def _drop(self, channel: ClientChannel):
+        self.unregister(channel.connection)
+        if self.on_disconnect is not None:
+            self.on_disconnect(channel.connection)
+
+    # 4. Metrics
+    def queue_depth(self, connection: Any) -> int:
+        """Messages waiting to be written to a connection"""
+        channel = self.channels.get(connection)
+        return len(channel) if channel is not None else 0
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Queue depth, drop/coalesce counters and latency percentiles"""
+        depths = [len(channel) for channel in self.channels.values()]
+        return {
+            **self.stats,
+            "clients": len(self.channels),
+            "queued": sum(depths),
+            "queue_depth": max(depths, default=0),
+            "delivery_latency": _percentiles(self.latencies),
+            "fanout_latency": _percentiles(self.fanout_times)
+        }
+
+
+def _percentiles(samples: Iterable[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    if not ordered:
+        return {"avg": 0.0, "p50": 0.0, "p99": 0.0, "max": 0.0}
+    return {
+        "avg": sum(ordered) / len(ordered),
+        "p50": ordered[len(ordered) // 2],
+        "p99": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))],
+        "max": ordered[-1]
+    }
+
+
+# Example usage and testing
+if __name__ == "__main__":
+    class DemoConnection:
+        def __init__(self, name: str, delay: float):
+            self.name = name
+            self.delay = delay
+            self.received = []
+
+        async def send(self, payload):
+            await asyncio.sleep(self.delay)
+            self.received.append(payload)
+
+        async def close(self, code: int = 1000, reason: str = ""):
+            pass
+
+    async def main():
+        print("📡 WebSocket Broadcaster Demo")
+        print("=" * 50)
+
+        broadcaster = FanoutBroadcaster(max_queue=32)
+        fast = [DemoConnection(f"fast-{index}", 0) for index in range(50)]
+        slow = DemoConnection("slow", 0.05)
+        for connection in fast + [slow]:
+            broadcaster.register(connection)
+
+        for index in range(200):
+            broadcaster.broadcast(fast + [slow], {"type": "cursor_move", "position": index},
+                                  coalesce_key=("cursor_move", "user1"))
+            await asyncio.sleep(0)
+        await broadcaster.flush(timeout=5)
+
+        metrics = broadcaster.get_metrics()
+        print(f"✅ Fast client received: {len(fast[0].received)} messages")
+        print(f"✅ Slow client received: {len(slow.received)} messages (coalesced)")
+        print(f"✅ Coalesced: {metrics['coalesced']}, dropped: {metrics['dropped']}")
+        print(f"✅ p99 delivery latency: {metrics['delivery_latency']['p99'] * 1000:.2f} ms")
+        await broadcaster.close()
+
+    asyncio.run(main())